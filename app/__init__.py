@@ -81,6 +81,20 @@ def create_app(config_class=None):
         ITEMS_PER_PAGE=int(os.environ.get('ITEMS_PER_PAGE', 10)),
         PER_PAGE_TRADES=int(os.environ.get('PER_PAGE_TRADES', 25)),
 
+        # Analytics cache (app/utils/analytics_cache.py): lru, filesystem, sqlite or null.
+        # Use filesystem or sqlite to share one cache between gunicorn workers.
+        ANALYTICS_CACHE_TYPE=os.environ.get('ANALYTICS_CACHE_TYPE', 'lru'),
+        ANALYTICS_CACHE_TTL=int(os.environ.get('ANALYTICS_CACHE_TTL', 300)),
+        ANALYTICS_CACHE_MAX_ENTRIES=int(os.environ.get('ANALYTICS_CACHE_MAX_ENTRIES', 1024)),
+
+        # Dashboard live updates (app/utils/live_updates.py): memory, or sqlite to fan out across workers
+        LIVE_UPDATES_BROKER=os.environ.get('LIVE_UPDATES_BROKER', 'memory'),
+
+        # Report chart rendering: each web worker process keeps its own chart process pool,
+        # so gunicorn runs up to (web workers x REPORT_CHART_WORKERS) chart processes.
+        REPORT_PARALLEL_CHARTS=os.environ.get('REPORT_PARALLEL_CHARTS', 'True').lower() in ['true', '1', 't'],
+        REPORT_CHART_WORKERS=int(os.environ.get('REPORT_CHART_WORKERS', min(4, os.cpu_count() or 1))),
+
         # REMOVED: Profile picture configuration
         # PROFILE_PICS_FOLDER_REL=os.environ.get('PROFILE_PICS_FOLDER_REL', 'profile_pics'),
         # PROFILE_PICS_SAVE_PATH=os.path.join(os.path.abspath(os.path.join(app.root_path, 'static')),
@@ -285,6 +299,22 @@ def create_app(config_class=None):
 
         from app.blueprints.admin_access_control import access_control_bp
         app.register_blueprint(access_control_bp)
+        from app.blueprints.jobs_bp import jobs_bp
+        app.register_blueprint(jobs_bp, url_prefix='/jobs')
+
+        from app.services.job_service import job_service
+        job_service.initialize(app)
+
+        from app.utils.equity_series import register_equity_listeners
+        register_equity_listeners()
+        from app.utils.daily_performance import register_daily_performance_listeners
+        register_daily_performance_listeners()
+        from app.utils.data_version import register_data_version_listeners
+        register_data_version_listeners()
+        from app.utils.change_log import register_change_log_listeners
+        register_change_log_listeners()
+        from app.utils.live_updates import live_updates
+        live_updates.init_app(app)
 
         try:
             from app.services.discord_service import discord_service
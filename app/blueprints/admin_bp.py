@@ -24,6 +24,7 @@ import os
 from app.forms import TradingModelForm
 from app.models import User, UserRole, Activity, Instrument, Tag, TagCategory, TradingModel, P12Scenario, DiscordRolePermission, GlobalImage, Backtest, BacktestTrade, BacktestStatus, BacktestExitReason
 from app.utils.image_manager import ImageManager
+from app.services.job_service import background_job
 from app.forms import BacktestForm, BacktestTradeForm, BacktestFilterForm
 admin_bp = Blueprint('admin', __name__,
                      template_folder='../templates/admin',
@@ -2776,6 +2777,20 @@ def api_system_metrics():
         }), 500
 
 
+@admin_bp.route('/api/analytics-cache')
+@login_required
+@admin_required
+def api_analytics_cache_stats():
+    """Hit/miss counters of the analytics cache in this worker process."""
+    from app.utils.analytics_cache import analytics_cache
+
+    return jsonify({
+        'success': True,
+        'cache': analytics_cache.stats(),
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+
 @admin_bp.route('/debug/routes')
 @login_required
 @admin_required
@@ -3007,7 +3022,8 @@ def export_audit_log():
 
 @admin_bp.route('/backup_system_data', methods=['GET'])
 @login_required
-@admin_required  
+@admin_required
+@background_job('system_backup')
 def backup_system_data():
     """Create comprehensive system backup."""
     import json
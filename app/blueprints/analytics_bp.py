@@ -4,6 +4,10 @@ from flask import Blueprint, render_template, jsonify, request, current_app
 from flask_login import login_required, current_user
 from app.extensions import db
 from app.models import TagUsageStats, Tag, Trade
+from sqlalchemy.orm import joinedload
+from app.utils.performance_cube import cached_cube, parse_dimensions
+from app.utils.trade_filters import TradeFilterSpec
+from app.utils.http_cache import versioned_etag, content_etag
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
 
@@ -55,6 +59,7 @@ def tag_usage_analytics():
 
 @analytics_bp.route('/api/tag-usage-data')
 @login_required
+@content_etag
 def tag_usage_data():
     """API endpoint for tag usage charts"""
     most_used = TagUsageStats.get_user_most_used_tags(current_user.id, limit=10)
@@ -70,6 +75,7 @@ def tag_usage_data():
 
 @analytics_bp.route('/api/tag-trades')
 @login_required
+@versioned_etag()
 def tag_trades_data():
     """API endpoint to get trades associated with a specific tag"""
     tag_id = request.args.get('tag_id', type=int)
@@ -94,6 +100,7 @@ def tag_trades_data():
         trades = (Trade.query
                   .filter(Trade.user_id == current_user.id)
                   .filter(Trade.tags.contains(tag))
+                  .options(joinedload(Trade.trading_model), joinedload(Trade.instrument_obj))
                   .order_by(Trade.trade_date.desc())
                   .limit(50)  # Limit to most recent 50 trades
                   .all())
@@ -123,4 +130,27 @@ def tag_trades_data():
 
     except Exception as e:
         current_app.logger.error(f"Error fetching trades for tag {tag_id}: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@analytics_bp.route('/api/cube')
+@login_required
+@versioned_etag()
+def performance_cube_data():
+    """
+    Performance cube: trades with a P&L grouped by ?dimensions=model,instrument,
+    direction,weekday,hour,session,tag (any combination, comma separated) and
+    narrowed by the trades-list filter args (start_date, end_date, ...).
+    Returns columnar JSON: one list per dimension and measure.
+    """
+    try:
+        dimensions = parse_dimensions(request.args.get('dimensions'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        filter_spec = TradeFilterSpec.from_request(request.args)
+        return jsonify(cached_cube(current_user.id, dimensions, filter_spec))
+    except Exception as e:
+        current_app.logger.error(f"Error building performance cube {dimensions}: {e}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,55 @@
+# app/blueprints/jobs_bp.py
+"""Status polling and artifact download for background jobs (see app.services.job_service)."""
+import os
+
+from flask import Blueprint, render_template, request, jsonify, send_file, abort
+from flask_login import login_required, current_user
+
+from app.models import BackgroundJob
+
+jobs_bp = Blueprint('jobs', __name__)
+
+JOB_TITLES = {
+    'trades_excel': 'Excel Trade Export',
+    'tax_report': 'Tax Report',
+    'performance_report_pdf': 'Performance Analysis (PDF)',
+    'system_backup': 'System Backup',
+}
+
+
+def _get_user_job(job_id):
+    job = BackgroundJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if job is None:
+        abort(404)
+    return job
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    """Job status as JSON for pollers, or a page that polls it."""
+    job = _get_user_job(job_id)
+    if request.accept_mimetypes.best == 'application/json' or request.args.get('format') == 'json':
+        return jsonify({'success': True, 'job': job.to_dict()})
+    return render_template('jobs/job_status.html', title=JOB_TITLES.get(job.kind, 'Background Job'), job=job)
+
+
+@jobs_bp.route('/', methods=['GET'])
+@login_required
+def list_jobs():
+    """The current user's recent jobs (JSON)."""
+    jobs = BackgroundJob.query.filter_by(user_id=current_user.id) \
+        .order_by(BackgroundJob.created_at.desc()).limit(20).all()
+    return jsonify({'success': True, 'jobs': [job.to_dict() for job in jobs]})
+
+
+@jobs_bp.route('/<job_id>/download', methods=['GET'])
+@login_required
+def download_job_artifact(job_id):
+    """Download the finished artifact of a succeeded job."""
+    job = _get_user_job(job_id)
+    if job.status != BackgroundJob.STATUS_SUCCEEDED or not job.artifact_path \
+            or not os.path.exists(job.artifact_path):
+        abort(404)
+    return send_file(job.artifact_path, mimetype=job.artifact_mimetype,
+                     as_attachment=True, download_name=job.artifact_name)
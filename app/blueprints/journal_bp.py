@@ -2,6 +2,7 @@ from flask import (Blueprint, render_template, request, redirect,
                    url_for, flash, current_app, abort, jsonify)
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
+from sqlalchemy.orm import joinedload
 import os
 import uuid
 from datetime import date as py_date, datetime as py_datetime, timedelta
@@ -10,6 +11,7 @@ from app.extensions import db
 from app.models import DailyJournal, DailyJournalImage, Trade, P12UsageStats, P12Scenario
 from app.forms import DailyJournalForm  # Assuming DailyJournalForm is in app.forms
 from app.utils import record_activity  # Assuming record_activity is in app.utils
+from app.utils.daily_performance import query_rollup
 
 journal_bp = Blueprint('journal', __name__,
                        template_folder='../templates/journal',
@@ -165,6 +167,7 @@ def manage_daily_journal(date_str=None):
 
     # Fetch trades for this specific day to display in the "Daily Trading Log"
     trades_for_day = Trade.query.filter_by(user_id=current_user.id, trade_date=target_date) \
+        .options(joinedload(Trade.trading_model), joinedload(Trade.instrument_obj)) \
         .order_by(Trade.id.asc()).all()
 
     # Calculate cumulative PNL for the day
@@ -557,11 +560,22 @@ def export_journal_analytics():
             monthly_stats[month_key]['count'] += 1
             if journal.overall_day_rating:
                 monthly_stats[month_key]['ratings'].append(journal.overall_day_rating)
+
+        # Trading results for the same period, summed from the daily performance rollup
+        monthly_trading = {}
+        for row in query_rollup(current_user.id, ('trade_date',),
+                                journals[0].journal_date, journals[-1].journal_date):
+            month = monthly_trading.setdefault(row.trade_date.strftime('%Y-%m'), {'days': 0, 'trades': 0, 'pnl': 0})
+            month['days'] += 1
+            month['trades'] += row.trades
+            month['pnl'] += row.net_pnl
         
-        writer.writerow(['Month', 'Entry Count', 'Avg Day Rating'])
+        writer.writerow(['Month', 'Entry Count', 'Avg Day Rating', 'Trading Days', 'Trades', 'Net P&L'])
         for month, stats in sorted(monthly_stats.items()):
             avg_rating = sum(stats['ratings']) / len(stats['ratings']) if stats['ratings'] else 0
-            writer.writerow([month, stats['count'], f'{avg_rating:.2f}' if avg_rating else 'N/A'])
+            trading = monthly_trading.get(month, {'days': 0, 'trades': 0, 'pnl': 0})
+            writer.writerow([month, stats['count'], f'{avg_rating:.2f}' if avg_rating else 'N/A',
+                             trading['days'], trading['trades'], f"{trading['pnl']:.2f}"])
         
         output.seek(0)
         filename = f"journal_analytics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
@@ -1,25 +1,34 @@
-from flask import Blueprint, render_template, request, jsonify, url_for
+from flask import Blueprint, render_template, request, jsonify, url_for, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
-from sqlalchemy import func, desc, extract, and_, or_
+from sqlalchemy import func, extract, and_, or_
 from datetime import datetime, timedelta, date as py_date
-from collections import defaultdict
 import calendar
-import statistics
 import math
 from ..models import Trade, DailyJournal, TradingModel, P12Scenario
-from sqlalchemy import asc, desc, text
+from sqlalchemy import asc
 
 from flask import jsonify
 from sqlalchemy import func
-from collections import defaultdict
-import statistics
 import math
 from datetime import datetime, date as py_date
 from functools import lru_cache
 from datetime import datetime, timedelta
-from sqlalchemy.orm import joinedload
 from app.utils.discord_decorators import require_discord_permission, sync_discord_roles_if_needed
 from app.utils import record_activity
+from app.utils.keyset import keyset_paginate, InvalidCursor
+from app.utils.trade_frame import TradeFrame
+from app.utils.performance_metrics import compute_performance_metrics
+from app.utils.equity_series import load_series
+from app.utils.daily_performance import query_rollup
+from app.utils.trade_kpis import get_trade_kpis
+from app.utils.analytics_cache import analytics_cache
+from app.utils.http_cache import versioned_etag, today, p12_scenarios_version
+from app.utils.live_updates import live_updates
+from app.utils.data_version import get_data_version
+from app.utils.change_log import changes_since
+from app.extensions import db
+import json
+import numpy as np
 
 
 # Define the blueprint
@@ -33,140 +42,44 @@ def index():
     """
     Renders the comprehensive Trading Analytics Center with enhanced Fortune 500 styling.
     Provides macro and micro level trading analytics for professional traders.
+    The page is a shell with the KPI summary (one cached GROUP BY); the table,
+    charts and calendar load from the /api/dashboard/* endpoints on demand.
     """
+    today = py_date.today()
     try:
-        # Get all trades for the current user
-        trades = Trade.query.filter_by(user_id=current_user.id).order_by(Trade.trade_date.asc()).all()
-
-        # Calculate comprehensive trading statistics
-        stats = calculate_comprehensive_trading_stats(trades)
-
-        # Prepare calendar data with daily P&L and trade counts
-        calendar_data = prepare_enhanced_calendar_data(trades)
-
-        # Get paginated trades for the main table (default to first 100)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 100, type=int)
-
-        trades_query = Trade.query.filter_by(user_id=current_user.id).order_by(
-            desc(Trade.trade_date), desc(Trade.id)
-        )
-
-        # Get all trades for the frontend (we'll handle pagination there)
-        all_trades = trades_query.all()
-
-        # Convert trades to serializable format
-        trades_data = []
-        for trade in all_trades:
-            trades_data.append({
-                'id': trade.id,
-                'trade_date': trade.trade_date.strftime('%Y-%m-%d') if trade.trade_date else None,
-                'instrument': trade.instrument,  # Uses the property
-                'trading_model': trade.trading_model.name if trade.trading_model else None,
-                'direction': trade.direction,
-                'total_contracts_entered': trade.total_contracts_entered or 0,
-                'entry_price': float(trade.average_entry_price) if trade.average_entry_price else 0,
-                'exit_price': float(trade.average_exit_price) if trade.average_exit_price else 0,
-                'pnl': float(trade.pnl) if trade.pnl else 0,
-                'time_in_trade': self.get_time_in_trade_minutes(trade),
-                'entry_time': self.get_first_entry_time(trade),
-                'exit_time': self.get_last_exit_time(trade),
-                'how_closed': trade.how_closed
-            })
-
-        # Prepare enhanced chart data
-        chart_data = prepare_comprehensive_chart_data(trades)
-
-        # Calculate model performance analytics
-        model_analytics = calculate_model_performance(trades)
-
-        # Current date info for calendar
-        today = py_date.today()
-        current_month = today.strftime('%B %Y')
-        current_month_num = today.month
-        current_year = today.year
-        today_str = today.strftime('%Y-%m-%d')
-
-        return render_template('main/dashboard.html',
-                               title="Trading Analytics Center",
-                               stats=stats,
-                               calendar_data=calendar_data,
-                               recent_trades=trades_data,
-                               chart_data=chart_data,
-                               model_analytics=model_analytics,
-                               current_month=current_month,
-                               current_month_num=current_month_num,
-                               current_year=current_year,
-                               today_str=today_str)
-
+        summary = get_trade_kpis(current_user.id)
     except Exception as e:
-        # Fallback for any errors - show basic dashboard
-        print(f"Dashboard error: {e}")
-        return render_template('main/dashboard.html',
-                               title="Trading Analytics Center",
-                               stats=get_default_comprehensive_stats(),
-                               calendar_data={},
-                               recent_trades=[],
-                               chart_data=get_default_chart_data(),
-                               model_analytics={},
-                               current_month=py_date.today().strftime('%B %Y'),
-                               current_month_num=py_date.today().month,
-                               current_year=py_date.today().year,
-                               today_str=py_date.today().strftime('%Y-%m-%d'))
-
+        current_app.logger.error(f"Dashboard summary error: {e}", exc_info=True)
+        summary = None
 
+    return render_template('main/dashboard.html',
+                           title="Trading Analytics Center",
+                           summary=summary,
+                           current_month=today.strftime('%B %Y'),
+                           current_month_num=today.month,
+                           current_year=today.year,
+                           today_str=today.strftime('%Y-%m-%d'))
 
 
 def get_time_in_trade_minutes(trade):
-    """Helper function to get time in trade in minutes."""
-    try:
-        if not trade.entries.first() or not trade.exits.first():
-            return None
-
-        first_entry = trade.entries.order_by(text('entry_time ASC')).first()
-        last_exit = trade.exits.order_by(text('exit_time DESC')).first()
-
-        if not first_entry or not last_exit or not first_entry.entry_time or not last_exit.exit_time:
-            return None
-
-        entry_datetime = datetime.combine(trade.trade_date, first_entry.entry_time)
-        exit_datetime = datetime.combine(trade.trade_date, last_exit.exit_time)
-        duration = exit_datetime - entry_datetime
-        return int(duration.total_seconds() / 60)
-
-    except Exception as e:
-        print(f"Error calculating time in trade: {e}")
+    """Helper function to get time in trade in minutes (from the stored aggregate)."""
+    if trade.time_in_trade_seconds is None:
         return None
+    return int(trade.time_in_trade_seconds / 60)
 
 
 def get_first_entry_time(trade):
     """Helper function to get first entry time as string."""
-    try:
-        if not trade.entries.first():
-            return None
-
-        first_entry = trade.entries.order_by(text('entry_time ASC')).first()
-        if first_entry and first_entry.entry_time:
-            return first_entry.entry_time.strftime('%H:%M')
-        return None
-    except Exception as e:
-        print(f"Error getting first entry time: {e}")
-        return None
+    if trade.entry_timestamp:
+        return trade.entry_timestamp.strftime('%H:%M')
+    return None
 
 
 def get_last_exit_time(trade):
     """Helper function to get last exit time as string."""
-    try:
-        if not trade.exits.first():
-            return None
-
-        last_exit = trade.exits.order_by(text('exit_time DESC')).first()
-        if last_exit and last_exit.exit_time:
-            return last_exit.exit_time.strftime('%H:%M')
-        return None
-    except Exception as e:
-        print(f"Error getting last exit time: {e}")
-        return None
+    if trade.exit_timestamp:
+        return trade.exit_timestamp.strftime('%H:%M')
+    return None
 
     # Daily Analytics
     daily_data = calculate_daily_analytics(trades)
@@ -217,163 +130,87 @@ def calculate_comprehensive_trading_stats(trades):
     Calculate comprehensive trading statistics for the dashboard.
     Includes all metrics a professional trader would want to see.
     """
-    if not trades:
+    trades = TradeFrame.coerce(trades)
+    if not len(trades):
         return get_default_comprehensive_stats()
 
-    # Basic trade metrics
-    total_trades = len(trades)
-    trade_pnls = [float(trade.pnl) for trade in trades if trade.pnl is not None]
-
-    print(f"DEBUG: Processing {total_trades} trades, {len(trade_pnls)} with P&L data")
-
-    if not trade_pnls:
-        return get_default_comprehensive_stats()
-
-    # P&L Calculations
-    total_pnl = sum(trade_pnls)
-    winning_trades = [pnl for pnl in trade_pnls if pnl > 0]
-    losing_trades = [pnl for pnl in trade_pnls if pnl < 0]
-    breakeven_trades = [pnl for pnl in trade_pnls if pnl == 0]
-
-    win_count = len(winning_trades)
-    loss_count = len(losing_trades)
-    breakeven_count = len(breakeven_trades)
-
-    # Core Statistics
-    win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
-
-    gross_profit = sum(winning_trades) if winning_trades else 0
-    gross_loss = abs(sum(losing_trades)) if losing_trades else 0  # Make positive
-
-    profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else (float('inf') if gross_profit > 0 else 0)
-
-    average_trade = total_pnl / total_trades if total_trades > 0 else 0
-
-    # Win/Loss Averages
-    avg_win = statistics.mean(winning_trades) if winning_trades else 0
-    avg_loss = abs(statistics.mean(losing_trades)) if losing_trades else 0  # Make positive
-
-    # Expectancy Calculation
-    expectancy = (win_rate / 100 * avg_win) - ((100 - win_rate) / 100 * avg_loss)
-
-    # System Quality Number (SQN)
-    if len(trade_pnls) > 1:
-        std_dev = statistics.stdev(trade_pnls)
-        sqn = (average_trade / std_dev) * math.sqrt(total_trades) if std_dev > 0 else 0
-    else:
-        sqn = 0
+    return calculate_stats_from_frame(trades)
 
-    # Daily Analytics
-    daily_data = calculate_daily_analytics(trades)
-
-    # Model Analytics
-    model_stats = calculate_model_expectancy(trades)
-
-    result = {
-        # Core Metrics
-        'total_pnl': round(total_pnl, 2),
-        'total_trades': total_trades,
-        'winning_trades': win_count,
-        'losing_trades': loss_count,
-        'breakeven_trades': breakeven_count,
 
-        # Performance Ratios
-        'win_rate': round(win_rate, 1),
-        'profit_factor': round(profit_factor, 2),
-        'expectancy': round(expectancy, 2),
-        'average_trade': round(average_trade, 2),
-        'sqn': round(sqn, 1),
-
-        # Win/Loss Analysis
-        'gross_profit': round(gross_profit, 2),
-        'gross_loss': round(gross_loss, 2),  # Already positive
-        'avg_win': round(avg_win, 2),
-        'avg_loss': round(avg_loss, 2),  # Already positive
-
-        # Daily Analytics
-        'win_days': daily_data['win_days'],
-        'loss_days': daily_data['loss_days'],
-        'daily_win_rate': round(daily_data['daily_win_rate'], 1),
-        'avg_wins_per_day': round(daily_data['avg_wins_per_day'], 1),
-        'daily_expectancy': round(daily_data['daily_expectancy'], 2),
-
-        # Model Performance
-        'model_expectancies': model_stats['expectancies'],
-        'best_model': model_stats['best_model'],
-        'worst_model': model_stats['worst_model'],
+def _daily_buckets(frame):
+    """{'YYYY-MM-DD': {'pnl', 'trades', 'wins', 'losses'}} over trades with a P&L, oldest day first."""
+    days, totals = frame.daily()
+    return {
+        str(day): {
+            'pnl': float(totals['pnl'][i]),
+            'trades': int(totals['trades'][i]),
+            'wins': int(totals['wins'][i]),
+            'losses': int(totals['losses'][i]),
+        }
+        for i, day in enumerate(days)
     }
 
-    print(f"DEBUG: Calculated stats: {result}")
-    return result
-
-
-def calculate_daily_analytics(trades):
-    """Calculate daily-level analytics for trading performance."""
-    daily_data = defaultdict(lambda: {'pnl': 0, 'trades': 0, 'wins': 0, 'losses': 0})
-
-    for trade in trades:
-        if trade.trade_date and trade.pnl is not None:
-            date_key = trade.trade_date.strftime('%Y-%m-%d')
-            daily_data[date_key]['pnl'] += float(trade.pnl)
-            daily_data[date_key]['trades'] += 1
 
-            if float(trade.pnl) > 0:
-                daily_data[date_key]['wins'] += 1
-            elif float(trade.pnl) < 0:
-                daily_data[date_key]['losses'] += 1
-
-    # Calculate daily metrics
-    win_days = sum(1 for day in daily_data.values() if day['pnl'] > 0)
-    loss_days = sum(1 for day in daily_data.values() if day['pnl'] < 0)
-    total_days = len(daily_data)
+def _model_buckets(frame):
+    """{model name: {'trades', 'total_pnl', 'wins', 'losses'}} over trades with a P&L."""
+    models, totals = frame.group_sums(frame.labels('model_name'))
+    return {
+        str(model): {
+            'trades': int(totals['trades'][i]),
+            'total_pnl': float(totals['pnl'][i]),
+            'wins': int(totals['wins'][i]),
+            'losses': int(totals['losses'][i]),
+        }
+        for i, model in enumerate(models)
+    }
 
-    daily_win_rate = (win_days / total_days * 100) if total_days > 0 else 0
 
-    # Average wins per day
-    total_wins = sum(day['wins'] for day in daily_data.values())
-    avg_wins_per_day = total_wins / total_days if total_days > 0 else 0
+def _rollup_daily_buckets(user_id, start_date=None, end_date=None):
+    """_daily_buckets() for all of a user's trades, summed from the daily_performance rollup."""
+    return {
+        row.trade_date.isoformat(): {
+            'pnl': float(row.net_pnl),
+            'trades': int(row.trades),
+            'wins': int(row.wins),
+            'losses': int(row.losses),
+        }
+        for row in query_rollup(user_id, ('trade_date',), start_date, end_date)
+    }
 
-    # Daily expectancy
-    total_daily_pnl = sum(day['pnl'] for day in daily_data.values())
-    daily_expectancy = total_daily_pnl / total_days if total_days > 0 else 0
 
+def calculate_daily_analytics(trades, daily=None):
+    """
+    Calculate daily-level analytics for trading performance.
+    daily is _daily_buckets() / _rollup_daily_buckets() output when the caller has it.
+    """
+    if daily is None:
+        daily = _daily_buckets(TradeFrame.coerce(trades))
+    day_pnl = np.array([day['pnl'] for day in daily.values()], dtype=np.float64)
+    total_days = len(day_pnl)
+    win_days = int((day_pnl > 0).sum())
+    total_wins = sum(day['wins'] for day in daily.values())
     return {
-        'win_days': win_days,
-        'loss_days': loss_days,
         'total_days': total_days,
-        'daily_win_rate': daily_win_rate,
-        'avg_wins_per_day': avg_wins_per_day,
-        'daily_expectancy': daily_expectancy
+        'win_days': win_days,
+        'loss_days': int((day_pnl < 0).sum()),
+        'daily_win_rate': win_days / total_days * 100 if total_days else 0.0,
+        'avg_wins_per_day': total_wins / total_days if total_days else 0.0,
+        'daily_expectancy': float(day_pnl.sum()) / total_days if total_days else 0.0,
     }
 
 
 def calculate_model_expectancy(trades):
     """Calculate expectancy and performance metrics per trading model."""
-    model_data = defaultdict(lambda: {'trades': [], 'total_pnl': 0, 'count': 0})
-
-    for trade in trades:
-        # Get model name properly
-        model_name = None
-        if trade.trading_model:
-            model_name = trade.trading_model.name
-        else:
-            model_name = 'Unknown'
-
-        if trade.pnl is not None:
-            pnl = float(trade.pnl)
-
-            model_data[model_name]['trades'].append(pnl)
-            model_data[model_name]['total_pnl'] += pnl
-            model_data[model_name]['count'] += 1
+    model_data = _model_buckets(TradeFrame.coerce(trades))
 
     # Calculate expectancy per model
     expectancies = {}
     avg_pnls = {}
 
     for model, data in model_data.items():
-        if data['count'] > 0:
-            expectancies[model] = data['total_pnl'] / data['count']
-            avg_pnls[model] = data['total_pnl'] / data['count']
+        if data['trades'] > 0:
+            expectancies[model] = data['total_pnl'] / data['trades']
+            avg_pnls[model] = data['total_pnl'] / data['trades']
 
     # Find best and worst performing models
     best_model = max(expectancies.items(), key=lambda x: x[1]) if expectancies else ('N/A', 0)
@@ -387,64 +224,52 @@ def calculate_model_expectancy(trades):
     }
 
 
-def prepare_enhanced_calendar_data(trades):
-    """Prepare enhanced calendar data with daily PnL and trade counts for calendar display."""
-    calendar_data = {}
-
-    for trade in trades:
-        if trade.trade_date and trade.pnl is not None:
-            date_str = trade.trade_date.strftime('%Y-%m-%d')
-
-            if date_str not in calendar_data:
-                calendar_data[date_str] = {'pnl': 0, 'trades': 0}
-
-            calendar_data[date_str]['pnl'] += float(trade.pnl)
-            calendar_data[date_str]['trades'] += 1
+def prepare_enhanced_calendar_data(trades, daily=None):
+    """
+    Prepare enhanced calendar data with daily PnL and trade counts for calendar display.
+    daily is _daily_buckets() / _rollup_daily_buckets() output when the caller has it.
+    """
+    if daily is None:
+        daily = _daily_buckets(TradeFrame.coerce(trades))
+    return {
+        date_str: {'pnl': round(day['pnl'], 2), 'trades': day['trades']}  # Rounded for display
+        for date_str, day in daily.items()
+    }
 
-    # Round PnL values for display
-    for date_str in calendar_data:
-        calendar_data[date_str]['pnl'] = round(calendar_data[date_str]['pnl'], 2)
 
-    return calendar_data
+def _equity_columns(trades, equity=None):
+    """
+    (cumulative P&L, trade dates) of the equity curve: the persisted series
+    (equity_series.load_series) when given, else accumulated from the frame.
+    """
+    if equity is not None:
+        return equity['cumulative_pnl'], equity['trade_date']
+    scored = trades.with_pnl().chronological()
+    return np.cumsum(scored['pnl']), scored['trade_date']
 
 
-def prepare_comprehensive_chart_data(trades):
-    """Prepare comprehensive chart data for all dashboard visualizations."""
-    if not trades:
+def prepare_comprehensive_chart_data(trades, equity=None, daily=None):
+    """
+    Prepare comprehensive chart data for all dashboard visualizations.
+    equity is the user's persisted equity series and daily the rollup's daily
+    buckets, both covering the same trades.
+    """
+    trades = TradeFrame.coerce(trades)
+    if not len(trades):
         return get_default_chart_data()
 
-    # Sort trades by date
-    trades_sorted = sorted([t for t in trades if t.trade_date], key=lambda t: t.trade_date)
-
-    # Equity curve calculation
-    running_total = 0
-    equity_curve = []
-    equity_labels = []
-
-    for trade in trades_sorted:
-        if trade.pnl is not None:
-            running_total += float(trade.pnl)
-            equity_curve.append(round(running_total, 2))
-            equity_labels.append(trade.trade_date.strftime('%m/%d'))
+    # Equity curve (chronological, trades with a P&L)
+    running_totals, equity_dates = _equity_columns(trades, equity)
+    equity_curve = [round(value, 2) for value in running_totals.tolist()]
+    equity_labels = _month_day_labels(equity_dates)
 
-    # Daily PnL data (last 30 trading days)
-    daily_data = defaultdict(float)
-    for trade in trades_sorted:
-        if trade.trade_date and trade.pnl is not None:
-            date_str = trade.trade_date.strftime('%m/%d')
-            daily_data[date_str] += float(trade.pnl)
-
-    # Get last 20 days for daily chart
-    daily_items = list(daily_data.items())[-20:] if len(daily_data) > 20 else list(daily_data.items())
-    daily_labels = [item[0] for item in daily_items]
-    daily_pnl = [round(item[1], 2) for item in daily_items]
+    # Daily PnL data - last 20 trading days for daily chart
+    daily_items = list((daily if daily is not None else _daily_buckets(trades)).items())[-20:]
+    daily_labels = [f"{date_str[5:7]}/{date_str[8:10]}" for date_str, _ in daily_items]
+    daily_pnl = [round(day['pnl'], 2) for _, day in daily_items]
 
     # Monthly PnL data
-    monthly_data = defaultdict(float)
-    for trade in trades_sorted:
-        if trade.trade_date and trade.pnl is not None:
-            month_key = trade.trade_date.strftime('%Y-%m')
-            monthly_data[month_key] += float(trade.pnl)
+    monthly_data = _monthly_pnl(trades)
 
     # Get last 12 months
     monthly_items = list(monthly_data.items())[-12:] if len(monthly_data) > 12 else list(monthly_data.items())
@@ -471,45 +296,28 @@ def prepare_comprehensive_chart_data(trades):
     }
 
 
-def calculate_model_performance(trades):
-    """Calculate detailed performance analytics per trading model."""
-    model_stats = defaultdict(lambda: {
-        'trades': 0,
-        'total_pnl': 0,
-        'wins': 0,
-        'losses': 0,
-        'win_rate': 0,
-        'avg_trade': 0,
-        'expectancy': 0
-    })
+def _month_day_labels(dates):
+    """'MM/DD' chart labels for a datetime64[D] array."""
+    return [f"{value[5:7]}/{value[8:10]}" for value in np.datetime_as_string(dates, unit='D')]
 
-    for trade in trades:
-        # Get model name properly
-        model_name = None
-        if trade.trading_model:
-            model_name = trade.trading_model.name
-        else:
-            model_name = 'Unknown'
 
-        if trade.pnl is not None:
-            pnl = float(trade.pnl)
+def _monthly_pnl(frame):
+    """{'YYYY-MM': total P&L} over trades with a P&L, oldest month first."""
+    months, totals = frame.group_sums(frame.month())
+    return {str(month): float(pnl) for month, pnl in zip(months, totals['pnl'])}
 
-            model_stats[model_name]['trades'] += 1
-            model_stats[model_name]['total_pnl'] += pnl
 
-            if pnl > 0:
-                model_stats[model_name]['wins'] += 1
-            elif pnl < 0:
-                model_stats[model_name]['losses'] += 1
+def calculate_model_performance(trades):
+    """Calculate detailed performance analytics per trading model."""
+    model_stats = _model_buckets(TradeFrame.coerce(trades))
 
     # Calculate derived metrics
     for model, stats in model_stats.items():
-        if stats['trades'] > 0:
-            stats['win_rate'] = (stats['wins'] / stats['trades']) * 100
-            stats['avg_trade'] = stats['total_pnl'] / stats['trades']
-            stats['expectancy'] = stats['avg_trade']  # Simplified expectancy
+        stats['win_rate'] = (stats['wins'] / stats['trades']) * 100
+        stats['avg_trade'] = stats['total_pnl'] / stats['trades']
+        stats['expectancy'] = stats['avg_trade']  # Simplified expectancy
 
-    return dict(model_stats)
+    return model_stats
 
 
 def get_default_comprehensive_stats():
@@ -555,8 +363,28 @@ def get_default_chart_data():
     }
 
 
+def trade_table_row(trade):
+    """A trade as a dashboard/trades table row (the /api/trades and live stream format)."""
+    return {
+        'id': trade.id,
+        'trade_date': trade.trade_date.strftime('%Y-%m-%d') if trade.trade_date else None,
+        'instrument': trade.instrument,  # Uses the property
+        'trading_model': trade.trading_model.name if trade.trading_model else None,
+        'direction': trade.direction,
+        'total_contracts_entered': trade.total_contracts_entered or 0,
+        'entry_price': float(trade.average_entry_price) if trade.average_entry_price else 0,
+        'exit_price': float(trade.average_exit_price) if trade.average_exit_price else 0,
+        'pnl': float(trade.pnl) if trade.pnl else 0,
+        'time_in_trade': get_time_in_trade_minutes(trade),
+        'entry_time': get_first_entry_time(trade),
+        'exit_time': get_last_exit_time(trade),
+        'how_closed': trade.how_closed
+    }
+
+
 @main_bp.route('/api/trades')
 @login_required
+@versioned_etag()
 def api_trades():
     """
     API endpoint for paginated trades data with sorting and filtering.
@@ -625,35 +453,30 @@ def api_trades():
             # Default sorting
             query = query.order_by(Trade.trade_date.desc(), Trade.id.desc())
 
-        # Execute paginated query
-        trades_pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        # Opt-in keyset pagination for the default date ordering
+        cursor = request.args.get('cursor')
+        use_cursor = sort_field == 'trade_date' and (cursor or request.args.get('paging') == 'cursor')
+        if use_cursor:
+            try:
+                trades_pagination = keyset_paginate(query, cursor=cursor, per_page=per_page,
+                                                    descending=sort_order.lower() == 'desc')
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            # Execute paginated query
+            trades_pagination = query.paginate(
+                page=page,
+                per_page=per_page,
+                error_out=False
+            )
 
         # Format trades data for JSON response
-        trades_data = []
-        for trade in trades_pagination.items:
-            trades_data.append({
-                'id': trade.id,
-                'trade_date': trade.trade_date.strftime('%Y-%m-%d') if trade.trade_date else None,
-                'instrument': trade.instrument,  # Uses the property
-                'trading_model': trade.trading_model.name if trade.trading_model else None,
-                'direction': trade.direction,
-                'total_contracts_entered': trade.total_contracts_entered or 0,
-                'entry_price': float(trade.average_entry_price) if trade.average_entry_price else 0,
-                'exit_price': float(trade.average_exit_price) if trade.average_exit_price else 0,
-                'pnl': float(trade.pnl) if trade.pnl else 0,
-                'time_in_trade': get_time_in_trade_minutes(trade),
-                'entry_time': get_first_entry_time(trade),
-                'exit_time': get_last_exit_time(trade),
-                'how_closed': trade.how_closed
-            })
+        trades_data = [trade_table_row(trade) for trade in trades_pagination.items]
 
-        return jsonify({
-            'trades': trades_data,
-            'pagination': {
+        if use_cursor:
+            pagination_data = trades_pagination.to_dict()
+        else:
+            pagination_data = {
                 'page': trades_pagination.page,
                 'pages': trades_pagination.pages,
                 'per_page': trades_pagination.per_page,
@@ -661,6 +484,10 @@ def api_trades():
                 'has_next': trades_pagination.has_next,
                 'has_prev': trades_pagination.has_prev
             }
+
+        return jsonify({
+            'trades': trades_data,
+            'pagination': pagination_data
         })
 
     except Exception as e:
@@ -767,22 +594,27 @@ def get_p12_intelligence():
 
 @main_bp.route('/api/dashboard-data')
 @login_required
+@versioned_etag(today, p12_scenarios_version)
 def dashboard_data():
-    """Optimized API endpoint to serve dashboard data as JSON"""
+    """
+    Optimized API endpoint to serve dashboard data as JSON.
+    ?since=<version from an earlier response> returns only what changed after
+    that version (see _dashboard_delta), or the full payload with full=true
+    when the change log cannot answer.
+    """
     try:
-        # OPTIMIZATION 1: Single optimized query with eager loading
-        trades = Trade.query.filter_by(user_id=current_user.id) \
-            .options(joinedload(Trade.trading_model)) \
-            .order_by(Trade.trade_date.asc()) \
-            .all()
-
-        print(f"API DEBUG: Found {len(trades)} trades for user {current_user.id}")
-
-        # OPTIMIZATION 2: Batch calculate all data at once
-        stats, calendar_data, chart_data, model_analytics = calculate_all_dashboard_data(trades)
-
-        # OPTIMIZATION 3: Simplified trades data (only what's needed for table)
-        trades_data = prepare_simplified_trades_data(trades[-50:])  # Only last 50 trades
+        version = get_data_version(current_user.id)
+        since = request.args.get('since', type=int)
+        if since is not None:
+            changes = changes_since(current_user.id, since)
+            if changes is not None:
+                return jsonify(_dashboard_delta(current_user.id, version, since, *changes))
+
+        # OPTIMIZATION 1: Trade analytics cached until the user's data version changes
+        user_data = analytics_cache.get_or_compute(
+            current_user.id, 'dashboard_data', None, lambda: _dashboard_user_data(current_user.id), version=version)
+        trades_data = user_data['trades_data']
+        calendar_data = user_data['calendar_data']
 
         # Current date info for calendar
         today = py_date.today()
@@ -791,11 +623,9 @@ def dashboard_data():
         p12_intelligence = get_p12_intelligence()
 
         response_data = {
-            'stats': stats,
-            'calendar_data': calendar_data,
-            'trades_data': trades_data,
-            'chart_data': chart_data,
-            'model_analytics': model_analytics,
+            **user_data,
+            'version': version,
+            'full': True,
             'p12_intelligence': p12_intelligence,
             'current_month': today.strftime('%B %Y'),
             'current_month_num': today.month,
@@ -824,12 +654,234 @@ def dashboard_data():
         })
 
 
-def calculate_all_dashboard_data(trades):
+def _dashboard_user_data(user_id):
+    """The user-derived part of /api/dashboard-data (everything but P12 and today's date)."""
+    # Single columnar query (no ORM objects), then batch calculate all data at once
+    trades = TradeFrame.for_user(user_id)
+    stats, calendar_data, chart_data, model_analytics = calculate_all_dashboard_data(
+        trades, load_series(user_id), _rollup_daily_buckets(user_id))
+    return {
+        'stats': stats,
+        'calendar_data': calendar_data,
+        # Simplified trades data (only what's needed for table), last 50 trades
+        'trades_data': prepare_simplified_trades_data(trades.take(slice(-50, None))),
+        'chart_data': chart_data,
+        'model_analytics': model_analytics,
+    }
+
+
+def _dashboard_delta(user_id, version, since, dates, model_ids):
+    """
+    The /api/dashboard-data?since= payload: stats, plus only the calendar days,
+    equity points (from the earliest changed date on) and model rows that
+    changed after version since. A null calendar day or model row was removed.
+    """
+    summary = analytics_cache.get_or_compute(
+        user_id, 'dashboard_summary', None, lambda: _dashboard_summary_data(user_id), version=version)
+    delta = {
+        'version': version,
+        'since': since,
+        'full': False,
+        'stats': summary['stats'],
+        'calendar_data': {},
+        'equity_points': None,
+        'model_analytics': _model_rows(user_id, model_ids) if model_ids else {},
+    }
+    if dates:
+        first_day = min(dates)
+        days = prepare_enhanced_calendar_data(None, _rollup_daily_buckets(user_id, first_day, max(dates)))
+        delta['calendar_data'] = {day.isoformat(): days.get(day.isoformat()) for day in sorted(dates)}
+
+        # The persisted series is rewritten from the earliest changed date, so send that suffix
+        series = load_series(user_id, start_date=first_day)
+        delta['equity_points'] = {
+            'from_date': first_day.isoformat(),
+            'sequence': series['sequence'].tolist(),
+            'trade_date': series['trade_date'].astype(str).tolist(),
+            'cumulative_pnl': [round(value, 2) for value in series['cumulative_pnl'].tolist()],
+            'drawdown': [round(value, 2) for value in series['drawdown'].tolist()],
+        }
+    return delta
+
+
+def _model_rows(user_id, model_ids):
+    """model_analytics rows (keyed by model name, like the full payload) for the given trading model ids."""
+    rows = query_rollup(user_id, ('trading_model_id',))
+    names = dict(db.session.query(TradingModel.id, TradingModel.name).filter(
+        TradingModel.id.in_({row.trading_model_id for row in rows} | set(model_ids))))
+
+    model_data = {}
+    for row in rows:
+        bucket = model_data.setdefault(names.get(row.trading_model_id) or 'Unknown',
+                                       {'trades': 0, 'total_pnl': 0.0, 'wins': 0, 'losses': 0})
+        bucket['trades'] += int(row.trades)
+        bucket['total_pnl'] += float(row.net_pnl)
+        bucket['wins'] += int(row.wins)
+        bucket['losses'] += int(row.losses)
+
+    analytics = prepare_model_analytics_from_data(model_data)
+    return {name: analytics.get(name) for name in {names.get(model_id) or 'Unknown' for model_id in model_ids}}
+
+
+def _dashboard_summary_data(user_id):
+    trades = TradeFrame.for_user(user_id)
+    model_data = _model_buckets(trades) if len(trades) else {}
+    return {
+        'stats': calculate_stats_from_frame(trades, model_data),
+        'model_analytics': prepare_model_analytics_from_data(model_data),
+    }
+
+
+def _dashboard_chart_data(user_id):
+    equity = load_series(user_id)
+    daily = _rollup_daily_buckets(user_id)
+    equity_curve, equity_labels = _sampled_equity(equity['cumulative_pnl'], equity['trade_date'])
+    return prepare_chart_data_from_data(equity_curve, equity_labels, daily, _monthly_from_daily(daily))
+
+
+@main_bp.route('/api/dashboard/summary')
+@login_required
+@versioned_etag(p12_scenarios_version)
+def dashboard_summary():
+    """KPI statistics, model analytics and P12 intelligence for the dashboard shell."""
+    try:
+        summary = analytics_cache.get_or_compute(
+            current_user.id, 'dashboard_summary', None, lambda: _dashboard_summary_data(current_user.id))
+        return jsonify({**summary, 'p12_intelligence': get_p12_intelligence()})
+    except Exception as e:
+        current_app.logger.error(f"Dashboard summary error: {e}", exc_info=True)
+        return jsonify({'error': str(e), 'stats': get_default_comprehensive_stats(), 'model_analytics': {}}), 500
+
+
+@main_bp.route('/api/dashboard/charts')
+@login_required
+@versioned_etag()
+def dashboard_charts():
+    """Equity, daily and monthly chart series from the persisted equity series and daily rollup."""
+    try:
+        chart_data = analytics_cache.get_or_compute(
+            current_user.id, 'dashboard_charts', None, lambda: _dashboard_chart_data(current_user.id))
+        return jsonify({'chart_data': chart_data})
+    except Exception as e:
+        current_app.logger.error(f"Dashboard charts error: {e}", exc_info=True)
+        return jsonify({'error': str(e), 'chart_data': get_default_chart_data()}), 500
+
+
+@main_bp.route('/api/dashboard/calendar')
+@login_required
+@versioned_etag(today)
+def dashboard_calendar():
+    """Daily P&L and trade counts for one month (?year=&month=, default the current month)."""
+    today = py_date.today()
+    year = request.args.get('year', today.year, type=int)
+    month = request.args.get('month', today.month, type=int)
+    if not 1 <= month <= 12 or not 1 <= year <= 9999:
+        return jsonify({'error': 'Invalid year or month'}), 400
+
+    first_day = py_date(year, month, 1)
+    last_day = py_date(year, month, calendar.monthrange(year, month)[1])
+    calendar_data = analytics_cache.get_or_compute(
+        current_user.id, 'dashboard_calendar', (year, month),
+        lambda: prepare_enhanced_calendar_data(None, _rollup_daily_buckets(current_user.id, first_day, last_day)))
+    return jsonify({
+        'year': year,
+        'month': month,
+        'calendar_data': calendar_data,
+    })
+
+
+# Seconds between keepalive comments on an idle stream (keeps proxies from closing it)
+STREAM_KEEPALIVE_SECONDS = 15
+
+
+@main_bp.route('/api/dashboard/stream')
+@login_required
+def dashboard_stream():
+    """
+    Server-Sent Events: small delta events whenever the user's trades change.
+      trade        {id, action: created|edited|deleted, trade: table row or null}
+      recent_trades  newest table rows (after an import, which has no per-trade notices)
+      kpis         the KPI summary (trade_kpis format)
+      calendar     {'YYYY-MM-DD': calendar day or null} for each changed day
+      resync       reload everything (the stream fell behind or the change spans all history)
+    """
+    user_id = current_user.id
+    subscription = live_updates.subscribe(user_id)
+    db.session.remove()  # hold no connection while idle
+
+    def events():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                notice = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                if notice is None:
+                    yield ': keepalive\n\n'
+                    continue
+                try:
+                    for name, data in _dashboard_deltas(user_id, notice):
+                        yield f'event: {name}\ndata: {json.dumps(data)}\n\n'
+                finally:
+                    db.session.remove()
+        finally:
+            live_updates.unsubscribe(subscription)
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _dashboard_deltas(user_id, notice):
+    """(event name, data) pairs describing one change notice (see dashboard_stream)."""
+    if notice.get('resync') or notice['dates'] is None:
+        yield 'resync', {}
+        return
+
+    actions = dict((trade_id, action) for trade_id, action in notice['trades'])
+    if actions:
+        live_ids = [trade_id for trade_id, action in actions.items() if action != 'deleted']
+        trades = {trade.id: trade for trade in Trade.query.filter(
+            Trade.user_id == user_id, Trade.id.in_(live_ids))} if live_ids else {}
+        for trade_id, action in actions.items():
+            trade = trades.get(trade_id)
+            yield 'trade', {'id': trade_id, 'action': action if trade else 'deleted',
+                            'trade': trade_table_row(trade) if trade else None}
+    elif notice['dates']:
+        recent = Trade.query.filter_by(user_id=user_id) \
+            .order_by(Trade.trade_date.desc(), Trade.id.desc()).limit(10).all()
+        yield 'recent_trades', [trade_table_row(trade) for trade in recent]
+
+    yield 'kpis', get_trade_kpis(user_id)
+
+    if notice['dates']:
+        dates = [py_date.fromisoformat(day) for day in notice['dates']]
+        days = prepare_enhanced_calendar_data(None, _rollup_daily_buckets(user_id, min(dates), max(dates)))
+        yield 'calendar', {day: days.get(day) for day in notice['dates']}
+
+
+def _sampled_equity(running_totals, dates):
+    """Equity curve values and labels, sampled: first trade then every 5th for performance."""
+    sample = np.flatnonzero((np.arange(len(running_totals)) + 1) % 5 == 0)
+    if len(running_totals):
+        sample = np.concatenate(([0], sample))
+    return [round(value, 2) for value in running_totals[sample].tolist()], _month_day_labels(dates[sample])
+
+
+def _monthly_from_daily(daily):
+    """{'YYYY-MM': total P&L} from _daily_buckets() / _rollup_daily_buckets() output, oldest month first."""
+    monthly = {}
+    for date_str, day in daily.items():
+        monthly[date_str[:7]] = monthly.get(date_str[:7], 0.0) + day['pnl']
+    return monthly
+
+
+def calculate_all_dashboard_data(trades, equity=None, daily=None):
     """
     OPTIMIZATION: Calculate all dashboard data in a single pass
-    This reduces multiple iterations over the same data
+    This reduces multiple iterations over the same data.
+    equity is the user's persisted equity series and daily the rollup's daily
+    buckets, both covering the same trades.
     """
-    if not trades:
+    trades = TradeFrame.coerce(trades)
+    if not len(trades):
         return (
             get_default_comprehensive_stats(),
             {},
@@ -837,145 +889,67 @@ def calculate_all_dashboard_data(trades):
             {}
         )
 
-    # Initialize all data structures
-    trade_pnls = []
-    daily_data = defaultdict(lambda: {'pnl': 0, 'trades': 0, 'wins': 0, 'losses': 0})
-    calendar_data = {}
-    model_data = defaultdict(lambda: {'trades': 0, 'total_pnl': 0, 'wins': 0, 'losses': 0})
-    equity_curve = []
-    equity_labels = []
-    monthly_data = defaultdict(float)
-
-    # SINGLE PASS through all trades
-    running_total = 0
-
-    for trade in trades:
-        if trade.pnl is None:
-            continue
-
-        pnl = float(trade.pnl)
-        trade_pnls.append(pnl)
-
-        # Update running equity
-        running_total += pnl
-
-        if trade.trade_date:
-            date_str = trade.trade_date.strftime('%Y-%m-%d')
-
-            # Calendar data
-            if date_str not in calendar_data:
-                calendar_data[date_str] = {'pnl': 0, 'trades': 0}
-            calendar_data[date_str]['pnl'] += pnl
-            calendar_data[date_str]['trades'] += 1
-
-            # Daily analytics
-            daily_data[date_str]['pnl'] += pnl
-            daily_data[date_str]['trades'] += 1
-            if pnl > 0:
-                daily_data[date_str]['wins'] += 1
-            elif pnl < 0:
-                daily_data[date_str]['losses'] += 1
-
-            # Equity curve (sample every 10th trade for performance)
-            if len(equity_curve) == 0 or len(trade_pnls) % 5 == 0:
-                equity_curve.append(round(running_total, 2))
-                equity_labels.append(trade.trade_date.strftime('%m/%d'))
-
-            # Monthly data
-            month_key = trade.trade_date.strftime('%Y-%m')
-            monthly_data[month_key] += pnl
-
-        # Model data
-        model_name = trade.trading_model.name if trade.trading_model else 'Unknown'
-        model_data[model_name]['trades'] += 1
-        model_data[model_name]['total_pnl'] += pnl
-        if pnl > 0:
-            model_data[model_name]['wins'] += 1
-        elif pnl < 0:
-            model_data[model_name]['losses'] += 1
-
-    # Round calendar PnL values
-    for date_str in calendar_data:
-        calendar_data[date_str]['pnl'] = round(calendar_data[date_str]['pnl'], 2)
+    # Column-wise over the frame (oldest first)
+    daily_data = daily if daily is not None else _daily_buckets(trades)
+    model_data = _model_buckets(trades)
+    monthly_data = _monthly_pnl(trades)
+
+    # Calendar data (rounded for display)
+    calendar_data = {date_str: {'pnl': round(day['pnl'], 2), 'trades': day['trades']}
+                     for date_str, day in daily_data.items()}
+
+    equity_curve, equity_labels = _sampled_equity(*_equity_columns(trades, equity))
 
     # Calculate final statistics
-    stats = calculate_stats_from_data(trade_pnls, daily_data, model_data)
+    stats = calculate_stats_from_frame(trades, model_data)
     chart_data = prepare_chart_data_from_data(equity_curve, equity_labels, daily_data, monthly_data)
     model_analytics = prepare_model_analytics_from_data(model_data)
 
     return stats, calendar_data, chart_data, model_analytics
 
 
-def calculate_stats_from_data(trade_pnls, daily_data, model_data):
-    """Calculate stats from pre-processed data"""
-    if not trade_pnls:
+def calculate_stats_from_frame(frame, model_data=None):
+    """
+    Dashboard statistics from the shared performance metrics, over the trades
+    with a P&L in chronological order. model_data is _model_buckets(frame)
+    when the caller already has it.
+    """
+    scored = frame.with_pnl().chronological()
+    if not len(scored):
         return get_default_comprehensive_stats()
 
-    total_trades = len(trade_pnls)
-    total_pnl = sum(trade_pnls)
-    winning_trades = [pnl for pnl in trade_pnls if pnl > 0]
-    losing_trades = [pnl for pnl in trade_pnls if pnl < 0]
-
-    win_count = len(winning_trades)
-    loss_count = len(losing_trades)
-    win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
-
-    gross_profit = sum(winning_trades) if winning_trades else 0
-    gross_loss = abs(sum(losing_trades)) if losing_trades else 0
-    profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0
-
-    average_trade = total_pnl / total_trades if total_trades > 0 else 0
-    avg_win = statistics.mean(winning_trades) if winning_trades else 0
-    avg_loss = abs(statistics.mean(losing_trades)) if losing_trades else 0
-
-    expectancy = (win_rate / 100 * avg_win) - ((100 - win_rate) / 100 * avg_loss)
-
-    # SQN calculation
-    if len(trade_pnls) > 1:
-        std_dev = statistics.stdev(trade_pnls)
-        sqn = (average_trade / std_dev) * math.sqrt(total_trades) if std_dev > 0 else 0
-    else:
-        sqn = 0
-
-    # Daily analytics from pre-calculated data
-    win_days = sum(1 for day in daily_data.values() if day['pnl'] > 0)
-    loss_days = sum(1 for day in daily_data.values() if day['pnl'] < 0)
-    total_days = len(daily_data)
-    daily_win_rate = (win_days / total_days * 100) if total_days > 0 else 0
-
-    total_wins = sum(day['wins'] for day in daily_data.values())
-    avg_wins_per_day = total_wins / total_days if total_days > 0 else 0
-    daily_expectancy = total_pnl / total_days if total_days > 0 else 0
+    metrics = compute_performance_metrics(scored['pnl'], scored['trade_date'])
 
     # Model expectancies
-    expectancies = {}
-    for model, data in model_data.items():
-        if data['trades'] > 0:
-            expectancies[model] = data['total_pnl'] / data['trades']
-
+    if model_data is None:
+        model_data = _model_buckets(frame)
+    expectancies = {model: data['total_pnl'] / data['trades'] for model, data in model_data.items()}
     best_model = max(expectancies.items(), key=lambda x: x[1]) if expectancies else ('N/A', 0)
     worst_model = min(expectancies.items(), key=lambda x: x[1]) if expectancies else ('N/A', 0)
 
+    # No losing trades gives an infinite profit factor; keep the payload JSON-safe
+    profit_factor = metrics['profit_factor'] if math.isfinite(metrics['profit_factor']) else 0
+
     return {
-        'total_pnl': round(total_pnl, 2),
-        'total_trades': total_trades,
-        'winning_trades': win_count,
-        'losing_trades': loss_count,
-        'breakeven_trades': total_trades - win_count - loss_count,
-        'win_rate': round(win_rate, 1),
+        'total_pnl': round(metrics['net_pnl'], 2),
+        'total_trades': len(frame),
+        'winning_trades': metrics['winning_trades'],
+        'losing_trades': metrics['losing_trades'],
+        'breakeven_trades': metrics['breakeven_trades'],
+        'win_rate': round(metrics['win_rate'], 1),
         'profit_factor': round(profit_factor, 2),
-        'expectancy': round(expectancy, 2),
-        'average_trade': round(average_trade, 2),
-        'sqn': round(sqn, 1),
-        'gross_profit': round(gross_profit, 2),
-        'gross_loss': round(gross_loss, 2),
-        'avg_win': round(avg_win, 2),
-        'avg_loss': round(avg_loss, 2),
-        'win_days': win_days,
-        'loss_days': loss_days,
-        'daily_win_rate': round(daily_win_rate, 1),
-        'avg_wins_per_day': round(avg_wins_per_day, 1),
-        'daily_expectancy': round(daily_expectancy, 2),
+        'expectancy': round(metrics['expectancy'], 2),
+        'average_trade': round(metrics['average_trade'], 2),
+        'sqn': round(metrics['sqn'], 1),
+        'gross_profit': round(metrics['gross_profit'], 2),
+        'gross_loss': round(metrics['gross_loss'], 2),
+        'avg_win': round(metrics['avg_win'], 2),
+        'avg_loss': round(metrics['avg_loss'], 2),
+        'win_days': metrics['win_days'],
+        'loss_days': metrics['loss_days'],
+        'daily_win_rate': round(metrics['daily_win_rate'], 1),
+        'avg_wins_per_day': round(metrics['avg_wins_per_day'], 1),
+        'daily_expectancy': round(metrics['daily_expectancy'], 2),
         'model_expectancies': expectancies,
         'best_model': {'name': best_model[0], 'expectancy': best_model[1]},
         'worst_model': {'name': worst_model[0], 'expectancy': worst_model[1]}
@@ -1028,30 +1002,32 @@ def prepare_model_analytics_from_data(model_data):
 
 
 def prepare_simplified_trades_data(trades):
-    """Simplified trades data preparation - only essential fields"""
-    trades_data = []
-
-    for trade in trades:
-        try:
-            trades_data.append({
-                'id': trade.id,
-                'trade_date': trade.trade_date.strftime('%Y-%m-%d') if trade.trade_date else None,
-                'instrument': trade.instrument or 'N/A',
-                'trading_model': trade.trading_model.name if trade.trading_model else 'N/A',
-                'direction': trade.direction or 'N/A',
-                'total_contracts_entered': trade.total_contracts_entered or 0,
-                'pnl': round(float(trade.pnl), 2) if trade.pnl else 0,
-                # Skip time calculations for performance - they're expensive
-                'time_in_trade': None,
-                'entry_time': None,
-                'exit_time': None,
-                'how_closed': trade.how_closed
-            })
-        except Exception as e:
-            print(f"Error processing trade {trade.id}: {e}")
-            continue
-
-    return trades_data
+    """Simplified trades data preparation - only essential fields, from a TradeFrame's columns"""
+    def clock(stamps):
+        # datetime64 -> 'HH:MM' (None for NaT)
+        formatted = np.datetime_as_string(stamps.astype('datetime64[m]'))
+        return [None if np.isnat(stamp) else value[11:16] for stamp, value in zip(stamps, formatted)]
+
+    seconds = trades['time_in_trade_seconds']
+    minutes = [None if np.isnan(value) else int(value / 60) for value in seconds]
+    pnl = np.round(np.nan_to_num(trades['pnl'], nan=0.0), 2)
+    return [{
+        'id': int(trade_id),
+        'trade_date': str(trade_date),
+        'instrument': instrument or 'N/A',
+        'trading_model': model_name or 'N/A',
+        'direction': direction or 'N/A',
+        'total_contracts_entered': int(contracts),
+        'pnl': float(trade_pnl),
+        'time_in_trade': time_in_trade,
+        'entry_time': entry_time,
+        'exit_time': exit_time,
+        'how_closed': how_closed
+    } for trade_id, trade_date, instrument, model_name, direction, contracts, trade_pnl,
+        time_in_trade, entry_time, exit_time, how_closed in zip(
+        trades['id'], trades['trade_date'], trades['instrument'], trades['model_name'],
+        trades['direction'], trades['total_contracts_entered'], pnl, minutes,
+        clock(trades['entry_timestamp']), clock(trades['exit_timestamp']), trades['how_closed'])]
 
 
 # Add these imports to the top of your app/blueprints/main_bp.py file
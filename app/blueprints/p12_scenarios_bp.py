@@ -17,6 +17,7 @@ from app.models import P12Scenario
 from app.forms import P12ScenarioForm
 from app.utils.image_manager import ImageManager
 from app.models import GlobalImage
+from app.utils.http_cache import versioned_etag, p12_scenarios_version
 
 
 
@@ -1333,6 +1334,7 @@ def view_scenario(scenario_id):
 # API endpoints for daily journal integration
 @p12_scenarios_bp.route('/api/scenarios')
 @login_required
+@versioned_etag(p12_scenarios_version, per_user=False)
 def api_get_scenarios():
     """API endpoint to get active scenarios for daily journal."""
     scenarios = P12Scenario.query.filter_by(is_active=True).order_by(P12Scenario.scenario_number).all()
@@ -5,11 +5,16 @@ from sqlalchemy import func, desc, and_, or_
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 import json
+from sqlalchemy.orm import joinedload
 
 from app.models import (
     Trade, TradingModel, Instrument, EntryPoint, ExitPoint,
     DailyJournal, P12Scenario, db
 )
+from app.utils.keyset import keyset_paginate, InvalidCursor
+from app.utils.daily_performance import query_rollup
+from app.utils.analytics_cache import analytics_cache
+from app.utils.http_cache import versioned_etag, content_etag, today
 
 
 # Define helper functions for calculations since the utils functions expect different parameters
@@ -101,116 +106,127 @@ def portfolio_analytics():
 
 @portfolio_bp.route('/api/metrics')
 @login_required
+@versioned_etag(today)
 def get_portfolio_metrics():
     """API endpoint to get portfolio performance metrics."""
     try:
         # Get date range from query parameters
         days = request.args.get('days', 30, type=int)
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = date.today() - timedelta(days=days)
 
         # Get trading model filter
         model_filter = request.args.get('model', 'all')
         instrument_filter = request.args.get('instrument', 'all')
         classification_filter = request.args.get('classification', 'all')
 
-        # Base query for user's trades
-        trades_query = Trade.query.filter(
-            Trade.user_id == current_user.id,
-            Trade.entry_time >= start_date
-        )
-
-        # Apply filters if joins are available
-        try:
-            if model_filter != 'all':
-                trades_query = trades_query.join(TradingModel).filter(
-                    TradingModel.name == model_filter
-                )
-        except Exception:
-            # Skip filter if join fails
-            pass
-
-        try:
-            if instrument_filter != 'all':
-                trades_query = trades_query.join(Instrument).filter(
-                    Instrument.symbol == instrument_filter
-                )
-        except Exception:
-            # Skip filter if join fails
-            pass
-
-        if classification_filter != 'all':
-            trades_query = trades_query.filter(Trade.classification == classification_filter)
-
-        trades = trades_query.all()
-
-        # Calculate metrics
-        total_trades = len(trades)
-
-        if total_trades == 0:
-            return jsonify({
-                'totalPnL': 0,
-                'winRate': 0,
-                'totalTrades': 0,
-                'avgRiskReward': 0,
-                'totalWins': 0,
-                'totalLosses': 0,
-                'avgWin': 0,
-                'avgLoss': 0,
-                'largestWin': 0,
-                'largestLoss': 0,
-                'profitFactor': 0
-            })
-
-        # Calculate P&L for each trade
-        pnl_values = []
-        risk_reward_ratios = []
-
-        for trade in trades:
-            pnl = calculate_trade_pnl_from_trade(trade)
-            pnl_values.append(pnl)
-
-            rr = calculate_risk_reward_from_trade(trade)
-            if rr and rr > 0:
-                risk_reward_ratios.append(rr)
+        # Cached until the user's data version changes (or the window moves a day)
+        filters = (start_date, model_filter, instrument_filter, classification_filter)
+        return jsonify(analytics_cache.get_or_compute(
+            current_user.id, 'portfolio_metrics', filters,
+            lambda: _calculate_portfolio_metrics(current_user.id, *filters)))
 
-        total_pnl = sum(pnl_values)
-        winning_trades = [pnl for pnl in pnl_values if pnl > 0]
-        losing_trades = [pnl for pnl in pnl_values if pnl < 0]
-
-        win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
-        avg_risk_reward = sum(risk_reward_ratios) / len(risk_reward_ratios) if risk_reward_ratios else 0
+    except Exception as e:
+        current_app.logger.error(f"Error fetching portfolio metrics: {e}", exc_info=True)
+        return jsonify({'error': 'Failed to fetch portfolio metrics'}), 500
 
-        # Additional metrics
-        avg_win = sum(winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum(losing_trades) / len(losing_trades) if losing_trades else 0
-        largest_win = max(winning_trades) if winning_trades else 0
-        largest_loss = min(losing_trades) if losing_trades else 0
 
-        gross_profit = sum(winning_trades)
-        gross_loss = abs(sum(losing_trades))
-        profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
+def _calculate_portfolio_metrics(user_id, start_date, model_filter, instrument_filter, classification_filter):
+    """Portfolio performance metrics of the user's trades since start_date."""
+    # Base query for user's trades
+    trades_query = Trade.query.filter(
+        Trade.user_id == user_id,
+        Trade.trade_date >= start_date
+    )
 
-        return jsonify({
-            'totalPnL': round(total_pnl, 2),
-            'winRate': round(win_rate, 1),
-            'totalTrades': total_trades,
-            'avgRiskReward': round(avg_risk_reward, 2),
-            'totalWins': len(winning_trades),
-            'totalLosses': len(losing_trades),
-            'avgWin': round(avg_win, 2),
-            'avgLoss': round(avg_loss, 2),
-            'largestWin': round(largest_win, 2),
-            'largestLoss': round(largest_loss, 2),
-            'profitFactor': round(profit_factor, 2)
-        })
+    # Apply filters if joins are available
+    try:
+        if model_filter != 'all':
+            trades_query = trades_query.join(TradingModel).filter(
+                TradingModel.name == model_filter
+            )
+    except Exception:
+        # Skip filter if join fails
+        pass
 
-    except Exception as e:
-        current_app.logger.error(f"Error fetching portfolio metrics: {e}", exc_info=True)
-        return jsonify({'error': 'Failed to fetch portfolio metrics'}), 500
+    try:
+        if instrument_filter != 'all':
+            trades_query = trades_query.join(Instrument).filter(
+                Instrument.symbol == instrument_filter
+            )
+    except Exception:
+        # Skip filter if join fails
+        pass
+
+    if classification_filter != 'all':
+        trades_query = trades_query.filter(Trade.classification == classification_filter)
+
+    trades = trades_query.all()
+
+    # Calculate metrics
+    total_trades = len(trades)
+
+    if total_trades == 0:
+        return {
+            'totalPnL': 0,
+            'winRate': 0,
+            'totalTrades': 0,
+            'avgRiskReward': 0,
+            'totalWins': 0,
+            'totalLosses': 0,
+            'avgWin': 0,
+            'avgLoss': 0,
+            'largestWin': 0,
+            'largestLoss': 0,
+            'profitFactor': 0
+        }
+
+    # Calculate P&L for each trade
+    pnl_values = []
+    risk_reward_ratios = []
+
+    for trade in trades:
+        pnl = calculate_trade_pnl_from_trade(trade)
+        pnl_values.append(pnl)
+
+        rr = calculate_risk_reward_from_trade(trade)
+        if rr and rr > 0:
+            risk_reward_ratios.append(rr)
+
+    total_pnl = sum(pnl_values)
+    winning_trades = [pnl for pnl in pnl_values if pnl > 0]
+    losing_trades = [pnl for pnl in pnl_values if pnl < 0]
+
+    win_rate = (len(winning_trades) / total_trades * 100) if total_trades > 0 else 0
+    avg_risk_reward = sum(risk_reward_ratios) / len(risk_reward_ratios) if risk_reward_ratios else 0
+
+    # Additional metrics
+    avg_win = sum(winning_trades) / len(winning_trades) if winning_trades else 0
+    avg_loss = sum(losing_trades) / len(losing_trades) if losing_trades else 0
+    largest_win = max(winning_trades) if winning_trades else 0
+    largest_loss = min(losing_trades) if losing_trades else 0
+
+    gross_profit = sum(winning_trades)
+    gross_loss = abs(sum(losing_trades))
+    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
+
+    return {
+        'totalPnL': round(total_pnl, 2),
+        'winRate': round(win_rate, 1),
+        'totalTrades': total_trades,
+        'avgRiskReward': round(avg_risk_reward, 2),
+        'totalWins': len(winning_trades),
+        'totalLosses': len(losing_trades),
+        'avgWin': round(avg_win, 2),
+        'avgLoss': round(avg_loss, 2),
+        'largestWin': round(largest_win, 2),
+        'largestLoss': round(largest_loss, 2),
+        'profitFactor': round(profit_factor, 2)
+    }
 
 
 @portfolio_bp.route('/api/trades')
 @login_required
+@versioned_etag(today)
 def get_portfolio_trades():
     """API endpoint to get trade data for the portfolio table."""
     try:
@@ -230,8 +246,8 @@ def get_portfolio_trades():
         # Base query
         trades_query = Trade.query.filter(
             Trade.user_id == current_user.id,
-            Trade.entry_time >= start_date
-        )
+            Trade.trade_date >= start_date.date()
+        ).options(joinedload(Trade.trading_model), joinedload(Trade.instrument_obj))
 
         # Apply filters with error handling
         try:
@@ -242,20 +258,28 @@ def get_portfolio_trades():
 
         try:
             if instrument_filter != 'all':
-                trades_query = trades_query.join(Instrument).filter(Instrument.symbol == instrument_filter)
+                trades_query = trades_query.outerjoin(Instrument, Trade.instrument_id == Instrument.id).filter(
+                    or_(Instrument.symbol == instrument_filter, Trade.instrument_legacy == instrument_filter))
         except Exception:
             pass
 
+        # Trades have no classification column; the closing method is the nearest equivalent
         if classification_filter != 'all':
-            trades_query = trades_query.filter(Trade.classification == classification_filter)
-
-        # Order by entry time (most recent first)
-        trades_query = trades_query.order_by(desc(Trade.entry_time))
-
-        # Paginate
-        trades_paginated = trades_query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+            trades_query = trades_query.filter(Trade.how_closed == classification_filter)
+
+        # Most recent first; opt-in keyset pagination keeps deep pages as cheap as page 1
+        cursor = request.args.get('cursor')
+        use_cursor = bool(cursor) or request.args.get('paging') == 'cursor'
+        if use_cursor:
+            try:
+                trades_paginated = keyset_paginate(trades_query, cursor=cursor, per_page=per_page)
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            trades_query = trades_query.order_by(desc(Trade.trade_date), desc(Trade.id))
+            trades_paginated = trades_query.paginate(
+                page=page, per_page=per_page, error_out=False
+            )
 
         # Format trade data
         trades_data = []
@@ -263,32 +287,30 @@ def get_portfolio_trades():
             pnl = calculate_trade_pnl_from_trade(trade)
             rr = calculate_risk_reward_from_trade(trade)
 
-            # Safe attribute access
-            model_name = getattr(trade.trading_model, 'name', 'Unknown') if hasattr(trade,
-                                                                                    'trading_model') and trade.trading_model else 'Unknown'
-            instrument_symbol = getattr(trade.instrument, 'symbol', 'Unknown') if hasattr(trade,
-                                                                                          'instrument') and trade.instrument else 'Unknown'
+            model_name = trade.trading_model.name if trade.trading_model else 'Unknown'
+            notes = trade.trade_notes
 
             trades_data.append({
                 'id': trade.id,
-                'date': trade.entry_time.strftime('%Y-%m-%d') if trade.entry_time else 'N/A',
-                'time': trade.entry_time.strftime('%H:%M') if trade.entry_time else 'N/A',
+                'date': trade.trade_date.strftime('%Y-%m-%d') if trade.trade_date else 'N/A',
+                'time': trade.entry_timestamp.strftime('%H:%M') if trade.entry_timestamp else 'N/A',
                 'model': model_name,
-                'instrument': instrument_symbol,
-                'classification': trade.classification or 'N/A',
+                'instrument': trade.instrument or 'Unknown',
+                'classification': trade.how_closed or 'N/A',
                 'direction': trade.direction or 'N/A',
-                'quantity': float(trade.quantity) if trade.quantity else 0,
-                'entry_price': float(trade.entry_price) if trade.entry_price else 0,
-                'exit_price': float(trade.exit_price) if trade.exit_price else 0,
+                'quantity': trade.total_contracts_entered or 0,
+                'entry_price': float(trade.average_entry_price) if trade.average_entry_price else 0,
+                'exit_price': float(trade.average_exit_price) if trade.average_exit_price else 0,
                 'pnl': pnl,
                 'risk_reward': f"1:{rr:.1f}" if rr else "N/A",
-                'status': trade.status or 'Unknown',
-                'notes': trade.notes[:50] + '...' if trade.notes and len(trade.notes) > 50 else (trade.notes or '')
+                'status': trade.how_closed or 'Unknown',
+                'notes': notes[:50] + '...' if notes and len(notes) > 50 else (notes or '')
             })
 
-        return jsonify({
-            'trades': trades_data,
-            'pagination': {
+        if use_cursor:
+            pagination_data = trades_paginated.to_dict()
+        else:
+            pagination_data = {
                 'page': page,
                 'per_page': per_page,
                 'total': trades_paginated.total,
@@ -296,6 +318,10 @@ def get_portfolio_trades():
                 'has_next': trades_paginated.has_next,
                 'has_prev': trades_paginated.has_prev
             }
+
+        return jsonify({
+            'trades': trades_data,
+            'pagination': pagination_data
         })
 
     except Exception as e:
@@ -305,51 +331,31 @@ def get_portfolio_trades():
 
 @portfolio_bp.route('/api/chart-data')
 @login_required
+@versioned_etag(today)
 def get_chart_data():
     """API endpoint to get chart data for portfolio visualization."""
     try:
         # Get date range
         days = request.args.get('days', 30, type=int)
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = date.today() - timedelta(days=days)
 
-        # Get trades for the period
-        trades = Trade.query.filter(
-            Trade.user_id == current_user.id,
-            Trade.entry_time >= start_date
-        ).order_by(Trade.entry_time).all()
-
-        # Calculate cumulative P&L over time
+        # Daily P&L for the period from the daily rollup; cumulative over it
         cumulative_pnl = 0
         pnl_data = []
         labels = []
-
-        # Group trades by date
-        daily_pnl = {}
-        for trade in trades:
-            if trade.entry_time:
-                trade_date = trade.entry_time.date()
-                pnl = calculate_trade_pnl_from_trade(trade)
-
-                if trade_date not in daily_pnl:
-                    daily_pnl[trade_date] = 0
-                daily_pnl[trade_date] += pnl
-
-        # Build cumulative data
-        for trade_date in sorted(daily_pnl.keys()):
-            cumulative_pnl += daily_pnl[trade_date]
-            labels.append(trade_date.strftime('%b %d'))
+        for row in query_rollup(current_user.id, ('trade_date',), start_date):
+            cumulative_pnl += row.net_pnl
+            labels.append(row.trade_date.strftime('%b %d'))
             pnl_data.append(round(cumulative_pnl, 2))
 
         # Performance by trading model
+        model_rows = query_rollup(current_user.id, ('trading_model_id',), start_date)
+        model_names = dict(db.session.query(TradingModel.id, TradingModel.name).filter(
+            TradingModel.id.in_([row.trading_model_id for row in model_rows])))
         model_performance = {}
-        for trade in trades:
-            model_name = getattr(trade.trading_model, 'name', 'Unknown') if hasattr(trade,
-                                                                                    'trading_model') and trade.trading_model else 'Unknown'
-            pnl = calculate_trade_pnl_from_trade(trade)
-
-            if model_name not in model_performance:
-                model_performance[model_name] = 0
-            model_performance[model_name] += pnl
+        for row in model_rows:
+            model_name = model_names.get(row.trading_model_id, 'Unknown')
+            model_performance[model_name] = model_performance.get(model_name, 0) + row.net_pnl
 
         return jsonify({
             'cumulative_pnl': {
@@ -369,6 +375,7 @@ def get_chart_data():
 
 @portfolio_bp.route('/api/instruments')
 @login_required
+@content_etag
 def get_available_instruments():
     """API endpoint to get available instruments for filtering."""
     try:
@@ -400,6 +407,7 @@ def get_available_instruments():
 
 @portfolio_bp.route('/api/trading-models')
 @login_required
+@versioned_etag()
 def get_available_trading_models():
     """API endpoint to get available trading models for filtering."""
     try:
@@ -1,25 +1,23 @@
 
 from flask import (Blueprint, render_template, request, redirect,
-                   url_for, flash, current_app, Response, abort, jsonify)
+                   url_for, flash, current_app, Response, abort, jsonify, stream_with_context, send_file)
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from flask_wtf.csrf import generate_csrf
 import os
 
-import statistics
 import uuid
 import csv
 import io
 import json
 import numpy as np
-import pandas as pd
 import shutil
-from datetime import datetime, time as py_time
+from datetime import datetime
 from flask import (Blueprint, render_template, request, redirect,
                    url_for, flash, current_app, Response)
 from flask_login import login_required, current_user
 from datetime import date as py_date, timedelta
-from datetime import date as py_date, datetime as py_datetime, time as py_time
+from datetime import date as py_date
 from datetime import datetime
 import matplotlib
 matplotlib.use('Agg') # Use non-interactive backend
@@ -29,6 +27,9 @@ from matplotlib.colors import LinearSegmentedColormap
 import seaborn as sns
 from matplotlib.patches import Rectangle
 import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 try:
     from reportlab.lib.pagesizes import A4, landscape
     from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -52,6 +53,13 @@ try:
 except ImportError:
     SVG_AVAILABLE = False
 
+try:
+    import msgspec
+    _msgspec_encoder = msgspec.json.Encoder()
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -65,9 +73,21 @@ from app.extensions import db
 from app.models import (Trade, EntryPoint, ExitPoint, TradingModel, NewsEventItem,
                        TradeImage, Instrument, Tag, TagCategory, TagUsageStats)
 from app.forms import TradeForm, EntryPointForm, ExitPointForm, TradeFilterForm, ImportTradesForm
-from app.utils import (_parse_form_float, _parse_form_int, _parse_form_time,
+from app.utils import (_parse_form_float, _parse_form_time,
                        get_news_event_options, record_activity)
-from datetime import datetime, time as py_time, date as py_date
+from app.utils.trade_metrics import TradeMetricsBatch
+from app.utils.trade_kpis import get_trade_kpis
+from app.utils.keyset import keyset_paginate, iter_keyset_batches, InvalidCursor
+from app.utils.trade_filters import TradeFilterSpec, average_rating_expression
+from app.utils.trade_import import import_trades_csv
+from app.services.job_service import background_job, report_progress
+from app.utils.trade_frame import TradeFrame
+from app.utils.performance_metrics import compute_performance_metrics, equity_curve, drawdown_series
+from app.utils.equity_series import load_series
+from app.utils.chart_cache import chart_cache
+from app.utils.columnar_export import write_trades_parquet_zip, PYARROW_AVAILABLE
+from sqlalchemy.orm import joinedload, selectinload
+from datetime import datetime, date as py_date
 from app.models import Trade, TradingModel, Tag, Instrument, EntryPoint, ExitPoint
 from app.extensions import db
 
@@ -184,146 +204,40 @@ def _populate_trade_form_choices(form):
 
 
 def _apply_trade_filters(query, filter_form=None, request_args=None):
-    """Apply comprehensive trade filtering based on form data and request args.
-    
-    Args:
-        query: Base SQLAlchemy query for trades
-        filter_form: TradeFilterForm instance (optional)  
-        request_args: Request arguments dict (optional)
-    
+    """Apply comprehensive trade filtering based on request args.
+
+    Thin wrapper over TradeFilterSpec (app/utils/trade_filters.py), which is the
+    single source of filter semantics for the list view, exports and reports.
+
     Returns:
         Filtered query and filter status dictionary
     """
-    if request_args is None:
-        request_args = request.args
-    
-    if filter_form is None:
-        filter_form = TradeFilterForm(request_args)
-        _populate_filter_form_choices(filter_form)
-    
-    # Track active filters for export labeling
-    active_filters = {}
-    
-    # Date range filters
-    if filter_form.start_date.data:
-        query = query.filter(Trade.trade_date >= filter_form.start_date.data)
-        active_filters['start_date'] = filter_form.start_date.data
-    if filter_form.end_date.data:
-        query = query.filter(Trade.trade_date <= filter_form.end_date.data)
-        active_filters['end_date'] = filter_form.end_date.data
-
-    # Instrument filtering - handle both legacy and new instrument system
-    if filter_form.instrument.data:
-        # Try to filter by instrument_id first (new system)
-        if filter_form.instrument.data.isdigit():
-            instrument_id = int(filter_form.instrument.data)
-            query = query.filter(Trade.instrument_id == instrument_id)
-        else:
-            # Fallback to symbol matching (legacy system)
-            query = query.filter(Trade.instrument_legacy == filter_form.instrument.data)
-        active_filters['instrument'] = filter_form.instrument.data
-
-    # Direction filter
-    if filter_form.direction.data:
-        query = query.filter(Trade.direction == filter_form.direction.data)
-        active_filters['direction'] = filter_form.direction.data
-
-    # Trading model filter
-    if filter_form.trading_model_id.data and filter_form.trading_model_id.data != 0:
-        query = query.filter(Trade.trading_model_id == filter_form.trading_model_id.data)
-        active_filters['trading_model_id'] = filter_form.trading_model_id.data
-
-    # How closed filter
-    how_closed_filter = request_args.get('how_closed')
-    if how_closed_filter:
-        query = query.filter(Trade.how_closed == how_closed_filter)
-        active_filters['how_closed'] = how_closed_filter
-
-    # P&L filter
-    pnl_filter = request_args.get('pnl_filter')
-    if pnl_filter:
-        if pnl_filter == 'winners':
-            query = query.filter(Trade.pnl > 0)
-        elif pnl_filter == 'losers':
-            query = query.filter(Trade.pnl < 0)
-        elif pnl_filter == 'breakeven':
-            query = query.filter(Trade.pnl == 0)
-        active_filters['pnl_filter'] = pnl_filter
-
-    # Min/Max P&L filters
-    min_pnl = request_args.get('min_pnl')
-    max_pnl = request_args.get('max_pnl')
-    if min_pnl:
-        try:
-            min_val = float(min_pnl)
-            query = query.filter(Trade.pnl >= min_val)
-            active_filters['min_pnl'] = min_val
-        except ValueError:
-            pass
-    if max_pnl:
-        try:
-            max_val = float(max_pnl)
-            query = query.filter(Trade.pnl <= max_val)
-            active_filters['max_pnl'] = max_val
-        except ValueError:
-            pass
+    spec = TradeFilterSpec.from_request(request_args)
+    return spec.apply(query), spec.active_filters
 
-    # Min/Max contracts filters
-    min_contracts = request_args.get('min_contracts')
-    max_contracts = request_args.get('max_contracts')
-    if min_contracts:
-        try:
-            min_val = int(min_contracts)
-            # Using subquery for total_contracts_entered property
-            subquery = db.session.query(
-                EntryPoint.trade_id,
-                db.func.sum(EntryPoint.contracts).label('total_contracts')
-            ).group_by(EntryPoint.trade_id).subquery()
-            
-            query = query.join(subquery, Trade.id == subquery.c.trade_id)\
-                        .filter(subquery.c.total_contracts >= min_val)
-            active_filters['min_contracts'] = min_val
-        except ValueError:
-            pass
-    if max_contracts:
-        try:
-            max_val = int(max_contracts)
-            # Using subquery for total_contracts_entered property
-            subquery = db.session.query(
-                EntryPoint.trade_id,
-                db.func.sum(EntryPoint.contracts).label('total_contracts')
-            ).group_by(EntryPoint.trade_id).subquery()
-            
-            query = query.join(subquery, Trade.id == subquery.c.trade_id)\
-                        .filter(subquery.c.total_contracts <= max_val)
-            active_filters['max_contracts'] = max_val
-        except ValueError:
-            pass
-
-    # DCA only filter
-    dca_only = request_args.get('dca_only')
-    if dca_only == 'true':
-        # Filter trades with multiple entries (DCA)
-        subquery = db.session.query(
-            EntryPoint.trade_id,
-            db.func.count(EntryPoint.id).label('entry_count')
-        ).group_by(EntryPoint.trade_id).subquery()
-        
-        query = query.join(subquery, Trade.id == subquery.c.trade_id)\
-                    .filter(subquery.c.entry_count > 1)
-        active_filters['dca_only'] = True
-
-    # Tags filter (handle multiple tag selection)
-    selected_tags = request_args.get('selected_tags')
-    if selected_tags:
-        tag_ids = [int(tid) for tid in selected_tags.split(',') if tid.isdigit()]
-        if tag_ids:
-            # Filter for trades that have ALL selected tags (AND logic)
-            for tag_id in tag_ids:
-                query = query.filter(Trade.tags.any(Tag.id == tag_id))
-            active_filters['selected_tags'] = tag_ids
-
-    return query, active_filters
+
+def _computed_sort_expression(sort_field):
+    """SQL expression for sort keys that are derived from entries/exits or ratings.
+
+    Uses the stored aggregate columns where they exist so sorting happens in the
+    database across the whole result set rather than on the current page only.
+    """
+    if sort_field == 'contracts':
+        return Trade.total_contracts_entered
+    if sort_field == 'entry':
+        return Trade.average_entry_price
+    if sort_field == 'exit':
+        return Trade.average_exit_price
+    if sort_field == 'time_in_trade':
+        return Trade.time_in_trade_seconds
+    if sort_field == 'entry_time':
+        # Time of day of the first entry (independent of trade date)
+        return db.select(db.func.min(EntryPoint.entry_time)) \
+            .where(EntryPoint.trade_id == Trade.id) \
+            .correlate(Trade).scalar_subquery()
+    if sort_field == 'avg_rating':
+        return average_rating_expression()
+    return None
 
 
 def _populate_filter_form_choices(filter_form):
@@ -416,211 +330,17 @@ def view_trades_list():
 
     query = Trade.query.filter_by(user_id=current_user.id)
 
-    # Get ALL user trades for KPI calculations (not just filtered ones)
-    all_user_trades = Trade.query.filter_by(user_id=current_user.id).all()
-
-    # Calculate KPI data
-    kpi_data = {
-        'total_trades': len(all_user_trades),
-        'profitable_trades': len([t for t in all_user_trades if t.pnl and t.pnl > 0]),
-        'losing_trades': len([t for t in all_user_trades if t.pnl and t.pnl < 0]),
-        'breakeven_trades': len([t for t in all_user_trades if t.pnl and t.pnl == 0]),
-        'cumulative_pnl': sum([t.pnl for t in all_user_trades if t.pnl is not None]),
-        'strike_rate': 0
-    }
-
-    # Calculate strike rate
-    trades_with_pnl = [t for t in all_user_trades if t.pnl is not None]
-    if trades_with_pnl:
-        kpi_data['strike_rate'] = (kpi_data['profitable_trades'] / len(trades_with_pnl)) * 100
-    
-    # Calculate best model by strike rate (using all trades, not just paginated)
-    model_performance = {}
-    for trade in all_user_trades:
-        if trade.trading_model and trade.pnl is not None:
-            model_name = trade.trading_model.name
-            if model_name not in model_performance:
-                model_performance[model_name] = {'total_trades': 0, 'winning_trades': 0}
-            model_performance[model_name]['total_trades'] += 1
-            if trade.pnl > 0:
-                model_performance[model_name]['winning_trades'] += 1
-    
-    # Find best model by strike rate
-    best_model = None
-    if model_performance:
-        best_strike_rate = -1
-        for model_name, stats in model_performance.items():
-            if stats['total_trades'] > 0:
-                strike_rate = (stats['winning_trades'] / stats['total_trades']) * 100
-                if strike_rate > best_strike_rate:
-                    best_model = model_name
-                    best_strike_rate = strike_rate
-    
-    kpi_data['best_model'] = best_model
-
-    # Apply filters
-    if filter_form.start_date.data:
-        query = query.filter(Trade.trade_date >= filter_form.start_date.data)
-    if filter_form.end_date.data:
-        query = query.filter(Trade.trade_date <= filter_form.end_date.data)
-
-    # FIXED: Instrument filtering - handle both legacy and new instrument system
-    if filter_form.instrument.data:
-        # Try to filter by instrument_id first (new system)
-        if filter_form.instrument.data.isdigit():
-            instrument_id = int(filter_form.instrument.data)
-            query = query.filter(Trade.instrument_id == instrument_id)
-        else:
-            # Fallback to symbol matching (legacy system)
-            query = query.filter(Trade.instrument_legacy == filter_form.instrument.data)
-
-    if filter_form.direction.data:
-        query = query.filter(Trade.direction == filter_form.direction.data)
-
-    if filter_form.trading_model_id.data and filter_form.trading_model_id.data != 0:
-        query = query.filter(Trade.trading_model_id == filter_form.trading_model_id.data)
-
-    # Handle how_closed filter (from request.args since it's not in the form)
+    # KPI header covers ALL user trades (not just filtered ones): one GROUP BY query, cached per user
+    kpi_data = get_trade_kpis(current_user.id)
 
-    how_closed_filter = request.args.get('how_closed')
-    if how_closed_filter:
-        print(f"DEBUG: Filtering by how_closed = '{how_closed_filter}'")
-
-        # Let's see what values actually exist in the database
-        existing_how_closed_values = db.session.query(Trade.how_closed).filter(
-            Trade.user_id == current_user.id
-        ).distinct().all()
-        print(f"DEBUG: Existing how_closed values in database:")
-        for value in existing_how_closed_values:
-            print(f"  - '{value[0]}'")
-
-        query = query.filter(Trade.how_closed == how_closed_filter)
-
-        # Check how many trades match after this filter
-        count_after_filter = query.count()
-        print(f"DEBUG: Trades matching how_closed filter: {count_after_filter}")
-
-    # Handle P&L filter - now using the stored pnl column
-    pnl_filter = request.args.get('pnl_filter')
-    if pnl_filter:
-        if pnl_filter == 'winners':
-            query = query.filter(Trade.pnl > 0)
-        elif pnl_filter == 'losers':
-            query = query.filter(Trade.pnl < 0)
-        elif pnl_filter == 'breakeven':
-            query = query.filter(Trade.pnl == 0)
-
-    # Handle DCA filter
-    is_dca_filter = request.args.get('is_dca')
-    if is_dca_filter:
-        if is_dca_filter == 'true':
-            query = query.filter(Trade.is_dca == True)
-        elif is_dca_filter == 'false':
-            query = query.filter(Trade.is_dca == False)
-
-    # Handle min/max P&L filters
-    min_pnl = request.args.get('min_pnl')
-    if min_pnl:
-        try:
-            min_pnl_value = float(min_pnl)
-            query = query.filter(Trade.pnl >= min_pnl_value)
-        except (ValueError, TypeError):
-            pass  # Ignore invalid values
-    
-    max_pnl = request.args.get('max_pnl')
-    if max_pnl:
-        try:
-            max_pnl_value = float(max_pnl)
-            query = query.filter(Trade.pnl <= max_pnl_value)
-        except (ValueError, TypeError):
-            pass  # Ignore invalid values
-
-    # Handle min/max contracts filters
-    min_contracts = request.args.get('min_contracts')
-    max_contracts = request.args.get('max_contracts')
-    
-    if min_contracts or max_contracts:
-        try:
-            from app.models import EntryPoint
-            # Use subquery to sum contracts from entry points
-            subquery = db.session.query(
-                EntryPoint.trade_id,
-                db.func.sum(EntryPoint.contracts).label('total_contracts')
-            ).group_by(EntryPoint.trade_id).subquery()
-            
-            query = query.join(subquery, Trade.id == subquery.c.trade_id)
-            
-            if min_contracts:
-                min_contracts_value = int(min_contracts)
-                query = query.filter(subquery.c.total_contracts >= min_contracts_value)
-            
-            if max_contracts:
-                max_contracts_value = int(max_contracts)
-                query = query.filter(subquery.c.total_contracts <= max_contracts_value)
-                
-        except (ValueError, TypeError):
-            pass
-
-    # Handle min rating filter
-    min_rating = request.args.get('min_rating')
-    if min_rating:
-        try:
-            min_rating_value = int(min_rating)
-            # Calculate average rating and filter
-            query = query.filter(
-                ((Trade.preparation_rating + Trade.rules_rating + Trade.management_rating + 
-                  Trade.target_rating + Trade.entry_rating) / 5.0) >= min_rating_value
-            )
-        except (ValueError, TypeError):
-            pass
-
-    # Handle tags filter - support multiple tags with AND logic
-    selected_tags = request.args.getlist('tags')  # Get list of selected tag IDs
-    if selected_tags and any(tag.strip() for tag in selected_tags if tag):  # Check if any non-empty tags
-        # Handle comma-separated values and individual tags
-        all_tag_ids = []
-        for tag_param in selected_tags:
-            if tag_param and tag_param.strip():
-                # Split comma-separated values and add to list
-                tag_ids_in_param = [t.strip() for t in tag_param.split(',') if t.strip()]
-                all_tag_ids.extend(tag_ids_in_param)
-        
-        # Filter to only valid integer IDs
-        valid_tag_ids = []
-        for tag_id in all_tag_ids:
-            try:
-                valid_tag_ids.append(int(tag_id))
-            except (ValueError, TypeError):
-                continue
-
-        if valid_tag_ids:
-            # Use AND logic - show trades that have ALL of the selected tags
-            for tag_id in valid_tag_ids:
-                query = query.filter(Trade.tags.any(Tag.id == tag_id))
+    # Apply filters (shared compiler used by the exports and reports too)
+    filter_spec = TradeFilterSpec.from_request(request.args)
+    query = filter_spec.apply(query)
 
     selected_tag_details = []
-    if selected_tags:
-        # Handle comma-separated values for display
-        all_tag_ids = []
-        for tag_param in selected_tags:
-            if tag_param and tag_param.strip():
-                tag_ids_in_param = [t.strip() for t in tag_param.split(',') if t.strip()]
-                all_tag_ids.extend(tag_ids_in_param)
-        
-        valid_tag_ids = []
-        for tag_id in all_tag_ids:
-            try:
-                valid_tag_ids.append(int(tag_id))
-            except (ValueError, TypeError):
-                continue
-                
-        if valid_tag_ids:
-            tags_for_display = Tag.query.filter(Tag.id.in_(valid_tag_ids)).all()
-            selected_tag_details = [(tag.id, tag.name, tag.color_category or 'neutral') for tag in tags_for_display]
-
-    # Debug logging
-    print(f"Filter form data: {filter_form.data}")
-    print(f"Request args: {request.args}")
+    if filter_spec.tag_ids:
+        tags_for_display = Tag.query.filter(Tag.id.in_(filter_spec.tag_ids)).all()
+        selected_tag_details = [(tag.id, tag.name, tag.color_category or 'neutral') for tag in tags_for_display]
 
     # Continue with rest of the function (sorting, pagination, etc.)
     sort_field = request.args.get('sort', 'date')
@@ -654,6 +374,11 @@ def view_trades_list():
         order_clauses = (Trade.pnl.desc().nullslast(), Trade.trade_date.desc()) if sort_reverse else (
             Trade.pnl.asc().nullsfirst(), Trade.trade_date.desc())
         query = query.order_by(*order_clauses)
+    elif _computed_sort_expression(sort_field) is not None:
+        sort_expr = _computed_sort_expression(sort_field)
+        order_clauses = (sort_expr.desc().nullslast(), Trade.trade_date.desc(), Trade.id.desc()) if sort_reverse \
+            else (sort_expr.asc().nullsfirst(), Trade.trade_date.desc(), Trade.id.desc())
+        query = query.order_by(*order_clauses)
     else:
         query = query.order_by(Trade.trade_date.desc(), Trade.id.desc())
 
@@ -662,55 +387,26 @@ def view_trades_list():
     per_page = request.args.get('per_page', 25, type=int)
     if per_page not in [25, 50, 100, 250]:
         per_page = 25
-    trades_pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-    # In-memory sorting for calculated properties (P&L, Ratings, etc.)
-    property_sort_fields = ['contracts', 'entry_time', 'entry', 'exit', 'avg_rating', 'time_in_trade']
-    if sort_field in property_sort_fields:
-
-        def _calculate_avg_rating(trade):
-            ratings = [r for r in
-                       [trade.preparation_rating, trade.rules_rating, trade.management_rating, trade.target_rating,
-                        trade.entry_rating] if r is not None]
-            return sum(ratings) / len(ratings) if ratings else None
-
-        key_func = None
-        if sort_field == 'pnl':
-            key_func = lambda t: t.pnl if t.pnl is not None else -float('inf')
-        elif sort_field == 'contracts':
-            key_func = lambda t: t.total_contracts_entered if t.total_contracts_entered is not None else -1
-        elif sort_field == 'entry_time':
-            key_func = lambda \
-                    t: t.entries.first().entry_time if t.entries.first() and t.entries.first().entry_time else py_time.min
-        elif sort_field == 'entry':
-            key_func = lambda t: t.average_entry_price if t.average_entry_price is not None else -float('inf')
-        elif sort_field == 'exit':
-            key_func = lambda t: t.average_exit_price if t.average_exit_price is not None else -float('inf')
-        elif sort_field == 'avg_rating':
-            key_func = lambda t: _calculate_avg_rating(t) if _calculate_avg_rating(t) is not None else -1
-        elif sort_field == 'time_in_trade':
-            def _calculate_time_in_trade(trade):
-                if trade.exits.count() > 0 and trade.entries.count() > 0:
-                    first_entry = trade.entries.order_by(EntryPoint.entry_time.asc()).first()
-                    last_exit = trade.exits.order_by(ExitPoint.exit_time.desc()).first()
-
-                    if first_entry and last_exit and first_entry.entry_time and last_exit.exit_time:
-                        from datetime import datetime
-                        entry_datetime = datetime.combine(trade.trade_date, first_entry.entry_time)
-                        exit_datetime = datetime.combine(trade.trade_date, last_exit.exit_time)
-                        return (exit_datetime - entry_datetime).total_seconds()
-                return 0
-
-            key_func = _calculate_time_in_trade
-        if key_func:
-            trades_pagination.items = sorted(trades_pagination.items, key=key_func, reverse=sort_reverse)
-
+    query = query.options(joinedload(Trade.trading_model), joinedload(Trade.instrument_obj))
 
+    # Opt-in keyset pagination (date sort only): deep pages cost the same as page 1
+    cursor = request.args.get('cursor')
+    if sort_field == 'date' and (cursor or request.args.get('paging') == 'cursor'):
+        try:
+            trades_pagination = keyset_paginate(query, cursor=cursor, per_page=per_page, descending=sort_reverse)
+        except InvalidCursor:
+            flash('Invalid page cursor - showing the first page.', 'warning')
+            trades_pagination = keyset_paginate(query, per_page=per_page, descending=sort_reverse)
+    else:
+        trades_pagination = query.paginate(page=page, per_page=per_page, error_out=False)
 
     # Set the title
     title = "Trades List"
     trades_on_page = trades_pagination.items
 
+    # Entries/exits for the expandable detail rows, loaded for the whole page at once
+    trade_metrics = TradeMetricsBatch.for_trades(trades_on_page)
+
     return render_template("trades/view_trades_list.html",
                            title=title,
                            trades=trades_on_page,
@@ -719,6 +415,8 @@ def view_trades_list():
                            categorized_tags=categorized_tags,
                            selected_tag_details=selected_tag_details,
                            kpi_data=kpi_data,
+                           trade_metrics=trade_metrics,
+                           filter_hash=filter_spec.spec_hash,
                            csrf_token=generate_csrf())
 
 # --- ADD TRADE ---
@@ -823,7 +521,7 @@ def add_trade():
                     )
                     db.session.add(new_exit)
 
-            new_trade.calculate_and_store_pnl()
+            new_trade.recalculate_aggregates()
 
             # Add tags
             if form.tags.data:
@@ -1056,7 +754,7 @@ def edit_trade(trade_id):
                 if exit_to_delete:
                     db.session.delete(exit_to_delete)
 
-            trade_to_edit.calculate_and_store_pnl()
+            trade_to_edit.recalculate_aggregates()
 
             # Handle tags
             trade_to_edit.tags.clear()
@@ -1327,69 +1025,47 @@ def bulk_delete_trades():
 
 
 # --- EXPORT TRADES ---
+EXPORT_BATCH_SIZE = 500  # Trades fetched per keyset batch by the streaming exports
+
+
+class _CSVLineBuffer:
+    """File-like sink that hands each csv.writer row straight back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def _iter_export_batches(query):
+    """Keyset batches of trades with model, instrument and tags prefetched per batch."""
+    query = query.options(joinedload(Trade.trading_model), joinedload(Trade.instrument_obj),
+                          selectinload(Trade.tags))
+    for batch in iter_keyset_batches(query, batch_size=EXPORT_BATCH_SIZE):
+        yield batch
+        # Release the batch so the session does not accumulate the whole export
+        for trade in batch:
+            db.session.expunge(trade)
+
+
 @trades_bp.route('/export_csv', methods=['GET'])
 @login_required
 def export_trades_csv():
-    """Export trades to CSV format - filtered data if filters active, complete dataset if not."""
+    """Export trades to CSV format - filtered data if filters active, complete dataset if not.
+
+    The response is streamed: trades are read in keyset batches and rows are
+    written through a generator, so memory stays flat regardless of trade count.
+    """
     try:
-        # Create and populate filter form properly  
-        filter_form = TradeFilterForm(request.args, meta={'csrf': False})
-        filter_form, categorized_tags = _populate_filter_form_choices(filter_form)
-        
-        # Create base query for current user
-        query = Trade.query.filter_by(user_id=current_user.id)
-        
-        # Apply filters directly (same logic as main view)
-        active_filters = {}
-        if filter_form.start_date.data:
-            query = query.filter(Trade.trade_date >= filter_form.start_date.data)
-            active_filters['start_date'] = filter_form.start_date.data
-        if filter_form.end_date.data:
-            query = query.filter(Trade.trade_date <= filter_form.end_date.data)
-            active_filters['end_date'] = filter_form.end_date.data
-        if filter_form.instrument.data:
-            if filter_form.instrument.data.isdigit():
-                instrument_id = int(filter_form.instrument.data)
-                query = query.filter(Trade.instrument_id == instrument_id)
-            else:
-                query = query.filter(Trade.instrument_legacy == filter_form.instrument.data)
-            active_filters['instrument'] = filter_form.instrument.data
-        if filter_form.direction.data:
-            query = query.filter(Trade.direction == filter_form.direction.data)
-            active_filters['direction'] = filter_form.direction.data
-        if filter_form.trading_model_id.data and filter_form.trading_model_id.data != 0:
-            query = query.filter(Trade.trading_model_id == filter_form.trading_model_id.data)
-            active_filters['trading_model_id'] = filter_form.trading_model_id.data
-        
-        # Handle additional filters from request.args
-        how_closed_filter = request.args.get('how_closed')
-        if how_closed_filter:
-            query = query.filter(Trade.how_closed == how_closed_filter)
-            active_filters['how_closed'] = how_closed_filter
-        
-        pnl_filter = request.args.get('pnl_filter')
-        if pnl_filter:
-            if pnl_filter == 'winners':
-                query = query.filter(Trade.pnl > 0)
-            elif pnl_filter == 'losers':
-                query = query.filter(Trade.pnl < 0)
-            elif pnl_filter == 'breakeven':
-                query = query.filter(Trade.pnl == 0)
-            active_filters['pnl_filter'] = pnl_filter
-        
-        # Debug: Log filter status
-        current_app.logger.info(f"CSV Export - Active filters: {active_filters}")
-        current_app.logger.info(f"CSV Export - Request args: {dict(request.args)}")
-        
-        trades_to_export = query.order_by(Trade.trade_date.asc()).all()
-        current_app.logger.info(f"CSV Export - Total trades found: {len(trades_to_export)}")
+        # Same filter compiler as the trades list view
+        filter_spec = TradeFilterSpec.from_request(request.args)
+        query = filter_spec.apply(Trade.query.filter_by(user_id=current_user.id))
+        active_filters = filter_spec.active_filters
 
-        if not trades_to_export:
+        current_app.logger.info(f"CSV Export - Active filters: {active_filters} (spec {filter_spec.spec_hash})")
+
+        if not db.session.query(query.exists()).scalar():
             flash('No trades found matching current filters to export.', 'warning')
             return redirect(url_for('trades.view_trades_list', **request.args))
 
-        output = io.StringIO()
-        writer = csv.writer(output)
         headers = [
             'ID', 'Date', 'Instrument', 'Direction', 'Point Value',
             'Total Entry Contracts', 'Avg Entry Price', 'Total Exit Contracts', 'Avg Exit Price',
@@ -1397,31 +1073,36 @@ def export_trades_csv():
             'Initial SL', 'Terminus Target', 'MAE', 'MFE', 'How Closed',
             'Trading Model', 'Tags', 'Trade Notes', 'Overall Analysis', 'Management Notes',
             'Errors', 'Improvements', 'External Screenshot Link'
-            # Detailed entries/exits would require a more complex CSV or separate export
+            # Detailed entries/exits are available in the Parquet export
         ]
-        writer.writerow(headers)
-        for trade in trades_to_export:
-            writer.writerow([
-                trade.id, trade.trade_date.strftime('%Y-%m-%d'), trade.instrument, trade.direction, trade.point_value,
-                trade.total_contracts_entered, trade.average_entry_price,
-                trade.total_contracts_exited, trade.average_exit_price,
-                trade.pnl, trade.pnl_in_r, trade.dollar_risk,
-                trade.initial_stop_loss, trade.terminus_target, trade.mae_price, trade.mfe_price,
-                trade.how_closed, trade.trading_model.name if trade.trading_model else '',
-                ', '.join([tag.name for tag in trade.tags]) if trade.tags else '', trade.trade_notes, trade.overall_analysis_notes, trade.trade_management_notes,
-                trade.errors_notes, trade.improvements_notes, trade.screenshot_link
-            ])
-        output.seek(0)
-        
+
+        def generate():
+            writer = csv.writer(_CSVLineBuffer())
+            yield writer.writerow(headers)
+            for batch in _iter_export_batches(query):
+                yield ''.join(writer.writerow([
+                    trade.id, trade.trade_date.strftime('%Y-%m-%d'), trade.instrument, trade.direction,
+                    trade.point_value,
+                    trade.total_contracts_entered, trade.average_entry_price,
+                    trade.total_contracts_exited, trade.average_exit_price,
+                    trade.pnl, trade.pnl_in_r, trade.dollar_risk,
+                    trade.initial_stop_loss, trade.terminus_target, trade.mae_price, trade.mfe_price,
+                    trade.how_closed, trade.trading_model.name if trade.trading_model else '',
+                    ', '.join([tag.name for tag in trade.tags]) if trade.tags else '', trade.trade_notes,
+                    trade.overall_analysis_notes, trade.trade_management_notes,
+                    trade.errors_notes, trade.improvements_notes, trade.screenshot_link
+                ]) for trade in batch)
+
         # Create filename based on filter status
         if active_filters:
             filename = "trades_export_filtered.csv"
         else:
             filename = "trades_export_complete.csv"
-        
-        return Response(output.getvalue(), mimetype="text/csv",
-                        headers={"Content-Disposition": f"attachment;filename={filename}"})
-    
+
+        return Response(stream_with_context(generate()), mimetype="text/csv",
+                        headers={"Content-Disposition": f"attachment;filename={filename}",
+                                 "X-Filter-Hash": filter_spec.spec_hash})
+
     except Exception as e:
         current_app.logger.error(f"CSV Export failed: {e}")
         flash(f'Export failed: {str(e)}', 'danger')
@@ -1435,155 +1116,30 @@ def import_trades():
     if form.validate_on_submit():
         csv_file = form.csv_file.data
         try:
-            stream = io.StringIO(csv_file.stream.read().decode("UTF-8"), newline=None)
-            csv_reader = csv.DictReader(stream)
-
-            imported_count = 0
-            error_count = 0
-            error_details = []
-
-            # MODIFIED: Updated header names to match the new CSV template
-            header_map = {
-                'date': 'Date (Req: YYYY-MM-DD)', 'instrument': 'Instrument (Req)', 'direction': 'Direction (Req)',
-                'entry_time': 'Entry Time {i} (Req: HH:MM)', 'entry_contracts': 'Entry Contracts {i} (Req)',
-                'entry_price': 'Entry Price {i} (Req)',
-                'exit_time': 'Exit Time {i} (Req: HH:MM)', 'exit_contracts': 'Exit Contracts {i} (Req)',
-                'exit_price': 'Exit Price {i} (Req)',
-                'model': 'Trading Model', 'tags': 'Tags', 'how_closed': 'How Closed', 'sl': 'Initial SL',
-                'tp': 'Terminus Target', 'mae': 'MAE', 'mfe': 'MFE', 'notes': 'Trade Notes'
-            }
-            # For optional entries/exits, the header might not have "(Req)"
-            header_map_optional = {
-                'entry_time': 'Entry Time {i} (HH:MM)', 'entry_contracts': 'Entry Contracts {i}',
-                'entry_price': 'Entry Price {i}',
-                'exit_time': 'Exit Time {i} (HH:MM)', 'exit_contracts': 'Exit Contracts {i}',
-                'exit_price': 'Exit Price {i}'
-            }
+            result = import_trades_csv(csv_file.stream, current_user.id,
+                                       on_duplicate=form.on_duplicate.data)
 
-            for row_num, row in enumerate(csv_reader, 1):
-                try:
-                    # --- 1. Validate required main trade data using new headers ---
-                    trade_date_str = row.get(header_map['date'])
-                    instrument = row.get(header_map['instrument'])
-                    direction = row.get(header_map['direction'])
-
-                    if not all([trade_date_str, instrument, direction]):
-                        error_details.append(
-                            f"Row {row_num + 1}: Missing required fields (Date, Instrument, or Direction).");
-                        error_count += 1;
-                        continue
-
-                    trade_date = py_datetime.strptime(trade_date_str, '%Y-%m-%d').date()
-
-                    # --- 2. Create the main Trade object ---
-                    new_trade = Trade(user_id=current_user.id, trade_date=trade_date, instrument=instrument,
-                                      direction=direction, point_value=Instrument.get_point_value(instrument))
-
-                    # --- 3. Process Entries and Exits ---
-                    entries_found = 0
-                    # Look for up to 5 entries (you can increase this number)
-                    for i in range(1, 6):
-                        # Try both required and optional header formats
-                        entry_time_hdr = header_map['entry_time'].format(i=i) if i == 1 else header_map_optional[
-                            'entry_time'].format(i=i)
-                        entry_contracts_hdr = header_map['entry_contracts'].format(i=i) if i == 1 else \
-                        header_map_optional['entry_contracts'].format(i=i)
-                        entry_price_hdr = header_map['entry_price'].format(i=i) if i == 1 else header_map_optional[
-                            'entry_price'].format(i=i)
-
-                        entry_time_str = row.get(entry_time_hdr) or row.get(
-                            header_map_optional['entry_time'].format(i=i))
-                        entry_contracts_str = row.get(entry_contracts_hdr) or row.get(
-                            header_map_optional['entry_contracts'].format(i=i))
-                        entry_price_str = row.get(entry_price_hdr) or row.get(
-                            header_map_optional['entry_price'].format(i=i))
-
-                        if entry_time_str and entry_contracts_str and entry_price_str:
-                            new_trade.entries.append(EntryPoint(
-                                entry_time=py_datetime.strptime(entry_time_str, '%H:%M').time(),
-                                contracts=_parse_form_int(entry_contracts_str),
-                                entry_price=_parse_form_float(entry_price_str)
-                            ))
-                            entries_found += 1
-
-                    if entries_found == 0:
-                        error_details.append(
-                            f"Row {row_num + 1}: At least one full entry (Time, Contracts, Price) is required.");
-                        error_count += 1;
-                        continue
-
-                    # Process Exit 1 (Required)
-                    exit_time_1_str = row.get(header_map['exit_time'].format(i=1))
-                    exit_contracts_1_str = row.get(header_map['exit_contracts'].format(i=1))
-                    exit_price_1_str = row.get(header_map['exit_price'].format(i=1))
-
-                    if not all([exit_time_1_str, exit_contracts_1_str, exit_price_1_str]):
-                        error_details.append(f"Row {row_num + 1}: Missing required fields for first exit.");
-                        error_count += 1;
-                        continue
-
-                    new_trade.exits.append(ExitPoint(
-                        exit_time=py_datetime.strptime(exit_time_1_str, '%H:%M').time(),
-                        contracts=_parse_form_int(exit_contracts_1_str),
-                        exit_price=_parse_form_float(exit_price_1_str)
-                    ))
-
-                    # Look for optional additional exits
-                    for i in range(2, 6):
-                        exit_time_hdr = header_map_optional['exit_time'].format(i=i)
-                        exit_contracts_hdr = header_map_optional['exit_contracts'].format(i=i)
-                        exit_price_hdr = header_map_optional['exit_price'].format(i=i)
-
-                        exit_time_str = row.get(exit_time_hdr)
-                        exit_contracts_str = row.get(exit_contracts_hdr)
-                        exit_price_str = row.get(exit_price_hdr)
-
-                        if exit_time_str and exit_contracts_str and exit_price_str:
-                            new_trade.exits.append(ExitPoint(
-                                exit_time=py_datetime.strptime(exit_time_str, '%H:%M').time(),
-                                contracts=_parse_form_int(exit_contracts_str),
-                                exit_price=_parse_form_float(exit_price_str)
-                            ))
-
-                    # --- 4. Populate optional main trade fields ---
-                    model_name = row.get(header_map['model'])
-                    if model_name:
-                        model = TradingModel.query.filter_by(user_id=current_user.id, name=model_name).first()
-                        if model: new_trade.trading_model_id = model.id
-
-                    new_trade.tags = row.get(header_map['tags'])
-                    new_trade.how_closed = row.get(header_map['how_closed'])
-                    new_trade.initial_stop_loss = _parse_form_float(row.get(header_map['sl']))
-                    new_trade.terminus_target = _parse_form_float(row.get(header_map['tp']))
-                    new_trade.mae_price = _parse_form_float(row.get(header_map['mae']))
-                    new_trade.mfe_price = _parse_form_float(row.get(header_map['mfe']))
-                    new_trade.trade_notes = row.get(header_map['notes'])
-
-                    db.session.add(new_trade)
-                    imported_count += 1
-                except (ValueError, TypeError) as ve:
-                    error_details.append(
-                        f"Row {row_num + 1}: Data conversion error - {ve}. Check number/date/time formats.");
-                    error_count += 1
-                except Exception as e_row:
-                    error_details.append(f"Row {row_num + 1}: Unexpected error - {e_row}.");
-                    error_count += 1
-
-            if imported_count > 0:
+            if result.imported_count > 0 or result.updated_count > 0:
                 db.session.commit()
-                flash(f'Successfully imported {imported_count} trades.', 'success')
+                flash(f'Successfully imported {result.imported_count} trades.', 'success')
+                if result.updated_count:
+                    flash(f'Updated {result.updated_count} trades that were already in your journal.', 'info')
             else:
                 db.session.rollback()
+            if result.duplicates:
+                flash(f'Skipped {len(result.duplicates)} trades that were already imported.', 'info')
 
-            if error_count > 0:
-                flash(f'Skipped or had errors with {error_count} rows during import.', 'danger')
-            if error_details:
-                for err_detail in error_details[:5]:
-                    flash(err_detail, 'warning')
-                if len(error_details) > 5:
-                    flash(f"...and {len(error_details) - 5} more errors.", 'warning')
+            if result.error_count > 0:
+                flash(f'Skipped or had errors with {result.error_count} rows during import.', 'danger')
+            if result.errors or result.warnings or result.duplicates:
+                # Stay on the import page so the per-row report can be reviewed
+                return render_template('trades/import_trades.html', title="Import Trades", form=form,
+                                       import_result=result)
 
             return redirect(url_for('trades.view_trades_list'))
+        except ValueError as ve:
+            db.session.rollback()
+            flash(f'Could not read the file: {ve}', 'danger')
         except Exception as e:
             db.session.rollback()
             flash(f'A critical error occurred while processing the file: {str(e)}', 'danger')
@@ -1598,23 +1154,17 @@ def import_trades():
 
 @trades_bp.route('/export_excel', methods=['GET'])
 @login_required
+@background_job('trades_excel')
 def export_trades_excel():
     """Export trades to Excel format with enterprise-level formatting."""
     try:
         # For now, create a CSV that can be opened as Excel
         # In production, you'd use openpyxl for true Excel format
-        filter_form = TradeFilterForm(request.args, meta={'csrf': False})
-        _populate_filter_form_choices(filter_form)
+        filter_spec = TradeFilterSpec.from_request(request.args)
+        query = filter_spec.apply(Trade.query.filter_by(user_id=current_user.id))
 
-        query = Trade.query.filter_by(user_id=current_user.id)
-        if filter_form.start_date.data: query = query.filter(Trade.trade_date >= filter_form.start_date.data)
-        if filter_form.end_date.data: query = query.filter(Trade.trade_date <= filter_form.end_date.data)
-        if filter_form.instrument.data: query = query.filter(Trade.instrument == filter_form.instrument.data)
-        if filter_form.direction.data: query = query.filter(Trade.direction == filter_form.direction.data)
-        if filter_form.trading_model_id.data and filter_form.trading_model_id.data != 0:
-            query = query.filter(Trade.trading_model_id == filter_form.trading_model_id.data)
-
-        trades_to_export = query.order_by(Trade.trade_date.asc()).all()
+        trades_to_export = query.options(joinedload(Trade.trading_model), joinedload(Trade.instrument_obj)) \
+            .order_by(Trade.trade_date.asc()).all()
 
         if not trades_to_export:
             flash('No trades found matching current filters to export.', 'warning')
@@ -1676,113 +1226,178 @@ def export_trades_excel():
         return redirect(url_for('trades.view_trades_list'))
 
 
+def _trade_json_record(trade, trade_metrics):
+    """JSON export representation of one trade (entries/exits from the batch loader)."""
+    return {
+        'id': trade.id,
+        'trade_date': trade.trade_date.isoformat(),
+        'instrument': trade.instrument,
+        'direction': trade.direction,
+        'point_value': float(trade.point_value) if trade.point_value else None,
+        'contracts': {
+            'total_entered': trade.total_contracts_entered,
+            'total_exited': trade.total_contracts_exited
+        },
+        'prices': {
+            'average_entry': float(trade.average_entry_price) if trade.average_entry_price else None,
+            'average_exit': float(trade.average_exit_price) if trade.average_exit_price else None
+        },
+        'performance': {
+            'gross_pnl': float(trade.pnl) if trade.pnl else None,
+            'r_value': float(trade.pnl_in_r) if trade.pnl_in_r else None,
+            'dollar_risk': float(trade.dollar_risk) if trade.dollar_risk else None,
+            'mae_price': float(trade.mae_price) if trade.mae_price else None,
+            'mfe_price': float(trade.mfe_price) if trade.mfe_price else None
+        },
+        'levels': {
+            'initial_stop_loss': float(trade.initial_stop_loss) if trade.initial_stop_loss else None,
+            'terminus_target': float(trade.terminus_target) if trade.terminus_target else None
+        },
+        'metadata': {
+            'how_closed': trade.how_closed,
+            'trading_model': trade.trading_model.name if trade.trading_model else None,
+            'tags': [tag.name for tag in trade.tags] if trade.tags else [],
+            'notes': {
+                'trade_notes': trade.trade_notes,
+                'analysis_notes': trade.overall_analysis_notes,
+                'management_notes': trade.trade_management_notes,
+                'errors_notes': trade.errors_notes,
+                'improvements_notes': trade.improvements_notes
+            },
+            'screenshot_link': trade.screenshot_link
+        },
+        'entries': [
+            {
+                'entry_time': entry.entry_time.isoformat() if entry.entry_time else None,
+                'contracts': entry.contracts,
+                'entry_price': float(entry.entry_price) if entry.entry_price else None
+            } for entry in trade_metrics.entries_for(trade.id)
+        ],
+        'exits': [
+            {
+                'exit_time': exit.exit_time.isoformat() if exit.exit_time else None,
+                'contracts': exit.contracts,
+                'exit_price': float(exit.exit_price) if exit.exit_price else None
+            } for exit in trade_metrics.exits_for(trade.id)
+        ]
+    }
+
+
+def _encode_json(obj):
+    """Serialize to UTF-8 JSON bytes, using msgspec when it is installed."""
+    if MSGSPEC_AVAILABLE:
+        return _msgspec_encoder.encode(obj)
+    return json.dumps(obj, default=str).encode('utf-8')
+
+
 @trades_bp.route('/export_json', methods=['GET'])
 @login_required
 def export_trades_json():
-    """Export trades to JSON format for API integration."""
-    try:
-        filter_form = TradeFilterForm(request.args, meta={'csrf': False})
-        _populate_filter_form_choices(filter_form)
+    """Export trades to JSON format for API integration.
 
-        query = Trade.query.filter_by(user_id=current_user.id)
-        if filter_form.start_date.data: query = query.filter(Trade.trade_date >= filter_form.start_date.data)
-        if filter_form.end_date.data: query = query.filter(Trade.trade_date <= filter_form.end_date.data)
-        if filter_form.instrument.data: query = query.filter(Trade.instrument == filter_form.instrument.data)
-        if filter_form.direction.data: query = query.filter(Trade.direction == filter_form.direction.data)
-        if filter_form.trading_model_id.data and filter_form.trading_model_id.data != 0:
-            query = query.filter(Trade.trading_model_id == filter_form.trading_model_id.data)
+    ?format= selects the output shape; all modes stream trades in keyset batches:
+      document (default) - {"export_metadata": {...}, "trades": [...]}
+      array              - a bare JSON array of trades
+      ndjson             - one trade object per line (application/x-ndjson)
+    """
+    try:
+        export_format = request.args.get('format', 'document')
+        if export_format not in ('document', 'array', 'ndjson'):
+            flash(f'Unknown JSON export format: {export_format}', 'warning')
+            return redirect(url_for('trades.view_trades_list'))
 
-        trades_to_export = query.order_by(Trade.trade_date.asc()).all()
+        filter_spec = TradeFilterSpec.from_request(request.args)
+        query = filter_spec.apply(Trade.query.filter_by(user_id=current_user.id))
 
-        if not trades_to_export:
+        total_trades = query.count()
+        if not total_trades:
             flash('No trades found matching current filters to export.', 'warning')
             return redirect(url_for('trades.view_trades_list', **request.args))
 
-        # Build comprehensive JSON structure
-        export_data = {
-            'export_metadata': {
-                'exported_by': current_user.username,
-                'export_date': datetime.now().isoformat(),
-                'total_trades': len(trades_to_export),
-                'filters_applied': {
-                    'start_date': filter_form.start_date.data.isoformat() if filter_form.start_date.data else None,
-                    'end_date': filter_form.end_date.data.isoformat() if filter_form.end_date.data else None,
-                    'instrument': filter_form.instrument.data,
-                    'direction': filter_form.direction.data
-                }
+        export_metadata = {
+            'exported_by': current_user.username,
+            'export_date': datetime.now().isoformat(),
+            'total_trades': total_trades,
+            'filters_applied': {
+                'start_date': filter_spec.start_date.isoformat() if filter_spec.start_date else None,
+                'end_date': filter_spec.end_date.isoformat() if filter_spec.end_date else None,
+                'instrument': filter_spec.instrument_id or filter_spec.instrument_symbol,
+                'direction': filter_spec.direction
             },
-            'trades': []
+            'filter_hash': filter_spec.spec_hash
         }
 
-        for trade in trades_to_export:
-            trade_data = {
-                'id': trade.id,
-                'trade_date': trade.trade_date.isoformat(),
-                'instrument': trade.instrument,
-                'direction': trade.direction,
-                'point_value': float(trade.point_value) if trade.point_value else None,
-                'contracts': {
-                    'total_entered': trade.total_contracts_entered,
-                    'total_exited': trade.total_contracts_exited
-                },
-                'prices': {
-                    'average_entry': float(trade.average_entry_price) if trade.average_entry_price else None,
-                    'average_exit': float(trade.average_exit_price) if trade.average_exit_price else None
-                },
-                'performance': {
-                    'gross_pnl': float(trade.pnl) if trade.pnl else None,
-                    'r_value': float(trade.pnl_in_r) if trade.pnl_in_r else None,
-                    'dollar_risk': float(trade.dollar_risk) if trade.dollar_risk else None,
-                    'mae_price': float(trade.mae_price) if trade.mae_price else None,
-                    'mfe_price': float(trade.mfe_price) if trade.mfe_price else None
-                },
-                'levels': {
-                    'initial_stop_loss': float(trade.initial_stop_loss) if trade.initial_stop_loss else None,
-                    'terminus_target': float(trade.terminus_target) if trade.terminus_target else None
-                },
-                'metadata': {
-                    'how_closed': trade.how_closed,
-                    'trading_model': trade.trading_model.name if trade.trading_model else None,
-                    'tags': [tag.name for tag in trade.tags] if trade.tags else [],
-                    'notes': {
-                        'trade_notes': trade.trade_notes,
-                        'analysis_notes': trade.overall_analysis_notes,
-                        'management_notes': trade.trade_management_notes,
-                        'errors_notes': trade.errors_notes,
-                        'improvements_notes': trade.improvements_notes
-                    },
-                    'screenshot_link': trade.screenshot_link
-                },
-                'entries': [
-                    {
-                        'entry_time': entry.entry_time.isoformat() if entry.entry_time else None,
-                        'contracts': entry.contracts,
-                        'entry_price': float(entry.entry_price) if entry.entry_price else None
-                    } for entry in trade.entry_points
-                ],
-                'exits': [
-                    {
-                        'exit_time': exit.exit_time.isoformat() if exit.exit_time else None,
-                        'contracts': exit.contracts,
-                        'exit_price': float(exit.exit_price) if exit.exit_price else None
-                    } for exit in trade.exit_points
-                ]
-            }
-            export_data['trades'].append(trade_data)
+        def iter_records():
+            for batch in _iter_export_batches(query):
+                trade_metrics = TradeMetricsBatch.for_trades(batch)
+                yield [_encode_json(_trade_json_record(trade, trade_metrics)) for trade in batch]
+
+        def generate_ndjson():
+            for records in iter_records():
+                yield b''.join(record + b'\n' for record in records)
+
+        def generate_array(prefix=b'[', suffix=b']'):
+            yield prefix
+            first = True
+            for records in iter_records():
+                chunk = b','.join(records)
+                yield chunk if first else b',' + chunk
+                first = False
+            yield suffix
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if export_format == 'ndjson':
+            body, mimetype, filename = generate_ndjson(), "application/x-ndjson", f"trades_export_{timestamp}.ndjson"
+        elif export_format == 'array':
+            body, mimetype, filename = generate_array(), "application/json", f"trades_export_{timestamp}.json"
+        else:
+            prefix = b'{"export_metadata":' + _encode_json(export_metadata) + b',"trades":['
+            body = generate_array(prefix=prefix, suffix=b']}')
+            mimetype, filename = "application/json", f"trades_export_{timestamp}.json"
 
-        json_str = json.dumps(export_data, indent=2, default=str)
-        filename = f"trades_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        
-        return Response(json_str, mimetype="application/json",
-                        headers={"Content-Disposition": f"attachment;filename={filename}"})
+        return Response(stream_with_context(body), mimetype=mimetype,
+                        headers={"Content-Disposition": f"attachment;filename={filename}",
+                                 "X-Filter-Hash": filter_spec.spec_hash})
 
     except Exception as e:
         flash(f'Error exporting to JSON: {str(e)}', 'danger')
         return redirect(url_for('trades.view_trades_list'))
 
 
+@trades_bp.route('/export_parquet', methods=['GET'])
+@login_required
+def export_trades_parquet():
+    """Export trades, entries, exits and tag links as a zip of typed Parquet files."""
+    if not PYARROW_AVAILABLE:
+        flash('Parquet export is not available (pyarrow is not installed).', 'warning')
+        return redirect(url_for('trades.view_trades_list', **request.args))
+
+    try:
+        filter_spec = TradeFilterSpec.from_request(request.args)
+        query = filter_spec.apply(Trade.query.filter_by(user_id=current_user.id))
+        if not db.session.query(query.exists()).scalar():
+            flash('No trades found matching current filters to export.', 'warning')
+            return redirect(url_for('trades.view_trades_list', **request.args))
+
+        # Spill to disk past 16 MB instead of holding large exports in memory
+        archive = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+        write_trades_parquet_zip(archive, current_user.id, filter_spec)
+        archive.seek(0)
+
+        filename = f"trades_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        response = send_file(archive, mimetype='application/zip',
+                             as_attachment=True, download_name=filename)
+        response.headers['X-Filter-Hash'] = filter_spec.spec_hash
+        return response
+
+    except Exception as e:
+        flash(f'Error exporting to Parquet: {str(e)}', 'danger')
+        return redirect(url_for('trades.view_trades_list'))
+
+
 @trades_bp.route('/export_tax_report', methods=['GET'])
 @login_required
+@background_job('tax_report')
 def export_tax_report():
     """Export tax-compliant trading report."""
     try:
@@ -1845,9 +1460,9 @@ def export_tax_report():
 def export_performance_report():
     """Export the most comprehensive trading performance analysis report imaginable."""
     try:
-        trades = Trade.query.filter_by(user_id=current_user.id).order_by(Trade.trade_date.desc()).all()
+        frame = TradeFrame.for_user(current_user.id, descending=True, with_tags=True)
 
-        if not trades:
+        if not len(frame):
             flash('No trades found for performance report.', 'warning')
             return redirect(url_for('trades.view_trades_list'))
 
@@ -1858,27 +1473,33 @@ def export_performance_report():
         writer.writerow(['COMPREHENSIVE TRADING PERFORMANCE ANALYSIS REPORT'])
         writer.writerow([f'Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'])
         writer.writerow([f'Account: {current_user.username}'])
-        writer.writerow([f'Analysis Period: {trades[0].trade_date} to {trades[-1].trade_date}'])
+        writer.writerow([f'Analysis Period: {frame["trade_date"][0]} to {frame["trade_date"][-1]}'])
         writer.writerow([])
         
-        # Calculate all base statistics
-        total_trades = len(trades)
-        trades_with_pnl = [t for t in trades if t.pnl is not None]
-        profitable_trades = len([t for t in trades if t.pnl and t.pnl > 0])
-        losing_trades = len([t for t in trades if t.pnl and t.pnl < 0])
-        breakeven_trades = len([t for t in trades if t.pnl and t.pnl == 0])
-        strike_rate = (profitable_trades / len(trades_with_pnl) * 100) if trades_with_pnl else 0
-        total_pnl = sum(trade.pnl for trade in trades if trade.pnl)
-        avg_pnl_per_trade = total_pnl / total_trades if total_trades > 0 else 0
+        # Calculate all base statistics (shared metrics engine, trades with a P&L, oldest first)
+        scored = frame.with_pnl().chronological()
+        metrics = compute_performance_metrics(scored['pnl'], scored['trade_date'])
+
+        total_trades = len(frame)
+        profitable_trades = metrics['winning_trades']
+        losing_trades = metrics['losing_trades']
+        breakeven_trades = metrics['breakeven_trades']
+        strike_rate = metrics['win_rate']
+        total_pnl = metrics['net_pnl']
+        avg_pnl_per_trade = metrics['average_trade']
+
+        # Group keys shared by the breakdowns below
+        model_names = frame.labels('model_name', 'No Model')
+        instruments = frame.labels('instrument', 'Unknown')
+        weekdays = frame.weekday()
+        hours = frame.entry_hour()
         
         # Winner/Loser analysis
-        winning_pnls = [t.pnl for t in trades if t.pnl and t.pnl > 0]
-        losing_pnls = [t.pnl for t in trades if t.pnl and t.pnl < 0]
-        avg_winner = sum(winning_pnls) / len(winning_pnls) if winning_pnls else 0
-        avg_loser = sum(losing_pnls) / len(losing_pnls) if losing_pnls else 0
-        largest_winner = max(winning_pnls) if winning_pnls else 0
-        largest_loser = min(losing_pnls) if losing_pnls else 0
-        profit_factor = abs(sum(winning_pnls) / sum(losing_pnls)) if losing_pnls and sum(losing_pnls) != 0 else float('inf')
+        avg_winner = metrics['avg_win']
+        avg_loser = -metrics['avg_loss']
+        largest_winner = metrics['largest_win']
+        largest_loser = -metrics['largest_loss']
+        profit_factor = metrics['profit_factor']
         
         # EXECUTIVE SUMMARY STATISTICS
         writer.writerow(['EXECUTIVE SUMMARY STATISTICS'])
@@ -1899,38 +1520,17 @@ def export_performance_report():
         
         # COMPREHENSIVE MODEL PERFORMANCE ANALYSIS
         writer.writerow(['COMPREHENSIVE MODEL PERFORMANCE ANALYSIS'])
-        model_stats = {}
-        for trade in trades:
-            model_name = trade.trading_model.name if trade.trading_model else 'No Model'
-            if model_name not in model_stats:
-                model_stats[model_name] = {
-                    'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0, 'breakevens': 0,
-                    'winning_pnls': [], 'losing_pnls': [], 'all_pnls': []
-                }
-            
-            stats = model_stats[model_name]
-            stats['trades'] += 1
-            if trade.pnl is not None:
-                stats['all_pnls'].append(trade.pnl)
-                stats['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    stats['wins'] += 1
-                    stats['winning_pnls'].append(trade.pnl)
-                elif trade.pnl < 0:
-                    stats['losses'] += 1
-                    stats['losing_pnls'].append(trade.pnl)
-                else:
-                    stats['breakevens'] += 1
+        model_stats = frame.group_stats(model_names)
         
         writer.writerow(['Model', 'Trades', 'Total P&L', 'Win Rate', 'Avg P&L', 'Avg Winner', 'Avg Loser', 'Profit Factor', 'Best Trade', 'Worst Trade'])
         for model, stats in model_stats.items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
-            avg_winner = sum(stats['winning_pnls']) / len(stats['winning_pnls']) if stats['winning_pnls'] else 0
-            avg_loser = sum(stats['losing_pnls']) / len(stats['losing_pnls']) if stats['losing_pnls'] else 0
-            profit_factor = abs(sum(stats['winning_pnls']) / sum(stats['losing_pnls'])) if stats['losing_pnls'] and sum(stats['losing_pnls']) != 0 else float('inf')
-            best_trade = max(stats['all_pnls']) if stats['all_pnls'] else 0
-            worst_trade = min(stats['all_pnls']) if stats['all_pnls'] else 0
+            avg_winner = stats['gross_profit'] / stats['wins'] if stats['wins'] else 0
+            avg_loser = -stats['gross_loss'] / stats['losses'] if stats['losses'] else 0
+            profit_factor = stats['gross_profit'] / stats['gross_loss'] if stats['gross_loss'] else float('inf')
+            best_trade = stats['best'] if stats['best'] is not None else 0
+            worst_trade = stats['worst'] if stats['worst'] is not None else 0
             
             writer.writerow([
                 model, stats['trades'], f"${stats['pnl']:,.2f}", f"{win_rate:.1f}%", f"${avg_pnl:,.2f}",
@@ -1941,156 +1541,71 @@ def export_performance_report():
         
         # DAY OF WEEK ANALYSIS
         writer.writerow(['DAY OF WEEK ANALYSIS'])
-        dow_stats = {}
         dow_names = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         
-        for trade in trades:
-            dow = trade.trade_date.strftime('%A')
-            if dow not in dow_stats:
-                dow_stats[dow] = {'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0}
-            dow_stats[dow]['trades'] += 1
-            if trade.pnl is not None:
-                dow_stats[dow]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    dow_stats[dow]['wins'] += 1
-                elif trade.pnl < 0:
-                    dow_stats[dow]['losses'] += 1
-        
         writer.writerow(['Day', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate', 'Wins', 'Losses'])
-        for dow_name in dow_names:
-            if dow_name in dow_stats:
-                stats = dow_stats[dow_name]
-                win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
-                avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
-                writer.writerow([
-                    dow_name, stats['trades'], f"${stats['pnl']:,.2f}", f"${avg_pnl:,.2f}",
-                    f"{win_rate:.1f}%", stats['wins'], stats['losses']
-                ])
+        for dow, stats in frame.group_stats(weekdays).items():
+            win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
+            avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
+            writer.writerow([
+                dow_names[dow], stats['trades'], f"${stats['pnl']:,.2f}", f"${avg_pnl:,.2f}",
+                f"{win_rate:.1f}%", stats['wins'], stats['losses']
+            ])
         writer.writerow([])
         
         # MODEL BREAKDOWN BY DAY OF WEEK
         writer.writerow(['MODEL PERFORMANCE BY DAY OF WEEK'])
-        model_dow_stats = {}
-        for trade in trades:
-            model_name = trade.trading_model.name if trade.trading_model else 'No Model'
-            dow = trade.trade_date.strftime('%A')
-            key = f"{model_name}_{dow}"
-            
-            if key not in model_dow_stats:
-                model_dow_stats[key] = {'model': model_name, 'dow': dow, 'trades': 0, 'pnl': 0, 'wins': 0}
-            
-            model_dow_stats[key]['trades'] += 1
-            if trade.pnl is not None:
-                model_dow_stats[key]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    model_dow_stats[key]['wins'] += 1
-        
         writer.writerow(['Model', 'Day', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate'])
-        for key in sorted(model_dow_stats.keys()):
-            stats = model_dow_stats[key]
+        for (model_name, dow), stats in frame.group_stats(model_names, weekdays).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             writer.writerow([
-                stats['model'], stats['dow'], stats['trades'], f"${stats['pnl']:,.2f}",
+                model_name, dow_names[dow], stats['trades'], f"${stats['pnl']:,.2f}",
                 f"${avg_pnl:,.2f}", f"{win_rate:.1f}%"
             ])
         writer.writerow([])
         
         # TIME OF DAY ANALYSIS
         writer.writerow(['TIME OF DAY ANALYSIS'])
-        time_stats = {}
-        
-        for trade in trades:
-            if trade.entries.first() and trade.entries.first().entry_time:
-                hour = trade.entries.first().entry_time.hour
-                time_bucket = f"{hour:02d}:00-{hour:02d}:59"
-                
-                if time_bucket not in time_stats:
-                    time_stats[time_bucket] = {'trades': 0, 'pnl': 0, 'wins': 0}
-                
-                time_stats[time_bucket]['trades'] += 1
-                if trade.pnl is not None:
-                    time_stats[time_bucket]['pnl'] += trade.pnl
-                    if trade.pnl > 0:
-                        time_stats[time_bucket]['wins'] += 1
+        entered = hours >= 0
+        by_hour = frame.take(entered)
         
         writer.writerow(['Time Bucket', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate'])
-        for time_bucket in sorted(time_stats.keys()):
-            stats = time_stats[time_bucket]
+        for hour, stats in by_hour.group_stats(hours[entered]).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             writer.writerow([
-                time_bucket, stats['trades'], f"${stats['pnl']:,.2f}",
+                f"{hour:02d}:00-{hour:02d}:59", stats['trades'], f"${stats['pnl']:,.2f}",
                 f"${avg_pnl:,.2f}", f"{win_rate:.1f}%"
             ])
         writer.writerow([])
         
         # MODEL PERFORMANCE BY TIME OF DAY
         writer.writerow(['MODEL PERFORMANCE BY TIME OF DAY'])
-        model_time_stats = {}
-        
-        for trade in trades:
-            if trade.entries.first() and trade.entries.first().entry_time and trade.trading_model:
-                model_name = trade.trading_model.name
-                hour = trade.entries.first().entry_time.hour
-                time_bucket = f"{hour:02d}:00-{hour:02d}:59"
-                key = f"{model_name}_{time_bucket}"
-                
-                if key not in model_time_stats:
-                    model_time_stats[key] = {'model': model_name, 'time': time_bucket, 'trades': 0, 'pnl': 0, 'wins': 0}
-                
-                model_time_stats[key]['trades'] += 1
-                if trade.pnl is not None:
-                    model_time_stats[key]['pnl'] += trade.pnl
-                    if trade.pnl > 0:
-                        model_time_stats[key]['wins'] += 1
+        modelled = entered & np.not_equal(frame['model_name'], None)
         
         writer.writerow(['Model', 'Time Bucket', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate'])
-        for key in sorted(model_time_stats.keys()):
-            stats = model_time_stats[key]
+        for (model_name, hour), stats in frame.take(modelled).group_stats(model_names[modelled], hours[modelled]).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             writer.writerow([
-                stats['model'], stats['time'], stats['trades'], f"${stats['pnl']:,.2f}",
+                model_name, f"{hour:02d}:00-{hour:02d}:59", stats['trades'], f"${stats['pnl']:,.2f}",
                 f"${avg_pnl:,.2f}", f"{win_rate:.1f}%"
             ])
         writer.writerow([])
         
         # INSTRUMENT BREAKDOWN
         writer.writerow(['INSTRUMENT PERFORMANCE BREAKDOWN'])
-        instrument_stats = {}
-        
-        for trade in trades:
-            instrument = trade.instrument or trade.instrument_legacy or 'Unknown'
-            if instrument not in instrument_stats:
-                instrument_stats[instrument] = {
-                    'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0,
-                    'total_contracts': 0, 'winning_pnls': [], 'losing_pnls': []
-                }
-            
-            stats = instrument_stats[instrument]
-            stats['trades'] += 1
-            stats['total_contracts'] += trade.total_contracts_entered or 0
-            
-            if trade.pnl is not None:
-                stats['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    stats['wins'] += 1
-                    stats['winning_pnls'].append(trade.pnl)
-                elif trade.pnl < 0:
-                    stats['losses'] += 1
-                    stats['losing_pnls'].append(trade.pnl)
-        
         writer.writerow(['Instrument', 'Trades', 'Contracts', 'Total P&L', 'Avg P&L', 'Win Rate', 'Avg Winner', 'Avg Loser', 'Profit Factor'])
-        for instrument, stats in instrument_stats.items():
+        for instrument, stats in frame.group_stats(instruments).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
-            avg_winner = sum(stats['winning_pnls']) / len(stats['winning_pnls']) if stats['winning_pnls'] else 0
-            avg_loser = sum(stats['losing_pnls']) / len(stats['losing_pnls']) if stats['losing_pnls'] else 0
-            profit_factor = abs(sum(stats['winning_pnls']) / sum(stats['losing_pnls'])) if stats['losing_pnls'] and sum(stats['losing_pnls']) != 0 else float('inf')
+            avg_winner = stats['gross_profit'] / stats['wins'] if stats['wins'] else 0
+            avg_loser = -stats['gross_loss'] / stats['losses'] if stats['losses'] else 0
+            profit_factor = stats['gross_profit'] / stats['gross_loss'] if stats['gross_loss'] else float('inf')
             
             writer.writerow([
-                instrument, stats['trades'], stats['total_contracts'], f"${stats['pnl']:,.2f}",
+                instrument, stats['trades'], stats['contracts'], f"${stats['pnl']:,.2f}",
                 f"${avg_pnl:,.2f}", f"{win_rate:.1f}%", f"${avg_winner:,.2f}",
                 f"${avg_loser:,.2f}", f"{profit_factor:.2f}"
             ])
@@ -2098,54 +1613,20 @@ def export_performance_report():
         
         # MODEL BY INSTRUMENT MATRIX
         writer.writerow(['MODEL BY INSTRUMENT PERFORMANCE MATRIX'])
-        model_instrument_stats = {}
-        
-        for trade in trades:
-            model_name = trade.trading_model.name if trade.trading_model else 'No Model'
-            instrument = trade.instrument or trade.instrument_legacy or 'Unknown'
-            key = f"{model_name}_{instrument}"
-            
-            if key not in model_instrument_stats:
-                model_instrument_stats[key] = {'model': model_name, 'instrument': instrument, 'trades': 0, 'pnl': 0, 'wins': 0}
-            
-            model_instrument_stats[key]['trades'] += 1
-            if trade.pnl is not None:
-                model_instrument_stats[key]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    model_instrument_stats[key]['wins'] += 1
-        
         writer.writerow(['Model', 'Instrument', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate'])
-        for key in sorted(model_instrument_stats.keys()):
-            stats = model_instrument_stats[key]
+        for (model_name, instrument), stats in frame.group_stats(model_names, instruments).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             writer.writerow([
-                stats['model'], stats['instrument'], stats['trades'], f"${stats['pnl']:,.2f}",
+                model_name, instrument, stats['trades'], f"${stats['pnl']:,.2f}",
                 f"${avg_pnl:,.2f}", f"{win_rate:.1f}%"
             ])
         writer.writerow([])
         
         # DIRECTION BY RESULT ANALYSIS
         writer.writerow(['DIRECTION BY RESULT ANALYSIS'])
-        direction_stats = {}
-        
-        for trade in trades:
-            direction = trade.direction or 'Unknown'
-            if direction not in direction_stats:
-                direction_stats[direction] = {'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0, 'breakevens': 0}
-            
-            direction_stats[direction]['trades'] += 1
-            if trade.pnl is not None:
-                direction_stats[direction]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    direction_stats[direction]['wins'] += 1
-                elif trade.pnl < 0:
-                    direction_stats[direction]['losses'] += 1
-                else:
-                    direction_stats[direction]['breakevens'] += 1
-        
         writer.writerow(['Direction', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate', 'Wins', 'Losses', 'Breakevens'])
-        for direction, stats in direction_stats.items():
+        for direction, stats in frame.group_stats(frame.labels('direction', 'Unknown')).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             writer.writerow([
@@ -2156,34 +1637,11 @@ def export_performance_report():
         
         # TAG UTILIZATION BREAKDOWN
         writer.writerow(['TAG UTILIZATION AND PERFORMANCE ANALYSIS'])
-        tag_stats = {}
-        
-        for trade in trades:
-            if trade.tags:
-                for tag in trade.tags:
-                    tag_name = tag.name
-                    if tag_name not in tag_stats:
-                        tag_stats[tag_name] = {'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0}
-                    
-                    tag_stats[tag_name]['trades'] += 1
-                    if trade.pnl is not None:
-                        tag_stats[tag_name]['pnl'] += trade.pnl
-                        if trade.pnl > 0:
-                            tag_stats[tag_name]['wins'] += 1
-                        elif trade.pnl < 0:
-                            tag_stats[tag_name]['losses'] += 1
-            else:
-                # Track trades with no tags
-                if 'No Tags' not in tag_stats:
-                    tag_stats['No Tags'] = {'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0}
-                
-                tag_stats['No Tags']['trades'] += 1
-                if trade.pnl is not None:
-                    tag_stats['No Tags']['pnl'] += trade.pnl
-                    if trade.pnl > 0:
-                        tag_stats['No Tags']['wins'] += 1
-                    elif trade.pnl < 0:
-                        tag_stats['No Tags']['losses'] += 1
+        # One row per (trade, tag); untagged trades count once under 'No Tags'
+        trade_tags_used = [tags or ('No Tags',) for tags in frame['tags']]
+        tag_rows = np.repeat(np.arange(len(frame)), [len(tags) for tags in trade_tags_used])
+        tag_names = np.array([name for tags in trade_tags_used for name in tags], dtype=object)
+        tag_stats = frame.take(tag_rows).group_stats(tag_names)
         
         writer.writerow(['Tag', 'Usage Count', 'Total P&L', 'Avg P&L', 'Win Rate', 'Usage %'])
         for tag_name, stats in sorted(tag_stats.items(), key=lambda x: x[1]['trades'], reverse=True):
@@ -2198,35 +1656,18 @@ def export_performance_report():
         
         # MONTHLY PERFORMANCE DETAILED
         writer.writerow(['DETAILED MONTHLY PERFORMANCE'])
-        monthly_stats = {}
-        for trade in trades:
-            month_key = trade.trade_date.strftime('%Y-%m')
-            if month_key not in monthly_stats:
-                monthly_stats[month_key] = {'trades': 0, 'pnl': 0, 'wins': 0, 'losses': 0, 'breakevens': 0, 'winning_pnls': [], 'losing_pnls': []}
-            
-            monthly_stats[month_key]['trades'] += 1
-            if trade.pnl is not None:
-                monthly_stats[month_key]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    monthly_stats[month_key]['wins'] += 1
-                    monthly_stats[month_key]['winning_pnls'].append(trade.pnl)
-                elif trade.pnl < 0:
-                    monthly_stats[month_key]['losses'] += 1
-                    monthly_stats[month_key]['losing_pnls'].append(trade.pnl)
-                else:
-                    monthly_stats[month_key]['breakevens'] += 1
-        
         writer.writerow(['Month', 'Trades', 'P&L', 'Avg P&L', 'Win Rate', 'Avg Winner', 'Avg Loser', 'Best Trade', 'Worst Trade'])
-        for month, stats in sorted(monthly_stats.items()):
+        monthly_stats = frame.group_stats(frame.month())
+        for month, stats in monthly_stats.items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
-            avg_winner = sum(stats['winning_pnls']) / len(stats['winning_pnls']) if stats['winning_pnls'] else 0
-            avg_loser = sum(stats['losing_pnls']) / len(stats['losing_pnls']) if stats['losing_pnls'] else 0
-            best_trade = max(stats['winning_pnls'] + stats['losing_pnls']) if (stats['winning_pnls'] + stats['losing_pnls']) else 0
-            worst_trade = min(stats['winning_pnls'] + stats['losing_pnls']) if (stats['winning_pnls'] + stats['losing_pnls']) else 0
+            avg_winner = stats['gross_profit'] / stats['wins'] if stats['wins'] else 0
+            avg_loser = -stats['gross_loss'] / stats['losses'] if stats['losses'] else 0
+            best_trade = stats['best'] if stats['best'] is not None else 0
+            worst_trade = stats['worst'] if stats['worst'] is not None else 0
             
             writer.writerow([
-                month, stats['trades'], f"${stats['pnl']:,.2f}", f"${avg_pnl:,.2f}",
+                month.strftime('%Y-%m'), stats['trades'], f"${stats['pnl']:,.2f}", f"${avg_pnl:,.2f}",
                 f"{win_rate:.1f}%", f"${avg_winner:,.2f}", f"${avg_loser:,.2f}",
                 f"${best_trade:,.2f}", f"${worst_trade:,.2f}"
             ])
@@ -2235,114 +1676,36 @@ def export_performance_report():
         # RISK ANALYSIS
         writer.writerow(['COMPREHENSIVE RISK ANALYSIS'])
         
-        # Calculate risk metrics
-        all_pnls = [t.pnl for t in trades if t.pnl is not None]
-        if all_pnls:
-            import statistics
-            
-            # Standard deviation of returns
-            std_dev = statistics.stdev(all_pnls) if len(all_pnls) > 1 else 0
-            
-            # Max drawdown calculation
-            running_total = 0
-            peak = 0
-            max_drawdown = 0
-            drawdown_periods = []
-            current_drawdown = 0
-            
-            for trade in trades:
-                if trade.pnl is not None:
-                    running_total += trade.pnl
-                    if running_total > peak:
-                        peak = running_total
-                        if current_drawdown != 0:
-                            drawdown_periods.append(current_drawdown)
-                            current_drawdown = 0
-                    else:
-                        current_drawdown = peak - running_total
-                        if current_drawdown > max_drawdown:
-                            max_drawdown = current_drawdown
-            
-            # Sharpe ratio (simplified - assuming risk-free rate of 0)
-            sharpe_ratio = avg_pnl_per_trade / std_dev if std_dev > 0 else 0
-            
-            # Sortino ratio (downside deviation)
-            negative_returns = [p for p in all_pnls if p < 0]
-            downside_deviation = statistics.stdev(negative_returns) if len(negative_returns) > 1 else 0
-            sortino_ratio = avg_pnl_per_trade / downside_deviation if downside_deviation > 0 else 0
-            
+        if metrics['total_trades']:
             writer.writerow(['Risk Metric', 'Value', 'Interpretation'])
-            writer.writerow(['Standard Deviation', f'${std_dev:,.2f}', 'Volatility of returns'])
-            writer.writerow(['Maximum Drawdown', f'${max_drawdown:,.2f}', 'Largest peak-to-trough decline'])
-            writer.writerow(['Sharpe Ratio', f'{sharpe_ratio:.3f}', 'Risk-adjusted return (>1.0 is good)'])
-            writer.writerow(['Sortino Ratio', f'{sortino_ratio:.3f}', 'Downside risk-adjusted return'])
-            writer.writerow(['Value at Risk (1%)', f'${min(all_pnls):,.2f}', 'Worst 1% outcome'])
-            writer.writerow(['Average Drawdown Period', f'{len(drawdown_periods)} periods', 'Number of drawdown cycles'])
+            writer.writerow(['Standard Deviation', f'${metrics["std_dev"]:,.2f}', 'Volatility of returns'])
+            writer.writerow(['Maximum Drawdown', f'${metrics["max_drawdown"]:,.2f}', 'Largest peak-to-trough decline'])
+            writer.writerow(['Sharpe Ratio', f'{metrics["sharpe_ratio"]:.3f}', 'Risk-adjusted return (>1.0 is good)'])
+            writer.writerow(['Sortino Ratio', f'{metrics["sortino_ratio"]:.3f}', 'Downside risk-adjusted return'])
+            writer.writerow(['Value at Risk (1%)', f'${metrics["worst_trade"]:,.2f}', 'Worst 1% outcome'])
+            writer.writerow(['Average Drawdown Period', f'{metrics["drawdown_periods"]} periods', 'Number of drawdown cycles'])
             
         writer.writerow([])
         
         # STREAK ANALYSIS
         writer.writerow(['WINNING & LOSING STREAK ANALYSIS'])
-        
-        current_win_streak = 0
-        current_loss_streak = 0
-        max_win_streak = 0
-        max_loss_streak = 0
-        win_streaks = []
-        loss_streaks = []
-        
-        for trade in trades:
-            if trade.pnl is not None:
-                if trade.pnl > 0:
-                    current_win_streak += 1
-                    if current_loss_streak > 0:
-                        loss_streaks.append(current_loss_streak)
-                        current_loss_streak = 0
-                elif trade.pnl < 0:
-                    current_loss_streak += 1
-                    if current_win_streak > 0:
-                        win_streaks.append(current_win_streak)
-                        current_win_streak = 0
-                
-                max_win_streak = max(max_win_streak, current_win_streak)
-                max_loss_streak = max(max_loss_streak, current_loss_streak)
-        
-        # Add final streak
-        if current_win_streak > 0:
-            win_streaks.append(current_win_streak)
-        if current_loss_streak > 0:
-            loss_streaks.append(current_loss_streak)
-        
-        avg_win_streak = sum(win_streaks) / len(win_streaks) if win_streaks else 0
-        avg_loss_streak = sum(loss_streaks) / len(loss_streaks) if loss_streaks else 0
-        
         writer.writerow(['Streak Type', 'Maximum', 'Average', 'Total Streaks'])
-        writer.writerow(['Winning Streaks', max_win_streak, f'{avg_win_streak:.1f}', len(win_streaks)])
-        writer.writerow(['Losing Streaks', max_loss_streak, f'{avg_loss_streak:.1f}', len(loss_streaks)])
+        writer.writerow(['Winning Streaks', metrics['max_consecutive_wins'], f'{metrics["avg_win_streak"]:.1f}',
+                         metrics['win_streak_count']])
+        writer.writerow(['Losing Streaks', metrics['max_consecutive_losses'], f'{metrics["avg_loss_streak"]:.1f}',
+                         metrics['loss_streak_count']])
         writer.writerow([])
         
         # QUARTERLY ANALYSIS
         writer.writerow(['QUARTERLY PERFORMANCE ANALYSIS'])
-        quarterly_stats = {}
-        
-        for trade in trades:
-            quarter = f"{trade.trade_date.year}-Q{(trade.trade_date.month-1)//3 + 1}"
-            if quarter not in quarterly_stats:
-                quarterly_stats[quarter] = {'trades': 0, 'pnl': 0, 'wins': 0}
-            
-            quarterly_stats[quarter]['trades'] += 1
-            if trade.pnl is not None:
-                quarterly_stats[quarter]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    quarterly_stats[quarter]['wins'] += 1
+        months = frame.month().astype(np.int64)  # months since 1970-01
         
         writer.writerow(['Quarter', 'Trades', 'Total P&L', 'Avg P&L', 'Win Rate'])
-        for quarter in sorted(quarterly_stats.keys()):
-            stats = quarterly_stats[quarter]
+        for (year, quarter), stats in frame.group_stats(1970 + months // 12, months % 12 // 3 + 1).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             writer.writerow([
-                quarter, stats['trades'], f"${stats['pnl']:,.2f}",
+                f"{year}-Q{quarter}", stats['trades'], f"${stats['pnl']:,.2f}",
                 f"${avg_pnl:,.2f}", f"{win_rate:.1f}%"
             ])
         writer.writerow([])
@@ -2350,7 +1713,7 @@ def export_performance_report():
         # REPORT FOOTER
         writer.writerow(['END OF PERFORMANCE ANALYSIS REPORT'])
         writer.writerow([f'Report generated on {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'])
-        writer.writerow([f'Total analysis points: {total_trades} trades across {len(set(t.trade_date.strftime("%Y-%m") for t in trades))} months'])
+        writer.writerow([f'Total analysis points: {total_trades} trades across {len(monthly_stats)} months'])
         writer.writerow([])
         
         output.seek(0)
@@ -2363,12 +1726,48 @@ def export_performance_report():
         return redirect(url_for('trades.view_trades_list'))
 
 
+# Report quality -> (image format, DPI). Vector embeds SVG through svglib.
+REPORT_QUALITY_PRESETS = {
+    'draft': ('png', 100),
+    'standard': ('png', 150),
+    'print': ('png', 300),
+    'vector': ('svg', 100),
+}
+
+
 class TradingChartsGenerator:
     """Generate comprehensive charts for trading performance analysis."""
-    
-    def __init__(self, trades, temp_dir=None):
-        self.trades = trades
-        self.temp_dir = temp_dir or tempfile.gettempdir()
+
+    # (chart key, builder method) in report order
+    CHART_BUILDERS = (
+        ('equity_curve', 'create_equity_curve_chart'),
+        ('monthly_pnl', 'create_monthly_pnl_chart'),
+        ('model_performance', 'create_model_performance_chart'),
+        ('pnl_distribution', 'create_pnl_distribution_chart'),
+        ('direction_performance', 'create_direction_performance_chart'),
+        ('win_loss_comparison', 'create_win_loss_comparison_chart'),
+        ('r_multiple_distribution', 'create_r_multiple_distribution_chart'),
+        ('behavioral_tags', 'create_behavioral_tags_chart'),
+        ('hourly_heatmap', 'create_hourly_heatmap_chart'),
+        ('trade_duration', 'create_trade_duration_chart'),
+        ('position_size', 'create_position_size_chart'),
+        ('rolling_metrics', 'create_rolling_metrics_chart'),
+        ('mfe_mae_scatter', 'create_mfe_mae_scatter_chart'),
+        ('sequential_performance', 'create_sequential_performance_chart'),
+    )
+
+    # Bump whenever chart drawing code or styling changes (invalidates the chart cache)
+    CHART_STYLE_VERSION = 1
+
+    def __init__(self, trades, quality='standard', equity=None):
+        # Charts read the frame's column arrays; a list of Trade objects is loaded into one
+        self.frame = TradeFrame.coerce(trades, with_tags=True)
+        self.pnl = self.frame['pnl']
+        self.has_pnl = ~np.isnan(self.pnl)
+        # Persisted equity series (equity_series.load_series) when it covers exactly these trades
+        self.equity = equity
+        self.quality = quality if quality in REPORT_QUALITY_PRESETS else 'standard'
+        self.image_format, self.dpi = REPORT_QUALITY_PRESETS[self.quality]
         
         # Set global styling for professional appearance
         plt.style.use('default')
@@ -2402,34 +1801,21 @@ class TradingChartsGenerator:
         """Create cumulative P&L equity curve with drawdown."""
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10), height_ratios=[3, 1])
         
-        # Sort trades chronologically for equity curve (oldest first)
-        trades_chronological = sorted(self.trades, key=lambda t: t.trade_date)
-        
-        # Prepare data
-        trades_data = []
-        cumulative_pnl = 0
-        peak_equity = 0
-        
-        for i, trade in enumerate(trades_chronological):
-            if trade.pnl is not None:
-                cumulative_pnl += trade.pnl
-                if cumulative_pnl > peak_equity:
-                    peak_equity = cumulative_pnl
-                drawdown = peak_equity - cumulative_pnl
-                
-                trades_data.append({
-                    'trade_num': i + 1,
-                    'date': trade.trade_date,
-                    'cumulative_pnl': cumulative_pnl,
-                    'drawdown': -drawdown  # Negative for visualization
-                })
-        
-        df = pd.DataFrame(trades_data)
+        # Persisted series when it covers these trades, else accumulate (oldest first)
+        if self.equity is not None:
+            trade_num = self.equity['sequence']
+            cumulative = self.equity['cumulative_pnl']
+            drawdown = -self.equity['drawdown']  # Negative for visualization
+        else:
+            pnl = self.frame.with_pnl().chronological()['pnl']
+            trade_num = np.arange(1, len(pnl) + 1)
+            cumulative = equity_curve(pnl)
+            drawdown = -drawdown_series(pnl)
         
         # Equity curve
-        ax1.plot(df['trade_num'], df['cumulative_pnl'], 
+        ax1.plot(trade_num, cumulative, 
                 color=self.colors['primary'], linewidth=2.5, label='Cumulative P&L')
-        ax1.fill_between(df['trade_num'], df['cumulative_pnl'], 0, 
+        ax1.fill_between(trade_num, cumulative, 0, 
                         alpha=0.3, color=self.colors['primary'])
         ax1.axhline(y=0, color='black', linestyle='-', alpha=0.3)
         ax1.set_title('Equity Curve - Cumulative P&L Over Time', fontweight='bold', pad=20)
@@ -2442,7 +1828,7 @@ class TradingChartsGenerator:
         ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
         
         # Drawdown chart
-        ax2.fill_between(df['trade_num'], df['drawdown'], 0, 
+        ax2.fill_between(trade_num, drawdown, 0, 
                         color=self.colors['danger'], alpha=0.7, label='Drawdown from Peak')
         ax2.set_title('Drawdown from Peak Equity', fontweight='bold')
         ax2.set_xlabel('Trade Number')
@@ -2452,29 +1838,16 @@ class TradingChartsGenerator:
         ax2.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${abs(x):,.0f}'))
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'equity_curve.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_monthly_pnl_chart(self):
         """Create monthly P&L bar chart."""
         fig, ax = plt.subplots(figsize=(14, 8))
         
         # Group trades by month
-        monthly_data = {}
-        for trade in self.trades:
-            if trade.pnl is not None:
-                month_key = trade.trade_date.strftime('%Y-%m')
-                month_name = trade.trade_date.strftime('%b %Y')
-                if month_key not in monthly_data:
-                    monthly_data[month_key] = {'name': month_name, 'pnl': 0, 'trades': 0}
-                monthly_data[month_key]['pnl'] += trade.pnl
-                monthly_data[month_key]['trades'] += 1
-        
-        months = list(monthly_data.keys())
-        month_names = [monthly_data[m]['name'] for m in months]
-        pnls = [monthly_data[m]['pnl'] for m in months]
+        months, sums = self.frame.group_sums(self.frame.month())
+        month_names = [month.strftime('%b %Y') for month in months.astype(object)]
+        pnls = sums['pnl'].tolist()
         
         # Color bars based on positive/negative
         colors = [self.colors['success'] if pnl >= 0 else self.colors['danger'] for pnl in pnls]
@@ -2500,27 +1873,14 @@ class TradingChartsGenerator:
                    fontweight='bold', fontsize=9)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'monthly_pnl.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_model_performance_chart(self):
         """Create trading model performance comparison."""
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
         
         # Calculate model statistics
-        model_stats = {}
-        for trade in self.trades:
-            model_name = trade.trading_model.name if trade.trading_model else 'No Model'
-            if model_name not in model_stats:
-                model_stats[model_name] = {'pnl': 0, 'trades': 0, 'wins': 0}
-            
-            model_stats[model_name]['trades'] += 1
-            if trade.pnl is not None:
-                model_stats[model_name]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    model_stats[model_name]['wins'] += 1
+        model_stats = self.frame.group_stats(self.frame.labels('model_name', 'No Model'))
         
         models = list(model_stats.keys())
         pnls = [model_stats[m]['pnl'] for m in models]
@@ -2561,16 +1921,13 @@ class TradingChartsGenerator:
                     fontweight='bold', fontsize=9)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'model_performance.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_pnl_distribution_chart(self):
         """Create P&L distribution histogram."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        pnls = [trade.pnl for trade in self.trades if trade.pnl is not None]
+        pnls = self.pnl[self.has_pnl].tolist()
         
         # Create histogram
         n_bins = min(50, len(pnls) // 10) if pnls else 20
@@ -2603,27 +1960,14 @@ class TradingChartsGenerator:
                    verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'pnl_distribution.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_direction_performance_chart(self):
         """Create long vs short performance comparison."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
         # Calculate direction statistics
-        direction_stats = {}
-        for trade in self.trades:
-            direction = trade.direction or 'Unknown'
-            if direction not in direction_stats:
-                direction_stats[direction] = {'pnl': 0, 'trades': 0, 'wins': 0}
-            
-            direction_stats[direction]['trades'] += 1
-            if trade.pnl is not None:
-                direction_stats[direction]['pnl'] += trade.pnl
-                if trade.pnl > 0:
-                    direction_stats[direction]['wins'] += 1
+        direction_stats = self.frame.group_stats(self.frame.labels('direction', 'Unknown'))
         
         directions = list(direction_stats.keys())
         total_pnls = [direction_stats[d]['pnl'] for d in directions]
@@ -2661,17 +2005,14 @@ class TradingChartsGenerator:
         ax.legend(lines1 + lines2, labels1 + labels2, loc='upper right')
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'direction_performance.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_win_loss_comparison_chart(self):
         """Create average winner vs average loser comparison."""
         fig, ax = plt.subplots(figsize=(10, 6))
         
-        winning_trades = [t.pnl for t in self.trades if t.pnl and t.pnl > 0]
-        losing_trades = [t.pnl for t in self.trades if t.pnl and t.pnl < 0]
+        winning_trades = self.pnl[self.pnl > 0].tolist()
+        losing_trades = self.pnl[self.pnl < 0].tolist()
         
         avg_winner = np.mean(winning_trades) if winning_trades else 0
         avg_loser = abs(np.mean(losing_trades)) if losing_trades else 0  # Make positive for display
@@ -2703,16 +2044,13 @@ class TradingChartsGenerator:
                fontweight='bold', fontsize=12)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'win_loss_comparison.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_r_multiple_distribution_chart(self):
         """Create R-multiple distribution histogram."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        r_multiples = [trade.pnl_in_r for trade in self.trades if trade.pnl_in_r is not None]
+        r_multiples = self.frame['pnl_in_r'][~np.isnan(self.frame['pnl_in_r'])].tolist()
         
         if not r_multiples:
             # Create placeholder chart
@@ -2747,27 +2085,19 @@ class TradingChartsGenerator:
                    verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'r_multiple_distribution.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_behavioral_tags_chart(self):
         """Create performance by behavioral tags analysis."""
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 12))
         
-        # Calculate tag performance
+        # Calculate tag performance: one row per (trade with a P&L, tag)
         tag_stats = {}
-        for trade in self.trades:
-            if trade.tags and trade.pnl is not None:
-                for tag in trade.tags:
-                    tag_name = tag.name
-                    if tag_name not in tag_stats:
-                        tag_stats[tag_name] = {'pnl': 0, 'trades': 0, 'wins': 0}
-                    tag_stats[tag_name]['pnl'] += trade.pnl
-                    tag_stats[tag_name]['trades'] += 1
-                    if trade.pnl > 0:
-                        tag_stats[tag_name]['wins'] += 1
+        if self.frame.has_tags:
+            tags = self.frame['tags'][self.has_pnl]
+            tag_rows = np.repeat(np.flatnonzero(self.has_pnl), [len(names) for names in tags])
+            tag_names = np.array([name for names in tags for name in names], dtype=object)
+            tag_stats = self.frame.take(tag_rows).group_stats(tag_names)
         
         if not tag_stats:
             # Create placeholder chart
@@ -2824,43 +2154,21 @@ class TradingChartsGenerator:
                 ax2.set_title('Negative Behavioral Impact Tags', fontweight='bold', pad=20)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'behavioral_tags.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_hourly_heatmap_chart(self):
         """Create optimized hourly performance heatmap showing only active trading periods."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        # First pass: collect all active days and hours
-        active_days = set()
-        active_hours = set()
-        trading_data = {}  # {(day_idx, hour): pnl}
-        
         all_days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         
-        for trade in self.trades:
-            if trade.pnl is not None and trade.entries.first():
-                entry_point = trade.entries.first()
-                if entry_point.entry_time:
-                    # Handle both datetime and time objects
-                    if hasattr(entry_point.entry_time, 'weekday'):
-                        # It's a datetime object
-                        day_idx = entry_point.entry_time.weekday()  # 0=Monday
-                        hour_idx = entry_point.entry_time.hour
-                    else:
-                        # It's a time object, use trade date for weekday
-                        day_idx = trade.trade_date.weekday()
-                        hour_idx = entry_point.entry_time.hour
-                    
-                    active_days.add(day_idx)
-                    active_hours.add(hour_idx)
-                    
-                    key = (day_idx, hour_idx)
-                    if key not in trading_data:
-                        trading_data[key] = 0
-                    trading_data[key] += trade.pnl
+        # P&L by (weekday, entry hour) over trades with a P&L and an entry
+        hours = self.frame.entry_hour()
+        active = self.has_pnl & (hours >= 0)
+        trading_data = self.frame.take(active).group_stats(self.frame.weekday()[active], hours[active])
+        trading_data = {key: stats['pnl'] for key, stats in trading_data.items()}  # {(day_idx, hour): pnl}
+        active_days = {day_idx for day_idx, _ in trading_data}
+        active_hours = {hour_idx for _, hour_idx in trading_data}
         
         if not active_days or not active_hours:
             # No trading data available
@@ -2925,54 +2233,22 @@ class TradingChartsGenerator:
                    fontsize=10)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'hourly_heatmap.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_trade_duration_chart(self):
         """Create trade duration analysis for winners vs losers."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        # Calculate trade durations
-        winner_durations = []
-        loser_durations = []
-        
-        for trade in self.trades:
-            if trade.pnl is not None and trade.entries.first() and trade.exits.first():
-                entry_time = trade.entries.first().entry_time
-                exit_time = trade.exits.first().exit_time
-                
-                if entry_time and exit_time:
-                    # Handle both datetime and time objects
-                    try:
-                        if hasattr(entry_time, 'date') and hasattr(exit_time, 'date'):
-                            # Both are datetime objects
-                            duration_hours = (exit_time - entry_time).total_seconds() / 3600
-                        else:
-                            # They are time objects, combine with trade date
-                            from datetime import datetime, time, timedelta
-                            
-                            if isinstance(entry_time, time) and isinstance(exit_time, time):
-                                entry_dt = datetime.combine(trade.trade_date, entry_time)
-                                exit_dt = datetime.combine(trade.trade_date, exit_time)
-                                
-                                # Handle overnight trades (exit next day)
-                                if exit_time < entry_time:
-                                    exit_dt += timedelta(days=1)
-                                
-                                duration_hours = (exit_dt - entry_dt).total_seconds() / 3600
-                            else:
-                                # Skip if we can't calculate duration
-                                continue
-                        
-                        if trade.pnl > 0:
-                            winner_durations.append(duration_hours)
-                        elif trade.pnl < 0:
-                            loser_durations.append(duration_hours)
-                    except Exception:
-                        # Skip trades with calculation issues
-                        continue
+        # First entry to first exit, in hours (an exit before the entry time is the next day)
+        entries = self.frame['entry_timestamp']
+        entry_seconds = (entries - entries.astype('datetime64[D]')).astype(np.float64)
+        entry_seconds[np.isnat(entries)] = np.nan
+        exit_seconds = np.array([np.nan if t is None else t.hour * 3600 + t.minute * 60 + t.second
+                                 for t in self.frame['first_exit_time']], dtype=np.float64)
+        durations = (exit_seconds - entry_seconds) % 86400 / 3600
+        timed = self.has_pnl & ~np.isnan(durations)
+        winner_durations = durations[timed & (self.pnl > 0)].tolist()
+        loser_durations = durations[timed & (self.pnl < 0)].tolist()
         
         if not winner_durations and not loser_durations:
             ax.text(0.5, 0.5, 'No Trade Duration Data Available', 
@@ -3016,24 +2292,16 @@ class TradingChartsGenerator:
                        verticalalignment='top', bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'trade_duration.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_position_size_chart(self):
         """Create performance by position size analysis."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
         # Calculate position size performance
-        size_stats = {}
-        for trade in self.trades:
-            if trade.pnl is not None:
-                size = trade.total_contracts_entered or 0
-                if size not in size_stats:
-                    size_stats[size] = {'pnl': 0, 'trades': 0}
-                size_stats[size]['pnl'] += trade.pnl
-                size_stats[size]['trades'] += 1
+        sizes, size_sums = self.frame.group_sums('total_contracts_entered')
+        size_stats = {int(size): {'pnl': pnl, 'trades': int(count)}
+                      for size, pnl, count in zip(sizes, size_sums['pnl'], size_sums['trades'])}
         
         if not size_stats:
             ax.text(0.5, 0.5, 'No Position Size Data Available', 
@@ -3064,49 +2332,39 @@ class TradingChartsGenerator:
                        fontweight='bold', fontsize=9)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'position_size.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_rolling_metrics_chart(self):
         """Create rolling performance metrics over time."""
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(14, 12))
         
-        window_size = min(50, len(self.trades) // 4) if self.trades else 20
+        trade_count = len(self.frame)
+        window_size = min(50, trade_count // 4) if trade_count else 20
         
-        if len(self.trades) < window_size:
+        if trade_count < window_size or window_size < 1:
             for ax in [ax1, ax2, ax3]:
-                ax.text(0.5, 0.5, f'Need at least {window_size} trades for rolling analysis', 
+                ax.text(0.5, 0.5, f'Need at least {max(window_size, 4)} trades for rolling analysis', 
                        ha='center', va='center', transform=ax.transAxes, fontsize=14)
             ax1.set_title('Rolling Performance Metrics', fontweight='bold', pad=20)
         else:
-            trade_numbers = []
-            rolling_win_rates = []
-            rolling_profit_factors = []
-            rolling_avg_pnls = []
-            
-            for i in range(window_size - 1, len(self.trades)):
-                window_trades = self.trades[i - window_size + 1:i + 1]
-                valid_trades = [t for t in window_trades if t.pnl is not None]
-                
-                if valid_trades:
-                    # Win rate
-                    wins = sum(1 for t in valid_trades if t.pnl > 0)
-                    win_rate = (wins / len(valid_trades)) * 100
-                    
-                    # Profit factor
-                    gross_profit = sum(t.pnl for t in valid_trades if t.pnl > 0)
-                    gross_loss = abs(sum(t.pnl for t in valid_trades if t.pnl < 0))
-                    profit_factor = gross_profit / gross_loss if gross_loss > 0 else 0
-                    
-                    # Average P&L
-                    avg_pnl = sum(t.pnl for t in valid_trades) / len(valid_trades)
-                    
-                    trade_numbers.append(i + 1)
-                    rolling_win_rates.append(win_rate)
-                    rolling_profit_factors.append(profit_factor)
-                    rolling_avg_pnls.append(avg_pnl)
+            def rolling_sum(values):
+                # Sum over each window of window_size consecutive trades, ending at trade i
+                totals = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+                return totals[window_size:] - totals[:-window_size]
+            
+            scored = np.where(self.has_pnl, self.pnl, 0.0)
+            valid = rolling_sum(self.has_pnl)
+            wins = rolling_sum(scored > 0)
+            gross_profit = rolling_sum(np.where(scored > 0, scored, 0.0))
+            gross_loss = rolling_sum(np.where(scored < 0, -scored, 0.0))
+            net = rolling_sum(scored)
+            keep = valid > 0
+            
+            trade_numbers = np.arange(window_size, trade_count + 1)[keep]
+            rolling_win_rates = wins[keep] / valid[keep] * 100
+            rolling_profit_factors = np.divide(gross_profit[keep], gross_loss[keep],
+                                               out=np.zeros(keep.sum()), where=gross_loss[keep] > 0)
+            rolling_avg_pnls = net[keep] / valid[keep]
             
             # Plot rolling win rate
             ax1.plot(trade_numbers, rolling_win_rates, color=self.colors['primary'], linewidth=2)
@@ -3133,33 +2391,21 @@ class TradingChartsGenerator:
             ax3.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'${x:,.0f}'))
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'rolling_metrics.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_mfe_mae_scatter_chart(self):
         """Create MFE vs MAE scatter plot for trade efficiency analysis."""
         fig, ax = plt.subplots(figsize=(12, 10))
         
-        # Collect MFE and MAE data
-        winning_mae = []
-        winning_mfe = []
-        losing_mae = []
-        losing_mfe = []
-        
-        for trade in self.trades:
-            if trade.pnl is not None and trade.mae_price is not None and trade.mfe_price is not None and trade.average_entry_price is not None:
-                # Calculate MAE and MFE in points from the price values
-                mae_points = abs(trade.mae_price - trade.average_entry_price)
-                mfe_points = abs(trade.mfe_price - trade.average_entry_price)
-                
-                if trade.pnl > 0:
-                    winning_mae.append(mae_points)
-                    winning_mfe.append(mfe_points)
-                elif trade.pnl < 0:
-                    losing_mae.append(mae_points)
-                    losing_mfe.append(mfe_points)
+        # MAE and MFE in points from the price values
+        average_entry = self.frame['average_entry_price']
+        mae_points = np.abs(self.frame['mae_price'] - average_entry)
+        mfe_points = np.abs(self.frame['mfe_price'] - average_entry)
+        measured = self.has_pnl & ~np.isnan(mae_points) & ~np.isnan(mfe_points)
+        winners = measured & (self.pnl > 0)
+        losers = measured & (self.pnl < 0)
+        winning_mae, winning_mfe = mae_points[winners].tolist(), mfe_points[winners].tolist()
+        losing_mae, losing_mfe = mae_points[losers].tolist(), mfe_points[losers].tolist()
         
         if not winning_mae and not losing_mae:
             ax.text(0.5, 0.5, 'No MFE/MAE Data Available\\nEnsure trades have Maximum Favorable/Adverse Excursion data', 
@@ -3203,37 +2449,21 @@ class TradingChartsGenerator:
                 ax.legend()
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'mfe_mae_scatter.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        return filename
+        return self._save_figure()
     
     def create_sequential_performance_chart(self):
         """Create sequential performance analysis (post-win/post-loss behavior)."""
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        # Analyze sequential performance
-        post_big_win_trades = []
-        post_big_loss_trades = []
-        all_trades_pnl = []
-        
         big_win_threshold = 500  # Define what constitutes a "big" win
         big_loss_threshold = -300  # Define what constitutes a "big" loss
         
-        for i in range(1, len(self.trades)):
-            current_trade = self.trades[i]
-            previous_trade = self.trades[i-1]
-            
-            if current_trade.pnl is not None and previous_trade.pnl is not None:
-                all_trades_pnl.append(current_trade.pnl)
-                
-                # Check if previous trade was a big win
-                if previous_trade.pnl >= big_win_threshold:
-                    post_big_win_trades.append(current_trade.pnl)
-                
-                # Check if previous trade was a big loss
-                if previous_trade.pnl <= big_loss_threshold:
-                    post_big_loss_trades.append(current_trade.pnl)
+        # Each trade paired with the one before it (in frame order), both with a P&L
+        previous, current = self.pnl[:-1], self.pnl[1:]
+        paired = ~np.isnan(previous) & ~np.isnan(current)
+        all_trades_pnl = current[paired].tolist()
+        post_big_win_trades = current[paired & (previous >= big_win_threshold)].tolist()
+        post_big_loss_trades = current[paired & (previous <= big_loss_threshold)].tolist()
         
         if not all_trades_pnl:
             ax.text(0.5, 0.5, 'Insufficient Trade Data for Sequential Analysis', 
@@ -3278,10 +2508,104 @@ class TradingChartsGenerator:
                        fontweight='bold', fontsize=10)
         
         plt.tight_layout()
-        filename = os.path.join(self.temp_dir, 'sequential_performance.png')
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
+        return self._save_figure()
+
+    def _save_figure(self):
+        """Serialize the current figure in the report quality's format and close it."""
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format=self.image_format, dpi=self.dpi, bbox_inches='tight')
         plt.close()
-        return filename
+        return buffer.getvalue()
+
+    def render_all(self, parallel=False, max_workers=None, cache=None, filter_hash=None):
+        """
+        Render every chart in CHART_BUILDERS; returns {chart key: image bytes}.
+
+        parallel=True fans the builders out over a process pool. Workers get the
+        TradeFrame (NumPy columns, no ORM objects) and send back image bytes. With a ChartCache, charts whose (type, filter, data hash, style
+        version, quality) key is cached are reused and only the misses are
+        rendered. A chart that fails is logged and left out rather than
+        aborting the whole report.
+        """
+        charts = {}
+        pending = list(self.CHART_BUILDERS)
+        cache_keys = {}
+
+        if cache is not None:
+            data_hash = self.frame.data_hash()
+            pending = []
+            for key, method in self.CHART_BUILDERS:
+                cache_keys[key] = cache.make_key(key, filter_hash, data_hash, self.CHART_STYLE_VERSION,
+                                                 variant=self.quality)
+                image = cache.get(cache_keys[key])
+                if image is None:
+                    pending.append((key, method))
+                else:
+                    charts[key] = image
+
+        def store(key, image):
+            charts[key] = image
+            if cache is not None:
+                cache.put(cache_keys[key], image)
+
+        if parallel and len(pending) > 1:
+            pool = _get_chart_pool(max_workers)
+            futures = {pool.submit(_render_chart_in_worker, self.frame, method, self.quality, self.equity): key
+                       for key, method in pending}
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    store(key, future.result())
+                except Exception as e:
+                    current_app.logger.warning(f"Chart '{key}' failed in worker: {e}")
+            return charts
+
+        for key, method in pending:
+            try:
+                store(key, getattr(self, method)())
+            except Exception as e:
+                current_app.logger.warning(f"Chart '{key}' failed: {e}")
+                plt.close('all')
+        return charts
+
+
+def _chart_flowable(image, width, height):
+    """ReportLab flowable for chart bytes: SVG as a scaled vector Drawing, else an Image."""
+    if image.lstrip()[:5] in (b'<?xml', b'<svg ') and SVG_AVAILABLE:
+        drawing = svg2rlg(io.BytesIO(image))
+        scale = min(width / drawing.width, height / drawing.height)
+        drawing.scale(scale, scale)
+        drawing.width, drawing.height = drawing.width * scale, drawing.height * scale
+        return drawing
+    return Image(io.BytesIO(image), width=width, height=height)
+
+
+_chart_pool = None
+_chart_pool_lock = threading.Lock()
+
+
+def _get_chart_pool(max_workers=None):
+    """
+    Process pool shared by report renders (spawned once, reused across reports).
+
+    The pool belongs to this web worker process: every gunicorn worker that
+    renders a report starts its own, so keep REPORT_CHART_WORKERS small.
+    """
+    global _chart_pool
+    with _chart_pool_lock:
+        if _chart_pool is None:
+            # spawn, not fork: the web process has DB connections and worker threads
+            _chart_pool = ProcessPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1),
+                                              mp_context=multiprocessing.get_context('spawn'))
+        return _chart_pool
+
+
+def _render_chart_in_worker(frame, method, quality, equity=None):
+    """Process-pool entry point: render one chart from a TradeFrame, return image bytes."""
+    try:
+        return getattr(TradingChartsGenerator(frame, quality, equity), method)()
+    finally:
+        plt.close('all')
 
 
 class HeaderFooterDocTemplate(BaseDocTemplate):
@@ -3372,6 +2696,7 @@ class HeaderFooterDocTemplate(BaseDocTemplate):
 
 @trades_bp.route('/export_performance_report_pdf', methods=['GET'])
 @login_required
+@background_job('performance_report_pdf')
 def export_performance_report_pdf():
     """
     Export a comprehensive, multi-section performance analysis report as a
@@ -3383,91 +2708,43 @@ def export_performance_report_pdf():
         return redirect(url_for('trades.view_trades_list'))
 
     try:
-        # Create and populate filter form properly
-        filter_form = TradeFilterForm(request.args, meta={'csrf': False})
-        filter_form, categorized_tags = _populate_filter_form_choices(filter_form)
-        
-        # Create base query for current user
-        query = Trade.query.filter_by(user_id=current_user.id)
-        
-        # Apply filters directly (same logic as main view)
-        active_filters = {}
-        if filter_form.start_date.data:
-            query = query.filter(Trade.trade_date >= filter_form.start_date.data)
-            active_filters['start_date'] = filter_form.start_date.data
-        if filter_form.end_date.data:
-            query = query.filter(Trade.trade_date <= filter_form.end_date.data)
-            active_filters['end_date'] = filter_form.end_date.data
-        if filter_form.instrument.data:
-            if filter_form.instrument.data.isdigit():
-                instrument_id = int(filter_form.instrument.data)
-                query = query.filter(Trade.instrument_id == instrument_id)
-            else:
-                query = query.filter(Trade.instrument_legacy == filter_form.instrument.data)
-            active_filters['instrument'] = filter_form.instrument.data
-        if filter_form.direction.data:
-            query = query.filter(Trade.direction == filter_form.direction.data)
-            active_filters['direction'] = filter_form.direction.data
-        if filter_form.trading_model_id.data and filter_form.trading_model_id.data != 0:
-            query = query.filter(Trade.trading_model_id == filter_form.trading_model_id.data)
-            active_filters['trading_model_id'] = filter_form.trading_model_id.data
-        
-        # Handle additional filters from request.args
-        how_closed_filter = request.args.get('how_closed')
-        if how_closed_filter:
-            query = query.filter(Trade.how_closed == how_closed_filter)
-            active_filters['how_closed'] = how_closed_filter
-        
-        pnl_filter = request.args.get('pnl_filter')
-        if pnl_filter:
-            if pnl_filter == 'winners':
-                query = query.filter(Trade.pnl > 0)
-            elif pnl_filter == 'losers':
-                query = query.filter(Trade.pnl < 0)
-            elif pnl_filter == 'breakeven':
-                query = query.filter(Trade.pnl == 0)
-            active_filters['pnl_filter'] = pnl_filter
-        
+        # Same filter compiler as the trades list view
+        filter_spec = TradeFilterSpec.from_request(request.args)
+        active_filters = filter_spec.active_filters
+
         # Debug: Log filter status
-        current_app.logger.info(f"PDF Export - Active filters: {active_filters}")
+        current_app.logger.info(f"PDF Export - Active filters: {active_filters} (spec {filter_spec.spec_hash})")
         current_app.logger.info(f"PDF Export - Request args: {dict(request.args)}")
         
-        trades = query.order_by(Trade.trade_date.desc()).all()
-        current_app.logger.info(f"PDF Export - Total trades found: {len(trades)}")
+        # One columnar load for every section
+        frame = TradeFrame.for_user(current_user.id, filter_spec, descending=True, with_tags=True)
+        current_app.logger.info(f"PDF Export - Total trades found: {len(frame)}")
+        report_progress(10, f'Loaded {len(frame):,} trades')
 
-        if not trades:
+        if not len(frame):
             flash('No trades found to generate a performance report.', 'warning')
             return redirect(url_for('trades.view_trades_list'))
 
-        # Generate charts
-        temp_dir = tempfile.mkdtemp()
-        chart_generator = TradingChartsGenerator(trades, temp_dir)
+        # Generate charts (in memory; ?quality=draft|standard|print|vector)
+        report_progress(15, 'Rendering charts...')
+        quality = request.args.get('quality', current_app.config.get('REPORT_DEFAULT_QUALITY', 'standard'))
+        if quality not in REPORT_QUALITY_PRESETS or (quality == 'vector' and not SVG_AVAILABLE):
+            quality = 'standard'
+        # An unfiltered report covers exactly the user's persisted equity series
+        equity = load_series(current_user.id) if filter_spec.is_empty else None
+        chart_generator = TradingChartsGenerator(frame, quality, equity)
         
         try:
-            # Generate all charts
-            chart_files = {}
-            # Core performance charts
-            chart_files['equity_curve'] = chart_generator.create_equity_curve_chart()
-            chart_files['monthly_pnl'] = chart_generator.create_monthly_pnl_chart() 
-            chart_files['model_performance'] = chart_generator.create_model_performance_chart()
-            chart_files['pnl_distribution'] = chart_generator.create_pnl_distribution_chart()
-            chart_files['direction_performance'] = chart_generator.create_direction_performance_chart()
-            chart_files['win_loss_comparison'] = chart_generator.create_win_loss_comparison_chart()
-            chart_files['r_multiple_distribution'] = chart_generator.create_r_multiple_distribution_chart()
-            
-            # Advanced behavioral and timing charts
-            chart_files['behavioral_tags'] = chart_generator.create_behavioral_tags_chart()
-            chart_files['hourly_heatmap'] = chart_generator.create_hourly_heatmap_chart()
-            chart_files['trade_duration'] = chart_generator.create_trade_duration_chart()
-            chart_files['position_size'] = chart_generator.create_position_size_chart()
-            chart_files['rolling_metrics'] = chart_generator.create_rolling_metrics_chart()
-            chart_files['mfe_mae_scatter'] = chart_generator.create_mfe_mae_scatter_chart()
-            chart_files['sequential_performance'] = chart_generator.create_sequential_performance_chart()
-            
+            chart_files = chart_generator.render_all(
+                parallel=current_app.config.get('REPORT_PARALLEL_CHARTS', True),
+                max_workers=current_app.config.get('REPORT_CHART_WORKERS'),
+                cache=chart_cache if current_app.config.get('CHART_CACHE_ENABLED', True) else None,
+                filter_hash=filter_spec.spec_hash)
         except Exception as chart_error:
             current_app.logger.warning(f"Chart generation error: {chart_error}")
             chart_files = {}
 
+        report_progress(60, 'Building report sections...')
         buffer = io.BytesIO()
         doc = HeaderFooterDocTemplate(buffer, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=70, bottomMargin=50)
 
@@ -3532,11 +2809,11 @@ def export_performance_report_pdf():
 
         story.append(Paragraph(f"<b>Account:</b> {current_user.username}", cover_info_style))
         story.append(Paragraph(
-            f"<b>Analysis Period:</b> {trades[0].trade_date.strftime('%B %d, %Y')} to {trades[-1].trade_date.strftime('%B %d, %Y')}",
+            f"<b>Analysis Period:</b> {frame['trade_date'][0].item():%B %d, %Y} to {frame['trade_date'][-1].item():%B %d, %Y}",
             cover_info_style))
         story.append(
             Paragraph(f"<b>Report Generated:</b> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", cover_info_style))
-        story.append(Paragraph(f"<b>Total Trades Analyzed:</b> {len(trades):,}", cover_info_style))
+        story.append(Paragraph(f"<b>Total Trades Analyzed:</b> {len(frame):,}", cover_info_style))
 
         story.append(Spacer(1, 2.5 * inch))
         story.append(Paragraph("This report contains proprietary and confidential trading data.", cover_footer_style))
@@ -3545,20 +2822,20 @@ def export_performance_report_pdf():
         # ======================================================================
         # CALCULATE BASE STATISTICS
         # ======================================================================
-        total_trades = len(trades)
-        trades_with_pnl = [t for t in trades if t.pnl is not None]
-        profitable_trades = len([t for t in trades_with_pnl if t.pnl > 0])
-        losing_trades = len([t for t in trades_with_pnl if t.pnl < 0])
-        breakeven_trades = len([t for t in trades_with_pnl if t.pnl == 0])
-        strike_rate = (profitable_trades / len(trades_with_pnl) * 100) if trades_with_pnl else 0
-        total_pnl = sum(t.pnl for t in trades_with_pnl)
-
-        winning_pnls = [t.pnl for t in trades_with_pnl if t.pnl > 0]
-        losing_pnls = [t.pnl for t in trades_with_pnl if t.pnl < 0]
-        avg_winner = sum(winning_pnls) / len(winning_pnls) if winning_pnls else 0
-        avg_loser = sum(losing_pnls) / len(losing_pnls) if losing_pnls else 0
-        profit_factor = abs(sum(winning_pnls) / sum(losing_pnls)) if losing_pnls and sum(losing_pnls) != 0 else float(
-            'inf')
+        # Shared metrics engine over the trades with a P&L, oldest first
+        scored = frame.with_pnl().chronological()
+        metrics = compute_performance_metrics(scored['pnl'], scored['trade_date'])
+
+        total_trades = len(frame)
+        profitable_trades = metrics['winning_trades']
+        losing_trades = metrics['losing_trades']
+        breakeven_trades = metrics['breakeven_trades']
+        strike_rate = metrics['win_rate']
+        total_pnl = metrics['net_pnl']
+
+        avg_winner = metrics['avg_win']
+        avg_loser = -metrics['avg_loss']
+        profit_factor = metrics['profit_factor']
 
         # ======================================================================
         # EXECUTIVE SUMMARY
@@ -3576,8 +2853,8 @@ def export_performance_report_pdf():
             ['Total Net P&L', f'${total_pnl:,.2f}', 'Cumulative profit and loss over the period.'],
             ['Average Winner', f'${avg_winner:,.2f}', 'The average gain from a winning trade.'],
             ['Average Loser', f'${avg_loser:,.2f}', 'The average loss from a losing trade.'],
-            ['Largest Winner', f'${max(winning_pnls, default=0):,.2f}', 'The best single trade performance.'],
-            ['Largest Loser', f'${min(losing_pnls, default=0):,.2f}', 'The worst single trade performance.'],
+            ['Largest Winner', f'${metrics["largest_win"]:,.2f}', 'The best single trade performance.'],
+            ['Largest Loser', f'${-metrics["largest_loss"]:,.2f}', 'The worst single trade performance.'],
             ['Profit Factor', f'{profit_factor:.2f}', 'Gross profit divided by gross loss.']
         ]
         summary_table = Table(summary_data, colWidths=[2.0 * inch, 1.7 * inch, 3.3 * inch])
@@ -3594,71 +2871,71 @@ def export_performance_report_pdf():
         # Add charts if they were generated successfully
         if chart_files:
             # Equity Curve - Most Important Chart
-            if 'equity_curve' in chart_files and os.path.exists(chart_files['equity_curve']):
+            if 'equity_curve' in chart_files:
                 story.append(Paragraph("Equity Curve Analysis", subheading_style))
                 story.append(Paragraph("The equity curve shows your account's growth trajectory over time, with the drawdown chart below showing risk periods.", 
                                      styles['Normal']))
-                equity_img = Image(chart_files['equity_curve'], width=7*inch, height=5*inch)
+                equity_img = _chart_flowable(chart_files['equity_curve'], 7*inch, 5*inch)
                 story.append(equity_img)
                 story.append(Spacer(1, 12))
             
             # Monthly Performance
-            if 'monthly_pnl' in chart_files and os.path.exists(chart_files['monthly_pnl']):
+            if 'monthly_pnl' in chart_files:
                 story.append(Paragraph("Monthly Performance Breakdown", subheading_style))
                 story.append(Paragraph("Monthly P&L shows consistency and seasonality patterns in your trading performance.", 
                                      styles['Normal']))
-                monthly_img = Image(chart_files['monthly_pnl'], width=7*inch, height=4*inch)
+                monthly_img = _chart_flowable(chart_files['monthly_pnl'], 7*inch, 4*inch)
                 story.append(monthly_img)
                 story.append(Spacer(1, 12))
             
             story.append(PageBreak())
             
             # Model Performance Comparison
-            if 'model_performance' in chart_files and os.path.exists(chart_files['model_performance']):
+            if 'model_performance' in chart_files:
                 story.append(Paragraph("Trading Model Performance Analysis", subheading_style))
                 story.append(Paragraph("This analysis compares the profitability and win rates of your different trading strategies.", 
                                      styles['Normal']))
-                model_img = Image(chart_files['model_performance'], width=7*inch, height=4*inch)
+                model_img = _chart_flowable(chart_files['model_performance'], 7*inch, 4*inch)
                 story.append(model_img)
                 story.append(Spacer(1, 12))
             
             # P&L Distribution
-            if 'pnl_distribution' in chart_files and os.path.exists(chart_files['pnl_distribution']):
+            if 'pnl_distribution' in chart_files:
                 story.append(Paragraph("Trade Outcome Distribution", subheading_style))
                 story.append(Paragraph("The P&L distribution histogram reveals the frequency and size of your winning and losing trades.", 
                                      styles['Normal']))
-                pnl_dist_img = Image(chart_files['pnl_distribution'], width=7*inch, height=4*inch)
+                pnl_dist_img = _chart_flowable(chart_files['pnl_distribution'], 7*inch, 4*inch)
                 story.append(pnl_dist_img)
                 story.append(Spacer(1, 12))
             
             story.append(PageBreak())
             
             # Direction Performance
-            if 'direction_performance' in chart_files and os.path.exists(chart_files['direction_performance']):
+            if 'direction_performance' in chart_files:
                 story.append(Paragraph("Long vs Short Performance Analysis", subheading_style))
                 story.append(Paragraph("This chart compares your performance when trading long versus short positions.", 
                                      styles['Normal']))
-                direction_img = Image(chart_files['direction_performance'], width=7*inch, height=4*inch)
+                direction_img = _chart_flowable(chart_files['direction_performance'], 7*inch, 4*inch)
                 story.append(direction_img)
                 story.append(Spacer(1, 12))
             
             # Win/Loss Comparison
-            if 'win_loss_comparison' in chart_files and os.path.exists(chart_files['win_loss_comparison']):
+            if 'win_loss_comparison' in chart_files:
                 story.append(Paragraph("Average Winner vs Average Loser", subheading_style))
                 story.append(Paragraph("This comparison shows the risk-reward relationship in your trading system.", 
                                      styles['Normal']))
-                winloss_img = Image(chart_files['win_loss_comparison'], width=7*inch, height=4*inch)
+                winloss_img = _chart_flowable(chart_files['win_loss_comparison'], 7*inch, 4*inch)
                 story.append(winloss_img)
                 story.append(Spacer(1, 12))
             
             story.append(PageBreak())
             
             # R-Multiple Distribution
-            if 'r_multiple_distribution' in chart_files and os.path.exists(chart_files['r_multiple_distribution']):
+            if 'r_multiple_distribution' in chart_files:
                 story.append(Paragraph("Risk-Adjusted Returns (R-Multiple) Analysis", subheading_style))
                 story.append(Paragraph("R-multiples normalize trade outcomes by initial risk, showing how many 'R' units of profit or loss each trade generated.", 
                                      styles['Normal']))
-                r_mult_img = Image(chart_files['r_multiple_distribution'], width=7*inch, height=4*inch)
+                r_mult_img = _chart_flowable(chart_files['r_multiple_distribution'], 7*inch, 4*inch)
                 story.append(r_mult_img)
                 story.append(Spacer(1, 12))
             
@@ -3671,20 +2948,20 @@ def export_performance_report_pdf():
             story.append(Spacer(1, 12))
             
             # Behavioral Tags Performance
-            if 'behavioral_tags' in chart_files and os.path.exists(chart_files['behavioral_tags']):
+            if 'behavioral_tags' in chart_files:
                 story.append(Paragraph("Performance by Behavioral Tags", subheading_style))
                 story.append(Paragraph("This analysis reveals the financial impact of different trading behaviors and psychological states.", 
                                      styles['Normal']))
-                tags_img = Image(chart_files['behavioral_tags'], width=7*inch, height=6*inch)
+                tags_img = _chart_flowable(chart_files['behavioral_tags'], 7*inch, 6*inch)
                 story.append(tags_img)
                 story.append(Spacer(1, 12))
             
             # Sequential Performance Analysis
-            if 'sequential_performance' in chart_files and os.path.exists(chart_files['sequential_performance']):
+            if 'sequential_performance' in chart_files:
                 story.append(Paragraph("Sequential Performance: Post-Win/Post-Loss Analysis", subheading_style))
                 story.append(Paragraph("This chart investigates revenge trading and overconfidence by analyzing performance after big wins and losses.", 
                                      styles['Normal']))
-                seq_img = Image(chart_files['sequential_performance'], width=7*inch, height=4*inch)
+                seq_img = _chart_flowable(chart_files['sequential_performance'], 7*inch, 4*inch)
                 story.append(seq_img)
                 story.append(Spacer(1, 12))
             
@@ -3697,20 +2974,20 @@ def export_performance_report_pdf():
             story.append(Spacer(1, 12))
             
             # Hourly Performance Heatmap
-            if 'hourly_heatmap' in chart_files and os.path.exists(chart_files['hourly_heatmap']):
+            if 'hourly_heatmap' in chart_files:
                 story.append(Paragraph("Hourly Performance Heatmap", subheading_style))
                 story.append(Paragraph("This heatmap identifies your most profitable hours and days, revealing optimal trading windows.", 
                                      styles['Normal']))
-                heatmap_img = Image(chart_files['hourly_heatmap'], width=7*inch, height=4*inch)
+                heatmap_img = _chart_flowable(chart_files['hourly_heatmap'], 7*inch, 4*inch)
                 story.append(heatmap_img)
                 story.append(Spacer(1, 12))
             
             # Trade Duration Analysis
-            if 'trade_duration' in chart_files and os.path.exists(chart_files['trade_duration']):
+            if 'trade_duration' in chart_files:
                 story.append(Paragraph("Trade Duration: Winners vs Losers", subheading_style))
                 story.append(Paragraph("This analysis shows whether you're letting winners run and cutting losers quickly.", 
                                      styles['Normal']))
-                duration_img = Image(chart_files['trade_duration'], width=7*inch, height=4*inch)
+                duration_img = _chart_flowable(chart_files['trade_duration'], 7*inch, 4*inch)
                 story.append(duration_img)
                 story.append(Spacer(1, 12))
             
@@ -3723,20 +3000,20 @@ def export_performance_report_pdf():
             story.append(Spacer(1, 12))
             
             # Position Size Performance
-            if 'position_size' in chart_files and os.path.exists(chart_files['position_size']):
+            if 'position_size' in chart_files:
                 story.append(Paragraph("Performance by Position Size", subheading_style))
                 story.append(Paragraph("This chart reveals how your performance changes with different position sizes and whether psychological factors affect larger trades.", 
                                      styles['Normal']))
-                size_img = Image(chart_files['position_size'], width=7*inch, height=4*inch)
+                size_img = _chart_flowable(chart_files['position_size'], 7*inch, 4*inch)
                 story.append(size_img)
                 story.append(Spacer(1, 12))
             
             # MFE vs MAE Scatter Plot
-            if 'mfe_mae_scatter' in chart_files and os.path.exists(chart_files['mfe_mae_scatter']):
+            if 'mfe_mae_scatter' in chart_files:
                 story.append(Paragraph("Trade Efficiency: Maximum Favorable vs Adverse Excursion", subheading_style))
                 story.append(Paragraph("This professional scatter plot shows how much profit you're leaving on the table and optimal stop-loss placement.", 
                                      styles['Normal']))
-                mfe_mae_img = Image(chart_files['mfe_mae_scatter'], width=7*inch, height=5*inch)
+                mfe_mae_img = _chart_flowable(chart_files['mfe_mae_scatter'], 7*inch, 5*inch)
                 story.append(mfe_mae_img)
                 story.append(Spacer(1, 12))
             
@@ -3749,11 +3026,11 @@ def export_performance_report_pdf():
             story.append(Spacer(1, 12))
             
             # Rolling Performance Metrics
-            if 'rolling_metrics' in chart_files and os.path.exists(chart_files['rolling_metrics']):
+            if 'rolling_metrics' in chart_files:
                 story.append(Paragraph("Rolling Performance Metrics Over Time", subheading_style))
                 story.append(Paragraph("These rolling metrics show whether your trading edge is improving, declining, or remaining consistent over time.", 
                                      styles['Normal']))
-                rolling_img = Image(chart_files['rolling_metrics'], width=7*inch, height=6*inch)
+                rolling_img = _chart_flowable(chart_files['rolling_metrics'], 7*inch, 6*inch)
                 story.append(rolling_img)
                 story.append(Spacer(1, 12))
             
@@ -3776,25 +3053,30 @@ def export_performance_report_pdf():
                          'P&L', 'R-Val', 'Risk', 'W/L', 'SL', 'Target', 'Model', 'Tags']
 
         trade_data = [[Paragraph(h, header_cell_style) for h in trade_headers]]
-        for trade in trades:
-            tags_str = ', '.join([tag.name for tag in trade.tags])
-            win_loss = 'W' if (trade.pnl or 0) > 0 else ('L' if (trade.pnl or 0) < 0 else 'B/E')
+        # NULL amounts print as 0
+        amounts = {name: np.nan_to_num(frame[name], nan=0.0) for name in (
+            'pnl', 'pnl_in_r', 'dollar_risk', 'average_entry_price', 'average_exit_price',
+            'initial_stop_loss', 'terminus_target')}
+        trade_dates = frame['trade_date'].astype(object)
+        for i, trade_date in enumerate(trade_dates):
+            pnl = amounts['pnl'][i]
+            win_loss = 'W' if pnl > 0 else ('L' if pnl < 0 else 'B/E')
             row = [
-                Paragraph(trade.trade_date.strftime('%d-%b-%y'), cell_style),
-                Paragraph(trade.trade_date.strftime('%a'), cell_style),
-                Paragraph(str(trade.instrument or trade.instrument_legacy or 'N/A'), cell_style),
-                Paragraph(str(trade.direction)[:4], cell_style),
-                Paragraph(str(trade.total_contracts_entered or 0), cell_style),
-                Paragraph(f"{trade.average_entry_price or 0:.2f}", cell_style),
-                Paragraph(f"{trade.average_exit_price or 0:.2f}", cell_style),
-                Paragraph(f"${trade.pnl or 0:,.2f}", cell_style),
-                Paragraph(f"{trade.pnl_in_r or 0:.2f}", cell_style),
-                Paragraph(f"${trade.dollar_risk or 0:,.0f}", cell_style),
+                Paragraph(trade_date.strftime('%d-%b-%y'), cell_style),
+                Paragraph(trade_date.strftime('%a'), cell_style),
+                Paragraph(str(frame['instrument'][i] or 'N/A'), cell_style),
+                Paragraph(str(frame['direction'][i])[:4], cell_style),
+                Paragraph(str(frame['total_contracts_entered'][i]), cell_style),
+                Paragraph(f"{amounts['average_entry_price'][i]:.2f}", cell_style),
+                Paragraph(f"{amounts['average_exit_price'][i]:.2f}", cell_style),
+                Paragraph(f"${pnl:,.2f}", cell_style),
+                Paragraph(f"{amounts['pnl_in_r'][i]:.2f}", cell_style),
+                Paragraph(f"${amounts['dollar_risk'][i]:,.0f}", cell_style),
                 Paragraph(win_loss, cell_style),
-                Paragraph(f"{trade.initial_stop_loss or 0:.2f}", cell_style),
-                Paragraph(f"{trade.terminus_target or 0:.2f}", cell_style),
-                Paragraph(trade.trading_model.name if trade.trading_model else 'N/A', cell_style),
-                Paragraph(tags_str, cell_style),
+                Paragraph(f"{amounts['initial_stop_loss'][i]:.2f}", cell_style),
+                Paragraph(f"{amounts['terminus_target'][i]:.2f}", cell_style),
+                Paragraph(frame['model_name'][i] or 'N/A', cell_style),
+                Paragraph(', '.join(frame['tags'][i]), cell_style),
             ]
             trade_data.append(row)
 
@@ -3818,25 +3100,12 @@ def export_performance_report_pdf():
         # MODEL PERFORMANCE ANALYSIS
         # ======================================================================
         story.append(Paragraph("Model Performance Analysis", heading_style))
-        model_stats = {}
-        for trade in trades:
-            model_name = trade.trading_model.name if trade.trading_model else 'No Model'
-            if model_name not in model_stats:
-                model_stats[model_name] = {'trades': 0, 'pnl': 0, 'wins': 0, 'all_pnls': []}
-            stats = model_stats[model_name]
-            stats['trades'] += 1
-            if trade.pnl is not None:
-                stats['pnl'] += trade.pnl
-                stats['all_pnls'].append(trade.pnl)
-                if trade.pnl > 0:
-                    stats['wins'] += 1
-
         model_data = [['Model', 'Trades', 'Total P&L', 'Win Rate', 'Avg P&L', 'Best Trade', 'Worst Trade']]
-        for model, stats in sorted(model_stats.items()):
+        for model, stats in frame.group_stats(frame.labels('model_name', 'No Model')).items():
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] else 0
-            best_trade = max(stats['all_pnls']) if stats['all_pnls'] else 0
-            worst_trade = min(stats['all_pnls']) if stats['all_pnls'] else 0
+            best_trade = stats['best'] if stats['best'] is not None else 0
+            worst_trade = stats['worst'] if stats['worst'] is not None else 0
             model_data.append([
                 model, f"{stats['trades']}", f"${stats['pnl']:,.2f}", f"{win_rate:.1f}%",
                 f"${avg_pnl:,.2f}", f"${best_trade:,.2f}", f"${worst_trade:,.2f}"
@@ -3856,18 +3125,12 @@ def export_performance_report_pdf():
             Paragraph("Analysis of performance based on the day of the week and hour of entry.", subheading_style))
 
         # Day of Week
-        dow_stats = {d: {'trades': 0, 'pnl': 0, 'wins': 0} for d in
-                     ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']}
-        for trade in trades:
-            dow = trade.trade_date.strftime('%A')
-            if dow in dow_stats:
-                dow_stats[dow]['trades'] += 1
-                if trade.pnl is not None:
-                    dow_stats[dow]['pnl'] += trade.pnl
-                    if trade.pnl > 0: dow_stats[dow]['wins'] += 1
+        weekday_stats = frame.group_stats(frame.weekday())
+        empty_day = {'trades': 0, 'pnl': 0, 'wins': 0}
 
         dow_data = [['Day', 'Trades', 'Total P&L', 'Win Rate', 'Avg P&L']]
-        for day, stats in dow_stats.items():
+        for dow, day in enumerate(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']):
+            stats = weekday_stats.get(dow, empty_day)
             win_rate = (stats['wins'] / stats['trades'] * 100) if stats['trades'] > 0 else 0
             avg_pnl = stats['pnl'] / stats['trades'] if stats['trades'] > 0 else 0
             dow_data.append(
@@ -3883,18 +3146,10 @@ def export_performance_report_pdf():
         story.append(Paragraph("Risk & Drawdown Analysis", heading_style))
 
         # Max Drawdown & Risk Metrics
-        all_pnls = [t.pnl for t in trades_with_pnl]
-        if all_pnls:
-            std_dev = statistics.stdev(all_pnls) if len(all_pnls) > 1 else 0
-            avg_pnl_per_trade = statistics.mean(all_pnls)
-            sharpe_ratio = avg_pnl_per_trade / std_dev if std_dev > 0 else 0
-
-            running_total, peak, max_drawdown = 0, 0, 0
-            for pnl in all_pnls:
-                running_total += pnl
-                if running_total > peak: peak = running_total
-                drawdown = peak - running_total
-                if drawdown > max_drawdown: max_drawdown = drawdown
+        if metrics['total_trades']:
+            std_dev = metrics['std_dev']
+            sharpe_ratio = metrics['sharpe_ratio']
+            max_drawdown = metrics['max_drawdown']
 
             risk_data = [
                 ['Risk Metric', 'Value', 'Interpretation'],
@@ -3909,16 +3164,8 @@ def export_performance_report_pdf():
 
         # Streak Analysis
         story.append(Paragraph("Winning & Losing Streaks", subheading_style))
-        win_streak, loss_streak, max_win_streak, max_loss_streak = 0, 0, 0, 0
-        for trade in trades_with_pnl:
-            if trade.pnl > 0:
-                win_streak += 1
-                loss_streak = 0
-            elif trade.pnl < 0:
-                loss_streak += 1
-                win_streak = 0
-            max_win_streak = max(max_win_streak, win_streak)
-            max_loss_streak = max(max_loss_streak, loss_streak)
+        max_win_streak = metrics['max_consecutive_wins']
+        max_loss_streak = metrics['max_consecutive_losses']
 
         streak_data = [['Streak Type', 'Maximum Consecutive'], ['Winning Streaks', f'{max_win_streak} Trades'],
                        ['Losing Streaks', f'{max_loss_streak} Trades']]
@@ -3929,18 +3176,11 @@ def export_performance_report_pdf():
         # ======================================================================
         # BUILD THE PDF
         # ======================================================================
+        report_progress(85, 'Rendering PDF pages...')
         doc.build(story)
         pdf_data = buffer.getvalue()
         buffer.close()
         
-        # Clean up temporary chart files
-        try:
-            if 'temp_dir' in locals():
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
-        except Exception as cleanup_error:
-            current_app.logger.warning(f"Failed to clean up temp files: {cleanup_error}")
-
         # Create filename based on filter status
         if active_filters:
             filename = f"professional_performance_analysis_filtered_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
@@ -3950,14 +3190,6 @@ def export_performance_report_pdf():
                         headers={"Content-Disposition": f"attachment;filename={filename}"})
 
     except Exception as e:
-        # Clean up temporary files on error
-        try:
-            if 'temp_dir' in locals():
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
-        except Exception as cleanup_error:
-            current_app.logger.warning(f"Failed to clean up temp files on error: {cleanup_error}")
-            
         current_app.logger.error(f'Error generating comprehensive PDF report: {e}', exc_info=True)
         flash(f'An error occurred while generating the PDF report: {str(e)}', 'danger')
         return redirect(url_for('trades.view_trades_list'))
@@ -1,15 +1,16 @@
 from flask import render_template, request, flash, redirect, url_for, jsonify, abort
 from flask_login import login_required, current_user
 from sqlalchemy import func, desc, asc, and_, or_
-from datetime import datetime, timedelta
+from datetime import timedelta
 import json
 from decimal import Decimal
-import statistics
 import math
-from collections import defaultdict
 from . import bp
 from app.models import TradingModel, Trade, EntryPoint, ExitPoint, db
 from app.utils.calculations import calculate_trade_pnl, calculate_risk_reward_ratio
+from app.utils.trade_frame import TradeFrame
+from app.utils.performance_metrics import compute_performance_metrics
+import numpy as np
 
 # Configuration for analytics calculations
 ANALYTICS_CONFIG = {
@@ -41,15 +42,11 @@ def view_model_detail(model_id):
         )
     ).first_or_404()
 
-    # Get all trades for this model (only user's trades)
-    trades_query = Trade.query.filter_by(
-        trading_model_id=model_id,
-        user_id=current_user.id
-    ).order_by(Trade.trade_date.desc(), Trade.id.desc())
+    # Get all trades for this model (only user's trades), newest first
+    trades = TradeFrame.for_user(current_user.id, trading_model_id=model_id, descending=True)
 
-    trades = trades_query.all()
     # If no trades, show empty state
-    if not trades:
+    if not len(trades):
         return render_template('model_detail.html',
                                model=model,
                                trades=[],
@@ -92,194 +89,95 @@ def calculate_model_analytics(trades, risk_params=None):
     Includes all requested metrics for complete performance analysis.
 
     Args:
-        trades: List of trade objects
+        trades: TradeFrame (or list of trade objects)
         risk_params: Dictionary with 'risk_per_trade' and 'account_size'
 
     Returns:
         Dictionary with all performance, risk, and consistency metrics.
     """
-    if not trades:
+    trades = TradeFrame.coerce(trades)
+    if not len(trades):
         return {}
 
     if risk_params is None:
         risk_params = get_risk_parameters()
 
-    # Extract trade data
-    pnl_values = []
-    r_multiples = []
-    win_amounts = []
-    loss_amounts = []
-    trade_dates = []
-    daily_pnls = defaultdict(float)  # For daily analysis
-
-    for trade in trades:
-        pnl = float(trade.pnl or 0)
-        pnl_values.append(pnl)
-
-        # Track daily P&L
-        if trade.trade_date:
-            daily_pnls[trade.trade_date] += pnl
-
-        # Calculate R-multiple (assuming risk_per_trade as 1R)
-        risk_amount = risk_params['risk_per_trade']
-        r_multiple = pnl / risk_amount if risk_amount > 0 else 0
-        r_multiples.append(r_multiple)
-
-        if pnl > 0:
-            win_amounts.append(pnl)
-        elif pnl < 0:
-            loss_amounts.append(abs(pnl))
-
-        if trade.entry_timestamp:
-            trade_dates.append(trade.entry_timestamp)
-        elif trade.trade_date:
-            trade_dates.append(datetime.combine(trade.trade_date, datetime.min.time()))
+    # Extract trade data in time order (a missing P&L counts as 0)
+    trades = trades.chronological()
+    pnl_array = np.nan_to_num(trades['pnl'])
+    metrics = compute_performance_metrics(pnl_array, trades['trade_date'])
+
+    # R-multiples (assuming risk_per_trade as 1R)
+    risk_amount = risk_params['risk_per_trade']
+    r_array = pnl_array / risk_amount if risk_amount > 0 else np.zeros_like(pnl_array)
+    r_metrics = compute_performance_metrics(r_array)
+
+    # First entry time, else the trade date at midnight
+    trade_dates = np.where(np.isnat(trades['entry_timestamp']),
+                           trades['trade_date'].astype('datetime64[s]'), trades['entry_timestamp'])
 
     # Basic Performance Metrics
-    total_trades = len(trades)
-    winning_trades = len([p for p in pnl_values if p > 0])
-    losing_trades = len([p for p in pnl_values if p < 0])
-    breakeven_trades = len([p for p in pnl_values if p == 0])
+    total_trades = metrics['total_trades']
+    winning_trades = metrics['winning_trades']
+    losing_trades = metrics['losing_trades']
+    breakeven_trades = metrics['breakeven_trades']
 
-    net_pnl = sum(pnl_values)
-    gross_profit = sum(win_amounts)
-    gross_loss = sum(loss_amounts)
+    net_pnl = metrics['net_pnl']
+    gross_profit = metrics['gross_profit']
+    gross_loss = metrics['gross_loss']
 
     # Win/Loss Rates
-    win_rate = (winning_trades / total_trades) if total_trades > 0 else 0
-    loss_rate = (losing_trades / total_trades) if total_trades > 0 else 0
-    strike_rate = win_rate * 100
+    win_rate = metrics['win_rate'] / 100
+    loss_rate = metrics['loss_rate'] / 100
+    strike_rate = metrics['win_rate']
 
     # Profit Factor
-    profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else float('inf') if gross_profit > 0 else 0
+    profit_factor = metrics['profit_factor']
 
     # Expected Value and Averages
-    expected_value = statistics.mean(pnl_values) if pnl_values else 0
-    median_profit = statistics.median(pnl_values) if pnl_values else 0
+    expected_value = metrics['average_trade']
+    median_profit = metrics['median_trade']
     average_profit = expected_value
 
     # Win/Loss Analysis
-    avg_win = statistics.mean(win_amounts) if win_amounts else 0
-    avg_loss = statistics.mean(loss_amounts) if loss_amounts else 0
-    largest_win = max(win_amounts) if win_amounts else 0
-    largest_loss = max(loss_amounts) if loss_amounts else 0
+    avg_win = metrics['avg_win']
+    avg_loss = metrics['avg_loss']
+    largest_win = metrics['largest_win']
+    largest_loss = metrics['largest_loss']
 
     # R-Multiple Analysis
-    total_r = sum(r_multiples)
-    avg_r = statistics.mean(r_multiples) if r_multiples else 0
-    avg_win_r = statistics.mean([r for r in r_multiples if r > 0]) if any(r > 0 for r in r_multiples) else 0
-    avg_loss_r = statistics.mean([r for r in r_multiples if r < 0]) if any(r < 0 for r in r_multiples) else 0
-    largest_win_r = max(r_multiples) if r_multiples else 0
-    largest_loss_r = min(r_multiples) if r_multiples else 0
+    total_r = r_metrics['net_pnl']
+    avg_r = r_metrics['average_trade']
+    avg_win_r = r_metrics['avg_win']
+    avg_loss_r = -r_metrics['avg_loss']
+    largest_win_r = r_metrics['best_trade']
+    largest_loss_r = r_metrics['worst_trade']
 
     # Standard Deviation
-    standard_deviation = statistics.stdev(r_multiples) if len(r_multiples) > 1 else 0
+    standard_deviation = r_metrics['std_dev']
 
     # Kelly Fraction Calculation
-    if gross_loss > 0 and win_rate > 0:
-        if avg_loss > 0:
-            kelly_fraction = (win_rate * avg_win - loss_rate * avg_loss) / avg_win * 100
-        else:
-            kelly_fraction = 0
+    if gross_loss > 0 and win_rate > 0 and avg_loss > 0:
+        kelly_fraction = (win_rate * avg_win - loss_rate * avg_loss) / avg_win * 100
     else:
         kelly_fraction = 0
 
     # SQN (System Quality Number)
-    if len(r_multiples) > 1:
-        r_mean = statistics.mean(r_multiples)
-        r_stdev = statistics.stdev(r_multiples)
-        sqn = (r_mean / r_stdev * math.sqrt(len(r_multiples))) if r_stdev > 0 else 0
-        sqn_100 = sqn * math.sqrt(100 / len(r_multiples)) if len(r_multiples) > 0 else 0
-    else:
-        sqn = 0
-        sqn_100 = 0
+    sqn = r_metrics['sqn']
+    sqn_100 = sqn * math.sqrt(100 / total_trades)
 
     # Drawdown Analysis
-    running_total = 0
-    peak = 0
-    drawdowns = []
-    equity_curve = []
-    drawdown_durations = []
-    current_drawdown_duration = 0
-    in_drawdown = False
-
-    for pnl in pnl_values:
-        running_total += pnl
-        equity_curve.append(running_total)
-
-        if running_total > peak:
-            peak = running_total
-            if in_drawdown:
-                drawdown_durations.append(current_drawdown_duration)
-                current_drawdown_duration = 0
-                in_drawdown = False
-
-        drawdown = peak - running_total
-        drawdowns.append(drawdown)
-
-        if drawdown > 0:
-            if not in_drawdown:
-                in_drawdown = True
-                current_drawdown_duration = 1
-            else:
-                current_drawdown_duration += 1
-
-    # Add final drawdown duration if still in drawdown
-    if in_drawdown:
-        drawdown_durations.append(current_drawdown_duration)
-
-    max_drawdown = max(drawdowns) if drawdowns else 0
-    median_drawdown = statistics.median([d for d in drawdowns if d > 0]) if any(d > 0 for d in drawdowns) else 0
-    avg_drawdown = statistics.mean([d for d in drawdowns if d > 0]) if any(d > 0 for d in drawdowns) else 0
-    longest_drawdown_duration = max(drawdown_durations) if drawdown_durations else 0
-    median_drawdown_duration = statistics.median(drawdown_durations) if drawdown_durations else 0
+    max_drawdown = metrics['max_drawdown']
+    median_drawdown = metrics['median_drawdown']
+    avg_drawdown = metrics['avg_drawdown']
+    longest_drawdown_duration = metrics['longest_drawdown_duration']
+    median_drawdown_duration = metrics['median_drawdown_duration']
 
     # Streak Analysis
-    current_streak = 0
-    max_win_streak = 0
-    max_loss_streak = 0
-    current_win_streak = 0
-    current_loss_streak = 0
-
-    profit_streaks = []
-    loss_streaks = []
-    current_profit_streak = 0
-    current_loss_streak_count = 0
-
-    for pnl in pnl_values:
-        if pnl > 0:
-            current_win_streak += 1
-            current_loss_streak = 0
-            current_profit_streak += 1
-            if current_loss_streak_count > 0:
-                loss_streaks.append(current_loss_streak_count)
-                current_loss_streak_count = 0
-        elif pnl < 0:
-            current_loss_streak += 1
-            current_win_streak = 0
-            current_loss_streak_count += 1
-            if current_profit_streak > 0:
-                profit_streaks.append(current_profit_streak)
-                current_profit_streak = 0
-        else:  # breakeven
-            if current_profit_streak > 0:
-                profit_streaks.append(current_profit_streak)
-                current_profit_streak = 0
-            if current_loss_streak_count > 0:
-                loss_streaks.append(current_loss_streak_count)
-                current_loss_streak_count = 0
-
-        max_win_streak = max(max_win_streak, current_win_streak)
-        max_loss_streak = max(max_loss_streak, current_loss_streak)
-
-    # Add final streaks
-    if current_profit_streak > 0:
-        profit_streaks.append(current_profit_streak)
-    if current_loss_streak_count > 0:
-        loss_streaks.append(current_loss_streak_count)
-
-    median_profit_streak = statistics.median(profit_streaks) if profit_streaks else 0
-    median_expense_streak = statistics.median(loss_streaks) if loss_streaks else 0
+    max_win_streak = metrics['max_consecutive_wins']
+    max_loss_streak = metrics['max_consecutive_losses']
+    median_profit_streak = metrics['median_win_streak']
+    median_expense_streak = metrics['median_loss_streak']
 
     # Time-based metrics
     trading_period_days = 0
@@ -291,10 +189,10 @@ def calculate_model_analytics(trades, risk_params=None):
     avg_annual_r = 0
     percent_days_positive = 0
 
-    if trade_dates and len(trade_dates) > 1:
-        first_trade = min(trade_dates)
-        last_trade = max(trade_dates)
-        trading_period_days = (last_trade - first_trade).days + 1
+    if len(trade_dates) > 1:
+        first_trade = trade_dates.min()
+        last_trade = trade_dates.max()
+        trading_period_days = int((last_trade - first_trade) // np.timedelta64(1, 'D')) + 1
 
         if trading_period_days > 0:
             daily_ev = net_pnl / trading_period_days
@@ -305,22 +203,15 @@ def calculate_model_analytics(trades, risk_params=None):
             avg_annual_r = avg_r_per_day * 252
 
         # Calculate % days positive
-        positive_days = len([pnl for pnl in daily_pnls.values() if pnl > 0])
-        total_trading_days = len(daily_pnls)
-        percent_days_positive = (positive_days / total_trading_days * 100) if total_trading_days > 0 else 0
+        percent_days_positive = metrics['daily_win_rate']
 
     # Median EV (Expected Value)
     median_ev = median_profit
 
     # Skewness and Kurtosis
-    if len(pnl_values) > 2:
-        skewness = calculate_skewness(pnl_values)
-        kurtosis = calculate_kurtosis(pnl_values)
-        skewness_returns = calculate_skewness(r_multiples) if len(r_multiples) > 2 else 0
-    else:
-        skewness = 0
-        kurtosis = 0
-        skewness_returns = 0
+    skewness = metrics['skewness']
+    kurtosis = metrics['kurtosis']
+    skewness_returns = r_metrics['skewness']
 
     # Expectancy (alternative calculation)
     expectancy = (avg_win_r * win_rate) - (abs(avg_loss_r) * loss_rate)
@@ -333,7 +224,7 @@ def calculate_model_analytics(trades, risk_params=None):
     defined_risk_reward = abs(avg_win_r / avg_loss_r) if avg_loss_r != 0 else 0
 
     # MFE (Maximum Favorable Excursion) - simplified calculation
-    mfe_equity = max(equity_curve) if equity_curve else 0
+    mfe_equity = metrics['peak_equity']
 
     # Calculate weekly MFE (approximation)
     avg_weekly_mfe = mfe_equity / (trading_period_days / 7) if trading_period_days > 7 else mfe_equity
@@ -423,86 +314,23 @@ def calculate_model_analytics(trades, risk_params=None):
     }
 
 
-def calculate_skewness(data):
-    """Calculate skewness of a dataset."""
-    if len(data) < 3:
-        return 0
-
-    mean = statistics.mean(data)
-    std = statistics.stdev(data)
-
-    if std == 0:
-        return 0
-
-    n = len(data)
-    skew = sum(((x - mean) / std) ** 3 for x in data) / n
-    return skew
-
-
-def calculate_kurtosis(data):
-    """Calculate kurtosis of a dataset."""
-    if len(data) < 4:
-        return 0
-
-    mean = statistics.mean(data)
-    std = statistics.stdev(data)
-
-    if std == 0:
-        return 0
-
-    n = len(data)
-    kurt = sum(((x - mean) / std) ** 4 for x in data) / n - 3
-    return kurt
-
-
 def prepare_equity_curve_data(trades):
-    """Prepare equity curve data for Chart.js visualization with enhanced debugging."""
-
-
-    if not trades:
-
+    """Prepare equity curve data for Chart.js visualization."""
+    trades = TradeFrame.coerce(trades)
+    if not len(trades):
         return {'labels': [], 'data': []}
 
-    # Sort trades by entry_timestamp (handling the property correctly)
-    sorted_trades = []
-    for i, trade in enumerate(trades):
-        # Get the entry_timestamp property value and add it as a sort key
-        entry_ts = trade.entry_timestamp
-        if not entry_ts and trade.trade_date:
-            # Fallback to trade_date if entry_timestamp is None
-            entry_ts = datetime.combine(trade.trade_date, datetime.min.time())
-
-        # Get P&L value - FIXED: Better P&L handling
-        pnl = 0.0
-        if hasattr(trade, 'pnl') and trade.pnl is not None:
-            pnl = float(trade.pnl)
-        elif hasattr(trade, 'realized_pnl') and trade.realized_pnl is not None:
-            pnl = float(trade.realized_pnl)
-
-
-        sorted_trades.append((trade, entry_ts or datetime.min, pnl))
-
-    # Sort by the timestamp
-    sorted_trades.sort(key=lambda x: x[1])
-
-
-    labels = []
-    equity_data = []
-    running_total = 0.0
-
-    for i, (trade, timestamp, pnl) in enumerate(sorted_trades):
-        running_total += pnl
+    # Sort trades by entry_timestamp, falling back to trade_date (stable, like sorted())
+    timestamps = np.where(np.isnat(trades['entry_timestamp']),
+                          trades['trade_date'].astype('datetime64[s]'), trades['entry_timestamp'])
+    order = np.argsort(timestamps, kind='stable')
 
-        # Format date for chart - FIXED: More robust date formatting
-        if timestamp and timestamp != datetime.min:
-            date_str = timestamp.strftime('%m/%d/%Y')
-        elif trade.trade_date:
-            date_str = trade.trade_date.strftime('%m/%d/%Y')
-        else:
-            date_str = f'Trade {i + 1}'
+    running_totals = np.cumsum(np.nan_to_num(trades['pnl'])[order])
+    equity_data = [round(value, 2) for value in running_totals.tolist()]
 
-        labels.append(date_str)
-        equity_data.append(round(running_total, 2))
+    # Format dates for chart (MM/DD/YYYY)
+    labels = [f"{value[5:7]}/{value[8:10]}/{value[0:4]}"
+              for value in np.datetime_as_string(timestamps[order], unit='D')]
 
 
     result = {
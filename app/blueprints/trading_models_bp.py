@@ -13,6 +13,7 @@ bp = Blueprint('trading_models', __name__, url_prefix='/trading-models')
 
 from app.models import TradingModel, Trade, EntryPoint, ExitPoint, db
 from app.utils.calculations import calculate_trade_pnl, calculate_risk_reward_ratio
+from app.utils.analytics_cache import analytics_cache
 
 
 # Configuration for analytics calculations
@@ -48,28 +49,19 @@ def view_model_detail(model_id):
         user_id=current_user.id if not current_user.has_role('admin') else None
     ).first_or_404()
 
-    # Get all trades for this model
-    trades_query = Trade.query.filter_by(
-        trading_model_id=model_id,
-        user_id=current_user.id
-    ).order_by(Trade.entry_timestamp.desc())
-
-    trades = trades_query.all()
+    # Trade analytics are cached until the user's trade data changes
+    detail = analytics_cache.get_or_compute(
+        current_user.id, 'model_detail', model_id, lambda: _model_trade_analytics(model_id, current_user.id))
 
     # If no trades, show empty state
-    if not trades:
+    if not detail['total_trades']:
         return render_template('trading_models/model_detail.html',
                                model=model,
                                trades=[],
                                analytics={},
                                has_trades=False)
 
-    # Calculate comprehensive analytics
-    risk_params = get_risk_parameters(current_user.id)
-    analytics = calculate_model_analytics(trades, risk_params)
-
-    # Prepare equity curve data
-    equity_data = prepare_equity_curve_data(trades)
+    analytics = detail['analytics']
 
     # Get model-specific insights based on Random's methodology
     model_insights = generate_model_insights(model, analytics)
@@ -77,13 +69,29 @@ def view_model_detail(model_id):
     return render_template('trading_models/model_detail.html',
                            model=model,
                            trades=[],  # Remove recent trades as requested
-                           total_trades=len(trades),
+                           total_trades=detail['total_trades'],
                            analytics=analytics,
-                           equity_data=json.dumps(equity_data),
+                           equity_data=json.dumps(detail['equity_data']),
                            model_insights=model_insights,
                            has_trades=True)
 
 
+def _model_trade_analytics(model_id, user_id):
+    """Trade count, analytics and equity curve data of the user's trades on a model."""
+    trades = Trade.query.filter_by(
+        trading_model_id=model_id,
+        user_id=user_id
+    ).order_by(Trade.entry_timestamp.desc()).all()
+    if not trades:
+        return {'total_trades': 0}
+
+    return {
+        'total_trades': len(trades),
+        'analytics': calculate_model_analytics(trades, get_risk_parameters(user_id)),
+        'equity_data': prepare_equity_curve_data(trades),
+    }
+
+
 def calculate_model_analytics(trades, risk_params=None):
     """
     Calculate comprehensive trading model analytics based on Random's methodology.
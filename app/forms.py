@@ -417,6 +417,9 @@ class TradeFilterForm(FlaskForm):
 class ImportTradesForm(FlaskForm):
     csv_file = FileField('CSV File to Import',
                          validators=[DataRequired(), FileAllowed(['csv'], 'Only CSV files are allowed!')])
+    on_duplicate = SelectField('Trades Already in Your Journal',
+                               choices=[('skip', 'Skip them'), ('update', 'Update them from the file')],
+                               default='skip')
     submit = SubmitField('Upload and Import Trades')
 
 class DailyJournalForm(FlaskForm):
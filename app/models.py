@@ -13,6 +13,7 @@ from app.extensions import db
 from enum import Enum
 from datetime import datetime
 import json
+import hashlib
 
 
 
@@ -55,6 +56,7 @@ class User(db.Model, UserMixin):
     discord_linked = db.Column(db.Boolean, nullable=False, default=False)
     discord_roles = db.Column(db.JSON, nullable=True)  # Store Discord roles as JSON
     last_discord_sync = db.Column(db.DateTime, nullable=True)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # see app.utils.data_version
 
     # Relationships
     activities = db.relationship('Activity', backref='user', lazy='dynamic', cascade='all, delete-orphan')
@@ -878,6 +880,125 @@ class TradeImage(db.Model):
 
 
 
+def _gross_pnl(direction, avg_entry, avg_exit, contracts_exited, pv):
+    """Gross P&L in dollars; 0.0 when any input is missing."""
+    # If point value could not be determined, PnL is zero.
+    if pv is None or pv == 0:
+        return 0.0
+
+    if avg_entry is None or avg_exit is None or not contracts_exited:
+        return 0.0
+
+    pnl_per_contract_in_points = 0.0
+    if direction == "Long":
+        pnl_per_contract_in_points = avg_exit - avg_entry
+    elif direction == "Short":
+        pnl_per_contract_in_points = avg_entry - avg_exit
+
+    return pnl_per_contract_in_points * contracts_exited * pv
+
+
+# Trading sessions by entry hour (exchange time), as used in the daily journal
+TRADING_SESSIONS = (('Asia', 18, 2), ('London', 2, 8), ('NY1', 8, 14), ('NY2', 14, 18))
+
+
+def trading_session_for_hour(hour):
+    """Session name for an entry hour (0-23), or None."""
+    if hour is None:
+        return None
+    for name, start, end in TRADING_SESSIONS:
+        if (start <= hour < end) if start < end else (hour >= start or hour < end):
+            return name
+    return None
+
+
+def compute_trade_aggregates(trade_date, direction, initial_stop_loss, point_value, how_closed, entries, exits):
+    """
+    Derive the stored Trade aggregate columns from raw entry/exit rows.
+
+    entries: iterable of (entry_time, contracts, entry_price)
+    exits: iterable of (exit_time, contracts, exit_price)
+    Returns a dict keyed by Trade column name.
+    """
+    entries = list(entries)
+    exits = list(exits)
+
+    total_entered = sum(c for _, c, _ in entries if c is not None)
+    total_exited = sum(c for _, c, _ in exits if c is not None)
+
+    avg_entry = None
+    if total_entered:
+        avg_entry = sum(c * p for _, c, p in entries if c is not None and p is not None) / total_entered
+    avg_exit = None
+    if total_exited:
+        avg_exit = sum(c * p for _, c, p in exits if c is not None and p is not None) / total_exited
+
+    gross = _gross_pnl(direction, avg_entry, avg_exit, total_exited, point_value)
+
+    timed_entries = sorted((e for e in entries if e[0] is not None), key=lambda e: e[0])
+    first_entry = timed_entries[0] if timed_entries else (entries[0] if entries else None)
+    exit_times = [t for t, _, _ in exits if t is not None]
+
+    entry_ts = datetime.combine(trade_date, first_entry[0]) if first_entry and first_entry[0] and trade_date else None
+    exit_ts = datetime.combine(trade_date, max(exit_times)) if exit_times and trade_date else None
+    seconds = int((exit_ts - entry_ts).total_seconds()) if entry_ts and exit_ts else None
+
+    dollar_risk = None
+    if first_entry and initial_stop_loss is not None and point_value and first_entry[2] is not None:
+        risk_per_contract_in_points = 0.0
+        if direction == "Long":
+            risk_per_contract_in_points = first_entry[2] - initial_stop_loss
+        elif direction == "Short":
+            risk_per_contract_in_points = initial_stop_loss - first_entry[2]
+        dollar_risk = (risk_per_contract_in_points * (first_entry[1] or 0) * point_value
+                       if risk_per_contract_in_points > 0 else 0.0)
+
+    pnl_in_r = None
+    if dollar_risk and total_exited > 0 and how_closed not in ["Still Open", None, '']:
+        pnl_in_r = gross / dollar_risk
+
+    return {
+        'total_contracts_entered': total_entered,
+        'total_contracts_exited': total_exited,
+        'average_entry_price': avg_entry,
+        'average_exit_price': avg_exit,
+        'pnl': gross,
+        'dollar_risk': dollar_risk,
+        'pnl_in_r': pnl_in_r,
+        'entry_timestamp': entry_ts,
+        'exit_timestamp': exit_ts,
+        'time_in_trade_seconds': seconds,
+        'entry_weekday': trade_date.weekday() if trade_date else None,
+        'entry_hour': entry_ts.hour if entry_ts else None,
+        'trading_session': trading_session_for_hour(entry_ts.hour) if entry_ts else None,
+    }
+
+
+def _fingerprint_leg(leg_time, contracts, price):
+    return '{}|{}|{}'.format(
+        leg_time.strftime('%H:%M:%S') if leg_time else '',
+        int(contracts) if contracts is not None else '',
+        f"{float(price):.6f}" if price is not None else '')
+
+
+def compute_trade_fingerprint(trade_date, instrument, direction, entries, exits):
+    """
+    Content hash identifying a trade independent of its id.
+
+    Covers date, instrument symbol, direction and the normalized entry/exit legs
+    (same tuples as compute_trade_aggregates), so the same fill re-imported from
+    an overlapping broker file hashes identically.
+    """
+    parts = [
+        trade_date.isoformat() if trade_date else '',
+        (instrument or '').strip().upper(),
+        (direction or '').strip().capitalize(),
+        'E:' + ';'.join(sorted(_fingerprint_leg(*leg) for leg in entries)),
+        'X:' + ';'.join(sorted(_fingerprint_leg(*leg) for leg in exits)),
+    ]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
 class Trade(db.Model):
     """
     Core Trade model for Random's trading journal
@@ -904,6 +1025,22 @@ class Trade(db.Model):
     mae_price = db.Column(db.Float, nullable=True)  # Maximum Adverse Excursion (worst price reached)
     mfe_price = db.Column(db.Float, nullable=True)  # Maximum Favorable Excursion (best price reached)
 
+    # Entry/exit aggregates, maintained by recalculate_aggregates()
+    total_contracts_entered = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_contracts_exited = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    average_entry_price = db.Column(db.Float, nullable=True)
+    average_exit_price = db.Column(db.Float, nullable=True)
+    dollar_risk = db.Column(db.Float, nullable=True)
+    pnl_in_r = db.Column(db.Float, nullable=True, index=True)
+    entry_timestamp = db.Column(db.DateTime, nullable=True, index=True)  # trade_date + first entry time
+    exit_timestamp = db.Column(db.DateTime, nullable=True)  # trade_date + last exit time
+    time_in_trade_seconds = db.Column(db.Integer, nullable=True, index=True)
+    content_fingerprint = db.Column(db.String(64), nullable=True)  # see compute_trade_fingerprint()
+    # Precomputed analytics dimensions (performance cube GROUP BY columns)
+    entry_weekday = db.Column(db.Integer, nullable=True)  # 0=Monday, from trade_date
+    entry_hour = db.Column(db.Integer, nullable=True)  # hour of entry_timestamp
+    trading_session = db.Column(db.String(10), nullable=True)  # see TRADING_SESSIONS
+
     # Trade management and notes
     trade_notes = db.Column(db.Text, nullable=True)
     how_closed = db.Column(db.String(20), nullable=True)
@@ -938,6 +1075,13 @@ class Trade(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_trade_user'), nullable=False, index=True)
     images = db.relationship('TradeImage', backref='trade', lazy='dynamic', cascade="all, delete-orphan")
 
+    # Keyset pagination key: per-user (trade_date, id) range scans
+    # Duplicate detection on import: per-user fingerprint lookups
+    # Cube slices by entry weekday / hour per user
+    __table_args__ = (db.Index('idx_trade_user_date_id', 'user_id', 'trade_date', 'id'),
+                      db.Index('idx_trade_user_fingerprint', 'user_id', 'content_fingerprint'),
+                      db.Index('idx_trade_user_weekday_hour', 'user_id', 'entry_weekday', 'entry_hour'))
+
     @property
     def instrument(self):
         """Get instrument symbol - checks new relationship first, then legacy field"""
@@ -975,64 +1119,32 @@ class Trade(db.Model):
         # If no override and no linked instrument, there is no valid point value
         return None
 
-    @property
-    def total_contracts_entered(self):
-        if not self.entries:
-            return 0
-        return sum(entry.contracts for entry in self.entries if entry.contracts is not None)
-
-    @property
-    def average_entry_price(self):
-        total_contracts = self.total_contracts_entered
-        if not total_contracts or total_contracts == 0:
-            return None
-        total_value = sum(entry.contracts * entry.entry_price for entry in self.entries
-                          if entry.contracts is not None and entry.entry_price is not None)
-        return total_value / total_contracts
-
-    @property
-    def total_contracts_exited(self):
-        if not self.exits:
-            return 0
-        return sum(exit_point.contracts for exit_point in self.exits if exit_point.contracts is not None)
-
-    @property
-    def average_exit_price(self):
-        total_exited = self.total_contracts_exited
-        if not total_exited or total_exited == 0:
-            return None
-        total_exit_value = sum(exit_point.contracts * exit_point.exit_price for exit_point in self.exits
-                               if exit_point.contracts is not None and exit_point.exit_price is not None)
-        return total_exit_value / total_exited
+    def recalculate_aggregates(self):
+        """
+        Recompute the stored entry/exit aggregates (pnl, content fingerprint)
+        from this trade's entry and exit points. Call after any entry or exit
+        is added, edited or deleted, before committing.
+        """
+        entries = [(e.entry_time, e.contracts, e.entry_price) for e in self.entries]
+        exits = [(x.exit_time, x.contracts, x.exit_price) for x in self.exits]
+        aggregates = compute_trade_aggregates(
+            self.trade_date, self.direction, self.initial_stop_loss,
+            self.point_value_safe, self.how_closed, entries, exits)
+        for column, value in aggregates.items():
+            setattr(self, column, value)
+        self.content_fingerprint = compute_trade_fingerprint(
+            self.trade_date, self.instrument, self.direction, entries, exits)
+        return aggregates
 
     @property
     def gross_pnl(self):
-        """Calculate gross P&L using consolidated point value logic"""
-        avg_entry = self.average_entry_price
-        avg_exit = self.average_exit_price
-        contracts_exited = self.total_contracts_exited
-        pv = self.point_value_safe
-
-        # If point value could not be determined, PnL is zero.
-        if pv is None or pv == 0:
-            return 0.0
-
-        if avg_entry is None or avg_exit is None or contracts_exited == 0:
-            return 0.0
-
-        pnl_per_contract_in_points = 0.0
-        if self.direction == "Long":
-            pnl_per_contract_in_points = avg_exit - avg_entry
-        elif self.direction == "Short":
-            pnl_per_contract_in_points = avg_entry - avg_exit
-
-        return pnl_per_contract_in_points * contracts_exited * pv
+        """Gross P&L from the stored aggregates using consolidated point value logic"""
+        return _gross_pnl(self.direction, self.average_entry_price, self.average_exit_price,
+                          self.total_contracts_exited, self.point_value_safe)
 
     def calculate_and_store_pnl(self):
         """Calculate P&L and store it in the pnl column for fast database filtering"""
-        calculated_pnl = self.gross_pnl  # Use the existing property calculation
-        self.pnl = calculated_pnl
-        return calculated_pnl
+        return self.recalculate_aggregates()['pnl']
 
     @property
     def risk_reward_ratio(self):
@@ -1047,76 +1159,20 @@ class Trade(db.Model):
 
     @property
     def time_in_trade(self):
-        if not self.entries.first():
+        """Formatted duration from the stored first entry / last exit timestamps."""
+        if self.entry_timestamp is None:
             return "N/A"
-        first_entry_obj = self.entries.order_by(EntryPoint.entry_time).first()
-        if not first_entry_obj or not first_entry_obj.entry_time:
-            return "Open"
-        min_entry_datetime = datetime.combine(self.trade_date, first_entry_obj.entry_time)
-        last_exit_obj = self.exits.order_by(ExitPoint.exit_time.desc()).first()
-        if not last_exit_obj or not last_exit_obj.exit_time:
+        if self.time_in_trade_seconds is None:
             return "Open"
-        max_exit_datetime = datetime.combine(self.trade_date, last_exit_obj.exit_time)
-        if max_exit_datetime >= min_entry_datetime:
-            duration = max_exit_datetime - min_entry_datetime
-            total_seconds = int(duration.total_seconds())
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            return f"{hours:02d}h {minutes:02d}m"
-        return "N/A (Exit before Entry?)"
-
-    @property
-    def dollar_risk(self):
-        first_entry = self.entries.order_by(EntryPoint.entry_time).first()
-        sl = self.initial_stop_loss
-        pv = self.point_value_safe
-
-        if not first_entry or sl is None or pv is None or pv == 0:
-            return None
-
-        entry_price = first_entry.entry_price
-        contracts = first_entry.contracts
-        risk_per_contract_in_points = 0.0
-
-        if self.direction == "Long":
-            risk_per_contract_in_points = entry_price - sl
-        elif self.direction == "Short":
-            risk_per_contract_in_points = sl - entry_price
-
-        return risk_per_contract_in_points * contracts * pv if risk_per_contract_in_points > 0 else 0.0
-
-    @property
-    def pnl_in_r(self):
-        initial_risk_dollars = self.dollar_risk
-        pnl_dollars = self.gross_pnl
-        if initial_risk_dollars is None or initial_risk_dollars == 0 or pnl_dollars is None:
-            return None
-        if self.total_contracts_exited > 0 and self.how_closed not in ["Still Open", None, '']:
-            return pnl_dollars / initial_risk_dollars
-        return None
+        if self.time_in_trade_seconds < 0:
+            return "N/A (Exit before Entry?)"
+        hours = self.time_in_trade_seconds // 3600
+        minutes = (self.time_in_trade_seconds % 3600) // 60
+        return f"{hours:02d}h {minutes:02d}m"
 
     def __repr__(self):
         return f"<Trade {self.id} {self.instrument} on {self.trade_date} (User: {self.user_id})>"
 
-    @property
-    def entry_timestamp(self):
-        """
-        Returns the full timestamp of the first entry for a trade.
-        Combines the trade_date with the earliest entry_time.
-        """
-        if not self.entries.first():
-            return None  # Or return a default datetime
-
-        # Get the first entry, ordered by time
-        first_entry = self.entries.order_by(EntryPoint.entry_time).first()
-
-        if not first_entry or not first_entry.entry_time:
-            return None  # Or handle as needed
-
-        # Combine the trade date with the entry time
-        from datetime import datetime
-        return datetime.combine(self.trade_date, first_entry.entry_time)
-
     @property
     def images(self):
         """Get all images for this trade."""
@@ -1130,7 +1186,8 @@ class EntryPoint(db.Model):
     entry_time = db.Column(db.Time, nullable=False)
     contracts = db.Column(db.Integer, nullable=False)
     entry_price = db.Column(db.Float, nullable=False)
-    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id', name='fk_entrypoint_trade'), nullable=False)
+    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id', name='fk_entrypoint_trade'), nullable=False,
+                         index=True)
 
     def __repr__(self):
         return f"<EntryPoint ID: {self.id} for Trade ID: {self.trade_id} ({self.contracts} @ {self.entry_price})>"
@@ -1143,12 +1200,91 @@ class ExitPoint(db.Model):
     exit_time = db.Column(db.Time, nullable=True)
     contracts = db.Column(db.Integer, nullable=True)
     exit_price = db.Column(db.Float, nullable=True)
-    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id', name='fk_exitpoint_trade'), nullable=False)
+    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id', name='fk_exitpoint_trade'), nullable=False,
+                         index=True)
 
     def __repr__(self):
         return f"<ExitPoint ID: {self.id} for Trade ID: {self.trade_id} ({self.contracts} @ {self.exit_price})>"
 
 
+class EquityPoint(db.Model):
+    """
+    One point of a user's persisted equity curve: a trade with a P&L, in
+    (trade_date, trade id) order. Maintained by app.utils.equity_series.
+    """
+    __tablename__ = 'equity_point'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_equity_point_user'), nullable=False)
+    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id', name='fk_equity_point_trade', ondelete='CASCADE'),
+                         nullable=False)
+    trade_date = db.Column(db.Date, nullable=False)
+    sequence = db.Column(db.Integer, nullable=False)  # 1-based position in the user's series
+    pnl = db.Column(db.Float, nullable=False)
+    cumulative_pnl = db.Column(db.Float, nullable=False)
+    peak_equity = db.Column(db.Float, nullable=False)  # running peak, starting at 0
+    drawdown = db.Column(db.Float, nullable=False)  # peak_equity - cumulative_pnl
+
+    # Curve reads and suffix rewrites are per-user (trade_date, trade_id) range scans
+    __table_args__ = (db.Index('idx_equity_point_user_date_trade', 'user_id', 'trade_date', 'trade_id', unique=True),)
+
+    def __repr__(self):
+        return f"<EquityPoint #{self.sequence} Trade ID: {self.trade_id} (User: {self.user_id}) {self.cumulative_pnl}>"
+
+
+class DailyPerformance(db.Model):
+    """
+    Per-user daily rollup of trades with a P&L, one row per (date, instrument,
+    trading model, direction). Maintained by app.utils.daily_performance.
+    """
+    __tablename__ = 'daily_performance'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_daily_performance_user'), nullable=False)
+    trade_date = db.Column(db.Date, nullable=False)
+    instrument = db.Column(db.String(20), nullable=True)  # Instrument.symbol, else Trade.instrument_legacy
+    trading_model_id = db.Column(db.Integer, nullable=True)  # no FK: rows are rebuilt, never joined for integrity
+    direction = db.Column(db.String(5), nullable=True)
+    trade_count = db.Column(db.Integer, nullable=False, default=0)
+    wins = db.Column(db.Integer, nullable=False, default=0)
+    losses = db.Column(db.Integer, nullable=False, default=0)
+    gross_profit = db.Column(db.Float, nullable=False, default=0.0)
+    gross_loss = db.Column(db.Float, nullable=False, default=0.0)  # positive magnitude
+    sum_r = db.Column(db.Float, nullable=False, default=0.0)  # sum of pnl_in_r (trades without R add 0)
+
+    # Date-range rollups and per-day rewrites
+    __table_args__ = (db.Index('idx_daily_performance_user_date', 'user_id', 'trade_date'),)
+
+    @property
+    def net_pnl(self):
+        return self.gross_profit - self.gross_loss
+
+    def __repr__(self):
+        return (f"<DailyPerformance {self.trade_date} {self.instrument} {self.direction} "
+                f"(User: {self.user_id}) {self.trade_count} trades>")
+
+
+class DataChange(db.Model):
+    """
+    Delta-sync change log: one row per trade date ('date') or trading model
+    ('model') a write touched, or 'full' when everything is stale, tagged
+    with the user data version the write produced. Maintained by
+    app.utils.change_log.
+    """
+    __tablename__ = 'data_change'
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_data_change_user'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)  # user.data_version after the write
+    kind = db.Column(db.String(10), nullable=False)  # date / model / full / horizon
+    trade_date = db.Column(db.Date, nullable=True)
+    trading_model_id = db.Column(db.Integer, nullable=True)  # no FK: NULL also means "no model"
+    created_at = db.Column(db.DateTime, default=dt.utcnow, nullable=False)
+
+    # "Changes since version N" reads
+    __table_args__ = (db.Index('idx_data_change_user_version', 'user_id', 'version'),)
+
+    def __repr__(self):
+        return f"<DataChange v{self.version} {self.kind} (User: {self.user_id})>"
+
+
 # --- Journal Models for Random's System ---
 class DailyJournalImage(db.Model):
     """Images for daily journal entries"""
@@ -2100,56 +2236,33 @@ class Backtest(db.Model):
     
     def calculate_performance_metrics(self):
         """Calculate and update performance metrics based on trades"""
-        trades = self.trades.all()
-        
-        if not trades:
+        from app.utils.performance_metrics import compute_performance_metrics
+
+        rows = db.session.query(BacktestTrade.profit_loss, BacktestTrade.profit_loss_ticks) \
+            .filter(BacktestTrade.backtest_id == self.id) \
+            .order_by(BacktestTrade.trade_date, BacktestTrade.id).all()
+
+        if not rows:
             return
-        
-        self.total_trades = len(trades)
-        winning_trades = [t for t in trades if t.profit_loss > 0]
-        losing_trades = [t for t in trades if t.profit_loss < 0]
-        
-        self.winning_trades = len(winning_trades)
-        self.losing_trades = len(losing_trades)
+
+        metrics = compute_performance_metrics([pnl if pnl is not None else float('nan') for pnl, _ in rows])
+
+        self.total_trades = len(rows)
+        self.winning_trades = metrics['winning_trades']
+        self.losing_trades = metrics['losing_trades']
         self.win_percentage = (self.winning_trades / self.total_trades) * 100 if self.total_trades > 0 else 0
-        
-        self.total_pnl = sum(t.profit_loss for t in trades if t.profit_loss)
-        self.total_pnl_ticks = sum(t.profit_loss_ticks for t in trades if t.profit_loss_ticks)
-        
-        if winning_trades:
-            self.average_win = sum(t.profit_loss for t in winning_trades) / len(winning_trades)
-        if losing_trades:
-            self.average_loss = sum(t.profit_loss for t in losing_trades) / len(losing_trades)
-        
-        if self.average_loss and self.average_loss != 0:
-            self.profit_factor = abs(self.average_win * self.winning_trades) / abs(self.average_loss * self.losing_trades)
-        
-        # Calculate drawdown and runup
-        running_pnl = 0
-        peak_pnl = 0
-        trough_pnl = 0
-        max_dd = 0
-        max_ru = 0
-        
-        for trade in sorted(trades, key=lambda x: x.trade_date):
-            if trade.profit_loss:
-                running_pnl += trade.profit_loss
-                if running_pnl > peak_pnl:
-                    peak_pnl = running_pnl
-                    trough_pnl = running_pnl
-                elif running_pnl < trough_pnl:
-                    trough_pnl = running_pnl
-                
-                current_dd = peak_pnl - running_pnl
-                current_ru = running_pnl - trough_pnl
-                
-                if current_dd > max_dd:
-                    max_dd = current_dd
-                if current_ru > max_ru:
-                    max_ru = current_ru
-        
-        self.max_drawdown = max_dd
-        self.max_runup = max_ru
+
+        self.total_pnl = metrics['net_pnl']
+        self.total_pnl_ticks = sum(ticks for _, ticks in rows if ticks)
+
+        if self.winning_trades:
+            self.average_win = metrics['avg_win']
+        if self.losing_trades:
+            self.average_loss = -metrics['avg_loss']
+            self.profit_factor = metrics['profit_factor']
+
+        self.max_drawdown = metrics['max_drawdown']
+        self.max_runup = metrics['max_runup']
     
     @property
     def avg_trade_pnl(self):
@@ -2334,3 +2447,61 @@ class BacktestTradeExit(db.Model):
     
     def __repr__(self):
         return f'<BacktestTradeExit {self.quantity}@{self.exit_price} at {self.exit_time}>'
+
+
+class BackgroundJob(db.Model):
+    """Heavy export/report work queued from a request and run by app.services.job_service"""
+    __tablename__ = 'background_job'
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', name='fk_background_job_user'), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)  # registered job kind, e.g. 'performance_report_pdf'
+    status = db.Column(db.String(20), nullable=False, default=STATUS_QUEUED)
+    progress = db.Column(db.Integer, nullable=False, default=0)  # 0-100
+    progress_message = db.Column(db.String(255), nullable=True)
+    params = db.Column(db.JSON, nullable=True)  # request args the job replays
+
+    # Finished artifact (stored under instance/jobs/<id>/)
+    artifact_path = db.Column(db.String(500), nullable=True)
+    artifact_name = db.Column(db.String(255), nullable=True)
+    artifact_mimetype = db.Column(db.String(100), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    worker = db.Column(db.String(100), nullable=True)  # '<host>:<pid>' of the process running it
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User', backref=db.backref('background_jobs', lazy='dynamic'))
+
+    __table_args__ = (
+        db.Index('idx_background_job_user_status', 'user_id', 'status'),
+        db.Index('idx_background_job_status_created', 'status', 'created_at'),
+    )
+
+    @property
+    def is_active(self):
+        return self.status in self.ACTIVE_STATUSES
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'artifact_name': self.artifact_name,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.kind} {self.status}>'
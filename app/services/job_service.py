@@ -0,0 +1,329 @@
+"""
+Local background job runner for heavy exports and reports.
+
+Endpoints decorated with @background_job('<kind>') no longer do their work in
+the request thread. The request records a BackgroundJob row and returns its id
+(JSON 202 for XHR/JSON clients, otherwise a redirect to the job status page).
+A thread pool then claims the job and replays the original view inside a request
+context for the job's user. It saves the view's response body as the job
+artifact, which /jobs/<id>/download serves.
+
+Jobs live in the database, so status is visible from every gunicorn worker.
+Claiming a job is an atomic queued -> running UPDATE, so a queued job that
+several processes pick up (e.g. after a restart) still runs only once.
+
+The pool starts lazily in the serving process - on its first request or
+enqueue - never at import or in CLI commands. Starting it requeues jobs left
+running by a dead worker process on this host and resumes queued jobs.
+"""
+import os
+import uuid
+import shutil
+import socket
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+import psutil
+import sqlalchemy as sa
+from flask import (current_app, g, request, jsonify, redirect, url_for, flash,
+                   get_flashed_messages, has_app_context)
+from flask_login import current_user
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import parse_options_header
+from werkzeug.utils import secure_filename
+
+from app.extensions import db
+from app.models import BackgroundJob, User
+
+
+class JobLimitExceeded(Exception):
+    """Raised when a user already has the maximum number of active jobs."""
+
+
+class JobService:
+    """Thread-pool runner for BackgroundJob rows."""
+
+    def __init__(self):
+        self._app = None
+        self._executor = None
+        self._started_pid = None
+        self._handlers = {}  # {kind: undecorated view function}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def initialize(self, app):
+        """Configure the worker pool; it starts on the first request this process serves."""
+        self._app = app
+        app.config.setdefault('JOB_WORKERS', int(os.environ.get('JOB_WORKERS', 2)))
+        app.config.setdefault('JOB_MAX_ACTIVE_PER_USER', int(os.environ.get('JOB_MAX_ACTIVE_PER_USER', 2)))
+        app.config.setdefault('JOB_RETENTION_HOURS', int(os.environ.get('JOB_RETENTION_HOURS', 24)))
+        app.config.setdefault('JOB_FOLDER', os.path.join(app.instance_path, 'jobs'))
+        # Run jobs inline in the request (tests, single-threaded debugging)
+        app.config.setdefault('JOBS_RUN_INLINE', app.config.get('TESTING', False))
+        app.before_request(self.start)
+
+    def start(self):
+        """
+        Start the pool in this process (once per pid: threads do not survive a
+        gunicorn fork), requeue jobs orphaned by dead workers and resume queued ones.
+        """
+        if self._started_pid == os.getpid() or self._app.config.get('JOBS_RUN_INLINE'):
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self._app.config['JOB_WORKERS'],
+                                                thread_name_prefix='job-worker')
+            self._started_pid = os.getpid()
+
+        try:
+            self._requeue_orphans()
+            queued = db.session.query(BackgroundJob.id) \
+                .filter(BackgroundJob.status == BackgroundJob.STATUS_QUEUED) \
+                .order_by(BackgroundJob.created_at).all()
+            for (job_id,) in queued:
+                self._submit(job_id)
+        except Exception as e:
+            # Table may not exist yet (e.g. before `flask db upgrade`)
+            db.session.rollback()
+            self.logger.info(f"Background jobs not resumed: {e}")
+
+    @staticmethod
+    def _worker_name():
+        return f'{socket.gethostname()}:{os.getpid()}'
+
+    @staticmethod
+    def _worker_alive(worker, started_at):
+        """False when worker ('<host>:<pid>') is a process on this host that has exited."""
+        host, _, pid = (worker or '').rpartition(':')
+        if host != socket.gethostname() or not pid.isdigit():
+            return True  # another host's worker (or unknown): purge_expired fails it eventually
+        try:
+            created = psutil.Process(int(pid)).create_time()
+        except psutil.NoSuchProcess:
+            return False
+        # A process started after the claim merely reuses the pid
+        return started_at is None or created <= started_at.replace(tzinfo=timezone.utc).timestamp()
+
+    def _requeue_orphans(self):
+        """Put running jobs whose worker process has exited back in the queue."""
+        running = db.session.query(BackgroundJob.id, BackgroundJob.worker, BackgroundJob.started_at) \
+            .filter(BackgroundJob.status == BackgroundJob.STATUS_RUNNING).all()
+        for job_id, worker, started_at in running:
+            if self._worker_alive(worker, started_at):
+                continue
+            db.session.execute(
+                sa.update(BackgroundJob)
+                .where(BackgroundJob.id == job_id, BackgroundJob.status == BackgroundJob.STATUS_RUNNING,
+                       BackgroundJob.worker == worker)
+                .values(status=BackgroundJob.STATUS_QUEUED, worker=None, started_at=None,
+                        progress=0, progress_message='Queued (restarted)'))
+            self.logger.info(f"Requeued background job {job_id} from stopped worker {worker}")
+        db.session.commit()
+
+    def register(self, kind, func):
+        self._handlers[kind] = func
+
+    def enqueue(self, kind, user_id, args=None, path='/'):
+        """Record a job for user_id and hand it to the worker pool."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self.start()
+
+        if isinstance(args, MultiDict):
+            args = list(args.items(multi=True))
+        params = {'args': [list(pair) for pair in (args or [])], 'path': path}
+        limit = current_app.config['JOB_MAX_ACTIVE_PER_USER']
+        job_id = str(uuid.uuid4())
+
+        # Lock the user row (no-op on SQLite, which serializes writers) so concurrent
+        # requests cannot both pass the limit; the insert only happens under it
+        db.session.execute(sa.select(User.id).where(User.id == user_id).with_for_update())
+        table = BackgroundJob.__table__
+        active = sa.select(sa.func.count()).select_from(table).where(
+            table.c.user_id == user_id, table.c.status.in_(BackgroundJob.ACTIVE_STATUSES)).scalar_subquery()
+        row = sa.select(
+            sa.literal(job_id, table.c.id.type), sa.literal(user_id, table.c.user_id.type),
+            sa.literal(kind, table.c.kind.type), sa.literal(BackgroundJob.STATUS_QUEUED, table.c.status.type),
+            sa.literal(0, table.c.progress.type), sa.literal('Queued', table.c.progress_message.type),
+            sa.literal(params, table.c.params.type), sa.literal(datetime.utcnow(), table.c.created_at.type),
+        ).where(active < limit)
+        inserted = db.session.execute(table.insert().from_select(
+            ['id', 'user_id', 'kind', 'status', 'progress', 'progress_message', 'params', 'created_at'],
+            row)).rowcount
+        db.session.commit()
+        if not inserted:
+            raise JobLimitExceeded(
+                f"You already have {limit} report(s) in progress. Please wait for them to finish.")
+
+        self._submit(job_id)
+        return db.session.get(BackgroundJob, job_id)
+
+    def _submit(self, job_id):
+        if self._app.config.get('JOBS_RUN_INLINE'):
+            self._run(job_id)
+        else:
+            self._executor.submit(self._run, job_id)
+
+    def _claim(self, job_id):
+        """Atomically move a queued job to running; False if someone else got it."""
+        result = db.session.execute(
+            sa.update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == BackgroundJob.STATUS_QUEUED)
+            .values(status=BackgroundJob.STATUS_RUNNING, started_at=datetime.utcnow(),
+                    worker=self._worker_name(), progress=1, progress_message='Running'))
+        db.session.commit()
+        return result.rowcount == 1
+
+    def _finish(self, job_id, status, **values):
+        db.session.execute(
+            sa.update(BackgroundJob).where(BackgroundJob.id == job_id)
+            .values(status=status, finished_at=datetime.utcnow(), **values))
+        db.session.commit()
+
+    def _run(self, job_id):
+        app = self._app
+        with app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+
+                job = db.session.get(BackgroundJob, job_id)
+                handler = self._handlers.get(job.kind)
+                user = db.session.get(User, job.user_id)
+                if handler is None or user is None:
+                    raise RuntimeError(f"Cannot run job kind '{job.kind}' for user {job.user_id}")
+
+                params = job.params or {}
+                with app.test_request_context(params.get('path') or '/',
+                                              query_string=MultiDict(params.get('args') or [])):
+                    # Flask-Login reads the user from g, so the view runs as the job's owner
+                    g._login_user = user
+                    g.background_job_id = job_id
+                    response = app.make_response(handler())
+
+                    if response.status_code >= 300:
+                        # Views report problems with flash + redirect
+                        messages = get_flashed_messages()
+                        raise RuntimeError(messages[-1] if messages else f"Job ended with HTTP {response.status_code}")
+
+                    self._store_artifact(job, response)
+
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Background job {job_id} failed: {e}", exc_info=True)
+                try:
+                    self._finish(job_id, BackgroundJob.STATUS_FAILED, error=str(e), progress_message='Failed')
+                except Exception:
+                    db.session.rollback()
+            finally:
+                db.session.remove()
+
+    def _store_artifact(self, job, response):
+        _, options = parse_options_header(response.headers.get('Content-Disposition', ''))
+        filename = secure_filename(options.get('filename') or '') or f"{job.kind}_{job.id[:8]}"
+
+        job_folder = os.path.join(self._app.config['JOB_FOLDER'], job.id)
+        os.makedirs(job_folder, exist_ok=True)
+        artifact_path = os.path.join(job_folder, filename)
+        try:
+            with open(artifact_path, 'wb') as artifact:
+                for chunk in response.iter_encoded():
+                    artifact.write(chunk)
+        finally:
+            response.close()
+
+        self._finish(job.id, BackgroundJob.STATUS_SUCCEEDED, progress=100, progress_message='Complete',
+                     artifact_path=artifact_path, artifact_name=filename,
+                     artifact_mimetype=response.mimetype)
+
+    def purge_expired(self):
+        """
+        Delete finished jobs (and their artifacts) past the retention window, and
+        fail jobs stuck in running/queued that long (their worker has gone away).
+        Returns (purged_count, failed_count).
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=current_app.config['JOB_RETENTION_HOURS'])
+
+        stale = BackgroundJob.query.filter(
+            BackgroundJob.status.in_(BackgroundJob.ACTIVE_STATUSES),
+            BackgroundJob.created_at < cutoff).all()
+        for job in stale:
+            job.status = BackgroundJob.STATUS_FAILED
+            job.error = 'Job did not finish (worker stopped).'
+            job.finished_at = datetime.utcnow()
+
+        expired = BackgroundJob.query.filter(
+            BackgroundJob.status.in_((BackgroundJob.STATUS_SUCCEEDED, BackgroundJob.STATUS_FAILED)),
+            BackgroundJob.finished_at < cutoff).all()
+        for job in expired:
+            shutil.rmtree(os.path.join(current_app.config['JOB_FOLDER'], job.id), ignore_errors=True)
+            db.session.delete(job)
+
+        db.session.commit()
+        return len(expired), len(stale)
+
+
+def report_progress(percent, message=None):
+    """Update the progress of the background job running this view; no-op otherwise."""
+    if not has_app_context():
+        return
+    job_id = g.get('background_job_id')
+    if not job_id:
+        return
+    try:
+        # Own connection/transaction so the view's session state is untouched
+        with db.engine.begin() as connection:
+            connection.execute(
+                sa.update(BackgroundJob.__table__).where(BackgroundJob.__table__.c.id == job_id)
+                .values(progress=max(1, min(99, int(percent))), progress_message=message))
+    except Exception as e:
+        current_app.logger.warning(f"Could not update progress for job {job_id}: {e}")
+
+
+def _wants_json():
+    return (request.accept_mimetypes.best == 'application/json'
+            or request.headers.get('X-Requested-With') == 'XMLHttpRequest')
+
+
+def background_job(kind):
+    """
+    Run the decorated (GET) view as a background job of the given kind.
+
+    Apply below @login_required and any role checks, which still run in the
+    request; the job replays only the view body.
+    """
+    def decorator(f):
+        job_service.register(kind, f)
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if g.get('background_job_id'):
+                return f(*args, **kwargs)
+
+            try:
+                job = job_service.enqueue(kind, current_user.id, request.args, request.path)
+            except JobLimitExceeded as e:
+                if _wants_json():
+                    return jsonify({'success': False, 'error': str(e)}), 429
+                flash(str(e), 'warning')
+                return redirect(request.referrer or url_for('main.index'))
+
+            if _wants_json():
+                return jsonify({
+                    'success': True,
+                    'job': job.to_dict(),
+                    'status_url': url_for('jobs.job_status', job_id=job.id),
+                    'download_url': url_for('jobs.download_job_artifact', job_id=job.id),
+                }), 202
+            return redirect(url_for('jobs.job_status', job_id=job.id))
+
+        return decorated_function
+
+    return decorator
+
+
+job_service = JobService()
@@ -0,0 +1,212 @@
+# app/utils/analytics_cache.py
+"""
+Versioned per-user cache for computed analytics.
+
+Entries are keyed by (namespace, user, user data version, call key). Every
+write to a user's trades, entry/exit points, trade tags or daily journals
+bumps user.data_version in the same transaction (see data_version), so an
+entry can never be served after the data it was computed from changed: the
+next lookup asks for a new version and misses. Old versions simply age out.
+
+The backend is a cachelib cache chosen by ANALYTICS_CACHE_TYPE:
+  - 'lru' (default): in-process LRU with a TTL, ANALYTICS_CACHE_MAX_ENTRIES
+  - 'filesystem': cachelib FileSystemCache under ANALYTICS_CACHE_DIR
+    (default instance/analytics_cache), shared by every worker on the host
+  - 'sqlite': a SQLite file at ANALYTICS_CACHE_DIR/analytics_cache.sqlite,
+    shared by every worker on the host
+  - 'null': caching off
+ANALYTICS_CACHE_TTL (seconds, default 300) bounds how long an entry lives.
+
+Cached values are shared between requests and must be treated as read-only.
+Hit/miss counters are per process; stats() reports them by namespace.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from cachelib import BaseCache, FileSystemCache, NullCache
+from flask import current_app
+
+from app.utils.data_version import get_data_version
+
+
+class LRUCache(BaseCache):
+    """Thread-safe in-process cachelib cache with LRU eviction and per-entry TTL."""
+
+    def __init__(self, max_entries=1024, default_timeout=300):
+        BaseCache.__init__(self, default_timeout)
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  # {key: (expires_at or None, value)}
+        self._lock = threading.Lock()
+
+    def _expires_at(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.monotonic() + timeout if timeout > 0 else None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            self._entries[key] = (self._expires_at(timeout), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def has(self, key):
+        return self.get(key) is not None
+
+    def delete(self, key):
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        return True
+
+
+class SQLiteCache(BaseCache):
+    """cachelib cache in a SQLite file, shared by all processes on the host."""
+
+    def __init__(self, path, default_timeout=300):
+        BaseCache.__init__(self, default_timeout)
+        self._path = path
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS cache '
+                               '(key TEXT PRIMARY KEY, expires_at REAL, value BLOB NOT NULL)')
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=5)
+
+    def get(self, key):
+        with self._connect() as connection:
+            row = connection.execute('SELECT expires_at, value FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None or (row[0] is not None and row[0] <= time.time()):
+            return None
+        return pickle.loads(row[1])
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)',
+                               (key, now + timeout if timeout > 0 else None,
+                                pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+            connection.execute('DELETE FROM cache WHERE expires_at <= ?', (now,))
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def has(self, key):
+        return self.get(key) is not None
+
+    def delete(self, key):
+        with self._connect() as connection:
+            return connection.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount > 0
+
+    def clear(self):
+        with self._connect() as connection:
+            connection.execute('DELETE FROM cache')
+        return True
+
+
+class AnalyticsCache:
+    """Per-user analytics cache namespaced by data version, with hit/miss counters."""
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._counts = {}  # {namespace: [hits, misses]}
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self._make_backend(current_app.config)
+        return self._backend
+
+    @staticmethod
+    def _make_backend(config):
+        backend_type = config.get('ANALYTICS_CACHE_TYPE', 'lru')
+        ttl = int(config.get('ANALYTICS_CACHE_TTL', 300))
+        directory = config.get('ANALYTICS_CACHE_DIR',
+                               os.path.join(current_app.instance_path, 'analytics_cache'))
+        if backend_type == 'lru':
+            return LRUCache(int(config.get('ANALYTICS_CACHE_MAX_ENTRIES', 1024)), ttl)
+        if backend_type == 'null':
+            return NullCache()
+        os.makedirs(directory, exist_ok=True)
+        if backend_type == 'filesystem':
+            return FileSystemCache(
+                directory, threshold=int(config.get('ANALYTICS_CACHE_MAX_ENTRIES', 1024)), default_timeout=ttl)
+        if backend_type == 'sqlite':
+            return SQLiteCache(os.path.join(directory, 'analytics_cache.sqlite'), ttl)
+        raise ValueError(f"Unknown ANALYTICS_CACHE_TYPE: {backend_type!r}")
+
+    def _count(self, namespace, hit):
+        with self._lock:
+            self._counts.setdefault(namespace, [0, 0])[0 if hit else 1] += 1
+
+    def get_or_compute(self, user_id, namespace, key, compute, version=None):
+        """
+        Cached value of compute() for (namespace, user_id, key) at the user's
+        current data version (pass version if the caller already has it).
+        key is any value with a stable repr, e.g. a tuple of request arguments.
+        """
+        if version is None:
+            version = get_data_version(user_id)
+        cache_key = f'analytics:{namespace}:{user_id}:{version}:{key!r}'
+        value = self.backend.get(cache_key)
+        if value is not None:
+            self._count(namespace, hit=True)
+            return value
+
+        self._count(namespace, hit=False)
+        value = compute()
+        self.backend.set(cache_key, value)
+        return value
+
+    def stats(self):
+        """Backend type and hit/miss counts of this process, in total and by namespace."""
+        with self._lock:
+            counts = {namespace: list(pair) for namespace, pair in self._counts.items()}
+        hits = sum(pair[0] for pair in counts.values())
+        misses = sum(pair[1] for pair in counts.values())
+        return {
+            'backend': type(self._backend).__name__ if self._backend is not None else None,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses) * 100, 1) if hits + misses else 0,
+            'namespaces': {namespace: {'hits': pair[0], 'misses': pair[1]}
+                           for namespace, pair in sorted(counts.items())},
+        }
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        self.backend.clear()
+        with self._lock:
+            self._counts.clear()
+
+
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,138 @@
+# app/utils/change_log.py
+"""
+Per-user change log for dashboard delta sync.
+
+Every trade write adds data_change rows, in the same transaction, tagged with
+the user data version it produced (see data_version): one 'date' row per
+trade date touched and one 'model' row per trading model whose trades
+changed. Writes that make the whole history stale (a trade without a date,
+a trading model rename or delete) add a 'full' row instead.
+
+changes_since() answers "what changed after version N": the dates and models
+to re-send, or None when the client must take the full payload - the log
+holds a 'full' row in that range, or has been pruned past N (prune() leaves a
+'horizon' row at the newest version it removed).
+"""
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import DataChange, Trade, TradingModel, User
+from app.utils.trade_writes import DATE_CHUNK_SIZE, add_trade_write_handler
+
+
+def _current_version(connection, user_id):
+    user = User.__table__
+    return connection.scalar(sa.select(user.c.data_version).where(user.c.id == user_id)) or 0
+
+
+def _log(connection, user_id, dates=(), model_ids=(), full=False):
+    """Add change rows for user_id at the user's current data version."""
+    version = _current_version(connection, user_id)
+    rows = [{'kind': 'date', 'trade_date': day} for day in dates]
+    rows += [{'kind': 'model', 'trading_model_id': model_id} for model_id in model_ids]
+    if full:
+        rows.append({'kind': 'full'})
+    if rows:
+        connection.execute(DataChange.__table__.insert(), [
+            {'user_id': user_id, 'version': version, 'trade_date': None, 'trading_model_id': None, **row}
+            for row in rows])
+
+
+def _log_trade_write(connection, changes):
+    """trade_writes handler: log the dates written and the models of the trades now on them."""
+    trade = Trade.__table__
+    for user_id, dates in changes.items():
+        if dates is None:
+            _log(connection, user_id, full=True)
+            continue
+        dates = sorted(dates)
+        model_ids = set()
+        for start in range(0, len(dates), DATE_CHUNK_SIZE):
+            model_ids.update(connection.scalars(
+                sa.select(trade.c.trading_model_id).distinct()
+                .where(trade.c.user_id == user_id, trade.c.trade_date.in_(dates[start:start + DATE_CHUNK_SIZE]))))
+        _log(connection, user_id, dates, model_ids)
+
+
+def _log_flush(session, flush_context):
+    """Log models that lost trades (deleted or moved to another model) and model edits."""
+    lost = {}  # {user_id: model ids}
+    stale_users = set()
+    for obj in session.deleted:
+        if isinstance(obj, Trade):
+            lost.setdefault(obj.user_id, set()).add(obj.trading_model_id)
+    for obj in session.dirty:
+        if isinstance(obj, Trade):
+            previous = sa.inspect(obj).attrs.trading_model_id.history.deleted
+            if previous:
+                lost.setdefault(obj.user_id, set()).update(previous)
+    # Dashboard payloads key model rows by name: a rename or delete needs a full resync
+    for obj in session.deleted:
+        if isinstance(obj, TradingModel):
+            stale_users.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, TradingModel) and sa.inspect(obj).attrs.name.history.has_changes():
+            stale_users.add(obj.user_id)
+
+    connection = session.connection()
+    for user_id, model_ids in lost.items():
+        if user_id is not None:
+            _log(connection, user_id, model_ids=model_ids)
+    for user_id in stale_users:
+        _log(connection, user_id, full=True)
+
+
+def changes_since(user_id, since):
+    """
+    (set of dates, set of trading model ids) changed after version since, or
+    None when the client needs the full payload instead.
+    """
+    table = DataChange.__table__
+    if since < 0 or since > _current_version(db.session.connection(), user_id):
+        return None
+    horizon = db.session.scalar(sa.select(sa.func.max(table.c.version))
+                                .where(table.c.user_id == user_id, table.c.kind == 'horizon'))
+    if horizon is not None and since < horizon:
+        return None
+
+    dates, model_ids = set(), set()
+    rows = db.session.execute(sa.select(table.c.kind, table.c.trade_date, table.c.trading_model_id).distinct()
+                              .where(table.c.user_id == user_id, table.c.version > since))
+    for kind, trade_date, model_id in rows:
+        if kind == 'full':
+            return None
+        if kind == 'date':
+            dates.add(trade_date)
+        elif kind == 'model':
+            model_ids.add(model_id)
+    return dates, model_ids
+
+
+def prune(days=30):
+    """Delete log rows older than days, leaving a horizon row per user; returns rows deleted."""
+    table = DataChange.__table__
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    stale = db.session.execute(
+        sa.select(table.c.user_id, sa.func.max(table.c.version))
+        .where(table.c.created_at < cutoff).group_by(table.c.user_id)).all()
+
+    deleted = 0
+    for user_id, version in stale:
+        deleted += db.session.execute(table.delete().where(
+            table.c.user_id == user_id, table.c.version <= version, table.c.kind != 'horizon')).rowcount
+        db.session.execute(table.delete().where(table.c.user_id == user_id, table.c.kind == 'horizon'))
+        db.session.execute(table.insert().values(user_id=user_id, version=version, kind='horizon',
+                                                 created_at=datetime.utcnow()))
+    db.session.commit()
+    return deleted
+
+
+def register_change_log_listeners():
+    """Log the dates and models of every trade write (idempotent)."""
+    add_trade_write_handler(_log_trade_write, ('pnl', 'pnl_in_r', 'trading_model_id'))
+    if not event.contains(Session, 'after_flush', _log_flush):
+        event.listen(Session, 'after_flush', _log_flush)
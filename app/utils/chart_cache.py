@@ -0,0 +1,115 @@
+# app/utils/chart_cache.py
+"""
+Disk cache for rendered report charts.
+
+A chart is keyed by (chart type, filter spec hash, hash of the trade data it was
+drawn from, chart style version), so regenerating an unchanged report reuses
+every chart. Entries are files under instance/chart_cache; the directory is kept
+under CHART_CACHE_MAX_MB by evicting least-recently-used files (a hit touches
+the file's mtime).
+"""
+import hashlib
+import os
+import threading
+
+from flask import current_app
+
+
+class ChartCache:
+    """Size-bounded LRU file cache of chart images."""
+
+    def __init__(self, directory=None, max_bytes=None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = current_app.config.get(
+                'CHART_CACHE_DIR', os.path.join(current_app.instance_path, 'chart_cache'))
+        os.makedirs(self._directory, exist_ok=True)
+        return self._directory
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is None:
+            self._max_bytes = int(current_app.config.get('CHART_CACHE_MAX_MB', 256)) * 1024 * 1024
+        return self._max_bytes
+
+    @staticmethod
+    def make_key(chart_type, filter_hash, data_hash, style_version, variant=''):
+        raw = f"{chart_type}|{filter_hash or ''}|{data_hash}|{style_version}|{variant}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.chart')
+
+    def get(self, key):
+        """Cached bytes for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path, None)  # mark as recently used
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """Store bytes under key, then evict LRU entries beyond max_bytes."""
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # readers never see a partial file
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.directory):
+                if not entry.name.endswith('.chart'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.chart'):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+
+    def stats(self):
+        files = [entry.stat() for entry in os.scandir(self.directory) if entry.name.endswith('.chart')]
+        return {
+            'entries': len(files),
+            'bytes': sum(stat.st_size for stat in files),
+            'max_bytes': self.max_bytes,
+            'oldest_access': min((stat.st_mtime for stat in files), default=None),
+        }
+
+
+chart_cache = ChartCache()
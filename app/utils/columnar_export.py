@@ -0,0 +1,134 @@
+# app/utils/columnar_export.py
+"""
+Columnar (Parquet) export of a user's trades for offline analysis.
+
+Writes a zip containing one typed Parquet file per table - trades, entries,
+exits and tag links - plus a small manifest.json. Rows are read with Core
+selects fetched in batches (no ORM objects are built) and each batch is
+written as its own Parquet row group, so memory stays bounded by batch_size.
+
+    import pandas as pd, zipfile
+    zf = zipfile.ZipFile('trades_export.zip')
+    trades = pd.read_parquet(zf.open('trades.parquet'))
+"""
+import json
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.models import Trade, EntryPoint, ExitPoint, Tag, trade_tags
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _arrow_type(column_type):
+    """Arrow type for a SQLAlchemy column type (strings for anything unmapped)."""
+    if isinstance(column_type, sa.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, sa.Integer):
+        return pa.int64()
+    if isinstance(column_type, sa.Numeric):
+        return pa.float64()
+    if isinstance(column_type, sa.DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, sa.Date):
+        return pa.date32()
+    if isinstance(column_type, sa.Time):
+        return pa.time64('us')
+    return pa.string()
+
+
+def _plain_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _write_table(statement, output, batch_size):
+    """Stream a Core select into a Parquet file; returns the row count."""
+    columns = list(statement.selected_columns)
+    schema = pa.schema([pa.field(column.name, _arrow_type(column.type)) for column in columns])
+    names = [column.name for column in columns]
+
+    row_count = 0
+    with pq.ParquetWriter(output, schema, compression='snappy') as writer:
+        result = db.session.execute(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions(batch_size):
+            values = list(zip(*rows))
+            batch = pa.RecordBatch.from_pydict(
+                {name: [_plain_value(v) for v in values[i]] for i, name in enumerate(names)},
+                schema=schema)
+            writer.write_batch(batch)
+            row_count += len(rows)
+    return row_count
+
+
+def _export_statements(user_id, filter_spec=None):
+    """Core selects for each exported table, restricted to the user's (filtered) trades."""
+    trade_ids = db.session.query(Trade.id).filter(Trade.user_id == user_id)
+    if filter_spec is not None:
+        trade_ids = filter_spec.apply(trade_ids)
+    trade_ids = trade_ids.subquery()
+
+    trade_table = Trade.__table__
+    entry_table = EntryPoint.__table__
+    exit_table = ExitPoint.__table__
+
+    return {
+        'trades': sa.select(trade_table)
+            .where(trade_table.c.id.in_(sa.select(trade_ids.c.id)))
+            .order_by(trade_table.c.trade_date, trade_table.c.id),
+        'entries': sa.select(entry_table)
+            .where(entry_table.c.trade_id.in_(sa.select(trade_ids.c.id)))
+            .order_by(entry_table.c.trade_id, entry_table.c.entry_time, entry_table.c.id),
+        'exits': sa.select(exit_table)
+            .where(exit_table.c.trade_id.in_(sa.select(trade_ids.c.id)))
+            .order_by(exit_table.c.trade_id, exit_table.c.exit_time, exit_table.c.id),
+        'tag_links': sa.select(trade_tags.c.trade_id, trade_tags.c.tag_id,
+                               Tag.__table__.c.name.label('tag_name'))
+            .join(Tag.__table__, Tag.__table__.c.id == trade_tags.c.tag_id)
+            .where(trade_tags.c.trade_id.in_(sa.select(trade_ids.c.id)))
+            .order_by(trade_tags.c.trade_id, trade_tags.c.tag_id),
+    }
+
+
+def write_trades_parquet_zip(fileobj, user_id, filter_spec=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Write the Parquet zip for a user's trades into fileobj.
+
+    Returns the manifest dict (per-table row counts, filter hash, export time).
+    Raises RuntimeError when pyarrow is not installed.
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    manifest = {
+        'user_id': user_id,
+        'exported_at': datetime.utcnow().isoformat(),
+        'filter_hash': filter_spec.spec_hash if filter_spec is not None else None,
+        'filters_applied': filter_spec.active_filters if filter_spec is not None else {},
+        'tables': {},
+    }
+
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, statement in _export_statements(user_id, filter_spec).items():
+            # Row groups stream straight into the (stored, not deflated) zip entry
+            with archive.open(f'{name}.parquet', 'w', force_zip64=True) as output:
+                manifest['tables'][name] = _write_table(statement, output, batch_size)
+        archive.writestr('manifest.json', json.dumps(manifest, indent=2, default=str))
+
+    return manifest
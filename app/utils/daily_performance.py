@@ -0,0 +1,143 @@
+# app/utils/daily_performance.py
+"""
+Per-user daily performance rollup.
+
+daily_performance holds one row per (user, trade_date, instrument, trading
+model, direction) over the trades with a P&L: trade count, wins, losses,
+gross profit, gross loss (positive) and sum of R. Date-range analytics sum a
+few hundred of these rows with query_rollup() instead of scanning and
+regrouping every trade.
+
+Rows are maintained as trades are written: a trade_writes handler rewrites
+the rollup for each (user, date) the flush touched, in the same transaction,
+with one INSERT ... SELECT ... GROUP BY over that day's trades. The
+migration that adds the table fills it with backfill_all();
+`flask rebuild-daily-performance` rebuilds it from scratch.
+"""
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.models import Trade, Instrument, DailyPerformance
+from app.utils.trade_writes import DATE_CHUNK_SIZE, add_trade_write_handler
+
+# Columns query_rollup() can group by
+DIMENSIONS = ('trade_date', 'instrument', 'trading_model_id', 'direction')
+
+# Trade columns the rollup depends on
+_ROLLUP_COLUMNS = ('pnl', 'pnl_in_r', 'trade_date', 'user_id', 'instrument_id', 'instrument_legacy',
+                   'trading_model_id', 'direction')
+
+
+def _rollup_select(user_id=None):
+    """Trades of user_id (every user when None) with a P&L aggregated to rollup rows (columns in insert order)."""
+    trade = Trade.__table__
+    instrument = Instrument.__table__
+    symbol = sa.func.coalesce(instrument.c.symbol, trade.c.instrument_legacy)
+    pnl = trade.c.pnl
+    keys = (trade.c.user_id, trade.c.trade_date, symbol, trade.c.trading_model_id, trade.c.direction)
+    query = sa.select(
+        *keys,
+        sa.func.count(),
+        sa.func.sum(sa.case((pnl > 0, 1), else_=0)),
+        sa.func.sum(sa.case((pnl < 0, 1), else_=0)),
+        sa.func.sum(sa.case((pnl > 0, pnl), else_=0.0)),
+        sa.func.sum(sa.case((pnl < 0, -pnl), else_=0.0)),
+        sa.func.coalesce(sa.func.sum(trade.c.pnl_in_r), 0.0),
+    ).select_from(trade.outerjoin(instrument, instrument.c.id == trade.c.instrument_id)) \
+        .where(pnl.isnot(None), trade.c.user_id.isnot(None), trade.c.trade_date.isnot(None)) \
+        .group_by(*keys)
+    if user_id is not None:
+        query = query.where(trade.c.user_id == user_id)
+    return query
+
+
+def _insert(connection, source):
+    connection.execute(DailyPerformance.__table__.insert().from_select(
+        ['user_id', 'trade_date', 'instrument', 'trading_model_id', 'direction', 'trade_count',
+         'wins', 'losses', 'gross_profit', 'gross_loss', 'sum_r'], source))
+
+
+def _rewrite(connection, user_id, dates=None):
+    table = DailyPerformance.__table__
+    delete = table.delete().where(table.c.user_id == user_id)
+    source = _rollup_select(user_id)
+    if dates is not None:
+        delete = delete.where(table.c.trade_date.in_(dates))
+        source = source.where(Trade.__table__.c.trade_date.in_(dates))
+    connection.execute(delete)
+    _insert(connection, source)
+
+
+def rebuild_days(connection, user_id, dates=None):
+    """
+    Rewrite user_id's rollup rows for dates (every date when None) from the
+    trade table. Runs on the given connection, i.e. inside the caller's
+    transaction.
+    """
+    if dates is None:
+        _rewrite(connection, user_id)
+        return
+    dates = sorted(dates)
+    for start in range(0, len(dates), DATE_CHUNK_SIZE):
+        _rewrite(connection, user_id, dates[start:start + DATE_CHUNK_SIZE])
+
+
+def backfill_all(connection):
+    """Write every user's rollup with one INSERT ... SELECT (into an empty table)."""
+    _insert(connection, _rollup_select())
+
+
+def rebuild_all(user_ids=None):
+    """Rebuild the rollup for the given users (default: every user with trades); returns the user count."""
+    if user_ids is None:
+        user_ids = db.session.scalars(sa.select(Trade.user_id).distinct()).all()
+    connection = db.session.connection()
+    for user_id in user_ids:
+        rebuild_days(connection, user_id)
+    db.session.commit()
+    return len(user_ids)
+
+
+def query_rollup(user_id, group_by=('trade_date',), start_date=None, end_date=None, **filters):
+    """
+    Sum user_id's rollup rows between start_date and end_date (inclusive),
+    grouped by the given DIMENSIONS and ordered by them. filters are
+    {dimension: value} equality filters. Each result row has the group columns
+    plus trades, wins, losses, gross_profit, gross_loss, net_pnl and sum_r.
+    """
+    unknown = [name for name in (*group_by, *filters) if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown rollup dimension(s): {', '.join(unknown)}")
+
+    table = DailyPerformance.__table__
+    keys = [table.c[name] for name in group_by]
+    gross_profit = sa.func.sum(table.c.gross_profit)
+    gross_loss = sa.func.sum(table.c.gross_loss)
+    query = sa.select(
+        *keys,
+        sa.func.sum(table.c.trade_count).label('trades'),
+        sa.func.sum(table.c.wins).label('wins'),
+        sa.func.sum(table.c.losses).label('losses'),
+        gross_profit.label('gross_profit'),
+        gross_loss.label('gross_loss'),
+        (gross_profit - gross_loss).label('net_pnl'),
+        sa.func.sum(table.c.sum_r).label('sum_r'),
+    ).where(table.c.user_id == user_id)
+    if start_date is not None:
+        query = query.where(table.c.trade_date >= start_date)
+    if end_date is not None:
+        query = query.where(table.c.trade_date <= end_date)
+    for name, value in filters.items():
+        query = query.where(table.c[name].is_(None) if value is None else table.c[name] == value)
+    return db.session.execute(query.group_by(*keys).order_by(*keys)).all()
+
+
+def _update_rollup(connection, changes):
+    """trade_writes handler: rewrite the rollup for each changed (user, date)."""
+    for user_id, dates in changes.items():
+        rebuild_days(connection, user_id, dates)
+
+
+def register_daily_performance_listeners():
+    """Keep the rollup in step with trade writes (idempotent)."""
+    add_trade_write_handler(_update_rollup, _ROLLUP_COLUMNS)
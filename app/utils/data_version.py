@@ -0,0 +1,73 @@
+# app/utils/data_version.py
+"""
+Per-user data version.
+
+user.data_version is bumped in the same transaction as every write to a
+user's trades and trade tags (via a trade_writes handler), entry and exit
+points, daily journals, trading models and tags (via a session after_flush
+listener), so any
+result derived from that data can be cached under (user, query, data
+version) and is never served stale: the next request after a write asks for
+a new version and misses.
+"""
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Trade, User, EntryPoint, ExitPoint, DailyJournal, TradingModel, Tag
+from app.utils.trade_writes import add_trade_write_handler
+
+
+def bump_data_version(connection, user_ids):
+    """Increment data_version for user_ids on the given connection (caller's transaction)."""
+    user = User.__table__
+    connection.execute(
+        sa.update(user).where(user.c.id.in_(list(user_ids)))
+        # keep updated_at: it tracks profile edits, not trading activity
+        .values(data_version=user.c.data_version + 1, updated_at=user.c.updated_at))
+
+
+def get_data_version(user_id):
+    """Current data_version of a user (0 for an unknown user)."""
+    return db.session.scalar(sa.select(User.data_version).where(User.id == user_id)) or 0
+
+
+def _bump_after_write(connection, changes):
+    bump_data_version(connection, changes.keys())
+
+
+def _old_and_new(obj, attribute):
+    """Current and pre-flush values of obj.attribute (a row can move between trades or users)."""
+    history = sa.inspect(obj).attrs[attribute].history
+    return {value for value in (*history.deleted, getattr(obj, attribute)) if value is not None}
+
+
+def _after_flush(session, flush_context):
+    """Bump users whose entry/exit points, daily journals, models or tags this flush wrote."""
+    user_ids, trade_ids = set(), set()
+    dirty = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in (*session.new, *dirty, *session.deleted):
+        if isinstance(obj, (EntryPoint, ExitPoint)):
+            trade_ids |= _old_and_new(obj, 'trade_id')
+        elif isinstance(obj, (DailyJournal, TradingModel, Tag)):
+            user_ids |= _old_and_new(obj, 'user_id')
+
+    connection = session.connection()
+    if trade_ids:
+        trade = Trade.__table__
+        user_ids.update(connection.scalars(
+            sa.select(trade.c.user_id).where(trade.c.id.in_(trade_ids)).distinct()))
+    if user_ids:
+        bump_data_version(connection, user_ids)
+
+
+def register_data_version_listeners():
+    """
+    Bump a user's data version on every write to their trades, trade tags,
+    entry/exit points, daily journals, trading models or tags (idempotent).
+    """
+    columns = [attribute.key for attribute in sa.inspect(Trade).column_attrs] + ['tags']
+    add_trade_write_handler(_bump_after_write, columns)
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
@@ -0,0 +1,147 @@
+# app/utils/equity_series.py
+"""
+Persisted per-user equity curve.
+
+equity_point holds one row per trade with a P&L, in (trade_date, trade id)
+order, with the trade's P&L, the cumulative P&L after it, the running peak
+(starting at 0) and the drawdown from that peak. Readers get a ready-made
+curve from one range scan of idx_equity_point_user_date_trade instead of
+re-accumulating every trade on each page load.
+
+The series is maintained as trades are written:
+  - A trade_writes handler gets each user whose trades were inserted,
+    deleted, or had pnl / trade_date / user_id changed, and rewrites only
+    the suffix of the series from the earliest date affected, in the same
+    transaction. Closing a trade on the newest date is therefore an append;
+    an edit or a back-dated trade recomputes from its date onward.
+
+The migration that adds the table fills it with backfill_all();
+`flask rebuild-equity-series` rebuilds series from scratch.
+"""
+import numpy as np
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.models import Trade, EquityPoint
+from app.utils.trade_writes import add_trade_write_handler
+
+# Trade columns the series depends on
+_SERIES_COLUMNS = ('pnl', 'trade_date', 'user_id')
+
+
+def rebuild_suffix(connection, user_id, from_date=None):
+    """
+    Rewrite user_id's equity points from from_date onward (the whole series
+    when None), continuing from the last point before it - or from scratch
+    when there is none but the user has earlier trades. Runs on the given
+    connection, i.e. inside the caller's transaction. Returns points written.
+    """
+    points = EquityPoint.__table__
+    trades = Trade.__table__
+
+    delete = points.delete().where(points.c.user_id == user_id)
+    previous = sa.select(points.c.sequence, points.c.cumulative_pnl, points.c.peak_equity) \
+        .where(points.c.user_id == user_id)
+    source = sa.select(trades.c.id, trades.c.trade_date, trades.c.pnl) \
+        .where(trades.c.user_id == user_id, trades.c.pnl.isnot(None))
+    if from_date is not None:
+        delete = delete.where(points.c.trade_date >= from_date)
+        previous = previous.where(points.c.trade_date < from_date)
+        source = source.where(trades.c.trade_date >= from_date)
+
+    last = connection.execute(
+        previous.order_by(points.c.trade_date.desc(), points.c.trade_id.desc()).limit(1)).first()
+    if last is None and from_date is not None and connection.scalar(sa.select(sa.exists().where(
+            trades.c.user_id == user_id, trades.c.pnl.isnot(None), trades.c.trade_date < from_date))):
+        return rebuild_suffix(connection, user_id)
+
+    connection.execute(delete)
+    rows = connection.execute(source.order_by(trades.c.trade_date, trades.c.id)).all()
+    if not rows:
+        return 0
+
+    sequence, equity, peak = tuple(last) if last is not None else (0, 0.0, 0.0)
+    pnl = np.fromiter((row.pnl for row in rows), dtype=np.float64, count=len(rows))
+    cumulative = equity + np.cumsum(pnl)
+    peaks = np.maximum.accumulate(np.maximum(cumulative, peak))
+    drawdowns = peaks - cumulative
+
+    connection.execute(points.insert(), [
+        {'user_id': user_id, 'trade_id': row.id, 'trade_date': row.trade_date,
+         'sequence': sequence + position, 'pnl': row.pnl, 'cumulative_pnl': value,
+         'peak_equity': running_peak, 'drawdown': drawdown}
+        for position, (row, value, running_peak, drawdown)
+        in enumerate(zip(rows, cumulative.tolist(), peaks.tolist(), drawdowns.tolist()), start=1)])
+    return len(rows)
+
+
+def rebuild_all(user_ids=None):
+    """Rebuild the whole series for the given users (default: every user with trades)."""
+    if user_ids is None:
+        user_ids = db.session.scalars(sa.select(Trade.user_id).distinct()).all()
+    connection = db.session.connection()
+    written = {user_id: rebuild_suffix(connection, user_id) for user_id in user_ids}
+    db.session.commit()
+    return written
+
+
+def backfill_all(connection):
+    """Write every user's series with one window-function INSERT ... SELECT (into an empty table)."""
+    points = EquityPoint.__table__
+    trades = Trade.__table__
+    order = (trades.c.trade_date, trades.c.id)
+    running = sa.select(
+        trades.c.user_id, trades.c.id.label('trade_id'), trades.c.trade_date, trades.c.pnl,
+        sa.func.row_number().over(partition_by=trades.c.user_id, order_by=order).label('sequence'),
+        sa.func.sum(trades.c.pnl).over(partition_by=trades.c.user_id, order_by=order, rows=(None, 0))
+        .label('cumulative_pnl'),
+    ).where(trades.c.user_id.isnot(None), trades.c.trade_date.isnot(None), trades.c.pnl.isnot(None)).subquery()
+    highest = sa.select(
+        running,
+        sa.func.max(running.c.cumulative_pnl).over(
+            partition_by=running.c.user_id, order_by=(running.c.trade_date, running.c.trade_id), rows=(None, 0))
+        .label('highest'),
+    ).subquery()
+    peak = sa.case((highest.c.highest > 0, highest.c.highest), else_=0.0)  # the peak starts at 0
+    connection.execute(points.insert().from_select(
+        ['user_id', 'trade_id', 'trade_date', 'sequence', 'pnl', 'cumulative_pnl', 'peak_equity', 'drawdown'],
+        sa.select(highest.c.user_id, highest.c.trade_id, highest.c.trade_date, highest.c.sequence, highest.c.pnl,
+                  highest.c.cumulative_pnl, peak, peak - highest.c.cumulative_pnl)))
+
+
+def load_series(user_id, start_date=None, end_date=None):
+    """
+    The user's equity points between start_date and end_date (inclusive) as
+    NumPy columns: sequence, trade_id, trade_date (datetime64[D]), pnl,
+    cumulative_pnl, peak_equity, drawdown. One indexed range query.
+    """
+    query = sa.select(EquityPoint.sequence, EquityPoint.trade_id, EquityPoint.trade_date, EquityPoint.pnl,
+                      EquityPoint.cumulative_pnl, EquityPoint.peak_equity, EquityPoint.drawdown) \
+        .where(EquityPoint.user_id == user_id)
+    if start_date is not None:
+        query = query.where(EquityPoint.trade_date >= start_date)
+    if end_date is not None:
+        query = query.where(EquityPoint.trade_date <= end_date)
+    rows = db.session.execute(query.order_by(EquityPoint.trade_date, EquityPoint.trade_id)).all()
+
+    columns = list(zip(*rows)) if rows else [()] * 7
+    return {
+        'sequence': np.array(columns[0], dtype=np.int64),
+        'trade_id': np.array(columns[1], dtype=np.int64),
+        'trade_date': np.array(columns[2], dtype='datetime64[D]'),
+        'pnl': np.array(columns[3], dtype=np.float64),
+        'cumulative_pnl': np.array(columns[4], dtype=np.float64),
+        'peak_equity': np.array(columns[5], dtype=np.float64),
+        'drawdown': np.array(columns[6], dtype=np.float64),
+    }
+
+
+def _update_series(connection, changes):
+    """trade_writes handler: rewrite each user's series from the earliest changed date."""
+    for user_id, dates in changes.items():
+        rebuild_suffix(connection, user_id, min(dates) if dates else None)
+
+
+def register_equity_listeners():
+    """Keep equity series in step with trade writes (idempotent)."""
+    add_trade_write_handler(_update_series, _SERIES_COLUMNS)
@@ -0,0 +1,94 @@
+# app/utils/http_cache.py
+"""
+Conditional GET (ETag / 304) for the JSON APIs.
+
+versioned_etag() works out a strong ETag before the view runs, from the
+endpoint, its arguments, the current user and the user's data version (see
+data_version) plus any extra validators - cheap callables such as today()
+for date-relative windows or p12_scenarios_version() for payloads that embed
+P12 data. A matching If-None-Match gets an empty 304 after that one version
+lookup, without running the view.
+
+content_etag() is for payloads with no version to key on: the view runs and
+the ETag is a hash of the body, so a match saves the transfer, not the work.
+
+Responses carry Cache-Control: private, no-cache, so browsers keep them and
+revalidate with If-None-Match on every fetch.
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import current_app, request
+from flask_login import current_user
+
+from app.extensions import db
+from app.models import P12Scenario, GlobalImage
+from app.utils.data_version import get_data_version
+
+CACHE_CONTROL = 'private, no-cache'
+
+
+def today():
+    """Validator for responses relative to the current date (e.g. "last 30 days")."""
+    return date.today().isoformat()
+
+
+def p12_scenarios_version():
+    """Validator for responses embedding P12 scenarios: changes on any scenario or scenario image write."""
+    scenarios = db.session.execute(
+        sa.select(sa.func.count(P12Scenario.id), sa.func.max(P12Scenario.updated_date))).one()
+    images = db.session.execute(
+        sa.select(sa.func.count(GlobalImage.id), sa.func.max(GlobalImage.id))
+        .where(GlobalImage.entity_type == 'p12_scenario')).one()
+    return (*scenarios, *images)
+
+
+def _make_etag(*parts):
+    return hashlib.sha256('|'.join(map(str, parts)).encode('utf-8')).hexdigest()[:32]
+
+
+def _finish(response, etag=None):
+    """Tag a 200 response (with etag, or a hash of its body) and turn it into a 304 if the client has it."""
+    if response.status_code != 200:
+        return response
+    if etag is None:
+        response.add_etag()
+    else:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response.make_conditional(request)
+
+
+def versioned_etag(*validators, per_user=True):
+    """
+    Decorator: strong ETag from the request and the current user's data
+    version (per_user=False leaves the user out, for shared data) and each
+    validator(). A client that already has it gets an empty 304 before the
+    view runs. Put it below @login_required.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            parts = [request.endpoint, sorted(request.args.items(multi=True)), sorted(kwargs.items())]
+            if per_user:
+                parts += [current_user.id, get_data_version(current_user.id)]
+            etag = _make_etag(*parts, *(validator() for validator in validators))
+
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = CACHE_CONTROL
+                return response
+            return _finish(current_app.make_response(view(*args, **kwargs)), etag)
+        return wrapped
+    return decorator
+
+
+def content_etag(view):
+    """Decorator: strong ETag hashed from the JSON body; a match is sent as an empty 304."""
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        return _finish(current_app.make_response(view(*args, **kwargs)))
+    return wrapped
@@ -0,0 +1,182 @@
+# app/utils/keyset.py
+"""
+Keyset (cursor) pagination for trade queries ordered by (trade_date, id).
+
+Unlike OFFSET pagination, fetching a deep page costs the same as page 1: each
+page is an indexed range scan starting from the cursor position. Cursors are
+opaque URL-safe tokens that also carry the page number and the total row count
+counted on the first page, so later pages skip the COUNT query as well.
+"""
+import base64
+import json
+import math
+from datetime import date
+
+from sqlalchemy import and_, or_
+
+from app.models import Trade
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+def encode_cursor(payload):
+    """Serialize a cursor payload dict to an opaque URL-safe token."""
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token back into its payload dict."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if payload.get('dir') != 'last':
+            payload['d'] = date.fromisoformat(payload['d'])
+            payload['i'] = int(payload['i'])
+        payload['p'] = int(payload.get('p', 1))
+        return payload
+    except (ValueError, TypeError, KeyError, AttributeError, json.JSONDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}")
+
+
+class KeysetPage:
+    """
+    One page of keyset-paginated results.
+
+    Exposes the same attributes the templates use on a Flask-SQLAlchemy
+    Pagination (items, page, pages, per_page, total, has_next, has_prev),
+    plus next_cursor / prev_cursor / last_cursor tokens.
+    """
+    cursor_mode = True
+
+    def __init__(self, items, page, per_page, total, has_next, has_prev):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = max(1, math.ceil(total / per_page)) if total else 1
+        self.has_next = has_next
+        self.has_prev = has_prev
+
+    def _cursor(self, trade, direction, page):
+        return encode_cursor({'d': trade.trade_date.isoformat(), 'i': trade.id,
+                              'dir': direction, 'p': page, 't': self.total})
+
+    @property
+    def next_cursor(self):
+        if not self.has_next or not self.items:
+            return None
+        return self._cursor(self.items[-1], 'next', self.page + 1)
+
+    @property
+    def prev_cursor(self):
+        if not self.has_prev or not self.items:
+            return None
+        return self._cursor(self.items[0], 'prev', self.page - 1)
+
+    @property
+    def last_cursor(self):
+        if self.page >= self.pages:
+            return None
+        return encode_cursor({'dir': 'last', 'p': self.pages, 't': self.total})
+
+    def to_dict(self):
+        """Pagination block for JSON APIs."""
+        return {
+            'mode': 'cursor',
+            'page': self.page,
+            'pages': self.pages,
+            'per_page': self.per_page,
+            'total': self.total,
+            'has_next': self.has_next,
+            'has_prev': self.has_prev,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+        }
+
+
+def _past_key(trade_date, trade_id, descending):
+    """Rows that come after (trade_date, trade_id) in the given ordering."""
+    if descending:
+        return or_(Trade.trade_date < trade_date,
+                   and_(Trade.trade_date == trade_date, Trade.id < trade_id))
+    return or_(Trade.trade_date > trade_date,
+               and_(Trade.trade_date == trade_date, Trade.id > trade_id))
+
+
+def _key_order(descending):
+    if descending:
+        return Trade.trade_date.desc(), Trade.id.desc()
+    return Trade.trade_date.asc(), Trade.id.asc()
+
+
+def keyset_paginate(query, cursor=None, per_page=25, descending=True):
+    """
+    Paginate a Trade query by (trade_date, id) using a cursor token.
+
+    Any ORDER BY already on the query is replaced by the keyset ordering.
+    Raises InvalidCursor for malformed tokens.
+    """
+    query = query.order_by(None)
+    payload = decode_cursor(cursor) if cursor else None
+
+    # Total: counted once on the first page, then carried in the cursor
+    total = payload.get('t') if payload else None
+    if total is None:
+        total = query.count()
+
+    forward_order = _key_order(descending)
+    backward_order = _key_order(not descending)
+
+    if payload is None:
+        rows = query.order_by(*forward_order).limit(per_page + 1).all()
+        return KeysetPage(rows[:per_page], 1, per_page, total,
+                          has_next=len(rows) > per_page, has_prev=False)
+
+    page = max(1, payload['p'])
+    direction = payload.get('dir', 'next')
+
+    if direction == 'last':
+        remainder = total % per_page or per_page
+        rows = query.order_by(*backward_order).limit(remainder).all()
+        rows.reverse()
+        return KeysetPage(rows, page, per_page, total,
+                          has_next=False, has_prev=page > 1)
+
+    cursor_date, cursor_id = payload['d'], payload['i']
+    after = _past_key(cursor_date, cursor_id, descending)
+    before = _past_key(cursor_date, cursor_id, not descending)
+
+    if direction == 'prev':
+        rows = query.filter(before).order_by(*backward_order).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        rows = rows[:per_page]
+        rows.reverse()
+        return KeysetPage(rows, page, per_page, total,
+                          has_next=True, has_prev=has_prev)
+
+    rows = query.filter(after).order_by(*forward_order).limit(per_page + 1).all()
+    return KeysetPage(rows[:per_page], page, per_page, total,
+                      has_next=len(rows) > per_page, has_prev=True)
+
+
+def iter_keyset_batches(query, batch_size=500, descending=False):
+    """
+    Yield successive lists of trades in (trade_date, id) order.
+
+    Each batch is a separate indexed range query, so memory stays bounded by
+    batch_size no matter how many trades match. Used by the streaming exports.
+    """
+    query = query.order_by(None)
+    last_key = None
+    while True:
+        batch_query = query if last_key is None else query.filter(_past_key(*last_key, descending))
+        rows = batch_query.order_by(*_key_order(descending)).limit(batch_size).all()
+        if not rows:
+            return
+        yield rows
+        if len(rows) < batch_size:
+            return
+        last_key = (rows[-1].trade_date, rows[-1].id)
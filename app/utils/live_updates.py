@@ -0,0 +1,259 @@
+# app/utils/live_updates.py
+"""
+Live update notifications for the dashboard stream.
+
+Every committed transaction that writes a user's trades (or their entry and
+exit points) publishes one small change notice for that user:
+
+    {'user_id': 7, 'trades': [[trade_id, 'created' | 'edited' | 'deleted'], ...],
+     'dates': ['2024-05-02', ...] or None (whole history)}
+
+Notices are collected on the session while the transaction runs (a
+trade_writes handler for dates, a session after_flush listener for trade ids)
+and published from the session after_commit event, once the write is visible
+to other connections, so a rolled-back write never reaches a client. The /api/dashboard/stream SSE endpoint turns a notice into
+delta events; clients never re-download the full analytics payload.
+
+The broker is chosen by LIVE_UPDATES_BROKER:
+  - 'memory' (default): in-process pub/sub; only subscribers in the worker
+    that committed the write are told
+  - 'sqlite': notices go through a SQLite file under LIVE_UPDATES_DIR
+    (default instance/live_updates) that a poller thread in every worker
+    fans out to its local subscribers, for multi-worker gunicorn
+Streams hold a worker thread each, so run threaded or gevent workers.
+"""
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.models import Trade, EntryPoint, ExitPoint
+from app.utils.trade_writes import add_trade_write_handler
+
+_PENDING_KEY = 'live_updates_pending'
+
+# Sent to a subscriber that fell too far behind: reload instead of applying deltas
+RESYNC = {'resync': True}
+
+
+class Subscription:
+    """One stream's queue of change notices for a user."""
+
+    def __init__(self, user_id, max_pending=100):
+        self.user_id = user_id
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def put(self, notice):
+        try:
+            self._queue.put_nowait(notice)
+        except queue.Full:
+            # Drop the backlog; the client reloads once instead of replaying it
+            with self._queue.mutex:
+                self._queue.queue.clear()
+            self._queue.put_nowait(RESYNC)
+
+    def get(self, timeout=None):
+        """Next notice, or None after timeout seconds without one."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class InProcessBroker:
+    """Pub/sub between the threads of one worker process."""
+
+    def __init__(self):
+        self._subscriptions = {}  # {user_id: set of Subscription}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, notice):
+        self.deliver(notice)
+
+    def deliver(self, notice):
+        """Hand a notice to this process's subscribers of its user."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(notice['user_id'], ()))
+        for subscription in subscriptions:
+            subscription.put(notice)
+
+
+class SQLiteFanoutBroker(InProcessBroker):
+    """Publishes through a SQLite file that every worker polls, so all workers' subscribers are told."""
+
+    def __init__(self, path, poll_interval=1.0, retention_seconds=300):
+        super().__init__()
+        self._path = path
+        self._poll_interval = poll_interval
+        self._retention = retention_seconds
+        self._poller_pid = None
+        self._poller_lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS notice '
+                               '(id INTEGER PRIMARY KEY AUTOINCREMENT, created_at REAL NOT NULL, '
+                               'payload TEXT NOT NULL)')
+
+    def _connect(self):
+        return sqlite3.connect(self._path, timeout=5)
+
+    def publish(self, notice):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute('INSERT INTO notice (created_at, payload) VALUES (?, ?)',
+                               (now, json.dumps(notice)))
+            connection.execute('DELETE FROM notice WHERE created_at < ?', (now - self._retention,))
+
+    def subscribe(self, user_id):
+        self._ensure_poller()
+        return super().subscribe(user_id)
+
+    def _ensure_poller(self):
+        # Started on first use in each process: threads do not survive a gunicorn fork
+        with self._poller_lock:
+            if self._poller_pid == os.getpid():
+                return
+            self._poller_pid = os.getpid()
+            with self._connect() as connection:
+                last_id = connection.execute('SELECT COALESCE(MAX(id), 0) FROM notice').fetchone()[0]
+            threading.Thread(target=self._poll, args=(last_id,), name='live-updates-poller',
+                             daemon=True).start()
+
+    def _poll(self, last_id):
+        while True:
+            time.sleep(self._poll_interval)
+            try:
+                with self._connect() as connection:
+                    rows = connection.execute('SELECT id, payload FROM notice WHERE id > ? ORDER BY id',
+                                              (last_id,)).fetchall()
+            except sqlite3.Error:
+                continue
+            for notice_id, payload in rows:
+                last_id = notice_id
+                self.deliver(json.loads(payload))
+
+
+class LiveUpdates:
+    """Collects per-transaction change notices and publishes them on commit."""
+
+    def __init__(self):
+        self.broker = InProcessBroker()
+
+    def init_app(self, app):
+        """Pick the broker from LIVE_UPDATES_BROKER and start collecting notices (idempotent)."""
+        broker_type = app.config.get('LIVE_UPDATES_BROKER', 'memory')
+        if broker_type == 'sqlite':
+            directory = app.config.get('LIVE_UPDATES_DIR', os.path.join(app.instance_path, 'live_updates'))
+            os.makedirs(directory, exist_ok=True)
+            self.broker = SQLiteFanoutBroker(os.path.join(directory, 'live_updates.sqlite'),
+                                             float(app.config.get('LIVE_UPDATES_POLL_SECONDS', 1.0)))
+        elif broker_type != 'memory':
+            raise ValueError(f"Unknown LIVE_UPDATES_BROKER: {broker_type!r}")
+
+        add_trade_write_handler(_note_dates, ('trade_date', 'user_id'))
+        for target, name, listener in ((Session, 'after_flush', _note_trades),
+                                       (Engine, 'begin', _forget_pending),
+                                       (Session, 'after_begin', _share_pending),
+                                       (Session, 'after_rollback', _discard_pending),
+                                       (Session, 'after_commit', self._publish_pending)):
+            if not event.contains(target, name, listener):
+                event.listen(target, name, listener)
+
+    def subscribe(self, user_id):
+        return self.broker.subscribe(user_id)
+
+    def unsubscribe(self, subscription):
+        self.broker.unsubscribe(subscription)
+
+    def _publish_pending(self, session):
+        if session.in_nested_transaction():
+            return  # a released savepoint; the outer transaction publishes
+        pending = session.info.pop(_PENDING_KEY, None)
+        for user_id, change in (pending or {}).items():
+            dates = change['dates']
+            self.broker.publish({
+                'user_id': user_id,
+                'trades': [[trade_id, action] for trade_id, action in change['trades'].items()],
+                'dates': None if dates is None else sorted(day.isoformat() for day in dates),
+            })
+
+
+def _pending(info, user_id):
+    return info.setdefault(_PENDING_KEY, {}).setdefault(user_id, {'trades': {}, 'dates': set()})
+
+
+def _share_pending(session, transaction, connection):
+    """Point the connection at the session's notices, so trade_writes handlers add to them."""
+    connection.info[_PENDING_KEY] = session.info.setdefault(_PENDING_KEY, {})
+
+
+def _note_dates(connection, changes):
+    """trade_writes handler: remember which (user, date)s this transaction touched."""
+    for user_id, dates in changes.items():
+        change = _pending(connection.info, user_id)
+        if dates is None or change['dates'] is None:
+            change['dates'] = None
+        else:
+            change['dates'] |= dates
+
+
+def _note_trades(session, flush_context):
+    """Remember which trades this flush created, edited or deleted."""
+    actions = {}  # {trade_id: (user_id, action)}
+    for trade in session.new:
+        if isinstance(trade, Trade):
+            actions[trade.id] = (trade.user_id, 'created')
+    for trade in session.deleted:
+        if isinstance(trade, Trade):
+            actions[trade.id] = (trade.user_id, 'deleted')
+
+    edited = {trade.id for trade in session.dirty if isinstance(trade, Trade) and session.is_modified(trade)}
+    edited |= {point.trade_id for point in (*session.new, *session.dirty, *session.deleted)
+               if isinstance(point, (EntryPoint, ExitPoint)) and point.trade_id is not None}
+    edited -= actions.keys()
+    connection = session.connection()
+    if edited:
+        trade = Trade.__table__
+        for trade_id, user_id in connection.execute(
+                sa.select(trade.c.id, trade.c.user_id).where(trade.c.id.in_(edited))):
+            actions[trade_id] = (user_id, 'edited')
+
+    for trade_id, (user_id, action) in actions.items():
+        trades = _pending(session.info, user_id)['trades']
+        # created-then-edited in one transaction is still a creation
+        if trades.get(trade_id) != 'created' or action == 'deleted':
+            trades[trade_id] = action
+
+
+def _forget_pending(connection):
+    # A pooled connection may still point at an earlier session's notices
+    connection.info.pop(_PENDING_KEY, None)
+
+
+def _discard_pending(session):
+    if session.in_nested_transaction():
+        return  # a rolled-back savepoint; re-sending its dates is harmless, dropping the outer ones is not
+    session.info.pop(_PENDING_KEY, None)
+
+
+live_updates = LiveUpdates()
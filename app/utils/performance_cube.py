@@ -0,0 +1,96 @@
+# app/utils/performance_cube.py
+"""
+Multi-dimensional performance cube.
+
+query_cube() slices a user's trades with a P&L by any combination of
+DIMENSIONS - model, instrument, direction, weekday, entry hour, session,
+tag - in one SQL GROUP BY. Weekday, hour and session are precomputed Trade
+columns (see compute_trade_aggregates), so no per-row date functions run.
+The result is columnar: one list per dimension and per measure, all the
+same length, which keeps the JSON small.
+
+cached_cube() caches results in analytics_cache under (user, data version,
+dimensions, filter spec hash); a trade write bumps the data version, so
+cached cubes never go stale.
+"""
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.models import Trade, TradingModel, Instrument, Tag, trade_tags
+from app.utils.analytics_cache import analytics_cache
+from app.utils.data_version import get_data_version
+
+# {dimension name: SQL expression}; model / instrument / tag add the joins below
+DIMENSIONS = {
+    'model': TradingModel.name,
+    'instrument': sa.func.coalesce(Instrument.symbol, Trade.instrument_legacy),
+    'direction': Trade.direction,
+    'weekday': Trade.entry_weekday,  # 0=Monday
+    'hour': Trade.entry_hour,
+    'session': Trade.trading_session,
+    'tag': Tag.name,  # a trade with several tags counts once per tag
+}
+
+MEASURES = ('trades', 'wins', 'losses', 'gross_profit', 'gross_loss', 'net_pnl', 'sum_r', 'r_trades')
+
+
+def parse_dimensions(value):
+    """'model,hour' -> ('model', 'hour'); raises ValueError on unknown or repeated names."""
+    names = tuple(name.strip() for name in (value or '').split(',') if name.strip())
+    unknown = [name for name in names if name not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}. "
+                         f"Choose from {', '.join(DIMENSIONS)}.")
+    if len(set(names)) != len(names):
+        raise ValueError("Each dimension can be used once.")
+    return names
+
+
+def query_cube(user_id, dimensions, filter_spec=None):
+    """
+    Group user_id's trades with a P&L (narrowed by an optional TradeFilterSpec)
+    by dimensions. Returns {'dimensions', 'rows', 'columns': {name: [...]}}
+    with a column per dimension and per MEASURES entry, ordered by the
+    dimension values.
+    """
+    keys = [DIMENSIONS[name].label(name) for name in dimensions]
+    pnl = Trade.pnl
+    query = sa.select(
+        *keys,
+        sa.func.count(Trade.id).label('trades'),
+        sa.func.sum(sa.case((pnl > 0, 1), else_=0)).label('wins'),
+        sa.func.sum(sa.case((pnl < 0, 1), else_=0)).label('losses'),
+        sa.func.sum(sa.case((pnl > 0, pnl), else_=0.0)).label('gross_profit'),
+        sa.func.sum(sa.case((pnl < 0, -pnl), else_=0.0)).label('gross_loss'),
+        sa.func.sum(pnl).label('net_pnl'),
+        sa.func.coalesce(sa.func.sum(Trade.pnl_in_r), 0.0).label('sum_r'),
+        sa.func.count(Trade.pnl_in_r).label('r_trades'),
+    ).select_from(Trade).where(Trade.user_id == user_id, pnl.isnot(None))
+
+    if 'model' in dimensions:
+        query = query.outerjoin(TradingModel, TradingModel.id == Trade.trading_model_id)
+    if 'instrument' in dimensions:
+        query = query.outerjoin(Instrument, Instrument.id == Trade.instrument_id)
+    if 'tag' in dimensions:
+        # An alias, so a tag filter's EXISTS over trade_tags does not correlate to this join
+        link = trade_tags.alias()
+        query = query.outerjoin(link, link.c.trade_id == Trade.id) \
+            .outerjoin(Tag, Tag.id == link.c.tag_id)
+    if filter_spec is not None:
+        query = filter_spec.apply(query)
+
+    rows = db.session.execute(query.group_by(*keys).order_by(*keys)).all()
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(dimensions)}
+    for i, name in enumerate(MEASURES, start=len(dimensions)):
+        cast = int if name in ('trades', 'wins', 'losses', 'r_trades') else float
+        columns[name] = [cast(row[i] or 0) for row in rows]
+    return {'dimensions': list(dimensions), 'rows': len(rows), 'columns': columns}
+
+
+def cached_cube(user_id, dimensions, filter_spec=None):
+    """query_cube() result plus its data 'version', from analytics_cache when current."""
+    version = get_data_version(user_id)
+    key = (tuple(dimensions), filter_spec.spec_hash if filter_spec else None)
+    return analytics_cache.get_or_compute(
+        user_id, 'cube', key,
+        lambda: dict(query_cube(user_id, dimensions, filter_spec), version=version), version=version)
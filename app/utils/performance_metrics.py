@@ -0,0 +1,310 @@
+# app/utils/performance_metrics.py
+"""
+Vectorized trading performance metrics.
+
+One implementation of the metric set that the dashboard, model detail page,
+performance PDF and backtests report - profit factor, expectancy, SQN, Sharpe,
+skewness / kurtosis, drawdown, streaks and daily win rates - computed from a
+P&L array (and optionally the matching trade dates) in NumPy passes instead of
+per-trade Python loops.
+
+Conventions shared by every caller:
+  - P&L is taken in the order given; equity starts at 0, so the drawdown peak
+    is never below 0.
+  - Standard deviation is the sample (n-1) deviation; skewness / kurtosis are
+    the moment ratios against it (kurtosis is excess kurtosis).
+  - Streaks skip breakeven trades: a breakeven neither extends nor ends a
+    winning or losing streak.
+  - avg_loss, gross_loss and largest_loss are positive magnitudes.
+
+benchmark() times compute_performance_metrics against the loop implementation
+it replaced (see `flask benchmark-metrics`).
+"""
+import math
+import statistics
+import time
+from collections import defaultdict
+
+import numpy as np
+
+
+def _as_array(values):
+    array = np.asarray(values, dtype=np.float64)
+    return array[~np.isnan(array)] if array.size else array
+
+
+def _mean(values):
+    return float(values.mean()) if values.size else 0.0
+
+
+def _median(values):
+    return float(np.median(values)) if values.size else 0.0
+
+
+def run_lengths(flags):
+    """Lengths of the runs of consecutive True values in a boolean array."""
+    flags = np.asarray(flags, dtype=bool)
+    if not flags.size:
+        return np.zeros(0, dtype=np.int64)
+    edges = np.diff(np.concatenate(([0], flags.view(np.int8), [0])))
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def equity_curve(pnl):
+    """Cumulative P&L after each trade."""
+    return np.cumsum(_as_array(pnl))
+
+
+def drawdown_series(pnl):
+    """Drawdown after each trade: running peak (starting at 0) minus equity."""
+    equity = equity_curve(pnl)
+    return np.maximum.accumulate(np.maximum(equity, 0.0)) - equity if equity.size else equity
+
+
+def skewness(values):
+    """Skewness (moment ratio against the sample standard deviation); 0 below 3 values."""
+    values = _as_array(values)
+    if values.size < 3:
+        return 0.0
+    std = values.std(ddof=1)
+    if std == 0:
+        return 0.0
+    return float((((values - values.mean()) / std) ** 3).sum() / values.size)
+
+
+def kurtosis(values):
+    """Excess kurtosis (moment ratio against the sample standard deviation); 0 below 4 values."""
+    values = _as_array(values)
+    if values.size < 4:
+        return 0.0
+    std = values.std(ddof=1)
+    if std == 0:
+        return 0.0
+    return float((((values - values.mean()) / std) ** 4).sum() / values.size - 3)
+
+
+def _drawdown_metrics(pnl):
+    equity = np.cumsum(pnl)
+    running_peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+    drawdowns = running_peak - equity
+
+    # A drawdown period ends when equity makes a new high (strictly above the previous peak)
+    previous_peak = np.concatenate(([0.0], running_peak[:-1]))
+    new_high = equity > previous_peak
+    period = np.cumsum(new_high)
+    durations = np.bincount(period, weights=drawdowns > 0).astype(np.int64)
+    durations = durations[durations > 0]
+
+    # Run-up: rise from the lowest equity since the last new high (trough starts at 0).
+    # Segmented running minimum: shifting each period down by more than the equity
+    # range makes the period's first value a new global minimum.
+    base = np.concatenate(([0.0], equity))
+    base_period = np.concatenate(([0], period))
+    shift = float(np.ptp(base)) + 1.0
+    troughs = np.minimum.accumulate(base - base_period * shift) + base_period * shift
+    runups = base - troughs
+
+    in_drawdown = drawdowns[drawdowns > 0]
+    return {
+        'max_drawdown': float(drawdowns.max()),
+        'median_drawdown': _median(in_drawdown),
+        'avg_drawdown': _mean(in_drawdown),
+        'drawdown_periods': int(durations.size),
+        'longest_drawdown_duration': int(durations.max()) if durations.size else 0,
+        'median_drawdown_duration': _median(durations),
+        'max_runup': float(runups.max()),
+        'peak_equity': float(equity.max()),
+        'final_equity': float(equity[-1]),
+    }
+
+
+def _streak_metrics(pnl):
+    decided = pnl[pnl != 0]  # breakevens neither extend nor end a streak
+    win_runs = run_lengths(decided > 0)
+    loss_runs = run_lengths(decided < 0)
+    return {
+        'max_consecutive_wins': int(win_runs.max()) if win_runs.size else 0,
+        'max_consecutive_losses': int(loss_runs.max()) if loss_runs.size else 0,
+        'median_win_streak': _median(win_runs),
+        'median_loss_streak': _median(loss_runs),
+        'avg_win_streak': _mean(win_runs),
+        'avg_loss_streak': _mean(loss_runs),
+        'win_streak_count': int(win_runs.size),
+        'loss_streak_count': int(loss_runs.size),
+    }
+
+
+def daily_metrics(pnl, dates):
+    """Per-day win/loss metrics; dates is an array aligned with pnl (any sortable type)."""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    keep = ~np.isnan(pnl)
+    pnl = pnl[keep]
+    dates = np.asarray(dates)[keep]
+
+    days, day_index = np.unique(dates, return_inverse=True)
+    day_index = day_index.ravel()
+    day_pnl = np.bincount(day_index, weights=pnl, minlength=len(days))
+    total_days = len(days)
+    total_wins = int((pnl > 0).sum())
+
+    win_days = int((day_pnl > 0).sum())
+    return {
+        'trading_days': total_days,
+        'win_days': win_days,
+        'loss_days': int((day_pnl < 0).sum()),
+        'daily_win_rate': win_days / total_days * 100 if total_days else 0.0,
+        'avg_wins_per_day': total_wins / total_days if total_days else 0.0,
+        'daily_expectancy': float(day_pnl.sum()) / total_days if total_days else 0.0,
+    }
+
+
+def compute_performance_metrics(pnl, dates=None):
+    """
+    Full metric set for a P&L series (NaN / missing P&L is dropped).
+
+    Returns a dict of plain floats / ints, unrounded. Rates are percentages.
+    With `dates` (aligned with pnl) the daily_metrics() keys are included.
+    """
+    raw = np.asarray(pnl, dtype=np.float64)
+    values = _as_array(raw)
+    n = int(values.size)
+
+    wins = values[values > 0]
+    losses = values[values < 0]
+    gross_profit = float(wins.sum())
+    gross_loss = abs(float(losses.sum()))
+    win_rate = wins.size / n * 100 if n else 0.0
+    loss_rate = losses.size / n * 100 if n else 0.0
+    avg_win = _mean(wins)
+    avg_loss = abs(_mean(losses))
+    average_trade = _mean(values)
+    std_dev = float(values.std(ddof=1)) if n > 1 else 0.0
+    downside_deviation = float(losses.std(ddof=1)) if losses.size > 1 else 0.0
+
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float('inf') if gross_profit > 0 else 0.0
+
+    metrics = {
+        'total_trades': n,
+        'winning_trades': int(wins.size),
+        'losing_trades': int(losses.size),
+        'breakeven_trades': n - int(wins.size) - int(losses.size),
+        'net_pnl': float(values.sum()),
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'win_rate': win_rate,
+        'loss_rate': loss_rate,
+        'profit_factor': profit_factor,
+        'average_trade': average_trade,
+        'median_trade': _median(values),
+        'avg_win': avg_win,
+        'avg_loss': avg_loss,
+        'largest_win': float(wins.max()) if wins.size else 0.0,
+        'largest_loss': float(-losses.min()) if losses.size else 0.0,
+        'best_trade': float(values.max()) if n else 0.0,
+        'worst_trade': float(values.min()) if n else 0.0,
+        'expectancy': win_rate / 100 * avg_win - (100 - win_rate) / 100 * avg_loss,
+        'std_dev': std_dev,
+        'downside_deviation': downside_deviation,
+        'sharpe_ratio': average_trade / std_dev if std_dev > 0 else 0.0,
+        'sortino_ratio': average_trade / downside_deviation if downside_deviation > 0 else 0.0,
+        'sqn': average_trade / std_dev * math.sqrt(n) if std_dev > 0 else 0.0,
+        'skewness': skewness(values),
+        'kurtosis': kurtosis(values),
+    }
+
+    if n:
+        metrics.update(_drawdown_metrics(values))
+        metrics.update(_streak_metrics(values))
+    else:
+        metrics.update({key: 0 for key in (
+            'max_drawdown', 'median_drawdown', 'avg_drawdown', 'drawdown_periods', 'longest_drawdown_duration',
+            'median_drawdown_duration', 'max_runup', 'peak_equity', 'final_equity',
+            'max_consecutive_wins', 'max_consecutive_losses', 'median_win_streak', 'median_loss_streak',
+            'avg_win_streak', 'avg_loss_streak', 'win_streak_count', 'loss_streak_count')})
+
+    if dates is not None:
+        metrics.update(daily_metrics(raw, dates))
+    return metrics
+
+
+# ----------------------------------------------------------------------
+# Micro-benchmark
+# ----------------------------------------------------------------------
+
+def _loop_metrics(pnl, dates):
+    """The per-trade loop implementation compute_performance_metrics replaced."""
+    total_pnl = sum(pnl)
+    winning = [p for p in pnl if p > 0]
+    losing = [p for p in pnl if p < 0]
+    gross_profit = sum(winning)
+    gross_loss = abs(sum(losing))
+    std_dev = statistics.stdev(pnl) if len(pnl) > 1 else 0
+    mean = statistics.mean(pnl)
+
+    running_total, peak, max_drawdown = 0, 0, 0
+    for p in pnl:
+        running_total += p
+        peak = max(peak, running_total)
+        max_drawdown = max(max_drawdown, peak - running_total)
+
+    win_streak = loss_streak = max_win_streak = max_loss_streak = 0
+    for p in pnl:
+        if p > 0:
+            win_streak, loss_streak = win_streak + 1, 0
+        elif p < 0:
+            loss_streak, win_streak = loss_streak + 1, 0
+        max_win_streak = max(max_win_streak, win_streak)
+        max_loss_streak = max(max_loss_streak, loss_streak)
+
+    daily = defaultdict(float)
+    for p, day in zip(pnl, dates):
+        daily[day] += p
+
+    return {
+        'net_pnl': total_pnl,
+        'profit_factor': gross_profit / gross_loss if gross_loss else 0,
+        'sqn': mean / std_dev * math.sqrt(len(pnl)) if std_dev else 0,
+        'skewness': sum(((x - mean) / std_dev) ** 3 for x in pnl) / len(pnl) if std_dev else 0,
+        'max_drawdown': max_drawdown,
+        'max_consecutive_wins': max_win_streak,
+        'max_consecutive_losses': max_loss_streak,
+        'win_days': sum(1 for v in daily.values() if v > 0),
+    }
+
+
+def benchmark(sizes=(1_000, 10_000, 100_000), repeat=3, seed=42):
+    """
+    Time loop vs vectorized metrics on synthetic P&L of each size.
+
+    Returns a list of dicts (trades, loop_ms, vectorized_ms, speedup, max_diff)
+    where max_diff is the largest absolute difference over the shared metrics.
+    """
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        pnl = np.round(rng.normal(25, 250, size), 2)
+        dates = np.sort(rng.integers(0, max(size // 3, 1), size)).astype('datetime64[D]')
+        pnl_list, date_list = pnl.tolist(), dates.tolist()
+
+        loop_times, vector_times = [], []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            reference = _loop_metrics(pnl_list, date_list)
+            loop_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            metrics = compute_performance_metrics(pnl, dates)
+            vector_times.append(time.perf_counter() - started)
+
+        loop_ms, vector_ms = min(loop_times) * 1000, min(vector_times) * 1000
+        results.append({
+            'trades': size,
+            'loop_ms': loop_ms,
+            'vectorized_ms': vector_ms,
+            'speedup': loop_ms / vector_ms if vector_ms else float('inf'),
+            'max_diff': max(abs(reference[key] - metrics[key]) for key in reference),
+        })
+    return results
@@ -0,0 +1,192 @@
+# app/utils/trade_filters.py
+"""
+Single trade-filter compiler shared by the trades list, exports and reports.
+
+TradeFilterSpec.from_request() normalizes TradeFilterForm fields and the extra
+request args (how_closed, pnl_filter, min/max P&L, contracts, rating, DCA, tags)
+into an immutable, hashable spec. spec.apply(query) emits the SQL, and
+spec.spec_hash identifies the result set so it can be cached and reused
+between the list view and a following export.
+"""
+import hashlib
+import json
+from datetime import datetime
+
+from flask import request
+
+from app.extensions import db
+from app.models import Trade, EntryPoint, trade_tags
+
+
+def average_rating_expression():
+    """SQL average of the non-null 1-5 ratings on a trade (NULL when unrated)."""
+    ratings = [Trade.preparation_rating, Trade.rules_rating, Trade.management_rating,
+               Trade.target_rating, Trade.entry_rating]
+    rated_count = sum(db.case((rating.isnot(None), 1), else_=0) for rating in ratings)
+    rating_total = sum(db.func.coalesce(rating, 0) for rating in ratings)
+    return rating_total * 1.0 / db.func.nullif(rated_count, 0)
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(str(value).strip(), '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+
+def _parse_number(value, cast):
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_tag_ids(values):
+    """Tag ids from repeated and/or comma-separated args, sorted and de-duplicated."""
+    tag_ids = set()
+    for value in values:
+        for part in (value or '').split(','):
+            part = part.strip()
+            if part.isdigit():
+                tag_ids.add(int(part))
+    return tuple(sorted(tag_ids))
+
+
+class TradeFilterSpec:
+    """Normalized, hashable description of a trade filter."""
+
+    FIELDS = ('start_date', 'end_date', 'instrument_id', 'instrument_symbol', 'direction',
+              'trading_model_id', 'how_closed', 'pnl_filter', 'min_pnl', 'max_pnl',
+              'min_contracts', 'max_contracts', 'min_rating', 'is_dca', 'dca_only', 'tag_ids')
+
+    PNL_FILTERS = ('winners', 'losers', 'breakeven')
+
+    def __init__(self, **values):
+        unknown = set(values) - set(self.FIELDS)
+        if unknown:
+            raise TypeError(f"Unknown trade filter fields: {', '.join(sorted(unknown))}")
+        for field in self.FIELDS:
+            object.__setattr__(self, field, values.get(field))
+        if self.tag_ids is None:
+            object.__setattr__(self, 'tag_ids', ())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TradeFilterSpec is immutable")
+
+    @classmethod
+    def from_request(cls, request_args=None):
+        """Build a spec from request args (the same args TradeFilterForm reads)."""
+        if request_args is None:
+            request_args = request.args
+
+        instrument = (request_args.get('instrument') or '').strip()
+        trading_model_id = _parse_number(request_args.get('trading_model_id'), int)
+        pnl_filter = request_args.get('pnl_filter')
+        is_dca = request_args.get('is_dca')
+
+        return cls(
+            start_date=_parse_date(request_args.get('start_date')),
+            end_date=_parse_date(request_args.get('end_date')),
+            # Instrument: numeric values are Instrument ids, anything else is a legacy symbol
+            instrument_id=int(instrument) if instrument.isdigit() else None,
+            instrument_symbol=instrument if instrument and not instrument.isdigit() else None,
+            direction=request_args.get('direction') or None,
+            trading_model_id=trading_model_id or None,
+            how_closed=request_args.get('how_closed') or None,
+            pnl_filter=pnl_filter if pnl_filter in cls.PNL_FILTERS else None,
+            min_pnl=_parse_number(request_args.get('min_pnl'), float),
+            max_pnl=_parse_number(request_args.get('max_pnl'), float),
+            min_contracts=_parse_number(request_args.get('min_contracts'), int),
+            max_contracts=_parse_number(request_args.get('max_contracts'), int),
+            min_rating=_parse_number(request_args.get('min_rating'), int),
+            is_dca={'true': True, 'false': False}.get(is_dca),
+            dca_only=True if request_args.get('dca_only') == 'true' else None,
+            tag_ids=_parse_tag_ids(request_args.getlist('tags') + request_args.getlist('selected_tags')),
+        )
+
+    def key(self):
+        return tuple((field, getattr(self, field)) for field in self.FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, TradeFilterSpec) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"<TradeFilterSpec {self.active_filters}>"
+
+    @property
+    def active_filters(self):
+        """Only the filters that are set, for labelling exports and logs."""
+        return {field: getattr(self, field) for field in self.FIELDS
+                if getattr(self, field) not in (None, ())}
+
+    @property
+    def is_empty(self):
+        return not self.active_filters
+
+    @property
+    def spec_hash(self):
+        """Stable short hash of the spec (identical across processes)."""
+        canonical = json.dumps(self.active_filters, sort_keys=True, default=str)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+    def apply(self, query):
+        """Apply the spec to a Trade query."""
+        if self.start_date:
+            query = query.filter(Trade.trade_date >= self.start_date)
+        if self.end_date:
+            query = query.filter(Trade.trade_date <= self.end_date)
+        if self.instrument_id is not None:
+            query = query.filter(Trade.instrument_id == self.instrument_id)
+        elif self.instrument_symbol:
+            query = query.filter(Trade.instrument_legacy == self.instrument_symbol)
+        if self.direction:
+            query = query.filter(Trade.direction == self.direction)
+        if self.trading_model_id:
+            query = query.filter(Trade.trading_model_id == self.trading_model_id)
+        if self.how_closed:
+            query = query.filter(Trade.how_closed == self.how_closed)
+
+        if self.pnl_filter == 'winners':
+            query = query.filter(Trade.pnl > 0)
+        elif self.pnl_filter == 'losers':
+            query = query.filter(Trade.pnl < 0)
+        elif self.pnl_filter == 'breakeven':
+            query = query.filter(Trade.pnl == 0)
+        if self.min_pnl is not None:
+            query = query.filter(Trade.pnl >= self.min_pnl)
+        if self.max_pnl is not None:
+            query = query.filter(Trade.pnl <= self.max_pnl)
+
+        # Contract totals are stored on the trade; no per-request GROUP BY needed
+        if self.min_contracts is not None:
+            query = query.filter(Trade.total_contracts_entered >= self.min_contracts)
+        if self.max_contracts is not None:
+            query = query.filter(Trade.total_contracts_entered <= self.max_contracts)
+
+        if self.min_rating is not None:
+            query = query.filter(average_rating_expression() >= self.min_rating)
+
+        if self.is_dca is not None:
+            query = query.filter(Trade.is_dca == self.is_dca)
+        if self.dca_only:
+            # Trades scaled in over more than one entry
+            entry_counts = db.session.query(
+                EntryPoint.trade_id,
+                db.func.count(EntryPoint.id).label('entry_count')
+            ).group_by(EntryPoint.trade_id).subquery()
+            query = query.join(entry_counts, Trade.id == entry_counts.c.trade_id) \
+                .filter(entry_counts.c.entry_count > 1)
+
+        # AND logic: one EXISTS per selected tag against the association table
+        for tag_id in self.tag_ids:
+            query = query.filter(db.exists().where(
+                trade_tags.c.trade_id == Trade.id, trade_tags.c.tag_id == tag_id))
+
+        return query
@@ -0,0 +1,313 @@
+# app/utils/trade_frame.py
+"""
+Columnar snapshot of a user's trades for the analytics code paths.
+
+Dashboard stats, model analytics, report charts and the performance PDF used to
+load lists of ORM Trade objects and walk them attribute by attribute, touching
+lazy relationships (trading_model, instrument_obj, entries, exits) per trade.
+TradeFrame loads everything those paths read with one Core SELECT - trade
+columns plus the stored entry/exit aggregates, model name, instrument symbol and
+first exit time - straight into NumPy arrays. No ORM objects or identity map
+are built; tags are one optional extra query.
+
+    frame = TradeFrame.for_user(user_id, filter_spec=spec)
+    pnl = frame.with_pnl()['pnl']            # float64 array
+    days = frame.daily()                      # per-day sums / counts
+
+Nullable numeric columns are float64 with NaN for NULL, timestamps are
+datetime64 with NaT, text columns are object arrays (None for NULL).
+"""
+import hashlib
+
+import numpy as np
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.models import Trade, TradingModel, Instrument, ExitPoint, Tag, trade_tags
+
+# IN-list size when loading a frame for explicit trade ids
+ID_CHUNK_SIZE = 5000
+
+FLOAT_COLUMNS = ('pnl', 'pnl_in_r', 'dollar_risk', 'mae_price', 'mfe_price', 'average_entry_price',
+                 'average_exit_price', 'initial_stop_loss', 'terminus_target', 'time_in_trade_seconds')
+INT_COLUMNS = ('id', 'total_contracts_entered', 'total_contracts_exited')
+TIMESTAMP_COLUMNS = ('entry_timestamp', 'exit_timestamp')
+OBJECT_COLUMNS = ('direction', 'instrument', 'model_name', 'how_closed', 'first_exit_time')
+
+
+def _frame_select():
+    """The single SELECT behind every TradeFrame (callers add WHERE / ORDER BY)."""
+    first_exit_time = sa.select(ExitPoint.exit_time) \
+        .where(ExitPoint.trade_id == Trade.id) \
+        .order_by(ExitPoint.id).limit(1) \
+        .correlate(Trade).scalar_subquery()
+
+    return sa.select(
+        Trade.id, Trade.trade_date, Trade.direction, Trade.how_closed,
+        Trade.pnl, Trade.pnl_in_r, Trade.dollar_risk, Trade.mae_price, Trade.mfe_price,
+        Trade.average_entry_price, Trade.average_exit_price, Trade.initial_stop_loss, Trade.terminus_target,
+        Trade.total_contracts_entered, Trade.total_contracts_exited,
+        Trade.entry_timestamp, Trade.exit_timestamp, Trade.time_in_trade_seconds,
+        Trade.trading_model_id,
+        TradingModel.name.label('model_name'),
+        sa.func.coalesce(Instrument.symbol, Trade.instrument_legacy).label('instrument'),
+        first_exit_time.label('first_exit_time'),
+    ).outerjoin(TradingModel, Trade.trading_model_id == TradingModel.id) \
+        .outerjoin(Instrument, Trade.instrument_id == Instrument.id)
+
+
+def _float_column(values):
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _object_column(values):
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def _plain(value):
+    """NumPy scalar -> Python value (object array items pass through)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class TradeFrame:
+    """Column arrays for a set of trades, one row per trade, in load order."""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_rows(cls, rows, tags=None):
+        """Build from result rows of _frame_select(); tags is {trade_id: (tag names)} or None."""
+        rows = list(rows)
+        columns = {
+            'id': np.array([r.id for r in rows], dtype=np.int64),
+            'trade_date': np.array([r.trade_date for r in rows], dtype='datetime64[D]'),
+            'trading_model_id': np.array([r.trading_model_id or 0 for r in rows], dtype=np.int64),  # 0 = no model
+        }
+        for name in FLOAT_COLUMNS:
+            columns[name] = _float_column([getattr(r, name) for r in rows])
+        for name in INT_COLUMNS[1:]:
+            columns[name] = np.array([getattr(r, name) or 0 for r in rows], dtype=np.int64)
+        for name in TIMESTAMP_COLUMNS:
+            columns[name] = np.array([getattr(r, name) for r in rows], dtype='datetime64[s]')
+        for name in OBJECT_COLUMNS:
+            columns[name] = _object_column([getattr(r, name) for r in rows])
+        if tags is not None:
+            columns['tags'] = _object_column([tuple(tags.get(r.id, ())) for r in rows])
+        return cls(columns)
+
+    @classmethod
+    def for_user(cls, user_id: int, filter_spec=None, trading_model_id: int = None,
+                 descending: bool = False, with_tags: bool = False) -> 'TradeFrame':
+        """
+        All of a user's trades ordered by (trade_date, id), optionally narrowed by a
+        TradeFilterSpec and/or a trading model. with_tags adds a 'tags' column.
+        """
+        statement = _frame_select().where(Trade.user_id == user_id)
+        if trading_model_id is not None:
+            statement = statement.where(Trade.trading_model_id == trading_model_id)
+        if filter_spec is not None:
+            trade_ids = filter_spec.apply(db.session.query(Trade.id).filter(Trade.user_id == user_id)).subquery()
+            statement = statement.where(Trade.id.in_(sa.select(trade_ids.c.id)))
+
+        if descending:
+            statement = statement.order_by(Trade.trade_date.desc(), Trade.id.desc())
+        else:
+            statement = statement.order_by(Trade.trade_date.asc(), Trade.id.asc())
+
+        rows = db.session.execute(statement).all()
+        tags = cls._load_tags([r.id for r in rows]) if with_tags else None
+        return cls.from_rows(rows, tags)
+
+    @classmethod
+    def for_trades(cls, trades, with_tags: bool = False) -> 'TradeFrame':
+        """Frame for already-loaded Trade objects (or trade ids), in the given order."""
+        trade_ids = [getattr(trade, 'id', trade) for trade in trades]
+        by_id = {}
+        for start in range(0, len(trade_ids), ID_CHUNK_SIZE):
+            chunk = trade_ids[start:start + ID_CHUNK_SIZE]
+            for row in db.session.execute(_frame_select().where(Trade.id.in_(chunk))):
+                by_id[row.id] = row
+        rows = [by_id[trade_id] for trade_id in trade_ids if trade_id in by_id]
+        tags = cls._load_tags(trade_ids) if with_tags else None
+        return cls.from_rows(rows, tags)
+
+    @classmethod
+    def coerce(cls, trades, with_tags: bool = False) -> 'TradeFrame':
+        """Pass a TradeFrame through; load one for a list of Trade objects."""
+        if isinstance(trades, cls):
+            return trades
+        return cls.for_trades(trades or [], with_tags=with_tags)
+
+    @staticmethod
+    def _load_tags(trade_ids):
+        tags = {}
+        for start in range(0, len(trade_ids), ID_CHUNK_SIZE):
+            chunk = trade_ids[start:start + ID_CHUNK_SIZE]
+            for trade_id, name in db.session.execute(
+                    sa.select(trade_tags.c.trade_id, Tag.name)
+                    .join(Tag, Tag.id == trade_tags.c.tag_id)
+                    .where(trade_tags.c.trade_id.in_(chunk))
+                    .order_by(trade_tags.c.trade_id, Tag.name)):
+                tags.setdefault(trade_id, []).append(name)
+        return tags
+
+    # ------------------------------------------------------------------
+    # Column access
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getitem__(self, name) -> np.ndarray:
+        return self.columns[name]
+
+    def __contains__(self, name):
+        return name in self.columns
+
+    @property
+    def has_tags(self) -> bool:
+        return 'tags' in self.columns
+
+    def take(self, selector) -> 'TradeFrame':
+        """New frame with the rows picked by a boolean mask, index array or slice."""
+        return TradeFrame({name: values[selector] for name, values in self.columns.items()})
+
+    def with_pnl(self) -> 'TradeFrame':
+        """Only the trades that have a recorded P&L."""
+        return self.take(~np.isnan(self.columns['pnl']))
+
+    def chronological(self) -> 'TradeFrame':
+        """Rows ordered by (trade_date, id) ascending."""
+        return self.take(np.lexsort((self.columns['id'], self.columns['trade_date'])))
+
+    def labels(self, name, missing='Unknown') -> np.ndarray:
+        """Text column with NULLs replaced by `missing` (safe to group / sort)."""
+        values = self.columns[name].copy()
+        values[np.equal(values, None)] = missing
+        return values
+
+    def weekday(self) -> np.ndarray:
+        """Day of week per trade, 0=Monday."""
+        return (self.columns['trade_date'].astype(np.int64) - 4) % 7  # 1970-01-01 was a Thursday
+
+    def month(self) -> np.ndarray:
+        """trade_date truncated to the month (datetime64[M])."""
+        return self.columns['trade_date'].astype('datetime64[M]')
+
+    def entry_hour(self) -> np.ndarray:
+        """Hour of the first entry per trade, -1 where there is no entry."""
+        stamps = self.columns['entry_timestamp']
+        hours = (stamps.astype('datetime64[h]') - stamps.astype('datetime64[D]')).astype(np.int64)
+        return np.where(np.isnat(stamps), -1, hours)
+
+    def group_sums(self, keys):
+        """
+        Per-group P&L aggregates over the trades with a P&L.
+
+        keys is a column name or an array aligned with this frame. Returns
+        (group keys sorted ascending, dict of arrays: pnl, trades, wins, losses).
+        """
+        keys = self.columns[keys] if isinstance(keys, str) else np.asarray(keys)
+        has_pnl = ~np.isnan(self.columns['pnl'])
+        keys = keys[has_pnl]
+        pnl = self.columns['pnl'][has_pnl]
+
+        groups, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.ravel()
+        size = len(groups)
+        return groups, {
+            'pnl': np.bincount(inverse, weights=pnl, minlength=size),
+            'trades': np.bincount(inverse, minlength=size),
+            'wins': np.bincount(inverse, weights=pnl > 0, minlength=size).astype(np.int64),
+            'losses': np.bincount(inverse, weights=pnl < 0, minlength=size).astype(np.int64),
+        }
+
+    def daily(self):
+        """group_sums by trade_date: (datetime64[D] days, aggregates)."""
+        return self.group_sums('trade_date')
+
+    def group_stats(self, *keys):
+        """
+        Report breakdown over every trade, grouped by one or more keys (column
+        names or arrays aligned with this frame, without NULLs - see labels()).
+
+        Returns {group: stats} in ascending group order; group is a Python value
+        for one key, a tuple for several. stats has trades and contracts (all
+        trades) and pnl, wins, losses, breakevens, gross_profit, gross_loss,
+        best and worst (trades with a P&L; best / worst None if there are none).
+        """
+        if not len(self):
+            return {}
+        levels, codes = [], []
+        for key in keys:
+            level, code = np.unique(self.columns[key] if isinstance(key, str) else np.asarray(key),
+                                    return_inverse=True)
+            levels.append(level)
+            codes.append(code.ravel())
+        shape = tuple(len(level) for level in levels)
+        groups, inverse = np.unique(np.ravel_multi_index(codes, shape), return_inverse=True)
+        inverse = inverse.ravel()
+        size = len(groups)
+
+        pnl = self.columns['pnl']
+        has_pnl = ~np.isnan(pnl)
+        scored = np.where(has_pnl, pnl, 0.0)
+        best = np.full(size, -np.inf)
+        np.maximum.at(best, inverse[has_pnl], pnl[has_pnl])
+        worst = np.full(size, np.inf)
+        np.minimum.at(worst, inverse[has_pnl], pnl[has_pnl])
+
+        def total(weights):
+            return np.bincount(inverse, weights=weights, minlength=size)
+
+        columns = {
+            'trades': np.bincount(inverse, minlength=size),
+            'contracts': total(self.columns['total_contracts_entered']),
+            'pnl': total(scored),
+            'wins': total(scored > 0),
+            'losses': total(scored < 0),
+            'breakevens': total(has_pnl & (scored == 0)),
+            'gross_profit': total(np.where(scored > 0, scored, 0.0)),
+            'gross_loss': total(np.where(scored < 0, -scored, 0.0)),
+        }
+        counts = ('trades', 'contracts', 'wins', 'losses', 'breakevens')
+        indices = np.unravel_index(groups, shape)
+
+        stats = {}
+        for i in range(size):
+            group = tuple(_plain(level[index[i]]) for level, index in zip(levels, indices))
+            values = {name: int(column[i]) if name in counts else float(column[i])
+                      for name, column in columns.items()}
+            values['best'] = float(best[i]) if np.isfinite(best[i]) else None
+            values['worst'] = float(worst[i]) if np.isfinite(worst[i]) else None
+            stats[group[0] if len(keys) == 1 else group] = values
+        return stats
+
+    def to_dataframe(self):
+        """The frame as a pandas DataFrame (one column per array)."""
+        import pandas as pd
+        return pd.DataFrame({name: values for name, values in self.columns.items()})
+
+    # ------------------------------------------------------------------
+    # Hashing
+    # ------------------------------------------------------------------
+
+    def data_hash(self) -> str:
+        """Stable hash of every column (cache key component)."""
+        digest = hashlib.sha256()
+        for name in sorted(self.columns):
+            values = self.columns[name]
+            digest.update(name.encode('utf-8'))
+            digest.update(str(values.dtype).encode('ascii'))
+            if values.dtype == object:
+                digest.update(repr(values.tolist()).encode('utf-8'))
+            else:
+                digest.update(np.ascontiguousarray(values).tobytes())
+        return digest.hexdigest()
@@ -0,0 +1,441 @@
+# app/utils/trade_import.py
+"""
+Bulk CSV trade import.
+
+The whole file is parsed with vectorized pandas, instruments / trading models /
+tags are resolved from dictionaries loaded once per import, and the stored
+aggregates (contract totals, average prices, pnl, risk, R, timestamps) are
+computed column-wise with NumPy using the same rules as
+compute_trade_aggregates(). Valid rows are then written in chunks with
+executemany inserts: trades (with RETURNING ids), entry points, exit points and
+trade_tags links. Invalid rows are skipped and reported per row.
+
+Re-imports are idempotent: each row's content fingerprint (see
+compute_trade_fingerprint) is looked up once per chunk against the user's
+existing trades, so overlapping files only write the rows that are new.
+"""
+import io
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import sqlalchemy as sa
+
+from app.extensions import db
+from app.models import (Trade, EntryPoint, ExitPoint, Instrument, TradingModel, Tag, trade_tags,
+                        compute_trade_fingerprint, trading_session_for_hour)
+from app.utils.trade_writes import trades_written
+
+DEFAULT_CHUNK_SIZE = 1000
+DUPLICATE_MODES = ('skip', 'update')
+MAX_LEGS = 5
+
+# Headers from static/downloads/trades_import_template.csv
+HEADER_DATE = 'Date (Req: YYYY-MM-DD)'
+HEADER_INSTRUMENT = 'Instrument (Req)'
+HEADER_DIRECTION = 'Direction (Req)'
+HEADER_MODEL = 'Trading Model'
+HEADER_TAGS = 'Tags'
+HEADER_HOW_CLOSED = 'How Closed'
+HEADER_SL = 'Initial SL'
+HEADER_TP = 'Terminus Target'
+HEADER_MAE = 'MAE'
+HEADER_MFE = 'MFE'
+HEADER_NOTES = 'Trade Notes'
+
+# Leg headers: the first leg is marked "(Req)", later legs are optional
+LEG_HEADERS = {
+    'entry': (('Entry Time {i} (Req: HH:MM)', 'Entry Time {i} (HH:MM)'),
+              ('Entry Contracts {i} (Req)', 'Entry Contracts {i}'),
+              ('Entry Price {i} (Req)', 'Entry Price {i}')),
+    'exit': (('Exit Time {i} (Req: HH:MM)', 'Exit Time {i} (HH:MM)'),
+             ('Exit Contracts {i} (Req)', 'Exit Contracts {i}'),
+             ('Exit Price {i} (Req)', 'Exit Price {i}')),
+}
+
+
+@dataclass
+class ImportRowError:
+    row: int  # line number in the CSV file (header is line 1)
+    message: str
+
+
+@dataclass
+class TradeImportResult:
+    imported_count: int = 0
+    updated_count: int = 0
+    errors: list = field(default_factory=list)  # [ImportRowError] for skipped rows
+    warnings: list = field(default_factory=list)  # [ImportRowError] for imported rows with unresolved names
+    duplicates: list = field(default_factory=list)  # [ImportRowError] for rows matching an existing trade
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+
+class _RowErrors:
+    """Collects per-row error messages while validating whole columns at once."""
+
+    def __init__(self, index):
+        self.messages = pd.Series('', index=index, dtype=object)
+
+    def add(self, mask, message):
+        mask = mask & (self.messages == '')  # first error per row wins
+        self.messages[mask] = message
+
+    @property
+    def valid(self):
+        return self.messages == ''
+
+
+def _text(df, *names):
+    """First non-empty value across the candidate columns, stripped ('' when missing)."""
+    result = pd.Series('', index=df.index, dtype=object)
+    for name in names:
+        if name in df.columns:
+            result = result.where(result != '', df[name])
+    return result
+
+
+def _number(series):
+    return pd.to_numeric(series.where(series != ''), errors='coerce')
+
+
+def _time_seconds(series):
+    """HH:MM strings to seconds after midnight (NaN when blank or malformed)."""
+    parsed = pd.to_datetime(series.where(series != ''), format='%H:%M', errors='coerce')
+    return (parsed.dt.hour * 3600 + parsed.dt.minute * 60).astype(float)
+
+
+def _seconds_to_time(seconds):
+    return (pd.Timestamp(0) + pd.to_timedelta(seconds, unit='s')).time()
+
+
+def _read_legs(df, kind, errors):
+    """
+    (times, contracts, prices) as (rows x MAX_LEGS) float arrays, NaN for absent legs.
+
+    A leg is present when time, contracts and price are all filled; a present
+    leg with an unparseable value fails the whole row.
+    """
+    time_headers, contracts_headers, price_headers = LEG_HEADERS[kind]
+    shape = (len(df), MAX_LEGS)
+    times, contracts, prices = np.full(shape, np.nan), np.full(shape, np.nan), np.full(shape, np.nan)
+
+    for leg in range(MAX_LEGS):
+        i = leg + 1
+        time_str = _text(df, *(h.format(i=i) for h in time_headers))
+        contracts_str = _text(df, *(h.format(i=i) for h in contracts_headers))
+        price_str = _text(df, *(h.format(i=i) for h in price_headers))
+        present = (time_str != '') & (contracts_str != '') & (price_str != '')
+
+        leg_times = _time_seconds(time_str)
+        leg_contracts = _number(contracts_str)
+        leg_prices = _number(price_str)
+
+        errors.add(present & leg_times.isna(), f"{kind.title()} {i}: time must be HH:MM.")
+        errors.add(present & (leg_contracts.isna() | (leg_contracts % 1 != 0)),
+                   f"{kind.title()} {i}: contracts must be a whole number.")
+        errors.add(present & leg_prices.isna(), f"{kind.title()} {i}: price must be a number.")
+
+        present = present.to_numpy()
+        times[present, leg] = leg_times.to_numpy()[present]
+        contracts[present, leg] = leg_contracts.to_numpy()[present]
+        prices[present, leg] = leg_prices.to_numpy()[present]
+
+    return times, contracts, prices
+
+
+def _weighted_average(contracts, prices, totals):
+    weighted = np.nansum(contracts * prices, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(totals > 0, weighted / totals, np.nan)
+
+
+def _compute_aggregates(direction_sign, point_values, stop_losses, how_closed,
+                        entry_times, entry_contracts, entry_prices,
+                        exit_times, exit_contracts, exit_prices):
+    """Column-wise equivalent of compute_trade_aggregates() for the whole file."""
+    total_entered = np.nansum(entry_contracts, axis=1)
+    total_exited = np.nansum(exit_contracts, axis=1)
+    avg_entry = _weighted_average(entry_contracts, entry_prices, total_entered)
+    avg_exit = _weighted_average(exit_contracts, exit_prices, total_exited)
+
+    has_pv = ~np.isnan(point_values) & (point_values != 0)
+    can_price = has_pv & ~np.isnan(avg_entry) & ~np.isnan(avg_exit) & (total_exited > 0)
+    pnl = np.where(can_price,
+                   direction_sign * (avg_exit - avg_entry) * total_exited * np.nan_to_num(point_values), 0.0)
+
+    # First entry = earliest leg (first in file order on ties), as the model sorts them
+    rows = np.arange(len(entry_times))
+    first_leg = np.argmin(np.where(np.isnan(entry_times), np.inf, entry_times), axis=1)
+    first_time = entry_times[rows, first_leg]
+    first_contracts = np.nan_to_num(entry_contracts[rows, first_leg])
+    first_price = entry_prices[rows, first_leg]
+    last_exit_time = np.where(np.isnan(exit_times).all(axis=1), np.nan,
+                              np.nanmax(np.where(np.isnan(exit_times), -np.inf, exit_times), axis=1))
+
+    risk_points = direction_sign * (first_price - stop_losses)
+    can_risk = has_pv & ~np.isnan(stop_losses) & ~np.isnan(first_price)
+    dollar_risk = np.where(can_risk,
+                           np.where(risk_points > 0, risk_points * first_contracts * np.nan_to_num(point_values), 0.0),
+                           np.nan)
+
+    closed = ~how_closed.isin(['', 'Still Open']).to_numpy()
+    can_r = ~np.isnan(dollar_risk) & (np.nan_to_num(dollar_risk) != 0) & (total_exited > 0) & closed
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pnl_in_r = np.where(can_r, pnl / dollar_risk, np.nan)
+
+    return {
+        'total_contracts_entered': total_entered,
+        'total_contracts_exited': total_exited,
+        'average_entry_price': avg_entry,
+        'average_exit_price': avg_exit,
+        'pnl': pnl,
+        'dollar_risk': dollar_risk,
+        'pnl_in_r': pnl_in_r,
+        'first_entry_seconds': first_time,
+        'last_exit_seconds': last_exit_time,
+    }
+
+
+def _lookup_tables(user_id):
+    """Instruments, trading models and tags for the user, loaded once per import."""
+    instruments = {
+        symbol.upper(): (instrument_id, point_value)
+        for instrument_id, symbol, point_value in db.session.query(
+            Instrument.id, Instrument.symbol, Instrument.point_value).filter(Instrument.is_active == True)
+    }
+    models = dict(db.session.query(TradingModel.name, TradingModel.id)
+                  .filter(TradingModel.user_id == user_id))
+
+    tags = {}
+    # Default tags first so a personal tag with the same name takes precedence
+    for tag_id, name, owner_id in db.session.query(Tag.id, Tag.name, Tag.user_id) \
+            .filter(db.or_(Tag.is_default == True, Tag.user_id == user_id), Tag.is_active == True) \
+            .order_by(Tag.user_id.isnot(None)):
+        tags[name.strip().lower()] = tag_id
+    return instruments, models, tags
+
+
+def _none_if_nan(value):
+    if value is None:
+        return None
+    try:
+        return None if np.isnan(value) else value
+    except TypeError:
+        return value
+
+
+def import_trades_csv(fileobj, user_id, chunk_size=DEFAULT_CHUNK_SIZE, on_duplicate='skip'):
+    """
+    Import trades for user_id from an uploaded CSV (the import template format).
+
+    Rows whose content fingerprint matches an existing trade of the user (or an
+    earlier row of the same file) are skipped, or with on_duplicate='update'
+    the existing trade's fields and tags are overwritten from the row.
+    Adds the rows to the current session in chunks; the caller commits.
+    Raises ValueError when the file is missing a required column.
+    """
+    if on_duplicate not in DUPLICATE_MODES:
+        raise ValueError(f"on_duplicate must be one of {', '.join(DUPLICATE_MODES)}")
+
+    raw = fileobj.read()
+    text = raw.decode('utf-8-sig') if isinstance(raw, bytes) else raw
+    df = pd.read_csv(io.StringIO(text), dtype=str, keep_default_na=False, skip_blank_lines=True)
+    df.columns = [str(column).strip() for column in df.columns]
+    missing = [h for h in (HEADER_DATE, HEADER_INSTRUMENT, HEADER_DIRECTION) if h not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    df = df.apply(lambda column: column.str.strip())
+
+    result = TradeImportResult()
+    if df.empty:
+        return result
+
+    errors = _RowErrors(df.index)
+    line_numbers = df.index.to_numpy() + 2
+
+    # --- Required trade fields ---
+    date_str = df[HEADER_DATE]
+    symbol = df[HEADER_INSTRUMENT].str.upper()
+    direction = df[HEADER_DIRECTION].str.capitalize()
+    errors.add((date_str == '') | (symbol == '') | (direction == ''),
+               "Missing required fields (Date, Instrument, or Direction).")
+
+    trade_dates = pd.to_datetime(date_str.where(date_str != ''), format='%Y-%m-%d', errors='coerce')
+    errors.add(trade_dates.isna(), "Date must be YYYY-MM-DD.")
+    errors.add(~direction.isin(['Long', 'Short']), "Direction must be Long or Short.")
+
+    # --- Legs ---
+    entry_times, entry_contracts, entry_prices = _read_legs(df, 'entry', errors)
+    exit_times, exit_contracts, exit_prices = _read_legs(df, 'exit', errors)
+    errors.add(pd.Series(np.isnan(entry_times).all(axis=1), index=df.index),
+               "At least one full entry (Time, Contracts, Price) is required.")
+    errors.add(pd.Series(np.isnan(exit_times[:, 0]), index=df.index),
+               "Missing required fields for first exit.")
+
+    # --- Optional numeric fields ---
+    optional_numbers = {}
+    for column, header in (('initial_stop_loss', HEADER_SL), ('terminus_target', HEADER_TP),
+                           ('mae_price', HEADER_MAE), ('mfe_price', HEADER_MFE)):
+        values = _text(df, header)
+        parsed = _number(values)
+        errors.add((values != '') & parsed.isna(), f"{header} must be a number.")
+        optional_numbers[column] = parsed.to_numpy(dtype=float)
+
+    # --- Resolve names from in-memory lookups ---
+    instruments, models, tags = _lookup_tables(user_id)
+    instrument_ids = symbol.map(lambda s: instruments.get(s, (None, None))[0])
+    point_values = symbol.map(lambda s: instruments.get(s, (None, None))[1]).astype(float).to_numpy()
+    model_names = _text(df, HEADER_MODEL)
+    model_ids = model_names.map(models)
+    how_closed = _text(df, HEADER_HOW_CLOSED)
+    notes = _text(df, HEADER_NOTES)
+    tag_names = _text(df, HEADER_TAGS).map(
+        lambda value: [name.strip() for name in value.split(',') if name.strip()])
+
+    aggregates = _compute_aggregates(
+        np.where(direction == 'Long', 1.0, np.where(direction == 'Short', -1.0, 0.0)),
+        point_values, optional_numbers['initial_stop_loss'], how_closed,
+        entry_times, entry_contracts, entry_prices, exit_times, exit_contracts, exit_prices)
+
+    valid = errors.valid.to_numpy()
+    for position in np.flatnonzero(~valid):
+        result.errors.append(ImportRowError(int(line_numbers[position]), errors.messages.iat[position]))
+
+    valid_positions = np.flatnonzero(valid)
+    seen_fingerprints = set()
+    written_dates = set()  # for the tables derived from trades
+    for start in range(0, len(valid_positions), chunk_size):
+        chunk = valid_positions[start:start + chunk_size]
+        trade_rows, legs, links, lines = [], [], [], []
+
+        for position in chunk:
+            line = int(line_numbers[position])
+            trade_date = trade_dates.iat[position].date()
+            first_entry = aggregates['first_entry_seconds'][position]
+            last_exit = aggregates['last_exit_seconds'][position]
+            entry_ts = pd.Timestamp(trade_date) + pd.to_timedelta(first_entry, unit='s')
+            exit_ts = pd.Timestamp(trade_date) + pd.to_timedelta(last_exit, unit='s') \
+                if not np.isnan(last_exit) else None
+
+            model_name = model_names.iat[position]
+            model_id = model_ids.iat[position]
+            if pd.isna(model_id):
+                if model_name:
+                    result.warnings.append(ImportRowError(line, f"Unknown trading model '{model_name}' ignored."))
+                model_id = None
+
+            instrument_id = instrument_ids.iat[position]
+            instrument_id = None if pd.isna(instrument_id) else int(instrument_id)
+            trade_rows.append({
+                'user_id': user_id,
+                'trade_date': trade_date,
+                'instrument_id': instrument_id,
+                'instrument_legacy': None if instrument_id else symbol.iat[position],
+                'direction': direction.iat[position],
+                'trading_model_id': None if model_id is None else int(model_id),
+                'how_closed': how_closed.iat[position] or None,
+                'trade_notes': notes.iat[position] or None,
+                'initial_stop_loss': _none_if_nan(optional_numbers['initial_stop_loss'][position]),
+                'terminus_target': _none_if_nan(optional_numbers['terminus_target'][position]),
+                'mae_price': _none_if_nan(optional_numbers['mae_price'][position]),
+                'mfe_price': _none_if_nan(optional_numbers['mfe_price'][position]),
+                'total_contracts_entered': int(aggregates['total_contracts_entered'][position]),
+                'total_contracts_exited': int(aggregates['total_contracts_exited'][position]),
+                'average_entry_price': _none_if_nan(float(aggregates['average_entry_price'][position])),
+                'average_exit_price': _none_if_nan(float(aggregates['average_exit_price'][position])),
+                'pnl': float(aggregates['pnl'][position]),
+                'dollar_risk': _none_if_nan(float(aggregates['dollar_risk'][position])),
+                'pnl_in_r': _none_if_nan(float(aggregates['pnl_in_r'][position])),
+                'entry_timestamp': entry_ts.to_pydatetime(),
+                'exit_timestamp': exit_ts.to_pydatetime() if exit_ts is not None else None,
+                'time_in_trade_seconds': int(last_exit - first_entry) if exit_ts is not None else None,
+                'entry_weekday': trade_date.weekday(),
+                'entry_hour': entry_ts.hour,
+                'trading_session': trading_session_for_hour(entry_ts.hour),
+            })
+
+            entries = [(EntryPoint, {'entry_time': _seconds_to_time(entry_times[position, leg]),
+                                     'contracts': int(entry_contracts[position, leg]),
+                                     'entry_price': float(entry_prices[position, leg])})
+                       for leg in range(MAX_LEGS) if not np.isnan(entry_times[position, leg])]
+            exits = [(ExitPoint, {'exit_time': _seconds_to_time(exit_times[position, leg]),
+                                  'contracts': int(exit_contracts[position, leg]),
+                                  'exit_price': float(exit_prices[position, leg])})
+                     for leg in range(MAX_LEGS) if not np.isnan(exit_times[position, leg])]
+            legs.append(entries + exits)
+            lines.append(line)
+            trade_rows[-1]['content_fingerprint'] = compute_trade_fingerprint(
+                trade_date, symbol.iat[position], direction.iat[position],
+                [(v['entry_time'], v['contracts'], v['entry_price']) for _, v in entries],
+                [(v['exit_time'], v['contracts'], v['exit_price']) for _, v in exits])
+
+            tag_ids = []
+            for name in tag_names.iat[position]:
+                tag_id = tags.get(name.lower())
+                if tag_id is None:
+                    result.warnings.append(ImportRowError(line, f"Unknown tag '{name}' ignored."))
+                elif tag_id not in tag_ids:
+                    tag_ids.append(tag_id)
+            links.append(tag_ids)
+
+        # One set-based lookup per chunk for trades this user already has
+        existing = dict(db.session.query(Trade.content_fingerprint, Trade.id).filter(
+            Trade.user_id == user_id,
+            Trade.content_fingerprint.in_([row['content_fingerprint'] for row in trade_rows])))
+
+        new_rows, updates = [], []
+        for row, trade_legs, tag_ids, line in zip(trade_rows, legs, links, lines):
+            fingerprint = row['content_fingerprint']
+            if fingerprint in seen_fingerprints:
+                result.duplicates.append(ImportRowError(line, "Duplicate of an earlier row in this file; skipped."))
+                continue
+            seen_fingerprints.add(fingerprint)
+
+            if fingerprint in existing:
+                if on_duplicate == 'update':
+                    updates.append((existing[fingerprint], row, tag_ids))
+                else:
+                    result.duplicates.append(ImportRowError(
+                        line, f"Already imported as trade #{existing[fingerprint]}; skipped."))
+                continue
+            new_rows.append((row, trade_legs, tag_ids))
+
+        written_dates.update(row['trade_date'] for _, row, _ in updates)
+        written_dates.update(row['trade_date'] for row, _, _ in new_rows)
+
+        if updates:
+            # Same fingerprint means the same legs; only trade-level fields and tags change
+            db.session.execute(sa.update(Trade), [dict(row, id=trade_id) for trade_id, row, _ in updates])
+            updated_ids = [trade_id for trade_id, _, _ in updates]
+            db.session.execute(trade_tags.delete().where(trade_tags.c.trade_id.in_(updated_ids)))
+            update_links = [{'trade_id': trade_id, 'tag_id': tag_id}
+                            for trade_id, _, tag_ids in updates for tag_id in tag_ids]
+            if update_links:
+                db.session.execute(trade_tags.insert(), update_links)
+            result.updated_count += len(updates)
+
+        if not new_rows:
+            continue
+
+        trade_ids = db.session.scalars(
+            sa.insert(Trade).returning(Trade.id, sort_by_parameter_order=True),
+            [row for row, _, _ in new_rows]).all()
+
+        entry_rows, exit_rows, link_rows = [], [], []
+        for trade_id, (_, trade_legs, tag_ids) in zip(trade_ids, new_rows):
+            for model, values in trade_legs:
+                (entry_rows if model is EntryPoint else exit_rows).append(dict(values, trade_id=trade_id))
+            link_rows.extend({'trade_id': trade_id, 'tag_id': tag_id} for tag_id in tag_ids)
+
+        db.session.execute(sa.insert(EntryPoint), entry_rows)
+        db.session.execute(sa.insert(ExitPoint), exit_rows)
+        if link_rows:
+            db.session.execute(trade_tags.insert(), link_rows)
+        result.imported_count += len(trade_ids)
+
+    # Bulk statements bypass the session's flush listener
+    trades_written(db.session.connection(), user_id, written_dates)
+    return result
@@ -0,0 +1,68 @@
+# app/utils/trade_kpis.py
+"""
+KPI header for the trades list, computed with a single GROUP BY query and
+cached per user until the user's data changes (see analytics_cache).
+"""
+from app.extensions import db
+from app.models import Trade, TradingModel
+from app.utils.analytics_cache import analytics_cache
+
+
+def get_trade_kpis(user_id):
+    """KPI data for the user, cached until the user's data version changes."""
+    return dict(analytics_cache.get_or_compute(user_id, 'trade_kpis', None,
+                                               lambda: calculate_trade_kpis(user_id)))
+
+
+def calculate_trade_kpis(user_id):
+    """Counts, cumulative P&L, strike rate and best model in one round trip."""
+    wins = db.func.sum(db.case((Trade.pnl > 0, 1), else_=0))
+    losses = db.func.sum(db.case((Trade.pnl < 0, 1), else_=0))
+    breakevens = db.func.sum(db.case((Trade.pnl == 0, 1), else_=0))
+
+    rows = db.session.query(
+        Trade.trading_model_id,
+        TradingModel.name,
+        db.func.count(Trade.id),
+        db.func.count(Trade.pnl),
+        wins,
+        losses,
+        breakevens,
+        db.func.sum(Trade.pnl),
+    ).outerjoin(TradingModel, Trade.trading_model_id == TradingModel.id) \
+        .filter(Trade.user_id == user_id) \
+        .group_by(Trade.trading_model_id, TradingModel.name) \
+        .all()
+
+    kpi_data = {
+        'total_trades': 0,
+        'profitable_trades': 0,
+        'losing_trades': 0,
+        'breakeven_trades': 0,
+        'cumulative_pnl': 0,
+        'strike_rate': 0,
+        'best_model': None,
+    }
+    trades_with_pnl = 0
+    best_strike_rate = -1
+
+    for model_id, model_name, total, with_pnl, win_count, loss_count, be_count, pnl_sum in rows:
+        kpi_data['total_trades'] += total
+        kpi_data['profitable_trades'] += win_count or 0
+        kpi_data['losing_trades'] += loss_count or 0
+        kpi_data['breakeven_trades'] += be_count or 0
+        kpi_data['cumulative_pnl'] += pnl_sum or 0
+        trades_with_pnl += with_pnl
+
+        # Best model by strike rate (only trades with a recorded P&L count)
+        if model_id is not None and model_name and with_pnl:
+            strike_rate = ((win_count or 0) / with_pnl) * 100
+            if strike_rate > best_strike_rate:
+                kpi_data['best_model'] = model_name
+                best_strike_rate = strike_rate
+
+    if trades_with_pnl:
+        kpi_data['strike_rate'] = (kpi_data['profitable_trades'] / trades_with_pnl) * 100
+
+    return kpi_data
+
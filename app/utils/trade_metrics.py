@@ -0,0 +1,81 @@
+# app/utils/trade_metrics.py
+"""
+Batch loader for per-trade entry/exit metrics.
+
+Rendering a page of trades should never touch trade.entries / trade.exits row
+by row. TradeMetricsBatch pulls the trade headers, all entry rows and all exit
+rows for a list of trade ids in three queries (independent of page size) and
+exposes the precomputed metrics plus the grouped entry/exit points.
+"""
+from collections import defaultdict
+
+from app.extensions import db
+from app.models import Trade, EntryPoint, ExitPoint, Instrument, compute_trade_aggregates
+
+
+class TradeMetricsBatch:
+    """Precomputed entry/exit metrics for a batch of trades, keyed by trade id."""
+
+    def __init__(self, trade_ids):
+        self.trade_ids = [tid for tid in dict.fromkeys(trade_ids) if tid is not None]
+        self._entries = defaultdict(list)
+        self._exits = defaultdict(list)
+        self._metrics = {}
+        if self.trade_ids:
+            self._load()
+
+    @classmethod
+    def for_trades(cls, trades):
+        """Build a batch for already-loaded Trade objects."""
+        return cls([trade.id for trade in trades])
+
+    def _load(self):
+        # 1. Trade header fields needed for risk / P&L (point value falls back to the instrument)
+        header_rows = db.session.query(
+            Trade.id, Trade.trade_date, Trade.direction, Trade.initial_stop_loss,
+            Trade.point_value, Instrument.point_value, Trade.how_closed
+        ).outerjoin(Instrument, Trade.instrument_id == Instrument.id) \
+            .filter(Trade.id.in_(self.trade_ids)).all()
+
+        # 2. All entries for the batch, grouped by trade
+        for entry in EntryPoint.query.filter(EntryPoint.trade_id.in_(self.trade_ids)) \
+                .order_by(EntryPoint.trade_id, EntryPoint.entry_time, EntryPoint.id):
+            self._entries[entry.trade_id].append(entry)
+
+        # 3. All exits for the batch, grouped by trade
+        for exit_point in ExitPoint.query.filter(ExitPoint.trade_id.in_(self.trade_ids)) \
+                .order_by(ExitPoint.trade_id, ExitPoint.exit_time, ExitPoint.id):
+            self._exits[exit_point.trade_id].append(exit_point)
+
+        for trade_id, trade_date, direction, sl, trade_pv, instrument_pv, how_closed in header_rows:
+            point_value = trade_pv if trade_pv is not None and trade_pv > 0 else instrument_pv
+            entries = self._entries.get(trade_id, [])
+            exits = self._exits.get(trade_id, [])
+            metrics = compute_trade_aggregates(
+                trade_date, direction, sl, point_value, how_closed,
+                [(e.entry_time, e.contracts, e.entry_price) for e in entries],
+                [(x.exit_time, x.contracts, x.exit_price) for x in exits])
+            metrics['first_entry_time'] = metrics['entry_timestamp'].time() if metrics['entry_timestamp'] else None
+            metrics['last_exit_time'] = metrics['exit_timestamp'].time() if metrics['exit_timestamp'] else None
+            self._metrics[trade_id] = metrics
+
+    def __contains__(self, trade_id):
+        return trade_id in self._metrics
+
+    def __len__(self):
+        return len(self._metrics)
+
+    def get(self, trade_id, default=None):
+        """Metrics dict for a trade (same keys as compute_trade_aggregates plus first/last times)."""
+        return self._metrics.get(trade_id, default)
+
+    def __getitem__(self, trade_id):
+        return self._metrics[trade_id]
+
+    def entries_for(self, trade_id):
+        """Entry points for a trade, ordered by entry time."""
+        return self._entries.get(trade_id, [])
+
+    def exits_for(self, trade_id):
+        """Exit points for a trade, ordered by exit time."""
+        return self._exits.get(trade_id, [])
@@ -0,0 +1,86 @@
+# app/utils/trade_writes.py
+"""
+Write hooks for tables derived from the trade table.
+
+Derived tables (the equity series, the daily performance rollup) register a
+handler with the trade columns they depend on. One session after_flush
+listener works out which users and trade dates each flush touched - trades
+inserted or deleted, or with one of those columns changed - and calls the
+handler with the flush's connection, so derived rows commit or roll back
+together with the trade write.
+
+Handlers take (connection, changes) where changes is {user_id: dates}, dates
+being a set of datetime.date, or None when the user's whole history is stale.
+
+Core bulk writes that bypass the unit of work (CSV import) call
+trades_written() themselves.
+"""
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Trade
+
+# Dates per statement when handlers filter by date (keeps IN lists well under driver parameter limits)
+DATE_CHUNK_SIZE = 500
+
+_handlers = []  # [(handler, frozenset of Trade column names)]
+
+
+def _note(changes, user_id, trade_date):
+    if user_id is None:
+        return
+    if trade_date is None:
+        changes[user_id] = None
+    elif changes.get(user_id, set()) is not None:
+        changes.setdefault(user_id, set()).add(trade_date)
+
+
+def _flush_changes(session, columns):
+    """{user_id: dates} touched by this flush for handlers depending on columns."""
+    changes = {}
+    for trade in session.new:
+        if isinstance(trade, Trade):
+            _note(changes, trade.user_id, trade.trade_date)
+
+    for trade in session.deleted:
+        if isinstance(trade, Trade):
+            _note(changes, trade.user_id, trade.trade_date)
+
+    for trade in session.dirty:
+        if not isinstance(trade, Trade):
+            continue
+        state = sa.inspect(trade)
+        if not any(state.attrs[name].history.has_changes() for name in columns):
+            continue
+        # Old and new positions are both stale (a move empties one day, fills another)
+        old_users = state.attrs.user_id.history.deleted or [trade.user_id]
+        old_dates = state.attrs.trade_date.history.deleted or [trade.trade_date]
+        for user_id in set(old_users) | {trade.user_id}:
+            for trade_date in set(old_dates) | {trade.trade_date}:
+                _note(changes, user_id, trade_date)
+    return changes
+
+
+def _after_flush(session, flush_context):
+    for handler, columns in _handlers:
+        changes = _flush_changes(session, columns)
+        if changes:
+            handler(session.connection(), changes)
+
+
+def add_trade_write_handler(handler, columns):
+    """Call handler(connection, changes) after each flush that writes trades (idempotent)."""
+    columns = frozenset(columns) | {'trade_date', 'user_id'}
+    if not any(registered is handler for registered, _ in _handlers):
+        _handlers.append((handler, columns))
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+
+
+def trades_written(connection, user_id, dates):
+    """Tell every handler that user_id's trades on dates were written outside the ORM."""
+    dates = set(dates)
+    if dates:
+        for handler, _ in _handlers:
+            handler(connection, {user_id: dates})
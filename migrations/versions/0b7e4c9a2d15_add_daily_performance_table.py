@@ -0,0 +1,47 @@
+"""Add daily_performance rollup table
+
+Revision ID: 0b7e4c9a2d15
+Revises: f3b8d1e6a204
+Create Date: 2026-10-17 19:05:41.602117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0b7e4c9a2d15'
+down_revision = 'f3b8d1e6a204'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_performance',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('trade_date', sa.Date(), nullable=False),
+    sa.Column('instrument', sa.String(length=20), nullable=True),
+    sa.Column('trading_model_id', sa.Integer(), nullable=True),
+    sa.Column('direction', sa.String(length=5), nullable=True),
+    sa.Column('trade_count', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('losses', sa.Integer(), nullable=False),
+    sa.Column('gross_profit', sa.Float(), nullable=False),
+    sa.Column('gross_loss', sa.Float(), nullable=False),
+    sa.Column('sum_r', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_daily_performance_user'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('daily_performance', schema=None) as batch_op:
+        batch_op.create_index('idx_daily_performance_user_date', ['user_id', 'trade_date'], unique=False)
+
+    from app.utils.daily_performance import backfill_all
+    backfill_all(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('daily_performance', schema=None) as batch_op:
+        batch_op.drop_index('idx_daily_performance_user_date')
+
+    op.drop_table('daily_performance')
@@ -0,0 +1,25 @@
+"""Add composite (user_id, trade_date, id) index on trade
+
+Revision ID: 11418ff0f808
+Revises: ca1346864b23
+Create Date: 2026-10-17 13:02:47.551930
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '11418ff0f808'
+down_revision = 'ca1346864b23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.create_index('idx_trade_user_date_id', ['user_id', 'trade_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.drop_index('idx_trade_user_date_id')
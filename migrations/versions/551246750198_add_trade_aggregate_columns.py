@@ -0,0 +1,50 @@
+"""Add stored entry/exit aggregate columns to trade
+
+Revision ID: 551246750198
+Revises: 6332a76a91ba
+Create Date: 2026-10-17 09:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '551246750198'
+down_revision = '6332a76a91ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_contracts_entered', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('total_contracts_exited', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('average_entry_price', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('average_exit_price', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('dollar_risk', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('pnl_in_r', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('entry_timestamp', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('exit_timestamp', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('time_in_trade_seconds', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_trade_pnl_in_r'), ['pnl_in_r'], unique=False)
+        batch_op.create_index(batch_op.f('ix_trade_entry_timestamp'), ['entry_timestamp'], unique=False)
+        batch_op.create_index(batch_op.f('ix_trade_time_in_trade_seconds'), ['time_in_trade_seconds'], unique=False)
+
+    # Existing rows are populated by: flask backfill-trade-aggregates
+
+
+def downgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_trade_time_in_trade_seconds'))
+        batch_op.drop_index(batch_op.f('ix_trade_entry_timestamp'))
+        batch_op.drop_index(batch_op.f('ix_trade_pnl_in_r'))
+        batch_op.drop_column('time_in_trade_seconds')
+        batch_op.drop_column('exit_timestamp')
+        batch_op.drop_column('entry_timestamp')
+        batch_op.drop_column('pnl_in_r')
+        batch_op.drop_column('dollar_risk')
+        batch_op.drop_column('average_exit_price')
+        batch_op.drop_column('average_entry_price')
+        batch_op.drop_column('total_contracts_exited')
+        batch_op.drop_column('total_contracts_entered')
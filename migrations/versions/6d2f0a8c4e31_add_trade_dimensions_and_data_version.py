@@ -0,0 +1,38 @@
+"""Add trade analytics dimension columns and user data_version
+
+Revision ID: 6d2f0a8c4e31
+Revises: 0b7e4c9a2d15
+Create Date: 2026-10-17 20:31:17.284903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6d2f0a8c4e31'
+down_revision = '0b7e4c9a2d15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('entry_weekday', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('entry_hour', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('trading_session', sa.String(length=10), nullable=True))
+        batch_op.create_index('idx_trade_user_weekday_hour', ['user_id', 'entry_weekday', 'entry_hour'], unique=False)
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
+
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.drop_index('idx_trade_user_weekday_hour')
+        batch_op.drop_column('trading_session')
+        batch_op.drop_column('entry_hour')
+        batch_op.drop_column('entry_weekday')
@@ -0,0 +1,30 @@
+"""Add trade.content_fingerprint with a (user_id, content_fingerprint) index
+
+Revision ID: 7c2e9d4b1f60
+Revises: 11418ff0f808
+Create Date: 2026-10-17 14:21:36.204417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c2e9d4b1f60'
+down_revision = '11418ff0f808'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content_fingerprint', sa.String(length=64), nullable=True))
+        batch_op.create_index('idx_trade_user_fingerprint', ['user_id', 'content_fingerprint'], unique=False)
+
+    # Existing rows are fingerprinted by `flask backfill-trade-aggregates`
+
+
+def downgrade():
+    with op.batch_alter_table('trade', schema=None) as batch_op:
+        batch_op.drop_index('idx_trade_user_fingerprint')
+        batch_op.drop_column('content_fingerprint')
@@ -0,0 +1,39 @@
+"""Add data_change log table
+
+Revision ID: 9c1e5a7f3b42
+Revises: 6d2f0a8c4e31
+Create Date: 2026-10-17 22:14:08.519263
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c1e5a7f3b42'
+down_revision = '6d2f0a8c4e31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('data_change',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('trade_date', sa.Date(), nullable=True),
+    sa.Column('trading_model_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_data_change_user'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('data_change', schema=None) as batch_op:
+        batch_op.create_index('idx_data_change_user_version', ['user_id', 'version'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('data_change', schema=None) as batch_op:
+        batch_op.drop_index('idx_data_change_user_version')
+
+    op.drop_table('data_change')
@@ -0,0 +1,26 @@
+"""Add background_job.worker
+
+Revision ID: b7d3e9f1a264
+Revises: 9c1e5a7f3b42
+Create Date: 2026-10-18 09:41:52.103877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e9f1a264'
+down_revision = '9c1e5a7f3b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('background_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('worker', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('background_job', schema=None) as batch_op:
+        batch_op.drop_column('worker')
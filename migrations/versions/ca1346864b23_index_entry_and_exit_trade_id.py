@@ -0,0 +1,31 @@
+"""Index entry_point.trade_id and exit_point.trade_id
+
+Revision ID: ca1346864b23
+Revises: 551246750198
+Create Date: 2026-10-17 11:40:05.118342
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'ca1346864b23'
+down_revision = '551246750198'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('entry_point', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_entry_point_trade_id'), ['trade_id'], unique=False)
+
+    with op.batch_alter_table('exit_point', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_exit_point_trade_id'), ['trade_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('exit_point', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_exit_point_trade_id'))
+
+    with op.batch_alter_table('entry_point', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_entry_point_trade_id'))
@@ -0,0 +1,45 @@
+"""Add equity_point table
+
+Revision ID: f3b8d1e6a204
+Revises: e5a0c3b7d912
+Create Date: 2026-10-17 17:42:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b8d1e6a204'
+down_revision = 'e5a0c3b7d912'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('equity_point',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('trade_id', sa.Integer(), nullable=False),
+    sa.Column('trade_date', sa.Date(), nullable=False),
+    sa.Column('sequence', sa.Integer(), nullable=False),
+    sa.Column('pnl', sa.Float(), nullable=False),
+    sa.Column('cumulative_pnl', sa.Float(), nullable=False),
+    sa.Column('peak_equity', sa.Float(), nullable=False),
+    sa.Column('drawdown', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_equity_point_user'),
+    sa.ForeignKeyConstraint(['trade_id'], ['trade.id'], name='fk_equity_point_trade', ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('equity_point', schema=None) as batch_op:
+        batch_op.create_index('idx_equity_point_user_date_trade', ['user_id', 'trade_date', 'trade_id'], unique=True)
+
+    from app.utils.equity_series import backfill_all
+    backfill_all(op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('equity_point', schema=None) as batch_op:
+        batch_op.drop_index('idx_equity_point_user_date_trade')
+
+    op.drop_table('equity_point')
@@ -119,4 +119,143 @@ def migrate_p12_images_command():
         click.echo(f"Migration failed: {result['error']}")
 
 # You can then run this command with:
-# flask migrate-p12-images
\ No newline at end of file
+# flask migrate-p12-images
+
+@app.cli.command("backfill-trade-aggregates")
+@click.option("--batch-size", default=500, show_default=True, help="Trades to recalculate per commit.")
+def backfill_trade_aggregates_command(batch_size):
+    """Recalculate stored entry/exit aggregates (pnl, analytics dimensions, content fingerprint) for every trade."""
+    from app.models import Trade
+
+    total = Trade.query.count()
+    click.echo(f"Backfilling aggregates for {total} trades...")
+
+    processed = 0
+    last_id = 0
+    while True:
+        batch = Trade.query.filter(Trade.id > last_id).order_by(Trade.id).limit(batch_size).all()
+        if not batch:
+            break
+        for trade in batch:
+            trade.recalculate_aggregates()
+        db.session.commit()
+        processed += len(batch)
+        last_id = batch[-1].id
+        click.echo(f"  {processed}/{total}")
+
+    click.echo("Trade aggregates backfilled.")
+
+
+@app.cli.command("export-trades-parquet")
+@click.argument("username")
+@click.option("--output", "-o", default=None, help="Zip file to write (default: trades_<username>_<timestamp>.zip).")
+@click.option("--start-date", default=None, help="Only trades on or after this date (YYYY-MM-DD).")
+@click.option("--end-date", default=None, help="Only trades on or before this date (YYYY-MM-DD).")
+@click.option("--batch-size", default=5000, show_default=True, help="Rows fetched per batch / Parquet row group.")
+def export_trades_parquet_command(username, output, start_date, end_date, batch_size):
+    """Export a user's trades, entries, exits and tag links as a zip of Parquet files."""
+    from datetime import datetime
+    from app.models import User
+    from app.utils.columnar_export import write_trades_parquet_zip, PYARROW_AVAILABLE
+    from app.utils.trade_filters import TradeFilterSpec
+    from werkzeug.datastructures import MultiDict
+
+    if not PYARROW_AVAILABLE:
+        raise click.ClickException("pyarrow is not installed.")
+
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f"No user named {username}.")
+
+    filter_spec = TradeFilterSpec.from_request(MultiDict({'start_date': start_date, 'end_date': end_date}))
+    output = output or f"trades_{username}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+
+    with open(output, 'wb') as fileobj:
+        manifest = write_trades_parquet_zip(fileobj, user.id, filter_spec, batch_size=batch_size)
+
+    for table, row_count in manifest['tables'].items():
+        click.echo(f"  {table}: {row_count} rows")
+    click.echo(f"Wrote {output}")
+
+
+@app.cli.command("purge-background-jobs")
+def purge_background_jobs_command():
+    """Delete expired background jobs and artifacts; fail jobs whose worker went away."""
+    from app.services.job_service import job_service
+
+    purged, failed = job_service.purge_expired()
+    click.echo(f"Purged {purged} finished jobs, marked {failed} stuck jobs as failed.")
+
+
+@app.cli.command("clear-chart-cache")
+def clear_chart_cache_command():
+    """Remove all cached report chart images."""
+    from app.utils.chart_cache import chart_cache
+
+    stats = chart_cache.stats()
+    chart_cache.clear()
+    click.echo(f"Removed {stats['entries']} cached charts ({stats['bytes'] / (1024 * 1024):.1f} MB).")
+
+
+@app.cli.command("benchmark-metrics")
+@click.option("--sizes", default="1000,10000,100000", show_default=True, help="Comma-separated trade counts.")
+@click.option("--repeat", default=3, show_default=True, help="Runs per size (best time is reported).")
+def benchmark_metrics_command(sizes, repeat):
+    """Time the vectorized performance metrics against the old per-trade loops."""
+    from app.utils.performance_metrics import benchmark
+
+    try:
+        sizes = tuple(int(size) for size in sizes.split(',') if size.strip())
+    except ValueError:
+        raise click.ClickException("--sizes must be a comma-separated list of integers.")
+
+    click.echo(f"{'trades':>10} {'loop ms':>10} {'vector ms':>10} {'speedup':>9} {'max diff':>10}")
+    for row in benchmark(sizes=sizes, repeat=repeat):
+        click.echo(f"{row['trades']:>10} {row['loop_ms']:>10.2f} {row['vectorized_ms']:>10.2f} "
+                   f"{row['speedup']:>8.1f}x {row['max_diff']:>10.2e}")
+
+
+@app.cli.command("rebuild-equity-series")
+@click.option("--username", default=None, help="Only rebuild this user's series (default: every user).")
+def rebuild_equity_series_command(username):
+    """Recompute the persisted equity curve (equity_point rows) from the stored trade P&L."""
+    from app.models import User
+    from app.utils.equity_series import rebuild_all
+
+    user_ids = None
+    if username:
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.ClickException(f"No user named {username}.")
+        user_ids = [user.id]
+
+    written = rebuild_all(user_ids)
+    click.echo(f"Rebuilt equity series for {len(written)} users ({sum(written.values())} points).")
+
+
+@app.cli.command("rebuild-daily-performance")
+@click.option("--username", default=None, help="Only rebuild this user's rollup (default: every user).")
+def rebuild_daily_performance_command(username):
+    """Recompute the daily_performance rollup from the trade table."""
+    from app.models import User
+    from app.utils.daily_performance import rebuild_all
+
+    user_ids = None
+    if username:
+        user = User.query.filter_by(username=username).first()
+        if user is None:
+            raise click.ClickException(f"No user named {username}.")
+        user_ids = [user.id]
+
+    click.echo(f"Rebuilt daily performance rollup for {rebuild_all(user_ids)} users.")
+
+
+@app.cli.command("prune-change-log")
+@click.option("--days", default=30, show_default=True, type=int, help="Keep this many days of changes.")
+def prune_change_log_command(days):
+    """Drop old delta-sync change log rows; clients older than that get a full dashboard payload."""
+    from app.utils.change_log import prune
+
+    if days < 1:
+        raise click.ClickException("--days must be at least 1.")
+    click.echo(f"Pruned {prune(days)} change log rows.")
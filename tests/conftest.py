@@ -0,0 +1,67 @@
+# tests/conftest.py
+"""Shared fixtures: an app on an in-memory SQLite database, a user and a trade factory."""
+from datetime import date, time
+
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models import User, Instrument, Trade, EntryPoint, ExitPoint
+
+
+class TestConfig:
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+    ANALYTICS_CACHE_TYPE = 'null'
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='trader', email='trader@example.com')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, user):
+    """Test client logged in as user."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user.id)
+        session['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def make_trade(user):
+    """make_trade(entry_price, exit_price, ..., **trade_fields) -> a committed Trade with one entry and one exit."""
+    instrument = Instrument(symbol='NQ', name='Nasdaq 100 E-mini', point_value=20.0)
+    db.session.add(instrument)
+    db.session.commit()
+
+    def make(entry_price, exit_price, contracts=1, direction='Long', trade_date=date(2024, 5, 2),
+             entry_time=time(9, 35), exit_time=time(10, 5), tags=(), **fields):
+        trade = Trade(user_id=user.id, instrument_id=instrument.id, trade_date=trade_date,
+                      direction=direction, tags=list(tags), **fields)
+        db.session.add(trade)
+        trade.entries.append(EntryPoint(entry_time=entry_time, contracts=contracts, entry_price=entry_price))
+        trade.exits.append(ExitPoint(exit_time=exit_time, contracts=contracts, exit_price=exit_price))
+        db.session.flush()
+        trade.recalculate_aggregates()
+        db.session.commit()
+        return trade
+
+    return make
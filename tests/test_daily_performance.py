@@ -0,0 +1,20 @@
+# tests/test_daily_performance.py
+from datetime import date
+
+from app.extensions import db
+from app.models import DailyPerformance
+from app.utils.daily_performance import backfill_all, query_rollup
+
+
+def test_backfill_matches_incremental_rollup(user, make_trade):
+    make_trade(100.0, 110.0, trade_date=date(2024, 5, 1))
+    make_trade(100.0, 95.0, direction='Short', trade_date=date(2024, 5, 1))
+    make_trade(100.0, 90.0, trade_date=date(2024, 5, 2))
+    expected = query_rollup(user.id, group_by=('trade_date', 'direction'))
+    DailyPerformance.query.delete()
+
+    backfill_all(db.session.connection())
+
+    assert query_rollup(user.id, group_by=('trade_date', 'direction')) == expected
+    assert [(row.trade_date, row.trades, row.net_pnl) for row in query_rollup(user.id)] == [
+        (date(2024, 5, 1), 2, 300.0), (date(2024, 5, 2), 1, -200.0)]
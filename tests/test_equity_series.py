@@ -0,0 +1,34 @@
+# tests/test_equity_series.py
+from datetime import date
+
+from app.extensions import db
+from app.models import EquityPoint
+from app.utils.equity_series import backfill_all, load_series
+
+
+def test_trade_write_on_empty_series_rebuilds_from_scratch(user, make_trade):
+    make_trade(100.0, 110.0, trade_date=date(2024, 5, 1))
+    make_trade(100.0, 95.0, trade_date=date(2024, 5, 2))
+    # A table added after the trades, not backfilled yet
+    EquityPoint.query.delete()
+    db.session.commit()
+
+    make_trade(100.0, 102.0, trade_date=date(2024, 5, 3))
+
+    series = load_series(user.id)
+    assert series['sequence'].tolist() == [1, 2, 3]
+    assert series['cumulative_pnl'].tolist() == [200.0, 100.0, 140.0]
+    assert series['drawdown'].tolist() == [0.0, 100.0, 60.0]
+
+
+def test_backfill_matches_incremental_series(user, make_trade):
+    for day, exit_price in ((1, 90.0), (2, 115.0), (2, 105.0), (6, 99.0)):
+        make_trade(100.0, exit_price, trade_date=date(2024, 5, day))
+    expected = load_series(user.id)
+    EquityPoint.query.delete()
+
+    backfill_all(db.session.connection())
+
+    series = load_series(user.id)
+    for column in ('sequence', 'trade_id', 'cumulative_pnl', 'peak_equity', 'drawdown'):
+        assert series[column].tolist() == expected[column].tolist()
@@ -0,0 +1,38 @@
+# tests/test_performance_cube.py
+from app.extensions import db
+from app.models import Tag
+from app.utils.performance_cube import query_cube
+from app.utils.trade_filters import TradeFilterSpec
+
+
+def _tags(user, *names):
+    tags = [Tag(name=name, user_id=user.id) for name in names]
+    db.session.add_all(tags)
+    db.session.commit()
+    return tags
+
+
+def test_tag_dimension_with_tag_filter(user, make_trade):
+    breakout, news = _tags(user, 'Breakout', 'News')
+    make_trade(100.0, 110.0, tags=[breakout, news])
+    make_trade(100.0, 95.0, tags=[breakout])
+    make_trade(100.0, 120.0, tags=[news])
+
+    cube = query_cube(user.id, ('tag',), TradeFilterSpec(tag_ids=(breakout.id,)))
+
+    # Both Breakout trades; the one also tagged News shows up under News too
+    assert cube['columns']['tag'] == ['Breakout', 'News']
+    assert cube['columns']['trades'] == [2, 1]
+    assert cube['columns']['net_pnl'] == [100.0, 200.0]
+
+
+def test_cube_api_tag_dimension_with_tag_filter(client, user, make_trade):
+    breakout, news = _tags(user, 'Breakout', 'News')
+    make_trade(100.0, 110.0, tags=[breakout, news])
+    make_trade(100.0, 120.0, tags=[news])
+
+    response = client.get(f'/analytics/api/cube?dimensions=tag&tags={news.id}')
+
+    assert response.status_code == 200
+    assert response.json['columns']['tag'] == ['Breakout', 'News']
+    assert response.json['columns']['trades'] == [1, 2]
@@ -0,0 +1,54 @@
+# tests/test_trade_import.py
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import Instrument, Trade, TradingModel
+from app.utils.trade_import import import_trades_csv
+
+HEADER = ('Date (Req: YYYY-MM-DD),Instrument (Req),Direction (Req),{model}'
+          'Entry Time 1 (Req: HH:MM),Entry Contracts 1 (Req),Entry Price 1 (Req),'
+          'Exit Time 1 (Req: HH:MM),Exit Contracts 1 (Req),Exit Price 1 (Req)\n')
+
+
+@pytest.fixture
+def instrument(app):
+    instrument = Instrument(symbol='NQ', name='Nasdaq 100 E-mini', point_value=20.0)
+    db.session.add(instrument)
+    db.session.commit()
+    return instrument
+
+
+def _import(user, csv_text):
+    result = import_trades_csv(io.StringIO(csv_text), user.id)
+    db.session.commit()
+    return result
+
+
+def test_import_without_model_column(user, instrument):
+    result = _import(user, HEADER.format(model='') + '2024-05-02,NQ,Long,09:35,1,100,10:05,1,110\n')
+
+    assert result.imported_count == 1
+    assert result.errors == [] and result.warnings == []
+    trade = Trade.query.one()
+    assert trade.trading_model_id is None
+    assert trade.pnl == 200.0
+
+
+def test_import_with_blank_and_unknown_models(user, instrument):
+    model = TradingModel(name='0930 Open', user_id=user.id)
+    db.session.add(model)
+    db.session.commit()
+
+    result = _import(user, HEADER.format(model='Trading Model,')
+                     + '2024-05-02,NQ,Long,,09:35,1,100,10:05,1,110\n'
+                     + '2024-05-03,NQ,Short,0930 Open,09:35,1,100,10:05,1,90\n'
+                     + '2024-05-06,NQ,Long,Mystery,09:35,1,100,10:05,1,105\n')
+
+    assert result.imported_count == 3
+    assert result.errors == []
+    assert [(warning.row, warning.message) for warning in result.warnings] == [
+        (4, "Unknown trading model 'Mystery' ignored.")]
+    models = {trade.trade_date.day: trade.trading_model_id for trade in Trade.query}
+    assert models == {2: None, 3: model.id, 6: None}
@@ -0,0 +1,73 @@
+# tests/test_trade_metrics.py
+from datetime import date, time, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import EntryPoint, ExitPoint
+from app.utils.trade_metrics import TradeMetricsBatch
+
+
+@pytest.fixture
+def count_queries(app):
+    """count_queries(fn) -> number of SQL statements fn() sends to the database."""
+    def count(fn):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+        return len(statements)
+
+    return count
+
+
+@pytest.fixture
+def trades(make_trade):
+    """50 trades: longs and shorts, winners and losers, some scaled in and out."""
+    made = []
+    for i in range(50):
+        direction = 'Long' if i % 2 == 0 else 'Short'
+        entry_price = 18000.0 + i
+        move = (i % 7 - 3) * 2.5
+        trade = make_trade(entry_price, entry_price + move if direction == 'Long' else entry_price - move,
+                           contracts=2, direction=direction, trade_date=date(2024, 5, 1) + timedelta(days=i),
+                           initial_stop_loss=entry_price - 10 if direction == 'Long' else entry_price + 10)
+        if i % 5 == 0:
+            trade.entries.append(EntryPoint(entry_time=time(9, 50), contracts=1, entry_price=entry_price - 1))
+            trade.exits.append(ExitPoint(exit_time=time(10, 30), contracts=1, exit_price=entry_price + 4))
+            db.session.flush()
+            trade.recalculate_aggregates()
+            db.session.commit()
+        made.append(trade)
+    return made
+
+
+def test_query_count_does_not_depend_on_page_size(trades, count_queries):
+    ids = [trade.id for trade in trades]
+    db.session.expire_all()
+
+    one = count_queries(lambda: TradeMetricsBatch(ids[:1]))
+    fifty = count_queries(lambda: TradeMetricsBatch(ids))
+
+    assert one == fifty == 3
+
+
+def test_metrics_match_recalculate_aggregates(trades):
+    batch = TradeMetricsBatch.for_trades(trades)
+
+    assert len(batch) == len(trades)
+    for trade in trades:
+        expected = trade.recalculate_aggregates()
+        metrics = batch[trade.id]
+        for name, value in expected.items():
+            assert metrics[name] == (pytest.approx(value) if isinstance(value, float) else value), \
+                f"trade {trade.id}: {name}"
+        assert len(batch.entries_for(trade.id)) == trade.entries.count()
+        assert len(batch.exits_for(trade.id)) == trade.exits.count()